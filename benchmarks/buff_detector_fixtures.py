@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+畫面 buff 偵測測試
+以截圖測試 BuffDetector 的準確度與每幀耗時（單核心）。
+
+截圖來源：
+    --fixtures DIR   錄製的截圖目錄，需包含 labels.json：{"檔名.png": ["skill_id", ...], ...}
+    （未指定）        以 images/ 的技能圖示合成 buff 列截圖（隨機背景、亮度與雜訊）
+    --save DIR       將合成的截圖與 labels.json 存到目錄，之後可當作固定的測試資料
+
+另外以連續畫面（大多數幀不變，偶爾有 buff 出現或消失）比較啟用/停用畫面變化偵測時
+每幀的 CPU 時間，並確認兩者偵測到的 buff 完全相同；
+以及把圖示翻轉、旋轉、換色擴充成較大的圖示目錄（干擾用），比較有無感知雜湊預先篩選時
+每幀耗時隨圖示數量的成長。
+
+用法: python benchmarks/buff_detector_fixtures.py [--frames 60] [--sequence 400] [--catalog 1,4,16]
+                                                 [--fixtures DIR] [--save DIR]
+"""
+
+import os
+
+# 以單核心量測（必須在載入 numpy 之前設定）
+for _name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(_name, '1')
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image, ImageEnhance, ImageOps
+
+from src.ui.buff_detector import BuffDetector, ScreenBuffDetector
+
+BAR_WIDTH = 480
+BAR_HEIGHT = 48
+ICON_SIZE = 32
+ICON_GAP = 2
+
+
+def load_templates(config_path='config.json', images_dir='images'):
+    """讀取可當作 buff 的技能圖示（玩家技能與道具）"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    templates = {}
+    for entry in config.get('skills', []) + config.get('items', []):
+        if entry.get('category') == 'boss':
+            continue
+        path = os.path.join(images_dir, entry.get('icon', ''))
+        if os.path.isfile(path):
+            templates[entry['id']] = Image.open(path).convert('RGBA')
+    return templates
+
+
+def synthesize_frame(templates, rng):
+    """合成一張 buff 列截圖
+
+    Returns:
+        (PIL.Image, 出現的 skill_id 列表)
+    """
+    # 背景：隨機漸層加上平滑雜訊（模擬遊戲場景）
+    base = rng.uniform(20, 200, 3)
+    gradient = np.linspace(0, rng.uniform(-60, 60), BAR_WIDTH)[None, :, None]
+    noise = np.kron(rng.normal(0, 18, (BAR_HEIGHT // 8, BAR_WIDTH // 8, 3)), np.ones((8, 8, 1)))
+    background = np.clip(base + gradient + noise, 0, 255).astype(np.uint8)
+    frame = Image.fromarray(background, 'RGB')
+
+    # buff 由右往左排列
+    skill_ids = list(templates)
+    count = int(rng.integers(0, min(9, len(skill_ids) + 1)))
+    present = [skill_ids[i] for i in rng.choice(len(skill_ids), count, replace=False)] if count else []
+    y = int(rng.integers(0, BAR_HEIGHT - ICON_SIZE + 1))
+    for slot, skill_id in enumerate(present):
+        icon = templates[skill_id].resize((ICON_SIZE, ICON_SIZE), Image.Resampling.LANCZOS)
+        icon = ImageEnhance.Brightness(icon).enhance(rng.uniform(0.9, 1.1))
+        x = BAR_WIDTH - (slot + 1) * (ICON_SIZE + ICON_GAP)
+        frame.paste(icon, (x, y), icon)
+
+    # 擷取雜訊
+    pixels = np.asarray(frame, dtype=np.float32) + rng.normal(0, 3, (BAR_HEIGHT, BAR_WIDTH, 3))
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), 'RGB'), present
+
+
+def synthesize_sequence(templates, rng, length, change_every=12):
+    """合成連續畫面：背景固定，每隔約 change_every 幀有一個 buff 出現或消失
+
+    Returns:
+        PIL.Image 列表
+    """
+    background, _ = synthesize_frame({}, rng)
+    skill_ids = list(templates)
+    active = []
+    y = 8
+    frames = []
+    frame = None
+    for i in range(length):
+        if frame is None or rng.random() < 1 / change_every:
+            if active and (len(active) >= 8 or rng.random() < 0.4):
+                active.pop(int(rng.integers(0, len(active))))
+            else:
+                candidates = [skill_id for skill_id in skill_ids if skill_id not in active]
+                active.append(candidates[int(rng.integers(0, len(candidates)))])
+            frame = background.copy()
+            for slot, skill_id in enumerate(active):
+                icon = templates[skill_id].resize((ICON_SIZE, ICON_SIZE), Image.Resampling.LANCZOS)
+                frame.paste(icon, (BAR_WIDTH - (slot + 1) * (ICON_SIZE + ICON_GAP), y), icon)
+        frames.append(frame)
+    return frames
+
+
+def compare_gating(templates, frames, args):
+    """以相同的連續畫面比較有無畫面變化偵測
+
+    Returns:
+        兩者偵測結果是否一致
+    """
+    results = {}
+    for gate in (False, True):
+        detector = BuffDetector(templates, icon_size=ICON_SIZE, scale=args.scale, threshold=args.threshold)
+        screen = ScreenBuffDetector(detector, (0, 0, BAR_WIDTH, BAR_HEIGHT), None, gate=gate)
+        appeared = [tuple(screen.process(frame)) for frame in frames]
+        results[gate] = (appeared, screen.stats.summary())
+
+    print(f"\n🎞️ 連續畫面 {len(frames)} 幀")
+    for gate, (_, summary) in results.items():
+        label = "啟用變化偵測" if gate else "每幀全部比對"
+        print(f"   {label}: 平均 CPU {summary['cpu_ms_per_frame']:.3f} ms/幀")
+        for kind, values in summary['kinds'].items():
+            if values['frames']:
+                print(f"      {kind:8s} {values['frames']:4d} 幀  CPU {values['cpu_ms']:.3f} ms  "
+                      f"實際 {values['wall_ms']:.3f} ms")
+
+    same = results[False][0] == results[True][0]
+    speedup = results[False][1]['cpu_ms_per_frame'] / max(1e-9, results[True][1]['cpu_ms_per_frame'])
+    print(f"   {'✅' if same else '❌'} 偵測結果{'一致' if same else '不一致'}，CPU 減少 {speedup:.1f} 倍")
+    return same
+
+
+def augment_catalog(templates, factor):
+    """以翻轉、旋轉與色版互換擴充圖示目錄（新圖示的 id 加上 #n 後綴，偵測到即為誤判）
+
+    Returns:
+        {skill_id: PIL.Image}（包含原本的圖示）
+    """
+    variants = []
+    for transpose in (None, Image.Transpose.FLIP_LEFT_RIGHT, Image.Transpose.FLIP_TOP_BOTTOM,
+                      Image.Transpose.ROTATE_90, Image.Transpose.ROTATE_180, Image.Transpose.ROTATE_270,
+                      Image.Transpose.TRANSPOSE, Image.Transpose.TRANSVERSE):
+        for order in ((0, 1, 2), (2, 0, 1), (1, 2, 0), (2, 1, 0), (0, 2, 1), (1, 0, 2)):
+            variants.append((transpose, order))
+
+    catalog = dict(templates)
+    for n, (transpose, order) in enumerate(variants[1:factor], 1):
+        for skill_id, image in templates.items():
+            image = image.convert('RGBA')
+            if transpose is not None:
+                image = image.transpose(transpose)
+            channels = image.split()
+            image = Image.merge('RGBA', [channels[i] for i in order] + [channels[3]])
+            if n % 2:
+                image = ImageOps.invert(image.convert('RGB')).convert('RGBA')
+                image.putalpha(channels[3])
+            catalog[f"{skill_id}#{n}"] = image
+    return catalog
+
+
+def compare_prefilter(templates, fixtures, args):
+    """比較不同圖示數量下，有無感知雜湊預先篩選的每幀耗時與準確度
+
+    Returns:
+        預先篩選的結果是否與完整比對一致
+    """
+    print(f"\n📚 圖示數量與每幀耗時（感知雜湊預先篩選）")
+    same = True
+    for factor in args.catalog:
+        catalog = augment_catalog(templates, factor)
+        line = f"   {len(catalog):4d} 個圖示:"
+        results = {}
+        for prefilter in (False, True):
+            detector = BuffDetector(catalog, icon_size=ICON_SIZE, scale=args.scale,
+                                    threshold=args.threshold, prefilter=prefilter)
+            frames = [(detector.prepare_frame(image), expected) for _, image, expected in fixtures]
+            found_all = []
+            start = time.thread_time()
+            for gray, _ in frames:
+                found_all.append(set(detector.detect(gray)))
+            per_frame = (time.thread_time() - start) * 1000 / len(frames)
+
+            errors = sum(len(found ^ set(expected)) for found, (_, expected) in zip(found_all, frames))
+            results[prefilter] = found_all
+            line += f"  {'篩選' if prefilter else '完整'} {per_frame:6.2f} ms/幀（錯誤 {errors}）"
+        same = same and results[False] == results[True]
+        print(line)
+    print(f"   {'✅' if same else '❌'} 預先篩選的偵測結果{'與完整比對一致' if same else '與完整比對不同'}")
+    return same
+
+
+def load_fixtures(directory):
+    """讀取錄製的截圖與標註"""
+    with open(os.path.join(directory, 'labels.json'), 'r', encoding='utf-8') as f:
+        labels = json.load(f)
+    return [
+        (name, Image.open(os.path.join(directory, name)).convert('RGB'), expected)
+        for name, expected in sorted(labels.items())
+    ]
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description="畫面 buff 偵測測試")
+    parser.add_argument('--frames', type=int, default=60, help="合成截圖數")
+    parser.add_argument('--sequence', type=int, default=400, help="連續畫面幀數（0 表示略過）")
+    parser.add_argument('--catalog', default='1,4,16',
+                        help="圖示目錄擴充倍數（逗號分隔，最多 48，空字串表示略過）")
+    parser.add_argument('--fixtures', help="錄製的截圖目錄（含 labels.json）")
+    parser.add_argument('--save', help="將合成截圖存到此目錄")
+    parser.add_argument('--scale', type=float, default=0.5, help="比對縮小比例")
+    parser.add_argument('--threshold', type=float, default=0.85, help="NCC 門檻")
+    parser.add_argument('--seed', type=int, default=1, help="亂數種子")
+    args = parser.parse_args()
+    args.catalog = [int(value) for value in args.catalog.split(',') if value.strip()]
+
+    templates = load_templates()
+    if args.fixtures:
+        fixtures = load_fixtures(args.fixtures)
+    else:
+        rng = np.random.default_rng(args.seed)
+        fixtures = []
+        for i in range(args.frames):
+            image, present = synthesize_frame(templates, rng)
+            fixtures.append((f"frame_{i:03d}.png", image, present))
+        if args.save:
+            os.makedirs(args.save, exist_ok=True)
+            for name, image, _ in fixtures:
+                image.save(os.path.join(args.save, name))
+            with open(os.path.join(args.save, 'labels.json'), 'w', encoding='utf-8') as f:
+                json.dump({name: present for name, _, present in fixtures}, f, ensure_ascii=False, indent=2)
+            print(f"💾 已儲存 {len(fixtures)} 張截圖到 {args.save}")
+
+    start = time.perf_counter()
+    detector = BuffDetector(templates, icon_size=ICON_SIZE, scale=args.scale, threshold=args.threshold)
+    setup_ms = (time.perf_counter() - start) * 1000
+
+    true_positive = false_positive = false_negative = 0
+    timings = []
+    for name, image, expected in fixtures:
+        start = time.perf_counter()
+        found = detector.detect(detector.prepare_frame(image))
+        timings.append((time.perf_counter() - start) * 1000)
+
+        expected = set(expected)
+        true_positive += len(expected & set(found))
+        false_positive += len(set(found) - expected)
+        false_negative += len(expected - set(found))
+        if set(found) != expected:
+            print(f"   ⚠️ {name}: 多出 {sorted(set(found) - expected)}，漏掉 {sorted(expected - set(found))}")
+
+    precision = true_positive / max(1, true_positive + false_positive)
+    recall = true_positive / max(1, true_positive + false_negative)
+    timings.sort()
+    print(f"🖼️ {len(fixtures)} 張截圖，{len(detector.skill_ids)} 個圖示範本（縮小 {args.scale}，"
+          f"範本 {detector.size}px，建立 {setup_ms:.1f} ms）")
+    print(f"🎯 精確率 {precision:.3f}，召回率 {recall:.3f}")
+    print(f"⏱️ 每幀 平均 {statistics.mean(timings):.2f} ms / 中位數 {timings[len(timings) // 2]:.2f} ms / "
+          f"最大 {timings[-1]:.2f} ms（單核心約 {1000 / statistics.mean(timings):.0f} 幀/秒）")
+    ok = precision >= 0.99 and recall >= 0.95
+
+    if args.sequence:
+        frames = synthesize_sequence(templates, np.random.default_rng(args.seed + 1), args.sequence)
+        ok = compare_gating(templates, frames, args) and ok
+    if args.catalog:
+        ok = compare_prefilter(templates, fixtures, args) and ok
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
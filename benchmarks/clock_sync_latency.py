@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+時鐘同步延遲模擬測試
+在房間伺服器前加上延遲代理（可設定上下行延遲與抖動），
+兩個客戶端使用刻意偏移的時鐘，比較「以收到時間開始倒數」與「以同步後的觸發時間開始倒數」的誤差
+
+用法: python benchmarks/clock_sync_latency.py [--up 40] [--down 90] [--jitter 15]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ui.room_client import RoomClient
+from src.ui.room_server import RoomServer
+
+
+class LatencyProxy:
+    """延遲代理：轉送 TCP 資料並加上單向延遲與抖動（保持順序）"""
+
+    def __init__(self, target_port, up_ms, down_ms, jitter_ms):
+        self.target_port = target_port
+        self.up = up_ms / 1000
+        self.down = down_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.port = None
+        self._loop = None
+
+    def start_in_thread(self):
+        """啟動代理，返回監聽埠"""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, '127.0.0.1', 0)
+            )
+            self.port = server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait()
+        return self.port
+
+    def stop(self):
+        """停止代理（等待延遲中的資料與連線關閉轉送完畢）"""
+        async def shutdown():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            if tasks:
+                await asyncio.wait(tasks, timeout=2)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    async def _handle(self, client_reader, client_writer):
+        server_reader, server_writer = await asyncio.open_connection('127.0.0.1', self.target_port)
+        await asyncio.gather(
+            self._pipe(client_reader, server_writer, self.up),
+            self._pipe(server_reader, client_writer, self.down),
+            return_exceptions=True
+        )
+
+    async def _pipe(self, reader, writer, delay):
+        queue = asyncio.Queue()
+
+        async def deliver():
+            while True:
+                deliver_at, data = await queue.get()
+                await asyncio.sleep(max(0.0, deliver_at - time.monotonic()))
+                if data is None:
+                    writer.close()
+                    return
+                writer.write(data)
+
+        task = asyncio.get_running_loop().create_task(deliver())
+        last = 0.0
+        while True:
+            data = await reader.read(65536)
+            last = max(last, time.monotonic() + delay + random.uniform(0, self.jitter))
+            queue.put_nowait((last, data or None))
+            if not data:
+                break
+        await task
+
+
+def skewed_clock(skew):
+    """產生偏移 skew 秒的單調時鐘"""
+    return lambda: time.monotonic() + skew
+
+
+def wait_for(client, event_type, timeout=5):
+    """等待指定類型的事件"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        for event in client.poll_events():
+            if event['type'] == event_type:
+                return event
+        time.sleep(0.002)
+    raise TimeoutError(f"等待 {event_type} 逾時")
+
+
+def run(args):
+    """執行模擬"""
+    server = RoomServer('127.0.0.1', 0)
+    server_port = server.start_in_thread()
+
+    sender_skew, receiver_skew = 3.0, -7.5
+    sender_proxy = LatencyProxy(server_port, args.up, args.down, args.jitter)
+    receiver_proxy = LatencyProxy(server_port, args.down, args.up, args.jitter)
+
+    sender = RoomClient(clock=skewed_clock(sender_skew))
+    sender.create_room('127.0.0.1', sender_proxy.start_in_thread(), '寄件者', ['skill'])
+    room_code = wait_for(sender, 'created')['room']
+
+    receiver = RoomClient(clock=skewed_clock(receiver_skew))
+    receiver.join_room('127.0.0.1', receiver_proxy.start_in_thread(), room_code, '收件者', ['skill'])
+    wait_for(receiver, 'joined')
+
+    time.sleep(args.warmup)  # 等待時鐘同步的初始取樣
+
+    synced_errors, naive_errors = [], []
+    for _ in range(args.triggers):
+        true_time = time.monotonic()
+        sender.send_trigger('skill', 60)
+        event = wait_for(receiver, 'trigger')
+        received = time.monotonic()
+
+        synced_errors.append((event['triggered_at'] - receiver_skew - true_time) * 1000)
+        naive_errors.append((received - true_time) * 1000)
+        time.sleep(random.uniform(0.05, 0.15))
+
+    for label, client in (('寄件者', sender), ('收件者', receiver)):
+        sync = client.clock_sync
+        print(f"⏱️ {label}: 估計時鐘差 {sync.offset:+.4f} s，RTT {sync.rtt * 1000:.1f} ms")
+
+    sender.leave()
+    receiver.leave()
+    sender_proxy.stop()
+    receiver_proxy.stop()
+    server.stop_in_thread()
+
+    print(f"\n📡 延遲設定：上行 {args.up} ms、下行 {args.down} ms、抖動 0-{args.jitter} ms，"
+          f"{args.triggers} 次觸發")
+    for label, errors in (('以收到時間開始', naive_errors), ('以同步時間開始', synced_errors)):
+        abs_errors = [abs(e) for e in errors]
+        print(f"   {label}: 平均誤差 {statistics.mean(abs_errors):6.1f} ms，"
+              f"最大 {max(abs_errors):6.1f} ms")
+    # NTP 無法分辨上下行延遲不對稱，每一端的理論誤差為 |上行 - 下行| / 2
+    print(f"   （不對稱延遲造成的理論誤差下限: {abs(args.up - args.down):.1f} ms）")
+
+    return statistics.mean(abs(e) for e in synced_errors) < statistics.mean(naive_errors)
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description="時鐘同步延遲模擬測試")
+    parser.add_argument('--up', type=float, default=40, help="寄件者上行延遲（毫秒）")
+    parser.add_argument('--down', type=float, default=90, help="寄件者下行延遲（毫秒）")
+    parser.add_argument('--jitter', type=float, default=15, help="最大抖動（毫秒）")
+    parser.add_argument('--triggers', type=int, default=20, help="觸發次數")
+    parser.add_argument('--warmup', type=float, default=1.5, help="同步取樣等待秒數")
+    args = parser.parse_args()
+
+    ok = run(args)
+    print("   ✅ 同步後誤差較小" if ok else "   ❌ 同步後誤差沒有改善")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
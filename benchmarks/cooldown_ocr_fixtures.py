@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+冷卻數字辨識測試
+以技能欄截圖測試 DigitRecognizer 的準確度與每幀耗時（單核心），
+並以連續畫面模擬倒數，量測 ScreenCooldownReader 推算的剩餘秒數誤差。
+
+截圖來源：
+    --fixtures DIR   錄製的截圖目錄，需包含 labels.json：{"檔名.png": {"欄位索引": 秒數, ...}, ...}
+                     （未列出的欄位表示沒有冷卻數字），欄位大小以 --slot-size 指定
+    （未指定）        以 images/ 的技能圖示合成技能欄（冷卻中的圖示變暗並加上描邊數字，
+                     數字字型大小與範本不同）
+    --save DIR       將合成的截圖與 labels.json 存到目錄
+
+用法: python benchmarks/cooldown_ocr_fixtures.py [--frames 60] [--seconds 90] [--fixtures DIR] [--save DIR]
+"""
+
+import os
+
+# 以單核心量測（必須在載入 numpy 之前設定）
+for _name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(_name, '1')
+
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from src.ui.cooldown_ocr import DigitRecognizer, ScreenCooldownReader, render_glyphs
+
+COLUMNS = 8
+ROWS = 2
+SLOT_SIZE = 34
+ICON_SIZE = 32
+
+
+def load_icons(config_path='config.json', images_dir='images'):
+    """讀取技能圖示"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    icons = []
+    for entry in config.get('skills', []) + config.get('items', []):
+        path = os.path.join(images_dir, entry.get('icon', ''))
+        if os.path.isfile(path):
+            icons.append(Image.open(path).convert('RGBA').resize((ICON_SIZE, ICON_SIZE), Image.Resampling.LANCZOS))
+    return icons
+
+
+def draw_bar(icons, values, rng, font_sizes=(11, 12, 13), noise=3.0):
+    """合成一張技能欄截圖
+
+    Args:
+        icons: 各欄位的圖示（依欄位順序）
+        values: {欄位索引: 顯示的秒數}（冷卻中的欄位）
+        rng: numpy 亂數產生器
+
+    Returns:
+        PIL.Image
+    """
+    bar = Image.new('RGB', (COLUMNS * SLOT_SIZE, ROWS * SLOT_SIZE), (24, 28, 36))
+    draw = ImageDraw.Draw(bar)
+    for index, icon in enumerate(icons):
+        x, y = (index % COLUMNS) * SLOT_SIZE + 1, (index // COLUMNS) * SLOT_SIZE + 1
+        if index in values:
+            # 冷卻中：圖示變暗後疊上白色描邊數字
+            dark = Image.new('RGBA', icon.size, (0, 0, 0, 0))
+            dark.paste(icon.point(lambda v: int(v * 0.35)).convert('RGB'), (0, 0), icon)
+            bar.paste(dark, (x, y), icon)
+            font = ImageFont.load_default(size=int(rng.choice(font_sizes)))
+            text = str(values[index])
+            # 逐字繪製（字距 1 像素）：黑色描邊，白色粗體數字（水平重複繪製）
+            advances = [font.getlength(char) + 1 for char in text]
+            top, bottom = font.getbbox(text)[1::2]
+            left = x + int((ICON_SIZE - sum(advances)) // 2)
+            top = y + (ICON_SIZE - (bottom - top)) // 2 - top
+            for char, advance in zip(text, advances):
+                for fill, stroke in (((0, 0, 0), 1), ((255, 255, 255), 0)):
+                    for dx in (0, 1):
+                        draw.text((left + dx, top), char, font=font, fill=fill,
+                                  stroke_width=stroke, stroke_fill=(0, 0, 0))
+                left += advance
+        else:
+            bar.paste(icon, (x, y), icon)
+    if noise:
+        pixels = np.asarray(bar, dtype=np.float32) + rng.normal(0, noise, (ROWS * SLOT_SIZE, COLUMNS * SLOT_SIZE, 3))
+        bar = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), 'RGB')
+    return bar
+
+
+def synthesize_frames(icons, rng, count):
+    """合成隨機技能欄
+
+    Returns:
+        [(名稱, PIL.Image, {欄位索引: 秒數}), ...]
+    """
+    frames = []
+    for i in range(count):
+        chosen = [icons[j] for j in rng.choice(len(icons), COLUMNS * ROWS, replace=len(icons) < COLUMNS * ROWS)]
+        cooling = rng.choice(COLUMNS * ROWS, int(rng.integers(0, COLUMNS * ROWS + 1)), replace=False)
+        values = {int(index): int(rng.choice([rng.integers(1, 10), rng.integers(10, 100), rng.integers(100, 400)]))
+                  for index in cooling}
+        frames.append((f"bar_{i:03d}.png", draw_bar(chosen, values, rng), values))
+    return frames
+
+
+def load_fixtures(directory):
+    """讀取錄製的截圖與標註"""
+    with open(os.path.join(directory, 'labels.json'), 'r', encoding='utf-8') as f:
+        labels = json.load(f)
+    return [
+        (name, Image.open(os.path.join(directory, name)).convert('RGB'),
+         {int(index): value for index, value in expected.items()})
+        for name, expected in sorted(labels.items())
+    ]
+
+
+def evaluate(recognizer, fixtures, slot_size):
+    """辨識每張截圖的所有欄位
+
+    Returns:
+        是否達標
+    """
+    correct = wrong = missed = phantom = total = 0
+    timings = []
+    for name, image, expected in fixtures:
+        width, height = image.size
+        columns = width // slot_size
+        cells = [(index % columns * slot_size, index // columns * slot_size)
+                 for index in range(columns * (height // slot_size))]
+
+        start = time.perf_counter()
+        gray = np.asarray(image.convert('L'), dtype=np.float32)
+        values = recognizer.read_cells(gray, cells, slot_size)
+        timings.append((time.perf_counter() - start) * 1000)
+
+        for index, value in enumerate(values):
+            truth = expected.get(index)
+            total += 1
+            if value == truth:
+                correct += truth is not None
+            elif truth is None:
+                phantom += 1
+                print(f"   ⚠️ {name} 欄位 {index}: 沒有冷卻卻讀到 {value}")
+            elif value is None:
+                missed += 1
+            else:
+                wrong += 1
+                print(f"   ⚠️ {name} 欄位 {index}: {truth} 讀成 {value}")
+
+    labelled = sum(len(expected) for _, _, expected in fixtures)
+    timings.sort()
+    print(f"🔢 {len(fixtures)} 張截圖，{total} 個欄位，{labelled} 個冷卻數字")
+    print(f"🎯 正確 {correct}/{labelled}（{correct / max(1, labelled) * 100:.1f}%），"
+          f"讀不出 {missed}，讀錯 {wrong}，誤判 {phantom}")
+    print(f"⏱️ 每幀 平均 {statistics.mean(timings):.2f} ms / 中位數 {timings[len(timings) // 2]:.2f} ms / "
+          f"最大 {timings[-1]:.2f} ms")
+    return wrong == 0 and phantom == 0 and correct >= 0.95 * labelled
+
+
+def simulate(recognizer, icons, rng, seconds, interval):
+    """模擬一段遊戲時間的技能欄倒數，比較推算的剩餘秒數與實際值
+
+    Returns:
+        是否達標
+    """
+    slots = list(range(COLUMNS * ROWS))
+    chosen = [icons[i % len(icons)] for i in slots]
+    # 每個欄位的冷卻結束時間（部分欄位從未施放）
+    ends = {index: float(rng.uniform(5, seconds + 60)) for index in slots if rng.random() < 0.7}
+
+    results = {}
+    for gate in (False, True):
+        reader = ScreenCooldownReader(
+            recognizer, (0, 0, COLUMNS * SLOT_SIZE, ROWS * SLOT_SIZE), slots, SLOT_SIZE, None, gate=gate
+        )
+        frame_rng = np.random.default_rng(7)
+        errors = []
+        image = None
+        shown = None
+        steps = int(seconds / interval)
+        for step in range(steps):
+            now = step * interval
+            values = {index: math.ceil(end - now) for index, end in ends.items() if end - now > 0}
+            if values != shown:
+                image = draw_bar(chosen, values, frame_rng, font_sizes=(12,), noise=0)
+                shown = values
+            for skill_id, remaining in reader.process(image, now):
+                errors.append(abs(remaining - (ends[skill_id] - now)))
+        results[gate] = (errors, reader.stats.summary())
+
+    print(f"\n⏳ 模擬 {seconds:.0f} 秒倒數（每 {interval} 秒擷取，{len(ends)} 個冷卻中欄位）")
+    for gate, (errors, summary) in results.items():
+        label = "啟用變化偵測" if gate else "每幀辨識全部"
+        print(f"   {label}: {len(errors)} 次校正，誤差 平均 {statistics.mean(errors):.3f} 秒 / "
+              f"最大 {max(errors):.3f} 秒，平均 CPU {summary['cpu_ms_per_frame']:.3f} ms/幀")
+    errors = results[True][0]
+    return bool(errors) and max(errors) <= interval / 2 + 1e-6 and results[False][0] == errors
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description="冷卻數字辨識測試")
+    parser.add_argument('--frames', type=int, default=60, help="合成截圖數")
+    parser.add_argument('--seconds', type=float, default=90, help="模擬倒數秒數（0 表示略過）")
+    parser.add_argument('--interval', type=float, default=0.25, help="模擬擷取間隔秒數")
+    parser.add_argument('--fixtures', help="錄製的截圖目錄（含 labels.json）")
+    parser.add_argument('--slot-size', type=int, default=SLOT_SIZE, help="錄製截圖的欄位大小")
+    parser.add_argument('--save', help="將合成截圖存到此目錄")
+    parser.add_argument('--glyph-size', type=int, default=12, help="範本字形大小")
+    parser.add_argument('--seed', type=int, default=1, help="亂數種子")
+    args = parser.parse_args()
+
+    icons = load_icons()
+    recognizer = DigitRecognizer(render_glyphs(args.glyph_size))
+
+    if args.fixtures:
+        fixtures = load_fixtures(args.fixtures)
+        slot_size = args.slot_size
+    else:
+        fixtures = synthesize_frames(icons, np.random.default_rng(args.seed), args.frames)
+        slot_size = SLOT_SIZE
+        if args.save:
+            os.makedirs(args.save, exist_ok=True)
+            for name, image, _ in fixtures:
+                image.save(os.path.join(args.save, name))
+            with open(os.path.join(args.save, 'labels.json'), 'w', encoding='utf-8') as f:
+                json.dump({name: values for name, _, values in fixtures}, f, indent=2)
+            print(f"💾 已儲存 {len(fixtures)} 張截圖到 {args.save}")
+
+    ok = evaluate(recognizer, fixtures, slot_size)
+    if args.seconds:
+        ok = simulate(recognizer, icons, np.random.default_rng(args.seed + 1), args.seconds, args.interval) and ok
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
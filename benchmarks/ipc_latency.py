@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本機 IPC 延遲測試
+量測 IpcServer 的來回延遲：ping（只經過 IPC 執行緒）、trigger（經過主執行緒佇列），
+以及同一條連線一次送出多行（pipelining）時每個指令的平均耗時。
+
+主執行緒以一個等待 wakeup 的執行緒模擬（實際程式中為 Tk 的 after(0, ...)），
+處理函數只更新計時器表，不含視窗繪製。
+
+用法: python benchmarks/ipc_latency.py [--rounds 2000] [--batch 100] [--transport unix,tcp]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ui.ipc_server import (
+    IpcServer, open_connection, send_commands, unix_sockets_supported,
+    CMD_TRIGGER, CMD_RESET, CMD_QUERY,
+)
+
+
+class FakeDispatcher:
+    """模擬主執行緒：收到 wakeup 後處理佇列中的所有指令"""
+
+    def __init__(self):
+        self.timers = {}
+        self.server = None
+        self._event = threading.Event()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def wakeup(self):
+        self._event.set()
+
+    def stop(self):
+        self._running = False
+        self._event.set()
+        self._thread.join()
+
+    def _run(self):
+        while self._running:
+            self._event.wait()
+            self._event.clear()
+            if self.server is not None:
+                self.server.process_pending(self.handle)
+
+    def handle(self, command, argument):
+        if command == CMD_TRIGGER:
+            self.timers[argument] = time.monotonic() + 30
+            return {'remaining': 30.0}
+        if command == CMD_RESET:
+            self.timers.pop(argument, None)
+            return {}
+        if command == CMD_QUERY:
+            end = self.timers.get(argument)
+            return {'remaining': max(0.0, end - time.monotonic()) if end else 0.0}
+        raise ValueError(f"不支援的指令: {command}")
+
+
+def percentile(values, fraction):
+    """已排序列表的百分位數"""
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(sock, lines, rounds):
+    """逐次送出請求並等待回應
+
+    Returns:
+        每次來回的微秒數（已排序）
+    """
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        replies = send_commands(sock, lines)
+        timings.append((time.perf_counter() - start) * 1e6)
+        assert all(reply['ok'] for reply in replies), replies
+    timings.sort()
+    return timings
+
+
+def run_transport(transport, args):
+    """以一種連線方式量測
+
+    Returns:
+        是否所有指令都成功
+    """
+    dispatcher = FakeDispatcher()
+    if transport == 'unix':
+        path = os.path.join(tempfile.mkdtemp(), 'ipc.sock')
+        server = IpcServer(path=path, wakeup=dispatcher.wakeup)
+    else:
+        path = None
+        server = IpcServer(port=0, wakeup=dispatcher.wakeup)
+    dispatcher.server = server
+    address = server.start_in_thread()
+
+    print(f"\n🔌 {transport}（{address}）")
+    try:
+        with open_connection(path, port=server.port) as sock:
+            measure(sock, ['ping'], 200)  # 暖機
+            for label, lines in (("ping", ['ping']), ("trigger", ['trigger 時間魔方']),
+                                 ("trigger + query", ['trigger 時間魔方', 'query 時間魔方'])):
+                timings = measure(sock, lines, args.rounds)
+                print(f"   {label:<16} 中位數 {percentile(timings, 0.5):7.1f} µs  "
+                      f"p99 {percentile(timings, 0.99):7.1f} µs  最大 {timings[-1]:8.1f} µs")
+
+            batch = [f"trigger skill_{i % 20}" if i % 2 == 0 else f"query skill_{i % 20}"
+                     for i in range(args.batch)]
+            timings = measure(sock, batch, max(1, args.rounds // 10))
+            per_command = percentile(timings, 0.5) / len(batch)
+            print(f"   pipelining ×{len(batch):<5} 每批中位數 {percentile(timings, 0.5):8.1f} µs  "
+                  f"每個指令 {per_command:5.2f} µs（{1e6 / per_command:,.0f} 指令/秒）")
+        return True
+    except (OSError, AssertionError) as e:
+        print(f"   ❌ {e}")
+        return False
+    finally:
+        server.stop_in_thread()
+        dispatcher.stop()
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description="本機 IPC 延遲測試")
+    parser.add_argument('--rounds', type=int, default=2000, help="每種請求的來回次數")
+    parser.add_argument('--batch', type=int, default=100, help="pipelining 每批指令數")
+    parser.add_argument('--transport', default='unix,tcp', help="連線方式（unix、tcp，以逗號分隔）")
+    args = parser.parse_args()
+
+    transports = [name.strip() for name in args.transport.split(',') if name.strip()]
+    if 'unix' in transports and not unix_sockets_supported():
+        print("ℹ️ 此平台不支援 Unix domain socket，只測試 TCP")
+        transports.remove('unix')
+
+    ok = all([run_transport(transport, args) for transport in transports])
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+串流疊加層推送測試
+以不同數量的瀏覽器連線（原始 socket 模擬 EventSource）接收計時器事件，量測：
+    - 推送延遲：publish() 到最後一個連線收到整批事件
+    - 伺服器每批的 CPU 時間（編碼一次 + 寫給所有連線）
+
+每批事件模擬同一秒內多個計時器的秒數變化（tick）。
+
+用法: python benchmarks/overlay_fanout.py [--clients 1,10,100,300] [--batches 200] [--timers 20]
+"""
+
+import argparse
+import os
+import selectors
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ui.overlay_server import OverlayServer, OVERLAY_PAGE, encode_events
+from src.ui.timer_events import EVENT_TICK
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TimedOverlayServer(OverlayServer):
+    """記錄每批推送的伺服器執行緒 CPU 時間"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.flush_cpu = []
+
+    def _flush(self):
+        start = time.thread_time()
+        super()._flush()
+        self.flush_cpu.append((time.thread_time() - start) * 1e6)
+
+
+def make_event(index, remaining):
+    """模擬的 tick 事件"""
+    return {
+        'type': EVENT_TICK, 'skill_id': f"skill_{index}", 'name': f"技能 {index}", 'icon': 'hs.png',
+        'player': '測試玩家', 'remaining': remaining, 'total': 120,
+        'end_time': time.time() + remaining, 'loop': False, 'permanent': False,
+    }
+
+
+def connect_clients(port, count):
+    """建立事件串流連線並讀掉標頭與快照"""
+    clients = []
+    for _ in range(count):
+        sock = socket.create_connection(('127.0.0.1', port))
+        sock.sendall(b'GET /events HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n')
+        buffer = b''
+        while buffer.count(b'\n\n') < 2:  # retry 行與快照事件
+            buffer += sock.recv(65536)
+        sock.setblocking(False)
+        clients.append(sock)
+    return clients
+
+
+def receive_all(selector, clients, expected, timeout=5):
+    """等待每個連線都收到 expected 位元組
+
+    Returns:
+        最後一個連線收齊的時間（perf_counter），逾時為 None
+    """
+    remaining = {sock: expected for sock in clients}
+    deadline = time.perf_counter() + timeout
+    while remaining:
+        if time.perf_counter() > deadline:
+            return None
+        for key, _ in selector.select(0.1):
+            sock = key.fileobj
+            if sock not in remaining:
+                continue
+            data = sock.recv(1 << 20)
+            remaining[sock] -= len(data)
+            if remaining[sock] <= 0:
+                del remaining[sock]
+    return time.perf_counter()
+
+
+def run(count, args):
+    """以 count 個連線量測"""
+    server = TimedOverlayServer(os.path.join(ROOT, OVERLAY_PAGE), os.path.join(ROOT, 'images'),
+                                port=0, keepalive=0)
+    port = server.start_in_thread()
+    clients = connect_clients(port, count)
+    selector = selectors.DefaultSelector()
+    for sock in clients:
+        selector.register(sock, selectors.EVENT_READ)
+    while server.client_count < count:
+        time.sleep(0.01)
+
+    latencies = []
+    try:
+        for batch in range(args.batches):
+            events = [make_event(i, 120 - batch % 120) for i in range(args.timers)]
+            expected = len(encode_events(events))
+            start = time.perf_counter()
+            for event in events:
+                server.publish(event)
+            done = receive_all(selector, clients, expected)
+            if done is None:
+                print(f"   ❌ {count} 個連線：第 {batch} 批逾時")
+                return False
+            latencies.append((done - start) * 1e6)
+    finally:
+        for sock in clients:
+            sock.close()
+        server.stop_in_thread()
+
+    latencies.sort()
+    cpu = sorted(server.flush_cpu)
+    print(f"   {count:>4} 個連線: 延遲 中位數 {latencies[len(latencies) // 2]:8.1f} µs  "
+          f"p99 {latencies[int(len(latencies) * 0.99)]:8.1f} µs  "
+          f"伺服器 CPU 中位數 {cpu[len(cpu) // 2]:7.1f} µs/批（每連線 {cpu[len(cpu) // 2] / count:5.2f} µs）  "
+          f"編碼 {server.stats['payloads']} 次 / {server.stats['events']} 個事件")
+    return True
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description="串流疊加層推送測試")
+    parser.add_argument('--clients', default='1,10,100,300', help="連線數（以逗號分隔）")
+    parser.add_argument('--batches', type=int, default=200, help="推送批數")
+    parser.add_argument('--timers', type=int, default=20, help="每批的事件數（同時倒數的計時器）")
+    args = parser.parse_args()
+
+    print(f"📺 每批 {args.timers} 個 tick 事件，共 {args.batches} 批")
+    ok = all([run(int(count), args) for count in args.clients.split(',')])
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
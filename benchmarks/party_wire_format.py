@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+組隊房間通訊格式測試
+1. 比較逐筆 JSON 與二進位批次格式的每事件位元組數與編碼/解碼時間
+2. 本機迴路測試：啟動 RoomServer，多個 RoomClient 加入同一房間，確認觸發完整送達
+3. 中途加入：觸發結束後新成員加入，確認只收到與進行中計時器數量相同的快照
+
+用法: python benchmarks/party_wire_format.py [--members 50] [--events 2000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ui.party_protocol import (
+    MAX_TRIGGERS_PER_FRAME, decode_frame, encode_message, encode_triggers, pack_cooldown,
+)
+from src.ui.room_client import RoomClient
+from src.ui.room_server import RoomServer
+
+
+def load_skill_ids(config_path='config.json'):
+    """讀取 config.json 中的技能與道具 ID"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return [entry['id'] for entry in config.get('skills', []) + config.get('items', [])]
+
+
+def compare_formats(skill_ids, event_count):
+    """比較兩種格式的大小與編碼/解碼時間"""
+    events = [
+        (i % 200 + 1, skill_ids[i % len(skill_ids)], 120000)
+        for i in range(event_count)
+    ]
+    index = {skill_id: i for i, skill_id in enumerate(skill_ids)}
+
+    # 逐筆 JSON（每則都帶完整技能 ID 與玩家名稱）
+    start = time.perf_counter()
+    json_frames = [
+        encode_message({
+            'type': 'trigger', 'skill_id': skill_id,
+            'player': f"玩家{member_id}", 'cooldown': cooldown_ms / 1000
+        })
+        for member_id, skill_id, cooldown_ms in events
+    ]
+    for frame in json_frames:
+        decode_frame(frame[4:])
+    json_seconds = time.perf_counter() - start
+    json_bytes = sum(len(frame) for frame in json_frames)
+
+    # 二進位批次（以 20 筆為一批，模擬一個批次間隔內的觸發）
+    batch_size = min(20, MAX_TRIGGERS_PER_FRAME)
+    start = time.perf_counter()
+    binary_frames = [
+        encode_triggers(
+            (member_id, index[skill_id], 0, pack_cooldown(cooldown_ms))
+            for member_id, skill_id, cooldown_ms in events[i:i + batch_size]
+        )
+        for i in range(0, len(events), batch_size)
+    ]
+    for frame in binary_frames:
+        decode_frame(frame[4:])
+    binary_seconds = time.perf_counter() - start
+    binary_bytes = sum(len(frame) for frame in binary_frames)
+
+    print(f"📦 格式比較（{event_count} 筆事件）")
+    print(f"   JSON    {json_bytes / event_count:7.1f} bytes/事件  "
+          f"{json_seconds / event_count * 1e6:6.2f} µs/事件")
+    print(f"   二進位  {binary_bytes / event_count:7.1f} bytes/事件  "
+          f"{binary_seconds / event_count * 1e6:6.2f} µs/事件")
+    print(f"   縮小 {json_bytes / binary_bytes:.1f} 倍，加速 {json_seconds / binary_seconds:.1f} 倍")
+
+
+def wait_for(client, event_type, timeout=5):
+    """等待指定類型的事件"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        for event in client.poll_events():
+            if event['type'] == event_type:
+                return event
+            if event['type'] == 'error':
+                raise RuntimeError(event['message'])
+        time.sleep(0.005)
+    raise TimeoutError(f"等待 {event_type} 逾時")
+
+
+def loopback_test(skill_ids, member_count, trigger_count):
+    """本機迴路測試"""
+    server = RoomServer('127.0.0.1', 0)
+    port = server.start_in_thread()
+
+    host = RoomClient()
+    host.create_room('127.0.0.1', port, '房主', skill_ids)
+    room_code = wait_for(host, 'created')['room']
+
+    members = []
+    for i in range(member_count):
+        client = RoomClient()
+        # 後加入的成員帶入額外技能，測試技能表增量更新
+        client.join_room('127.0.0.1', port, room_code, f"成員{i}", skill_ids + [f"extra_{i}"])
+        members.append(client)
+    for client in members:
+        wait_for(client, 'joined')
+
+    sent = [skill_ids[i % len(skill_ids)] for i in range(trigger_count)]
+    sent.append(f"extra_{member_count - 1}")
+    time.sleep(0.1)  # 等待技能表更新送達房主
+
+    start = time.perf_counter()
+    for skill_id in sent:
+        host.send_trigger(skill_id, 60)
+
+    failures = 0
+    for client in members:
+        received = []
+        deadline = time.time() + 10
+        while len(received) < len(sent) and time.time() < deadline:
+            received.extend(
+                event['skill_id'] for event in client.poll_events() if event['type'] == 'trigger'
+            )
+            time.sleep(0.002)
+        if received != sent:
+            failures += 1
+    elapsed = time.perf_counter() - start
+
+    # 中途加入：應只收到每個技能一筆進行中的計時器，而不是重播所有觸發
+    late = RoomClient()
+    late.join_room('127.0.0.1', port, room_code, '晚到成員', skill_ids)
+    timers = []
+    deadline = time.time() + 5
+    while len(timers) < len(set(sent)) and time.time() < deadline:
+        timers.extend(event['skill_id'] for event in late.poll_events() if event['type'] == 'timer')
+        time.sleep(0.002)
+
+    for client in members + [host, late]:
+        client.leave()
+    server.stop_in_thread()
+
+    print(f"🔁 迴路測試：{member_count} 位成員 × {len(sent)} 次觸發，{elapsed * 1000:.0f} ms")
+    ok = True
+    if failures:
+        print(f"   ❌ {failures} 位成員收到的觸發不一致")
+        ok = False
+    else:
+        print("   ✅ 所有成員依序收到全部觸發")
+
+    if sorted(timers) == sorted(set(sent)):
+        print(f"   ✅ 中途加入收到 {len(timers)} 個進行中的計時器（共 {len(sent)} 次觸發）")
+    else:
+        print(f"   ❌ 中途加入收到 {len(timers)} 個計時器，預期 {len(set(sent))} 個")
+        ok = False
+    return ok
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description="組隊房間通訊格式測試")
+    parser.add_argument('--members', type=int, default=50, help="迴路測試成員數")
+    parser.add_argument('--events', type=int, default=2000, help="格式比較事件數")
+    parser.add_argument('--triggers', type=int, default=200, help="迴路測試觸發次數")
+    args = parser.parse_args()
+
+    skill_ids = load_skill_ids()
+    compare_formats(skill_ids, args.events)
+    print()
+    return 0 if loopback_test(skill_ids, args.members, args.triggers) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+組隊房間伺服器負載測試
+以子行程啟動房間伺服器（python -m src.ui.room_server），再以單一 asyncio 事件迴圈模擬 N 個客戶端。
+每個模擬玩家依 config.json 的技能表選擇一個職業，依各技能冷卻時間（乘上加速倍率）觸發，
+每個房間的第一位成員另外負責王的技能。
+
+量測：
+    - 廣播延遲百分位（觸發 → 其他成員收到，含客戶端與伺服器的批次間隔）
+    - 觸發與送達吞吐量、送達率
+    - 伺服器每條連線的記憶體（/proc/<pid>/status 的 VmRSS 差值）與 CPU 使用率
+結果寫入 JSON 報告（預設 room_load_report.json）。僅支援 Linux。
+
+用法: python benchmarks/room_load.py [--clients 30] [--rooms 1] [--duration 20] [--speed 20]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ui.clock_sync import ClockSync
+from src.ui.party_protocol import (
+    BATCH_INTERVAL_MS, FRAME_SNAPSHOT, FRAME_TRIGGERS,
+    encode_message, encode_triggers, pack_cooldown, read_frame,
+    MSG_CREATE, MSG_CREATED, MSG_JOIN, MSG_JOINED, MSG_SKILLS, MSG_PING, MSG_PONG, MSG_LEAVE,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ==================== 觸發模式 ====================
+
+def load_catalog(config_path):
+    """讀取技能表，依職業分組
+
+    Returns:
+        (jobs {職業: [(skill_id, cooldown)]}, common [(skill_id, cooldown)], boss [(skill_id, cooldown)])
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    jobs, common, boss = {}, [], []
+    for skill in config.get('skills', []):
+        entry = (skill['id'], skill.get('cooldown', 0))
+        if skill.get('category') == 'boss':
+            boss.append(entry)
+        elif skill.get('subcategory') == '共通':
+            common.append(entry)
+        else:
+            jobs.setdefault(skill.get('subcategory') or '其他', []).append(entry)
+    common.extend((item['id'], item.get('cooldown', 0)) for item in config.get('items', []))
+    return jobs, common, boss
+
+
+def percentile(sorted_values, fraction):
+    """已排序列表的百分位數（最近排名法）"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+# ==================== 伺服器子行程 ====================
+
+def free_port():
+    """取得一個未使用的 TCP 埠"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port):
+    """以子行程啟動房間伺服器並等待可連線"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'src.ui.room_server', '--host', '127.0.0.1',
+         '--port', str(port), '--no-announce'],
+        cwd=root, stdout=subprocess.DEVNULL
+    )
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise TimeoutError("房間伺服器啟動逾時")
+
+
+def read_rss_kb(pid):
+    """行程的常駐記憶體（KB）"""
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def read_cpu_seconds(pid):
+    """行程累計的 CPU 時間（user + system 秒）"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+# ==================== 模擬客戶端 ====================
+
+class Stats:
+    """所有模擬客戶端共用的統計"""
+
+    def __init__(self):
+        self.sent = {}        # (room, member_id, skill_index, timestamp_ms) → (送出時間, 預期收件人數)
+        self.latencies = []   # 秒
+        self.triggers = 0
+        self.expected = 0
+        self.delivered = 0
+        self.unmatched = 0
+
+
+class SimClient:
+    """模擬客戶端：直接使用房間通訊協定，與 RoomClient 相同的批次與時鐘同步方式"""
+
+    def __init__(self, name, skills, stats, speed, batch_interval):
+        self.name = name
+        self.skills = skills   # [(skill_id, cooldown)]
+        self.stats = stats
+        self.speed = speed
+        self.batch_interval = batch_interval
+        self.sync = ClockSync()
+        self.member_id = None
+        self.room = None
+        self.room_size = 1
+        self.skill_index = {}
+        self.joined = asyncio.Event()
+        self._reader = None
+        self._writer = None
+        self._outgoing = []
+        self._flush_handle = None
+        self._tasks = []
+
+    async def connect(self, port, room_code=None):
+        """連線並建立或加入房間"""
+        self._reader, self._writer = await asyncio.open_connection('127.0.0.1', port)
+        skill_ids = [skill_id for skill_id, _ in self.skills]
+        if room_code is None:
+            message = {'type': MSG_CREATE, 'player': self.name, 'skills': skill_ids}
+        else:
+            message = {'type': MSG_JOIN, 'room': room_code, 'player': self.name, 'skills': skill_ids}
+        self._writer.write(encode_message(message))
+        self._tasks.append(asyncio.get_running_loop().create_task(self._receive()))
+        await self.joined.wait()
+
+    async def sync_clock(self, count=5, interval=0.05):
+        """送出數次 ping 估計主機時鐘"""
+        for _ in range(count):
+            self._writer.write(encode_message({'type': MSG_PING, 't0': time.monotonic()}))
+            await asyncio.sleep(interval)
+
+    def start_triggers(self, stop_at):
+        """為每個技能啟動一個觸發協程"""
+        loop = asyncio.get_running_loop()
+        for skill_id, cooldown in self.skills:
+            if cooldown > 0:
+                self._tasks.append(loop.create_task(self._trigger_loop(skill_id, cooldown, stop_at)))
+
+    async def _trigger_loop(self, skill_id, cooldown, stop_at):
+        """冷卻結束後隨機延遲一小段時間再次觸發（模擬玩家反應時間）"""
+        await asyncio.sleep(random.uniform(0, cooldown / self.speed))
+        while time.monotonic() < stop_at:
+            self._queue(skill_id, cooldown)
+            await asyncio.sleep(cooldown * random.uniform(1.0, 1.2) / self.speed)
+
+    def _queue(self, skill_id, cooldown):
+        """加入待送出的觸發"""
+        self._outgoing.append((skill_id, cooldown, time.perf_counter(), time.monotonic()))
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_interval, self._flush)
+
+    def _flush(self):
+        """送出累積的觸發"""
+        self._flush_handle = None
+        outgoing, self._outgoing = self._outgoing, []
+        records = []
+        for skill_id, cooldown, sent_at, local_time in outgoing:
+            skill_index = self.skill_index.get(skill_id)
+            if skill_index is None:
+                continue
+            timestamp_ms = max(1, int(self.sync.host_time(local_time) * 1000))
+            key = (self.room, self.member_id, skill_index, timestamp_ms)
+            if key in self.stats.sent:
+                continue  # 同一毫秒重複觸發同一技能，無法區分延遲
+            self.stats.sent[key] = (sent_at, self.room_size - 1)
+            self.stats.triggers += 1
+            self.stats.expected += self.room_size - 1
+            records.append((0, skill_index, timestamp_ms, pack_cooldown(cooldown * 1000)))
+        if records and not self._writer.is_closing():
+            self._writer.write(encode_triggers(records))
+
+    async def _receive(self):
+        """接收伺服器封包"""
+        try:
+            while True:
+                frame = await read_frame(self._reader)
+                if frame is None:
+                    return
+                kind, data = frame
+                if kind == FRAME_TRIGGERS:
+                    self._on_triggers(data[1])
+                elif kind != FRAME_SNAPSHOT:
+                    self._on_message(data)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+    def _on_message(self, message):
+        """處理控制訊息"""
+        msg_type = message['type']
+        if msg_type in (MSG_CREATED, MSG_JOINED):
+            self.member_id = message['member_id']
+            self.room = message['room']
+            self.skill_index = {skill_id: i for i, skill_id in enumerate(message['skills'])}
+            self.room_size = len(message['members'])
+            self.joined.set()
+        elif msg_type == MSG_SKILLS:
+            for offset, skill_id in enumerate(message['ids']):
+                self.skill_index[skill_id] = message['start'] + offset
+        elif msg_type == 'members':
+            self.room_size = len(message['members'])
+        elif msg_type == MSG_PONG:
+            self.sync.add_sample(message['t0'], message['t1'], message['t2'], time.monotonic())
+
+    def _on_triggers(self, records):
+        """以送出時間計算每筆觸發的廣播延遲"""
+        now = time.perf_counter()
+        stats = self.stats
+        for member_id, skill_index, timestamp_ms, _ in records:
+            if member_id == self.member_id:
+                continue
+            sent = stats.sent.get((self.room, member_id, skill_index, timestamp_ms))
+            if sent is None:
+                stats.unmatched += 1
+                continue
+            stats.latencies.append(now - sent[0])
+            stats.delivered += 1
+
+    async def close(self):
+        """離開房間並關閉連線"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if not self._writer.is_closing():
+            self._writer.write(encode_message({'type': MSG_LEAVE}))
+            self._writer.close()
+
+
+# ==================== 測試流程 ====================
+
+async def run_load(args, port, server_pid):
+    """建立房間、同步時鐘、產生觸發並收集統計"""
+    jobs, common, boss = load_catalog(args.config)
+    job_names = sorted(jobs)
+    stats = Stats()
+    batch_interval = args.batch_ms / 1000
+
+    clients = []
+    for i in range(args.clients):
+        skills = jobs[job_names[i % len(job_names)]] + common
+        room_slot = i % args.rooms
+        if i < args.rooms:
+            skills = skills + boss  # 每個房間的第一位成員負責王的技能
+        clients.append((room_slot, SimClient(f"玩家{i + 1}", skills, stats, args.speed, batch_interval)))
+
+    rss_base = read_rss_kb(server_pid)
+    connect_start = time.perf_counter()
+    room_codes = {}
+    for room_slot, client in clients[:args.rooms]:
+        await client.connect(port)
+        room_codes[room_slot] = client.room
+    await asyncio.gather(*(
+        client.connect(port, room_codes[room_slot]) for room_slot, client in clients[args.rooms:]
+    ))
+    connect_seconds = time.perf_counter() - connect_start
+
+    await asyncio.gather(*(client.sync_clock() for _, client in clients))
+    await asyncio.sleep(0.3)  # 等待成員表與技能表廣播
+    rss_connected = read_rss_kb(server_pid)
+
+    cpu_start = read_cpu_seconds(server_pid)
+    run_start = time.perf_counter()
+    stop_at = time.monotonic() + args.duration
+    for _, client in clients:
+        client.start_triggers(stop_at)
+    await asyncio.sleep(args.duration)
+    await asyncio.sleep(0.5)  # 等待最後的批次送達
+    run_seconds = time.perf_counter() - run_start
+    cpu_seconds = read_cpu_seconds(server_pid) - cpu_start
+    rss_peak = read_rss_kb(server_pid)
+
+    await asyncio.gather(*(client.close() for _, client in clients))
+
+    latencies_ms = sorted(latency * 1000 for latency in stats.latencies)
+    return {
+        'config': {
+            'clients': args.clients,
+            'rooms': args.rooms,
+            'duration_s': args.duration,
+            'speed': args.speed,
+            'client_batch_ms': args.batch_ms,
+            'server_batch_ms': BATCH_INTERVAL_MS,
+            'catalog_skills': sum(len(skills) for skills in jobs.values()) + len(common) + len(boss),
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'connect_seconds': round(connect_seconds, 4),
+        'latency_ms': {
+            'count': len(latencies_ms),
+            'mean': round(statistics.mean(latencies_ms), 3) if latencies_ms else None,
+            'p50': percentile(latencies_ms, 0.50),
+            'p90': percentile(latencies_ms, 0.90),
+            'p99': percentile(latencies_ms, 0.99),
+            'max': latencies_ms[-1] if latencies_ms else None,
+        },
+        'throughput': {
+            'triggers': stats.triggers,
+            'deliveries': stats.delivered,
+            'expected_deliveries': stats.expected,
+            'delivery_ratio': round(stats.delivered / stats.expected, 5) if stats.expected else None,
+            'unmatched': stats.unmatched,
+            'triggers_per_s': round(stats.triggers / run_seconds, 2),
+            'deliveries_per_s': round(stats.delivered / run_seconds, 2),
+        },
+        'server': {
+            'rss_base_kb': rss_base,
+            'rss_connected_kb': rss_connected,
+            'rss_end_kb': rss_peak,
+            'rss_per_connection_kb': round((rss_connected - rss_base) / args.clients, 2),
+            'cpu_seconds': round(cpu_seconds, 3),
+            'cpu_percent': round(cpu_seconds / run_seconds * 100, 2),
+        },
+    }
+
+
+def print_report(report):
+    """輸出摘要"""
+    config, latency = report['config'], report['latency_ms']
+    throughput, server = report['throughput'], report['server']
+    print(f"👥 {config['clients']} 位客戶端 / {config['rooms']} 個房間，"
+          f"{config['duration_s']} 秒 × {config['speed']} 倍速")
+    print(f"🔗 連線與加入: {report['connect_seconds'] * 1000:.0f} ms")
+    if latency['count']:
+        print(f"⏱️ 廣播延遲 p50 {latency['p50']:.1f} ms / p90 {latency['p90']:.1f} ms / "
+              f"p99 {latency['p99']:.1f} ms / 最大 {latency['max']:.1f} ms")
+    print(f"📨 觸發 {throughput['triggers']} 次（{throughput['triggers_per_s']}/s），"
+          f"送達 {throughput['deliveries']} 次（{throughput['deliveries_per_s']}/s），"
+          f"送達率 {throughput['delivery_ratio']}")
+    print(f"💾 伺服器記憶體 {server['rss_connected_kb']} KB，"
+          f"每條連線約 {server['rss_per_connection_kb']} KB；CPU {server['cpu_percent']}%")
+
+
+def main():
+    """主函數"""
+    if not sys.platform.startswith('linux'):
+        print("❌ 負載測試需要 Linux（/proc）")
+        return 1
+
+    parser = argparse.ArgumentParser(description="組隊房間伺服器負載測試")
+    parser.add_argument('--clients', type=int, default=30, help="模擬客戶端數")
+    parser.add_argument('--rooms', type=int, default=1, help="房間數（客戶端平均分配）")
+    parser.add_argument('--duration', type=float, default=20, help="觸發持續秒數")
+    parser.add_argument('--speed', type=float, default=20, help="冷卻時間加速倍率")
+    parser.add_argument('--batch-ms', type=float, default=BATCH_INTERVAL_MS, help="客戶端批次間隔（毫秒）")
+    parser.add_argument('--config', default=os.path.join(ROOT, 'config.json'), help="技能表")
+    parser.add_argument('--seed', type=int, default=1, help="亂數種子")
+    parser.add_argument('--report', default='room_load_report.json', help="JSON 報告路徑")
+    args = parser.parse_args()
+
+    if not 0 < args.rooms <= args.clients:
+        parser.error("房間數需介於 1 與客戶端數之間")
+    random.seed(args.seed)
+
+    port = free_port()
+    server = start_server(port)
+    try:
+        report = asyncio.run(run_load(args, port, server.pid))
+    finally:
+        server.terminate()
+        server.wait(timeout=5)
+
+    print_report(report)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📄 報告已寫入 {args.report}")
+
+    ratio = report['throughput']['delivery_ratio']
+    return 0 if ratio is not None and ratio >= 0.999 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+操作重播測試
+以無介面引擎（HeadlessEngine）重播錄製檔，回報每種事件的延遲；
+沒有指定錄製檔時先產生一個合成的錄製檔（快捷鍵為主，夾雜設定切換與配置切換）。
+
+    實際遊玩錄下的檔案：cache/sessions/*.rec（設定中開啟「錄製快捷鍵與設定操作」）
+    Tk 介面重播：python main.py --replay 檔案 --replay-speed max
+
+用法: python benchmarks/session_replay.py [--session PATH] [--speed max] [--events 20000]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ui.config_manager import ConfigManager
+from src.ui.session_recorder import (
+    HeadlessEngine, SessionRecorder, SessionReplayer, format_report, parse_speed, read_session,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_session(directory, events):
+    """產生合成的錄製檔（複製 config.json 與配置，給前 10 個技能設定快捷鍵）
+
+    Returns:
+        (錄製檔路徑, config.json 路徑)
+    """
+    shutil.copy(os.path.join(ROOT, 'config.json'), directory)
+    shutil.copytree(os.path.join(ROOT, 'profiles'), os.path.join(directory, 'profiles'))
+    config_path = os.path.join(directory, 'config.json')
+    config_manager = ConfigManager(config_path)
+    profile_name = config_manager.get_current_profile()
+    profile = config_manager.load_profile(profile_name) or {}
+    skill_ids = [skill['id'] for skill in config_manager.initial_skills]
+    keys = [f"F{i + 1}" for i in range(min(10, len(skill_ids)))]
+    profile['hotkeys'] = dict(zip(skill_ids, keys))
+    config_manager.save_profile(profile_name, profile)
+
+    rng = random.Random(0)
+    path = os.path.join(directory, 'synthetic.rec')
+    recorder = SessionRecorder(path)
+    for i in range(events):
+        roll = rng.random()
+        if roll < 0.95:
+            recorder.hotkey(rng.choice(keys).lower())
+        elif roll < 0.99:
+            recorder.setting(rng.choice(skill_ids), rng.choice(('permanent', 'loop', 'alert')), rng.random() < 0.5)
+        elif roll < 0.995:
+            recorder.toggle_all(rng.choice(('permanent', 'loop', 'alert')))
+        else:
+            recorder.profile(profile_name)
+    recorder.close()
+    return path, config_path
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description="操作重播測試")
+    parser.add_argument('--session', help="錄製檔（未指定時產生合成的錄製檔）")
+    parser.add_argument('--config', default=os.path.join(ROOT, 'config.json'), help="config.json 路徑")
+    parser.add_argument('--speed', default='max', help="倍速（1、4…）或 max（預設）")
+    parser.add_argument('--events', type=int, default=20000, help="合成錄製檔的事件數")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='session_replay_')
+    try:
+        path, config_path = args.session, args.config
+        if not path:
+            path, config_path = make_session(directory, args.events)
+        _, events = read_session(path)
+        print(f"📼 {os.path.basename(path)}：{len(events)} 個事件（{os.path.getsize(path)} 位元組，"
+              f"{os.path.getsize(path) / max(1, len(events)):.1f} B/事件）")
+
+        engine = HeadlessEngine(config_path)
+        start = time.perf_counter()
+        report = SessionReplayer(events, engine, parse_speed(args.speed)).run()
+        print(format_report(report))
+        print(f"   共 {time.perf_counter() - start:.3f} 秒，觸發 {engine.triggers} 次")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+技能使用統計測試
+    1. 熱路徑：record_trigger() 在 Tk 主執行緒的耗時（只放入佇列）
+    2. 吞吐量：背景執行緒處理並批次寫入 SQLite 的速度、交易次數
+    3. summary()：本場與最近 1 小時統計的查詢耗時（不查詢資料庫）
+
+用法: python benchmarks/skill_analytics_load.py [--events 200000] [--skills 30]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ui.skill_analytics import SkillAnalytics, SCOPE_HOUR, SCOPE_SESSION
+from src.ui.timer_events import EVENT_FINISH
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description="技能使用統計測試")
+    parser.add_argument('--events', type=int, default=200000, help="觸發事件數")
+    parser.add_argument('--skills', type=int, default=30, help="技能數量")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='skill_analytics_')
+    try:
+        analytics = SkillAnalytics(os.path.join(directory, 'analytics.db'), missed_grace=0.0)
+        analytics.start('benchmark')
+        skill_ids = [f"skill_{i}" for i in range(args.skills)]
+        finish = {'type': EVENT_FINISH, 'skill_id': skill_ids[0], 'loop': False, 'total': 120.0, 'player': None}
+
+        start = time.perf_counter()
+        for i in range(args.events):
+            analytics.record_trigger(skill_ids[i % args.skills], 120.0)
+            if i % 10 == 0:
+                analytics.on_event(finish)
+        enqueue = (time.perf_counter() - start) / args.events * 1e6
+
+        analytics.stop()  # 等待背景執行緒寫完
+        total = time.perf_counter() - start
+
+        print(f"⏱️ 熱路徑 record_trigger()：{enqueue:.2f} µs")
+        print(f"💾 寫入 {analytics.stats['events']} 筆 / {analytics.stats['batches']} 個交易，"
+              f"共 {total:.2f} 秒（{analytics.stats['events'] / total:,.0f} 筆/秒）")
+
+        number = 1000
+        for scope in (SCOPE_SESSION, SCOPE_HOUR):
+            cost = timeit.timeit(lambda: analytics.summary(scope), number=number) / number * 1e6
+            print(f"📈 summary('{scope}')：{cost:.1f} µs（{len(analytics.summary(scope))} 個技能）")
+
+        # 重新開啟：讀入最近 1 小時的事件
+        start = time.perf_counter()
+        reopened = SkillAnalytics(os.path.join(directory, 'analytics.db'))
+        reopened.start()
+        while not reopened.summary(SCOPE_HOUR):
+            time.sleep(0.001)
+        print(f"🔁 重新開啟並讀入最近 1 小時：{(time.perf_counter() - start) * 1e3:.1f} ms")
+        reopened.stop()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+效能測試套件
+以 100 / 1 000 / 10 000 個技能的合成技能表量測主要的熱路徑，結果寫成 JSON，
+並與提交在版本庫中的基準（benchmarks/baseline.json）比較，變慢超過門檻時返回 1。
+
+    hotkey_lookup    SkillManager.get_skill_by_hotkey（最後一個技能 / 找不到）
+    profile          MainWindow._get_current_settings / _apply_profile（只含狀態，不含重建介面）
+    config_io        ConfigManager.save（整份 config.json）/ save_profile / load_profile
+    icons            decode_icon 讀取並縮放圖示（與技能數無關）
+    tick             N 個倒數中的 SkillWindow 每一輪 _tick 的耗時（子行程）
+    window_build     MainWindow 建立到第一次繪製與介面建立完成（子行程，工作目錄為合成技能表）
+
+tick 與 window_build 需要 Tk：有顯示器時使用真正的 Tk（沒有顯示器的 Linux 可以用 xvfb-run），
+否則使用無介面的 Tk 替身（benchmarks/tk_stub.py，只量測 Python 端的成本），
+替身的結果以 '項目@stub' 標示，只與基準中同樣以替身量測的結果比較。
+基準與目前的結果來自不同機器時只適合看比例，更新基準請在同一台機器上執行 --update-baseline。
+
+用法: python benchmarks/suite.py [--sizes 100,1000,10000] [--output results.json]
+                                 [--baseline benchmarks/baseline.json] [--update-baseline]
+                                 [--threshold 1.5] [--only hotkey_lookup,profile] [--tk auto|real|stub]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# src.ui 一律延遲導入：子行程使用 Tk 替身時，替身必須在導入 tkinter 之前安裝
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+PROFILE_NAME = '預設配置'
+HOTKEY_EVERY = 100  # 每 100 個技能設定一個快捷鍵
+
+
+# ==================== 合成技能表 ====================
+
+def make_catalog(directory, size):
+    """建立合成技能表：config.json、profiles/ 與 images/（連結到專案的圖示）
+
+    Returns:
+        config.json 路徑
+    """
+    icons = sorted(os.listdir(os.path.join(ROOT, 'images')))
+    with open(os.path.join(ROOT, 'config.json'), 'r', encoding='utf-8') as f:
+        settings = json.load(f).get('settings', {})
+    settings['current_profile'] = PROFILE_NAME
+
+    skill_ids = [f"skill_{i:05d}" for i in range(size)]
+    config = {
+        'skills': [
+            {
+                'id': skill_id, 'name': f"技能 {i}", 'icon': icons[i % len(icons)],
+                'cooldown': 30 + i % 300, 'hotkey': '', 'category': 'player', 'subcategory': f"分類 {i % 20}",
+            }
+            for i, skill_id in enumerate(skill_ids)
+        ],
+        'items': [],
+        'settings': settings,
+    }
+    config_path = os.path.join(directory, 'config.json')
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+
+    profile = {
+        'hotkeys': {skill_id: (f"K{i}" if i % HOTKEY_EVERY == HOTKEY_EVERY - 1 else '')
+                    for i, skill_id in enumerate(skill_ids)},
+        'permanent': {skill_id: i % 50 == 0 for i, skill_id in enumerate(skill_ids)},
+        'loop': {skill_id: i % 50 == 25 for i, skill_id in enumerate(skill_ids)},
+        'alert_enabled': {skill_id: i % 3 == 0 for i, skill_id in enumerate(skill_ids)},
+        'cooldown_overrides': {skill_id: 10 + i % 90 for i, skill_id in enumerate(skill_ids) if i % 10 == 0},
+    }
+    os.makedirs(os.path.join(directory, 'profiles'))
+    with open(os.path.join(directory, 'profiles', f"{PROFILE_NAME}.json"), 'w', encoding='utf-8') as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+
+    images = os.path.join(directory, 'images')
+    try:
+        os.symlink(os.path.join(ROOT, 'images'), images, target_is_directory=True)
+    except OSError:
+        shutil.copytree(os.path.join(ROOT, 'images'), images)  # Windows 沒有建立連結的權限
+    return config_path
+
+
+# ==================== 計時 ====================
+
+def measure(fn, budget=0.5, repeat=5):
+    """每次呼叫的耗時（秒，取多組的中位數）
+
+    先呼叫一次估計耗時，再決定每組的次數；很慢的函數在 budget 秒內能跑幾次就跑幾次。
+    """
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    if first * repeat >= budget:
+        samples = [first]
+        while sum(samples) < budget and len(samples) < repeat:
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+        return statistics.median(samples)
+
+    number = max(1, int(budget / repeat / max(first, 1e-7)))
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return statistics.median(samples)
+
+
+def has_display():
+    """是否可以建立 Tk 視窗"""
+    if sys.platform in ('win32', 'darwin'):
+        return True
+    return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+
+# ==================== 項目 ====================
+
+def load_engine(config_path):
+    """不建立 Tk 物件的技能表（已套用配置的快捷鍵）"""
+    from src.ui.config_manager import ConfigManager
+    from src.ui.session_recorder import HeadlessSkillManager
+
+    config_manager = ConfigManager(config_path)
+    skill_manager = HeadlessSkillManager(config_manager)
+    profile = config_manager.load_profile(PROFILE_NAME)
+    for skill_id, hotkey in profile['hotkeys'].items():
+        skill_manager.get_skill(skill_id)['hotkey'] = hotkey
+    return config_manager, skill_manager, profile
+
+
+def bench_hotkey_lookup(config_path, size):
+    """快捷鍵查找"""
+    _, skill_manager, profile = load_engine(config_path)
+    last_key = [hotkey for hotkey in profile['hotkeys'].values() if hotkey][-1]
+    assert skill_manager.get_skill_by_hotkey(last_key)
+    return {
+        'hit_last': measure(lambda: skill_manager.get_skill_by_hotkey(last_key.lower())),
+        'miss': measure(lambda: skill_manager.get_skill_by_hotkey('f24')),
+    }
+
+
+def bench_profile(config_path, size):
+    """配置快照與套用（MainWindow 的方法，介面重建與保存不計入）"""
+    from src.ui.main_window import MainWindow
+
+    class ProfileState:
+        """MainWindow 套用配置時用到的狀態"""
+        _get_current_settings = MainWindow._get_current_settings
+        _get_original_cooldown = MainWindow._get_original_cooldown
+        _apply_profile = MainWindow._apply_profile
+
+        def _save_config(self):
+            pass  # 實際程式為延遲保存，另由 config_io 量測
+
+        def _reload_main_ui(self):
+            pass  # 介面重建由 window_build 量測
+
+    config_manager, skill_manager, profile = load_engine(config_path)
+    state = ProfileState()
+    state.config_manager = config_manager
+    state.skill_manager = skill_manager
+    state.session_recorder = None
+    state.skill_permanent = dict(profile['permanent'])
+    state.skill_loop = dict(profile['loop'])
+    state.skill_alert_enabled = dict(profile['alert_enabled'])
+    return {
+        'snapshot': measure(state._get_current_settings),
+        'apply': measure(lambda: state._apply_profile(profile)),
+    }
+
+
+def bench_config_io(config_path, size):
+    """config.json 與配置檔讀寫"""
+    from src.ui.config_manager import ConfigManager
+
+    config_manager = ConfigManager(config_path)
+    profile = config_manager.load_profile(PROFILE_NAME)
+    return {
+        'save': measure(config_manager.save),
+        'save_profile': measure(lambda: config_manager.save_profile('bench', profile)),
+        'load_profile': measure(lambda: config_manager.load_profile(PROFILE_NAME)),
+    }
+
+
+def bench_icons(config_path, size):
+    """圖示解碼與縮放（主視窗的兩種尺寸）"""
+    from src.ui.skill_manager import decode_icon, ICON_SIZE_LARGE, ICON_SIZE_SMALL
+
+    images = os.path.join(ROOT, 'images')
+    paths = [os.path.join(images, name) for name in sorted(os.listdir(images))]
+    sizes = [ICON_SIZE_LARGE, ICON_SIZE_SMALL]
+    return {
+        'decode_resize': measure(lambda: [decode_icon(path, sizes) for path in paths]) / len(paths),
+    }
+
+
+def run_child(mode, tk_backend, cwd=None):
+    """在子行程執行需要 Tk 的項目，返回子行程印出的 JSON 結果"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', mode, '--tk', tk_backend],
+        cwd=cwd, capture_output=True, text=True, timeout=600
+    )
+    lines = [line for line in output.stdout.splitlines() if line.startswith('{')]
+    if output.returncode != 0 or not lines:
+        raise RuntimeError(f"子行程失敗: {output.stderr.strip()[-500:]}")
+    return json.loads(lines[-1])
+
+
+def bench_tick(config_path, size, tk_backend):
+    """N 個倒數中的計時器每一輪（100 ms）_tick 的耗時"""
+    return run_child('tick', tk_backend)
+
+
+def bench_window_build(config_path, size, tk_backend):
+    """主視窗建立（工作目錄為合成技能表）"""
+    return run_child('window_build', tk_backend, cwd=os.path.dirname(config_path))
+
+
+def child_tick(timers=(10, 50, 200)):
+    """子行程：建立 N 個倒數中的技能視窗，量測每一輪 _tick 的耗時"""
+    import tkinter as tk
+    from src.ui.skill_window import SkillWindow
+
+    root = tk.Tk()
+    root.withdraw()
+    results = {}
+    try:
+        for count in timers:
+            windows = [
+                SkillWindow(
+                    {'name': f"技能 {i}", 'cooldown': 10 ** 6}, '測試', (0, 0), None,
+                    lambda w: None, False, f"skill_{i}", False, window_size=48
+                )
+                for i in range(count)
+            ]
+            root.update()
+            for window in windows:
+                window.stop_countdown()
+                window.running = True
+
+            def idle_round():
+                for window in windows:
+                    window._tick()
+                    root.after_cancel(window.after_id)
+
+            def update_round():
+                for window in windows:
+                    window.remaining = -1  # 強制更新顯示的秒數
+                    window._tick()
+                    root.after_cancel(window.after_id)
+                root.update_idletasks()
+
+            results[f"idle_round_{count}"] = measure(idle_round)
+            results[f"update_round_{count}"] = measure(update_round)
+            for window in windows:
+                window.running = False
+                window.window.destroy()
+    finally:
+        root.destroy()
+    print(json.dumps(results))
+    return 0
+
+
+def child_window_build():
+    """子行程：建立主視窗，等待所有啟動階段結束後印出耗時（JSON）並關閉
+
+    不啟動鍵盤監聽與更新檢查（測試不應攔截實際的鍵盤或連線到網路）。
+    """
+    from src.ui.startup_profiler import StartupProfiler
+    from src.ui.main_window import MainWindow
+
+    MainWindow._start_keyboard_listener = lambda self: None
+    MainWindow._check_for_updates = lambda self: None
+
+    profiler = StartupProfiler(output_path=os.devnull)
+    start = time.perf_counter()
+    app = MainWindow(profiler=profiler)
+
+    def poll():
+        if profiler.pending_phases() and time.perf_counter() - start < 120:
+            app.root.after(50, poll)
+            return
+        report = profiler.report()
+        phases = report['phases']
+        result = {'total': time.perf_counter() - start}
+        for name in ('ui_build', 'image_load'):
+            if phases.get(name, {}).get('duration_ms') is not None:
+                result[name] = phases[name]['duration_ms'] / 1000
+        if 'first_paint' in report.get('marks', {}):
+            result['first_paint'] = report['marks']['first_paint'] / 1000
+        print(json.dumps(result))
+        app._on_close()
+
+    app.root.after(50, poll)
+    app.root.mainloop()
+    return 0
+
+
+# (名稱, 函數, 是否與技能數有關, 是否需要 Tk)
+BENCHMARKS = [
+    ('hotkey_lookup', bench_hotkey_lookup, True, False),
+    ('profile', bench_profile, True, False),
+    ('config_io', bench_config_io, True, False),
+    ('icons', bench_icons, False, False),
+    ('tick', bench_tick, False, True),
+    ('window_build', bench_window_build, True, True),
+]
+
+
+# ==================== 執行與比較 ====================
+
+def run(sizes, only=None, tk_backend='real'):
+    """執行所有項目
+
+    Args:
+        sizes: 合成技能表的技能數列表
+        only: 只執行的項目名稱（None 表示全部）
+        tk_backend: 'real'（真正的 Tk）或 'stub'（Tk 替身，結果標示為 '項目@stub'）
+
+    Returns:
+        {'results': {'項目/技能數/指標': 秒}, 'skipped': {'項目': 原因}}
+    """
+    results = {}
+    skipped = {}
+    directory = tempfile.mkdtemp(prefix='skill_tracker_bench_')
+    try:
+        catalogs = {}
+        for size in sizes:
+            catalog_dir = os.path.join(directory, str(size))
+            os.makedirs(catalog_dir)
+            catalogs[size] = make_catalog(catalog_dir, size)
+
+        for name, bench, per_size, needs_tk in BENCHMARKS:
+            if only and name not in only:
+                continue
+            kwargs = {}
+            if needs_tk:
+                kwargs['tk_backend'] = tk_backend
+                if tk_backend == 'stub':
+                    name = f"{name}@stub"
+            for size in (sizes if per_size else sizes[:1]):
+                label = f"{name}/{size}" if per_size else name
+                print(f"⏱️ {label} ...", flush=True)
+                try:
+                    metrics = bench(catalogs[size], size, **kwargs)
+                except Exception as e:
+                    skipped[label] = f"失敗: {e}"
+                    print(f"   ❌ {e}")
+                    continue
+                for metric, value in metrics.items():
+                    results[f"{label}/{metric}"] = value
+                    print(f"   {metric:<22} {format_time(value)}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {'results': results, 'skipped': skipped}
+
+
+def format_time(seconds):
+    """秒 → 易讀的單位"""
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:10.2f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:10.2f} ms"
+    return f"{seconds:10.3f} s"
+
+
+def compare(results, baseline, threshold):
+    """與基準比較
+
+    Returns:
+        變慢超過 threshold 倍的項目列表
+    """
+    regressions = []
+    print(f"\n📏 與基準比較（{baseline.get('machine', '未知機器')}，{baseline.get('timestamp', '')}）")
+    for key in sorted(results):
+        if key not in baseline['results']:
+            print(f"   {key:<42} {format_time(results[key])}  （基準沒有此項）")
+            continue
+        ratio = results[key] / baseline['results'][key]
+        flag = ''
+        if ratio > threshold:
+            flag = '  ❌ 變慢'
+            regressions.append(key)
+        elif ratio < 1 / threshold:
+            flag = '  ✅ 變快'
+        print(f"   {key:<42} {format_time(baseline['results'][key])} → {format_time(results[key])}  "
+              f"×{ratio:5.2f}{flag}")
+    return regressions
+
+
+def environment():
+    """執行環境（寫入結果，方便判斷基準是否可比）"""
+    try:
+        from version import get_version
+        version = get_version()
+    except Exception:
+        version = None
+    return {
+        'version': version,
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()} {platform.processor() or ''}".strip(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description="效能測試套件")
+    parser.add_argument('--sizes', default='100,1000,10000', help="合成技能表的技能數（以逗號分隔）")
+    parser.add_argument('--only', help="只執行指定項目（以逗號分隔）")
+    parser.add_argument('--output', help="結果 JSON 路徑")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="基準 JSON 路徑")
+    parser.add_argument('--update-baseline', action='store_true', help="以這次的結果覆寫基準")
+    parser.add_argument('--threshold', type=float, default=1.5, help="變慢超過此倍數視為退步")
+    parser.add_argument('--tk', choices=('auto', 'real', 'stub'), default='auto',
+                        help="tick 與 window_build 使用的 Tk：auto 在沒有顯示器時使用替身")
+    parser.add_argument('--child', choices=('tick', 'window_build'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    tk_backend = args.tk
+    if tk_backend == 'auto':
+        tk_backend = 'real' if has_display() else 'stub'
+
+    if args.child:
+        if tk_backend == 'stub':
+            import tk_stub
+            tk_stub.install()
+        return child_tick() if args.child == 'tick' else child_window_build()
+
+    if tk_backend == 'stub':
+        print("ℹ️ 沒有顯示器，tick 與 window_build 使用 Tk 替身（只含 Python 端的成本；可用 xvfb-run 量測真正的 Tk）")
+    sizes = [int(size) for size in args.sizes.split(',')]
+    only = set(args.only.split(',')) if args.only else None
+    report = dict(environment(), sizes=sizes, tk=tk_backend, **run(sizes, only, tk_backend))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 結果已寫入 {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 基準已更新 {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\n⚠️ 找不到基準 {args.baseline}（以 --update-baseline 建立）")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(report['results'], baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} 個項目變慢超過 {args.threshold} 倍")
+        return 1
+    print("\n✅ 沒有退步")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+計時器日誌測試
+    1. 熱路徑：on_event() 在 Tk 主執行緒的耗時（一般 tick 不寫入、開始事件加入緩衝區）
+    2. 戰鬥模擬：多個計時器持續觸發時實際寫入的紀錄數、fsync 次數與位元組數
+    3. 當機：寫入中的子行程被強制終止後，重播是否只得到完整且一致的紀錄，以及重播耗時
+
+當機測試中每個事件的冷卻秒數與結束時間來自同一個計數值，
+重播得到的紀錄兩個欄位不符即表示讀到寫到一半的資料。
+
+用法: python benchmarks/timer_journal_io.py [--timers 20] [--seconds 3] [--crashes 5]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ui.timer_journal import TimerJournal, DEFAULT_COMPACT_AFTER, replay
+from src.ui.timer_events import EVENT_CLOSE, EVENT_START, EVENT_TICK
+
+
+def make_event(kind, index, end_time, total=120.0):
+    """模擬的計時器事件"""
+    return {
+        'type': kind, 'skill_id': f"skill_{index}", 'name': f"技能 {index}",
+        'total': total, 'end_time': end_time, 'loop': False, 'permanent': False,
+    }
+
+
+def measure_hot_path(path):
+    """on_event() 耗時"""
+    journal = TimerJournal(path)
+    journal.open()
+    now = time.time()
+    journal.on_event(make_event(EVENT_START, 0, now + 120))
+    tick = make_event(EVENT_TICK, 0, now + 120)
+    start = make_event(EVENT_START, 1, now + 120)
+    number = 50000
+    tick_cost = timeit.timeit(lambda: journal.on_event(tick), number=number) / number * 1e6
+    start_cost = timeit.timeit(lambda: journal.on_event(start), number=number) / number * 1e6
+    journal.close()
+    print("⏱️ 熱路徑（Tk 主執行緒）")
+    print(f"   tick（不寫入）   {tick_cost:6.2f} µs")
+    print(f"   開始（加入緩衝） {start_cost:6.2f} µs")
+
+
+def simulate_fight(path, timers, seconds):
+    """戰鬥模擬：每個計時器每秒 10 次 tick，約每 2 秒重新觸發一次"""
+    journal = TimerJournal(path)
+    journal.open()
+    ends = {}
+    events = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        now = time.time()
+        for index in range(timers):
+            if index not in ends or random.random() < 0.05:
+                ends[index] = now + 120
+                journal.on_event(make_event(EVENT_START, index, ends[index]))
+            else:
+                journal.on_event(make_event(EVENT_TICK, index, ends[index]))
+            events += 1
+        time.sleep(0.1)
+    for index in list(ends):
+        journal.on_event(make_event(EVENT_CLOSE, index, None))
+    journal.close()
+    stats = journal.stats
+    print(f"\n⚔️ 戰鬥模擬（{timers} 個計時器，{seconds:g} 秒，{events} 個事件）")
+    print(f"   寫入 {stats['records']} 筆紀錄 / {stats['syncs']} 次 fsync / {stats['bytes']} 位元組"
+          f"（每秒 {stats['syncs'] / seconds:.1f} 次 fsync，{stats['bytes'] / seconds:.0f} B/s）")
+
+
+def write_process(path, timers):
+    """子行程：不停寫入直到被終止"""
+    journal = TimerJournal(path, sync_interval=0.001)
+    journal.open()
+    value = 1
+    while True:
+        index = value % timers
+        if value % 7 == 0:
+            journal.on_event(make_event(EVENT_CLOSE, index, None))
+        else:
+            journal.on_event(make_event(EVENT_START, index, float(value), total=float(value % 65536)))
+        value += 1
+        if value % 64 == 0:
+            time.sleep(0.0005)
+
+
+def check_crashes(directory, timers, crashes):
+    """強制終止寫入中的子行程後重播
+
+    Returns:
+        是否全部一致
+    """
+    ok = True
+    print(f"\n💥 當機測試（{crashes} 次）")
+    for attempt in range(crashes):
+        path = os.path.join(directory, f"crash_{attempt}.journal")
+        writer = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--write', path,
+                                   '--timers', str(timers)])
+        time.sleep(random.uniform(0.3, 0.8))
+        writer.kill()
+        writer.wait()
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        restored, valid = replay(data)
+        torn = sum(1 for _, total, end_time in restored.values() if total != end_time % 65536)
+        ok = ok and torn == 0
+        print(f"   #{attempt + 1}: 檔案 {len(data):>7} 位元組，完整紀錄 {valid // 32:>5} 筆，"
+              f"尾端略過 {len(data) - valid} 位元組，恢復 {len(restored)} 個計時器，不一致 {torn}")
+    return ok
+
+
+def measure_replay(path, timers):
+    """重播一個接近改寫門檻的日誌（啟動時的讀取成本）"""
+    journal = TimerJournal(path, compact_after=DEFAULT_COMPACT_AFTER * 2)
+    journal.open()
+    for value in range(DEFAULT_COMPACT_AFTER):
+        journal.on_event(make_event(EVENT_START, value % timers, time.time() + 120))
+    journal.close()
+    with open(path, 'rb') as f:
+        data = f.read()
+    number = 20
+    cost = timeit.timeit(lambda: replay(data), number=number) / number * 1e3
+    print(f"\n📒 重播 {len(data) // 32} 筆紀錄：{cost:.2f} ms")
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description="計時器日誌測試")
+    parser.add_argument('--timers', type=int, default=20, help="計時器數量")
+    parser.add_argument('--seconds', type=float, default=3, help="戰鬥模擬秒數")
+    parser.add_argument('--crashes', type=int, default=5, help="當機測試次數")
+    parser.add_argument('--write', metavar='PATH', help=argparse.SUPPRESS)  # 寫入端子行程
+    args = parser.parse_args()
+
+    if args.write:
+        write_process(args.write, args.timers)
+        return 0
+
+    directory = tempfile.mkdtemp(prefix='timer_journal_')
+    try:
+        measure_hot_path(os.path.join(directory, 'hot.journal'))
+        simulate_fight(os.path.join(directory, 'fight.journal'), args.timers, args.seconds)
+        ok = check_crashes(directory, args.timers, args.crashes)
+        measure_replay(os.path.join(directory, 'replay.journal'), args.timers)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+計時器共用記憶體測試
+    1. 讀取成本：不同計時器數量下 changed() 與 snapshot() 的耗時
+    2. 一致性：另一個行程持續寫入時，讀取端是否讀到寫到一半的紀錄（seqlock 重試次數）
+
+寫入端每次事件的冷卻秒數與結束時間來自同一個計數值，
+讀取端（另一個 Python 行程）檢查每筆紀錄的兩個欄位是否相符，不符即為讀到不一致的資料。
+
+用法: python benchmarks/timer_shm_read.py [--timers 20,100,256] [--seconds 2] [--rate 10000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ui.timer_shm import TimerStateExporter, TimerStateReader
+from src.ui.timer_events import EVENT_START, EVENT_TICK
+
+SEGMENT_NAME = f"skill_tracker_bench_{os.getpid()}"
+
+
+def make_event(kind, index, value):
+    """冷卻秒數與結束時間都由 value 決定的事件"""
+    return {
+        'type': kind, 'skill_id': f"skill_{index}", 'name': f"技能 {index}",
+        'total': float(value % 65536), 'end_time': float(value), 'loop': False, 'permanent': False,
+    }
+
+
+def measure_reads(counts):
+    """讀取成本"""
+    print("📖 讀取成本")
+    for count in counts:
+        exporter = TimerStateExporter(SEGMENT_NAME, capacity=max(counts))
+        for i in range(count):
+            exporter.on_event(make_event(EVENT_START, i, 1_000_000 + i))
+        reader = TimerStateReader(SEGMENT_NAME)
+        reader.snapshot()
+        number = 20000
+        changed = timeit.timeit(reader.changed, number=number) / number * 1e6
+        snapshot = timeit.timeit(reader.snapshot, number=number // 10) / (number // 10) * 1e6
+        reader.close()
+        exporter.close()
+        print(f"   {count:>4} 個計時器: changed() {changed:6.2f} µs  snapshot() {snapshot:7.2f} µs")
+
+
+def read_process(name, seconds):
+    """子行程：持續讀取快照並檢查紀錄（結果以 JSON 印出）"""
+    reader = TimerStateReader(name)
+    snapshots = torn = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for timer in reader.snapshot():
+            if timer.total != timer.end_time % 65536:
+                torn += 1
+        snapshots += 1
+    print(json.dumps({'snapshots': snapshots, 'torn': torn, 'retries': reader.retries}))
+    reader.close()
+
+
+def check_consistency(timers, seconds, rate):
+    """一致性測試：本行程寫入，另一個行程讀取
+
+    Returns:
+        是否沒有讀到不一致的紀錄
+    """
+    name = SEGMENT_NAME + '_writer'
+    exporter = TimerStateExporter(name, capacity=timers)
+    for i in range(timers):
+        exporter.on_event(make_event(EVENT_START, i, i))
+
+    reader = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--read', name, '--seconds', str(seconds)],
+        stdout=subprocess.PIPE, text=True
+    )
+    value = timers
+    writes = 0
+    interval = 1 / rate
+    next_write = time.perf_counter()
+    while reader.poll() is None:
+        if time.perf_counter() >= next_write:
+            exporter.on_event(make_event(EVENT_TICK, value % timers, value))
+            value += 1
+            writes += 1
+            next_write += interval
+    exporter.close()
+    result = json.loads(reader.stdout.read())
+
+    print(f"\n🔒 一致性（寫入 {timers} 個計時器，約 {rate:,.0f} 次/秒，共 {writes} 次）")
+    print(f"   {result['snapshots']} 次快照，seqlock 重試 {result['retries']} 次，"
+          f"不一致的紀錄 {result['torn']} 筆")
+    return result['torn'] == 0
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description="計時器共用記憶體測試")
+    parser.add_argument('--timers', default='20,100,256', help="計時器數量（以逗號分隔）")
+    parser.add_argument('--seconds', type=float, default=2, help="一致性測試秒數")
+    parser.add_argument('--rate', type=float, default=10000, help="一致性測試每秒寫入次數")
+    parser.add_argument('--read', metavar='NAME', help=argparse.SUPPRESS)  # 讀取端子行程
+    args = parser.parse_args()
+
+    if args.read:
+        read_process(args.read, args.seconds)
+        return 0
+
+    counts = [int(value) for value in args.timers.split(',')]
+    measure_reads(counts)
+    ok = check_consistency(counts[0], args.seconds, args.rate)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
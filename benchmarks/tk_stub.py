@@ -0,0 +1,527 @@
+# -*- coding: utf-8 -*-
+"""
+無介面 Tk 替身
+沒有顯示器（也沒有 Xvfb）時，讓 suite.py 的 tick 與 window_build 仍能量測 Python 端的成本：
+元件只保存選項與子元件，不繪製任何東西；after / after_idle 由以實際時間運作的事件迴圈執行，
+所以排程器的分幀、倒數的 100 ms 計時與真正的 Tk 一樣需要等待。
+
+量到的是程式本身（建立元件、計算排版、倒數邏輯）的耗時，不含 Tk 繪製，
+結果以 '@stub' 標示，不與真正的 Tk 結果比較。
+
+用法（必須在導入 tkinter 或 src.ui 之前呼叫）:
+    import tk_stub
+    tk_stub.install()
+"""
+
+import heapq
+import itertools
+import sys
+import time
+import types
+
+SCREEN_SIZE = (1920, 1080)
+
+
+class TclError(Exception):
+    """與 tkinter.TclError 相同用途"""
+
+
+# ==================== 事件迴圈 ====================
+
+class _EventLoop:
+    """after / after_idle 的事件迴圈（實際時間）"""
+
+    def __init__(self):
+        self._timers = []  # (到期時間, 序號, after_id)
+        self._callbacks = {}  # {after_id: (函數, 參數)}
+        self._idle = []  # [after_id, ...]
+        self._seq = itertools.count()
+        self._running = False
+
+    def after(self, ms, func, args):
+        seq = next(self._seq)
+        after_id = f"after#{seq}"
+        self._callbacks[after_id] = (func, args)
+        heapq.heappush(self._timers, (time.perf_counter() + max(0, ms) / 1000, seq, after_id))
+        return after_id
+
+    def after_idle(self, func, args):
+        after_id = f"after#{next(self._seq)}"
+        self._callbacks[after_id] = (func, args)
+        self._idle.append(after_id)
+        return after_id
+
+    def cancel(self, after_id):
+        self._callbacks.pop(after_id, None)
+
+    def _call(self, after_id):
+        callback = self._callbacks.pop(after_id, None)
+        if callback is not None:
+            func, args = callback
+            func(*args)
+
+    def run_idle(self):
+        """執行目前排入的閒置回調（回調中新增的留到下一輪）"""
+        idle, self._idle = self._idle, []
+        for after_id in idle:
+            self._call(after_id)
+
+    def run_due(self):
+        """執行已到期的計時器
+
+        Returns:
+            是否執行了任何回調
+        """
+        now = time.perf_counter()
+        ran = False
+        while self._timers and self._timers[0][0] <= now:
+            _, _, after_id = heapq.heappop(self._timers)
+            if after_id in self._callbacks:
+                self._call(after_id)
+                ran = True
+        return ran
+
+    def mainloop(self):
+        self._running = True
+        while self._running:
+            ran = self.run_due()
+            if self._idle:
+                self.run_idle()
+                continue
+            if ran:
+                continue
+            while self._timers and self._timers[0][2] not in self._callbacks:
+                heapq.heappop(self._timers)  # 已取消
+            if not self._timers:
+                break  # 沒有任何工作，真正的 Tk 會永遠等待使用者輸入
+            time.sleep(max(0.0, self._timers[0][0] - time.perf_counter()))
+
+    def quit(self):
+        self._running = False
+
+
+_loop = _EventLoop()
+_default_root = None
+
+
+def _noop(*args, **kwargs):
+    return ''
+
+
+# ==================== 元件 ====================
+
+class Misc:
+    """所有元件的共同行為：保存選項與子元件，其餘方法皆為空操作"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, master=None, cnf=None, **kw):
+        self.master = master if master is not None else _default_root
+        self.children = {}
+        self._options = dict(cnf or {}, **kw)
+        self._destroyed = False
+        self._name = f"!{type(self).__name__.lower()}{next(Misc._ids)}"
+        if self.master is not None:
+            self.master.children[self._name] = self
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return _noop
+
+    def __setitem__(self, key, value):
+        self._options[key] = value
+
+    def __getitem__(self, key):
+        return self._options.get(key, '')
+
+    def __str__(self):
+        return self._name
+
+    # 選項
+    def configure(self, cnf=None, **kw):
+        if cnf is None and not kw:
+            return {key: (key, value) for key, value in self._options.items()}
+        self._options.update(cnf or {}, **kw)
+
+    config = configure
+
+    def cget(self, key):
+        return self._options.get(key, '')
+
+    def keys(self):
+        return list(self._options)
+
+    # 計時器
+    def after(self, ms, func=None, *args):
+        if func is None:
+            time.sleep(ms / 1000)
+            return None
+        return _loop.after(ms, func, args)
+
+    def after_idle(self, func, *args):
+        return _loop.after_idle(func, args)
+
+    def after_cancel(self, after_id):
+        _loop.cancel(after_id)
+
+    def update(self):
+        _loop.run_due()
+        _loop.run_idle()
+
+    def update_idletasks(self):
+        _loop.run_idle()
+
+    def mainloop(self, n=0):
+        _loop.mainloop()
+
+    def quit(self):
+        _loop.quit()
+
+    # 事件
+    def bind(self, sequence=None, func=None, add=None):
+        return f"bind{id(func)}"
+
+    def bind_all(self, sequence=None, func=None, add=None):
+        return f"bind{id(func)}"
+
+    # 視窗資訊
+    def winfo_children(self):
+        return list(self.children.values())
+
+    def winfo_exists(self):
+        return 0 if self._destroyed else 1
+
+    def winfo_toplevel(self):
+        widget = self
+        while widget.master is not None and not isinstance(widget, (Tk, Toplevel)):
+            widget = widget.master
+        return widget
+
+    def winfo_screenwidth(self):
+        return SCREEN_SIZE[0]
+
+    def winfo_screenheight(self):
+        return SCREEN_SIZE[1]
+
+    def winfo_width(self):
+        return int(self._options.get('width') or 1)
+
+    def winfo_height(self):
+        return int(self._options.get('height') or 1)
+
+    winfo_reqwidth = winfo_width
+    winfo_reqheight = winfo_height
+
+    def winfo_x(self):
+        return 0
+
+    winfo_y = winfo_rootx = winfo_rooty = winfo_pointerx = winfo_pointery = winfo_x
+
+    def winfo_ismapped(self):
+        return 1
+
+    def winfo_id(self):
+        return id(self)
+
+    def destroy(self):
+        for child in list(self.children.values()):
+            child.destroy()
+        self._destroyed = True
+        if self.master is not None:
+            self.master.children.pop(self._name, None)
+
+    def nametowidget(self, name):
+        return self
+
+
+class Wm:
+    """視窗管理員方法"""
+
+    def geometry(self, new_geometry=None):
+        if new_geometry is None:
+            return f"{self.winfo_width()}x{self.winfo_height()}+0+0"
+        return ''
+
+    def attributes(self, *args):
+        return '' if len(args) != 1 else 0
+
+    wm_attributes = attributes
+
+    def title(self, string=None):
+        if string is None:
+            return self._options.get('title', '')
+        self._options['title'] = string
+
+
+class Tk(Misc, Wm):
+    """根視窗（同時建立全域預設根視窗）"""
+
+    def __init__(self, *args, **kw):
+        global _default_root
+        Misc.__init__(self, None, **kw)
+        self.master = None
+        self.tk = self
+        if _default_root is None:
+            _default_root = self
+
+    def call(self, *args):
+        return ''
+
+    def destroy(self):
+        global _default_root
+        Misc.destroy(self)
+        _loop.quit()
+        if _default_root is self:
+            _default_root = None
+
+
+class Toplevel(Misc, Wm):
+    pass
+
+
+class Frame(Misc):
+    pass
+
+
+class Label(Misc):
+    pass
+
+
+class Button(Misc):
+    pass
+
+
+class Checkbutton(Misc):
+    pass
+
+
+class Radiobutton(Misc):
+    pass
+
+
+class Scale(Misc):
+    pass
+
+
+class Scrollbar(Misc):
+    pass
+
+
+class Entry(Misc):
+    """保存文字內容的輸入框"""
+
+    def __init__(self, master=None, cnf=None, **kw):
+        super().__init__(master, cnf, **kw)
+        self._text = ''
+
+    def get(self):
+        return self._text
+
+    def insert(self, index, string):
+        position = index if isinstance(index, int) else len(self._text)
+        self._text = self._text[:position] + str(string) + self._text[position:]
+
+    def delete(self, first, last=None):
+        self._text = ''
+
+
+class Listbox(Misc):
+    """保存項目的列表"""
+
+    def __init__(self, master=None, cnf=None, **kw):
+        super().__init__(master, cnf, **kw)
+        self._items = []
+        self._selection = ()
+
+    def insert(self, index, *elements):
+        self._items.extend(elements)
+
+    def delete(self, first, last=None):
+        self._items = []
+
+    def get(self, first, last=None):
+        return self._items[first] if last is None else tuple(self._items)
+
+    def size(self):
+        return len(self._items)
+
+    def curselection(self):
+        return self._selection
+
+    def selection_set(self, first, last=None):
+        self._selection = (first,)
+
+
+class Canvas(Misc):
+    """畫布：create_* 返回遞增的項目編號"""
+
+    def __init__(self, master=None, cnf=None, **kw):
+        super().__init__(master, cnf, **kw)
+        self._items = {}
+        self._next_item = itertools.count(1)
+
+    def _create(self, *args, **kw):
+        item = next(self._next_item)
+        self._items[item] = kw
+        return item
+
+    create_arc = create_bitmap = create_image = create_line = create_oval = _create
+    create_polygon = create_rectangle = create_text = create_window = _create
+
+    def itemconfigure(self, item, cnf=None, **kw):
+        if item in self._items:
+            self._items[item].update(cnf or {}, **kw)
+
+    itemconfig = itemconfigure
+
+    def itemcget(self, item, option):
+        return self._items.get(item, {}).get(option, '')
+
+    def delete(self, *items):
+        if 'all' in items:
+            self._items.clear()
+        for item in items:
+            self._items.pop(item, None)
+
+    def coords(self, item, *args):
+        return [0, 0, 0, 0]
+
+    def bbox(self, *args):
+        return (0, 0, self.winfo_width(), self.winfo_height())
+
+    def find_withtag(self, tag):
+        return ()
+
+    def find_overlapping(self, *args):
+        return ()
+
+    def tag_bind(self, tag, sequence=None, func=None, add=None):
+        return f"bind{id(func)}"
+
+
+class PhotoImage:
+    """圖片（只保存尺寸）"""
+
+    def __init__(self, image=None, size=None, **kw):
+        if hasattr(image, 'size'):
+            size = image.size
+        elif size is None:
+            size = (int(kw.get('width', 1)), int(kw.get('height', 1)))
+        self._size = size
+
+    def width(self):
+        return self._size[0]
+
+    def height(self):
+        return self._size[1]
+
+    def paste(self, *args, **kw):
+        pass
+
+    def put(self, *args, **kw):
+        pass
+
+    def blank(self):
+        pass
+
+
+# ==================== 變數 ====================
+
+class Variable:
+    _default = ''
+
+    def __init__(self, master=None, value=None, name=None):
+        self._value = self._default if value is None else value
+        self._traces = []
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        self._value = value
+        for callback in list(self._traces):
+            callback('', '', 'write')
+
+    def trace_add(self, mode, callback):
+        self._traces.append(callback)
+        return str(id(callback))
+
+    def trace_remove(self, mode, cbname):
+        pass
+
+
+class StringVar(Variable):
+    _default = ''
+
+
+class BooleanVar(Variable):
+    _default = False
+
+
+class IntVar(Variable):
+    _default = 0
+
+
+class DoubleVar(Variable):
+    _default = 0.0
+
+
+# ==================== 常量 ====================
+
+END = 'end'
+_CONSTANTS = {
+    'LEFT': 'left', 'RIGHT': 'right', 'TOP': 'top', 'BOTTOM': 'bottom',
+    'X': 'x', 'Y': 'y', 'BOTH': 'both', 'NONE': 'none',
+    'N': 'n', 'S': 's', 'E': 'e', 'W': 'w', 'NW': 'nw', 'NE': 'ne', 'SW': 'sw', 'SE': 'se', 'CENTER': 'center',
+    'FLAT': 'flat', 'RAISED': 'raised', 'SUNKEN': 'sunken', 'GROOVE': 'groove', 'RIDGE': 'ridge', 'SOLID': 'solid',
+    'NORMAL': 'normal', 'DISABLED': 'disabled', 'ACTIVE': 'active', 'HIDDEN': 'hidden',
+    'HORIZONTAL': 'horizontal', 'VERTICAL': 'vertical', 'INSERT': 'insert', 'ALL': 'all',
+    'SINGLE': 'single', 'BROWSE': 'browse', 'MULTIPLE': 'multiple', 'EXTENDED': 'extended',
+    'WORD': 'word', 'CHAR': 'char', 'YES': 1, 'NO': 0, 'TRUE': 1, 'FALSE': 0,
+}
+
+
+# ==================== 安裝 ====================
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    return module
+
+
+def install():
+    """以替身取代 tkinter、tkinter.ttk/messagebox/simpledialog 與 PIL.ImageTk"""
+    import PIL
+
+    namespace = {
+        name: value for name, value in globals().items()
+        if isinstance(value, type) and issubclass(value, (Misc, Variable, PhotoImage, TclError))
+    }
+    tkinter = _module('tkinter', END=END, TkVersion=8.6, TclVersion=8.6, **_CONSTANTS, **namespace)
+    tkinter.__path__ = []  # 讓 from tkinter import ttk 視為套件
+
+    ttk = _module('tkinter.ttk', Combobox=Entry, Frame=Frame, Label=Label, Button=Button,
+                  Scrollbar=Scrollbar, Checkbutton=Checkbutton, Style=Misc, Treeview=Misc,
+                  Progressbar=Misc, Notebook=Misc)
+
+    def ask_none(*args, **kw):
+        return None
+
+    def ask_no(*args, **kw):
+        return False
+
+    def show_error(title=None, message=None, **kw):
+        print(f"❌ {title}: {message}", file=sys.stderr)  # 沒有對話框時錯誤不能被吞掉
+
+    messagebox = _module('tkinter.messagebox', showinfo=ask_none, showwarning=ask_none, showerror=show_error,
+                         askyesno=ask_no, askokcancel=ask_no, askquestion=ask_none, askyesnocancel=ask_none)
+    simpledialog = _module('tkinter.simpledialog', askstring=ask_none, askinteger=ask_none, askfloat=ask_none)
+    image_tk = _module('PIL.ImageTk', PhotoImage=PhotoImage, BitmapImage=PhotoImage)
+
+    tkinter.ttk, tkinter.messagebox, tkinter.simpledialog = ttk, messagebox, simpledialog
+    sys.modules.update({
+        'tkinter': tkinter, 'tkinter.ttk': ttk, 'tkinter.messagebox': messagebox,
+        'tkinter.simpledialog': simpledialog, 'PIL.ImageTk': image_tk,
+    })
+    PIL.ImageTk = image_tk
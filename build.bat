@@ -10,6 +10,7 @@ if %errorlevel% neq 0 (
 
 pip install -r requirements.txt
 pip install pyinstaller
+python build_icon_atlas.py
 pyinstaller skill_tracker.spec
 
 pause
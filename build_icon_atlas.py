@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+圖示圖集打包腳本
+將 config.json 中所有技能/道具圖示預先縮放成標準尺寸，寫入 icon_atlas.bin
+（打包前執行，build.bat 會自動呼叫）
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.ui.icon_atlas import build_atlas, ATLAS_FILENAME
+from src.ui.skill_manager import decode_icon, ICON_SIZE_LARGE, ICON_SIZE_SMALL
+from src.ui.styles import Sizes
+
+
+def collect_icons(config_path='config.json', images_dir='images'):
+    """收集 config.json 中引用且存在的圖示"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    icons = {}
+    missing = []
+    for entry in config.get('skills', []) + config.get('items', []):
+        icon_name = entry.get('icon')
+        if not icon_name or icon_name in icons:
+            continue
+        icon_path = os.path.join(images_dir, icon_name)
+        if os.path.exists(icon_path):
+            icons[icon_name] = icon_path
+        else:
+            missing.append(icon_name)
+
+    return icons, missing
+
+
+def main():
+    """主函數"""
+    print("🖼️ 建立圖示圖集...")
+
+    sizes = sorted({ICON_SIZE_SMALL, ICON_SIZE_LARGE} |
+                   {size for _, size in Sizes.SKILL_WINDOW_SIZE_OPTIONS})
+    icons, missing = collect_icons()
+
+    for icon_name in missing:
+        print(f"  ⚠️ 找不到圖示: {icon_name}")
+
+    count = build_atlas(icons, sizes, ATLAS_FILENAME, decode_icon)
+    size_kb = os.path.getsize(ATLAS_FILENAME) / 1024
+
+    print(f"  ✅ 已寫入 {count} 個圖示 × {len(sizes)} 種尺寸 {sizes}")
+    print(f"  ✅ {ATLAS_FILENAME} ({size_kb:.0f} KB)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -18,6 +18,27 @@ def check_imports():
         'src/ui/helpers.py',
         'src/ui/styles.py',
         'src/ui/updater.py',
+        'src/ui/scheduler.py',
+        'src/ui/thumbnail_cache.py',
+        'src/ui/icon_atlas.py',
+        'src/ui/startup_profiler.py',
+        'src/ui/startup_snapshot.py',
+        'src/ui/party_protocol.py',
+        'src/ui/room_server.py',
+        'src/ui/room_client.py',
+        'src/ui/clock_sync.py',
+        'src/ui/room_discovery.py',
+        'src/ui/buff_detector.py',
+        'src/ui/frame_diff.py',
+        'src/ui/cooldown_ocr.py',
+        'src/ui/icon_hash.py',
+        'src/ui/ipc_server.py',
+        'src/ui/timer_events.py',
+        'src/ui/overlay_server.py',
+        'src/ui/timer_shm.py',
+        'src/ui/timer_journal.py',
+        'src/ui/skill_analytics.py',
+        'src/ui/session_recorder.py',
     ]
     
     print("🔍 檢查 Python 文件導入...")
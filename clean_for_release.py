@@ -97,7 +97,7 @@ def remove_build_files():
     """刪除打包產生的檔案"""
     print("\n🧹 清理打包檔案...")
     
-    dirs_to_remove = ['build', 'dist']
+    dirs_to_remove = ['build', 'dist', 'cache']  # cache: 執行時產生的縮圖快取
     removed = []
     
     for dir_name in dirs_to_remove:
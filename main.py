@@ -3,18 +3,53 @@
 Artale 楓之谷技能冷卻追蹤工具
 """
 
+import argparse
 import sys
 import os
 
 # 添加專案根目錄到路徑
 sys.path.insert(0, os.path.dirname(__file__))
 
-from src.ui.main_window import MainWindow
+
+def parse_args():
+    """解析命令列參數"""
+    parser = argparse.ArgumentParser(description="技能追蹤器 - Artale 楓之谷")
+    parser.add_argument(
+        '--profile-startup', nargs='?', const='startup_profile.json', default=None,
+        metavar='PATH',
+        help="記錄啟動時的模組導入時間與各階段耗時，寫入 PATH（預設 startup_profile.json）"
+    )
+    parser.add_argument(
+        '--replay', default=None, metavar='PATH',
+        help="主視窗顯示後重播操作錄製檔（cache/sessions/*.rec），完成時印出每個事件的延遲"
+    )
+    parser.add_argument(
+        '--replay-speed', default='1', metavar='SPEED',
+        help="重播倍速（1、4…）或 max（預設 1）"
+    )
+    return parser.parse_args()
 
 
 def main():
     """主程式"""
-    app = MainWindow()
+    args = parse_args()
+    
+    profiler = None
+    if args.profile_startup:
+        from src.ui.startup_profiler import StartupProfiler
+        profiler = StartupProfiler(output_path=args.profile_startup)
+        profiler.start_import_timing()
+        profiler.begin('import')
+    
+    from src.ui.main_window import MainWindow
+    
+    if profiler:
+        profiler.end('import')
+    
+    app = MainWindow(profiler=profiler)
+    if args.replay:
+        from src.ui.session_recorder import parse_speed
+        app.start_replay(args.replay, parse_speed(args.replay_speed))
     app.run()
 
 
@@ -23,7 +23,16 @@ if errorlevel 1 (
 )
 echo.
 
-echo 📋 Step 3: 打包程式
+echo 📋 Step 3: 產生圖示圖集
+python build_icon_atlas.py
+if errorlevel 1 (
+    echo ❌ 圖示圖集產生失敗！
+    pause
+    exit /b 1
+)
+echo.
+
+echo 📋 Step 4: 打包程式
 pyinstaller skill_tracker.spec
 if errorlevel 1 (
     echo ❌ 打包失敗！
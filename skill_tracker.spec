@@ -12,6 +12,8 @@ a = Analysis(
         ('icon.ico', '.'),
         ('profiles', 'profiles'),  # 包含 profiles 資料夾
         ('version.py', '.'),       # 包含版本文件
+        ('icon_atlas.bin', '.'),   # 預先縮放的圖示圖集（build_icon_atlas.py 產生）
+        ('overlay', 'overlay'),    # 串流疊加層頁面
     ],
     hiddenimports=[
         'pynput.keyboard._win32',
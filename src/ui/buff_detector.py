@@ -0,0 +1,447 @@
+"""
+畫面 buff 列偵測模組
+擷取設定的螢幕區域，以縮小後的灰階影像與技能圖示做正規化互相關（NCC）比對，
+所有圖示一次以矩陣運算完成；buff 新出現時通知主視窗觸發技能。
+
+需要 numpy（選用套件，未安裝時停用偵測）。
+"""
+
+import threading
+import time
+
+from src.ui.frame_diff import import_numpy
+
+
+class BuffDetector:
+    """以正規化互相關比對 buff 圖示
+
+    每個圖示縮成 size×size 的灰階範本，透明像素不參與比對（遮罩式 NCC）：
+        ncc = Σ m·(w - μw)(t - μt) / sqrt(Σ m·(w - μw)² · Σ m·(t - μt)²)
+    影像中所有 size×size 視窗攤平成 N×P 矩陣後，與 K 個範本的三個 P×K 矩陣相乘，
+    即可一次得到 N×K 的分數。
+
+    縮小後圖示在原始畫面的位置不一定對齊縮小的像素格，
+    因此每個圖示另外建立以原始像素平移的範本（縮小一半時為 2×2 種相位），取最高分。
+
+    prefilter 啟用時，先以感知雜湊（icon_hash.HashPrefilter）找出可能相符的（視窗, 範本）組合，
+    只對這些組合計算 NCC，分數也只保存這些組合（稀疏），
+    每幀的計算量只與候選組合數有關，不隨圖示數量線性成長。
+    """
+
+    def __init__(self, templates, icon_size=32, scale=0.5, threshold=0.85, min_contrast=4.0,
+                 prefilter=False, max_hash_distance=14):
+        """初始化偵測器
+
+        Args:
+            templates: {skill_id: PIL.Image}（技能圖示，會縮放成 icon_size）
+            icon_size: 遊戲 buff 列中圖示的原始像素大小
+            scale: 比對前的縮小比例（0.5 表示寬高各縮一半）
+            threshold: NCC 分數門檻（0-1）
+            min_contrast: 視窗灰階標準差低於此值時視為純色背景，不比對
+            prefilter: 是否以感知雜湊預先篩選（範本邊長需為 8 的倍數，否則停用）
+            max_hash_distance: 預先篩選時，雜湊距離超過此值的組合不計算 NCC（0-56）
+        """
+        np = import_numpy('畫面 buff 偵測')
+        if np is None:
+            raise ImportError("numpy")
+        self.np = np
+        self.icon_size = icon_size
+        self.scale = scale
+        self.threshold = threshold
+        self.min_contrast = min_contrast
+        self.size = max(4, int(round(icon_size * scale)))
+        phases = max(1, int(round(1 / scale))) if scale < 1 else 1
+
+        self.skill_ids = []
+        kernels, masks, columns = [], [], []
+        for skill_id, image in templates.items():
+            prepared = []
+            for dy in range(phases):
+                for dx in range(phases):
+                    gray, mask = self._prepare_template(image, dx, dy)
+                    if mask.sum() < self.size:
+                        continue  # 幾乎全透明的圖示無法比對
+                    kernel = (gray - gray[mask].mean()) * mask
+                    if kernel.any():
+                        prepared.append((kernel, mask))
+            if not prepared:
+                continue  # 純色或透明圖示
+            for kernel, mask in prepared:
+                kernels.append(kernel.ravel())
+                masks.append(mask.ravel())
+                columns.append(len(self.skill_ids))
+            self.skill_ids.append(skill_id)
+
+        # 範本欄 → 技能索引
+        self._columns = np.array(columns, dtype=np.intp)
+
+        # P×K 矩陣，供 windows @ 矩陣 使用（沒有可比對的圖示時為 P×0，match() 直接返回）
+        pixels = self.size * self.size
+        self._kernels = np.array(kernels, dtype=np.float32).reshape(len(kernels), pixels).T
+        self._masks = np.array(masks, dtype=np.float32).reshape(len(masks), pixels).T
+        self._counts = self._masks.sum(axis=0)
+        self._kernel_norms = np.sqrt((self._kernels ** 2).sum(axis=0))
+
+        # 上一次比對的全部分數（N×欄），只重算有變化的視窗時沿用其餘的列
+        self._scores = None
+
+        # 🆕 感知雜湊預先篩選（範本以欄為單位；分數只保存候選組合）
+        self._prefilter = None
+        self._pairs = None  # (視窗索引, 範本欄, 分數)
+        self._pair_windows = 0
+        if prefilter and self.size % 8 == 0 and columns:
+            from src.ui.icon_hash import HashPrefilter
+
+            block = self.size // 8
+            blocks = np.array(kernels, dtype=np.float32).reshape(len(kernels), 8, block, 8, block)
+            self._prefilter = HashPrefilter(np, blocks.mean(axis=(2, 4)), max_hash_distance)
+            self._kernel_rows = np.ascontiguousarray(self._kernels.T)  # 欄×P
+            self._mask_rows = np.ascontiguousarray(self._masks.T)
+
+    def _prepare_template(self, image, dx=0, dy=0):
+        """圖示 → (灰階 float32 陣列, 不透明遮罩)
+
+        Args:
+            image: 圖示
+            dx, dy: 縮小前以原始像素平移的量（相位）
+        """
+        from PIL import Image
+
+        np = self.np
+        icon = image.convert('RGBA').resize((self.icon_size, self.icon_size), Image.Resampling.LANCZOS)
+        if dx or dy:
+            shifted = Image.new('RGBA', icon.size, (0, 0, 0, 0))
+            shifted.paste(icon, (dx, dy))
+            icon = shifted
+        rgba = icon.resize((self.size, self.size), Image.Resampling.BOX)
+        gray = np.asarray(rgba.convert('L'), dtype=np.float32)
+        mask = np.asarray(rgba.getchannel('A')) >= 128
+        return gray, mask
+
+    def prepare_frame(self, image):
+        """擷取的畫面（PIL.Image，原始解析度）→ 縮小後的灰階陣列"""
+        from PIL import Image
+
+        gray = image.convert('L')
+        factor = 1 / self.scale
+        if factor == int(factor):
+            gray = gray.reduce(int(factor))  # 整數倍縮小：區塊平均，比 resize 快
+        else:
+            width, height = image.size
+            size = (max(1, int(width * self.scale)), max(1, int(height * self.scale)))
+            gray = gray.resize(size, Image.Resampling.BOX)
+        return self.np.asarray(gray, dtype=self.np.float32)
+
+    def match(self, gray, windows_mask=None):
+        """計算每個圖示的最佳比對
+
+        Args:
+            gray: prepare_frame() 的結果
+            windows_mask: 需要重新比對的視窗（frame_diff.changed_windows() 的結果），
+                          None 表示全部重算；其餘視窗沿用上一次的分數
+
+        Returns:
+            (scores, positions)：scores 為長度 K 的最高分數，
+            positions 為對應的 (x, y)（縮小後座標）
+        """
+        np = self.np
+        size = self.size
+        count = len(self.skill_ids)
+        if gray.shape[0] < size or gray.shape[1] < size or not count:
+            return np.zeros(count, dtype=np.float32), [(0, 0)] * count
+        columns = len(self._columns)
+
+        windows = np.lib.stride_tricks.sliding_window_view(gray, (size, size))  # (列, 行, size, size)
+        rows, cols = windows.shape[:2]
+        if self._prefilter is not None:
+            return self._match_candidates(gray, windows, windows_mask)
+
+        scores = self._scores
+        if windows_mask is None or scores is None or scores.shape[0] != rows * cols:
+            scores = self._scores = self._score_windows(windows.reshape(rows * cols, size * size))
+        else:
+            selected = np.flatnonzero(windows_mask.ravel())
+            if selected.size:
+                subset = windows[selected // cols, selected % cols].reshape(selected.size, size * size)
+                scores[selected] = self._score_windows(subset)
+
+        best = scores.argmax(axis=0)
+        column_scores = scores[best, np.arange(columns)]
+
+        # 每個技能取各相位中的最高分
+        best_scores = np.zeros(count, dtype=np.float32)
+        best_windows = np.zeros(count, dtype=np.intp)
+        for column in range(columns):
+            skill = self._columns[column]
+            if column_scores[column] > best_scores[skill]:
+                best_scores[skill] = column_scores[column]
+                best_windows[skill] = best[column]
+        positions = [(int(index % cols), int(index // cols)) for index in best_windows]
+        return best_scores, positions
+
+    def _score_windows(self, windows):
+        """計算視窗 (N×P) 對所有範本欄的 NCC 分數 (N×欄)"""
+        np = self.np
+        numerator = windows @ self._kernels                # Σ m·w·(t - μt)（Σ m·(t - μt) = 0）
+        sums = windows @ self._masks                       # Σ m·w
+        squares = (windows * windows) @ self._masks        # Σ m·w²
+        variance = squares - sums * sums / self._counts    # Σ m·(w - μw)²
+
+        flat = variance < self._counts * (self.min_contrast ** 2)
+        scores = numerator / (np.sqrt(np.maximum(variance, 1e-6)) * self._kernel_norms)
+        scores[flat] = 0.0
+        return scores
+
+    def _match_candidates(self, gray, windows, windows_mask):
+        """match() 的預先篩選版本：只計算並保存候選組合的分數"""
+        np = self.np
+        size = self.size
+        rows, cols = windows.shape[:2]
+        count = len(self.skill_ids)
+
+        pairs = self._pairs
+        if windows_mask is None or pairs is None or self._pair_windows != rows * cols:
+            selected = np.arange(rows * cols)
+            kept = None
+        else:
+            selected = np.flatnonzero(windows_mask.ravel())
+            stale = windows_mask.ravel()[pairs[0]]
+            kept = tuple(values[~stale] for values in pairs)
+
+        window_index = column = np.zeros(0, dtype=np.intp)
+        scores = np.zeros(0, dtype=np.float32)
+        if selected.size:
+            blocks = self._prefilter.window_blocks(np, gray, size)
+            if selected.size == rows * cols:
+                blocks = blocks.reshape(selected.size, 8, 8)
+            else:
+                blocks = blocks[selected // cols, selected % cols]
+            owner, column = self._prefilter.candidates(blocks)
+            window_index = selected[owner]
+            if owner.size:
+                subset = windows[window_index // cols, window_index % cols].reshape(owner.size, size * size)
+                scores = self._score_pairs(subset, column)
+        if kept is not None:
+            window_index = np.concatenate((kept[0], window_index))
+            column = np.concatenate((kept[1], column))
+            scores = np.concatenate((kept[2], scores))
+        self._pairs = (window_index, column, scores)
+        self._pair_windows = rows * cols
+
+        # 每個技能取最高分的組合
+        best_scores = np.zeros(count, dtype=np.float32)
+        best_windows = np.zeros(count, dtype=np.intp)
+        if scores.size:
+            skills = self._columns[column]
+            order = np.lexsort((scores, skills))
+            last = order[np.append(skills[order][1:] != skills[order][:-1], True)]
+            best_scores[skills[last]] = np.maximum(scores[last], 0.0)
+            best_windows[skills[last]] = window_index[last]
+        positions = [(int(index % cols), int(index // cols)) for index in best_windows]
+        return best_scores, positions
+
+    def _score_pairs(self, subset, column):
+        """計算（視窗, 範本欄）組合的 NCC 分數
+
+        Args:
+            subset: 各組合的視窗 (n×P)
+            column: 各組合的範本欄 (n,)
+        """
+        np = self.np
+        masks = self._mask_rows[column]
+        numerator = np.einsum('ij,ij->i', subset, self._kernel_rows[column])
+        sums = np.einsum('ij,ij->i', subset, masks)
+        squares = np.einsum('ij,ij->i', subset * subset, masks)
+        counts = self._counts[column]
+        variance = squares - sums * sums / counts
+
+        scores = numerator / (np.sqrt(np.maximum(variance, 1e-6)) * self._kernel_norms[column])
+        scores[variance < counts * (self.min_contrast ** 2)] = 0.0
+        return scores
+
+    def detect(self, gray, windows_mask=None):
+        """找出畫面中出現的圖示
+
+        相似圖示可能在同一位置都超過門檻，依分數由高到低保留，
+        與已保留圖示位置重疊超過一半的不再計入。
+
+        Args:
+            gray: prepare_frame() 的結果
+            windows_mask: 同 match()
+
+        Returns:
+            {skill_id: (score, (x, y))}（x, y 為原始解析度座標）
+        """
+        scores, positions = self.match(gray, windows_mask)
+        candidates = sorted(
+            (float(score), index) for index, score in enumerate(scores) if score >= self.threshold
+        )
+        found = {}
+        taken = []
+        half = self.size / 2
+        for score, index in reversed(candidates):
+            x, y = positions[index]
+            if any(abs(x - tx) < half and abs(y - ty) < half for tx, ty in taken):
+                continue
+            taken.append((x, y))
+            found[self.skill_ids[index]] = (score, (int(x / self.scale), int(y / self.scale)))
+        return found
+
+
+class BuffTracker:
+    """追蹤 buff 出現與消失（連續 miss_frames 幀沒看到才視為消失，避免閃爍重複觸發）"""
+
+    def __init__(self, miss_frames=2):
+        """初始化追蹤器
+
+        Args:
+            miss_frames: 連續幾幀沒偵測到才視為消失
+        """
+        self.miss_frames = miss_frames
+        self._misses = {}  # {skill_id: 連續未偵測幀數}
+
+    @property
+    def active(self):
+        """目前視為存在的 buff"""
+        return set(self._misses)
+
+    def update(self, present):
+        """以一幀的偵測結果更新狀態
+
+        Args:
+            present: 這一幀偵測到的 skill_id 集合
+
+        Returns:
+            新出現的 skill_id 列表
+        """
+        appeared = [skill_id for skill_id in present if skill_id not in self._misses]
+        for skill_id in list(self._misses):
+            if skill_id in present:
+                self._misses[skill_id] = 0
+            else:
+                self._misses[skill_id] += 1
+                if self._misses[skill_id] >= self.miss_frames:
+                    del self._misses[skill_id]
+        for skill_id in appeared:
+            self._misses[skill_id] = 0
+        return appeared
+
+
+class ScreenBuffDetector:
+    """背景執行緒定期擷取螢幕區域並偵測 buff
+
+    比對前先檢查擷取結果是否與上一幀完全相同（靜止畫面只需一次位元組比較），
+    再以 FrameDiffGate 逐塊比較：沒有變化的幀沿用上次結果，
+    有變化時只重新比對涵蓋變化方塊的視窗。
+    """
+
+    def __init__(self, detector, region, on_appear, interval=0.25, grab=None, gate=True):
+        """初始化
+
+        Args:
+            detector: BuffDetector
+            region: 擷取區域 (x, y, width, height)
+            on_appear: buff 新出現時的回調 on_appear(skill_id)（在背景執行緒呼叫）
+            interval: 擷取間隔秒數
+            grab: 擷取函數 grab(bbox) → PIL.Image，None 表示使用 PIL.ImageGrab
+            gate: 是否啟用畫面變化偵測（False 時每幀全部比對）
+        """
+        from src.ui.frame_diff import FrameDiffGate, FrameStats
+
+        self.detector = detector
+        self.region = region
+        self.on_appear = on_appear
+        self.interval = interval
+        self.grab = grab
+        self.tracker = BuffTracker()
+        self.gate = FrameDiffGate(detector.np) if gate else None
+        self.stats = FrameStats()
+        self._found = {}
+        self._last_raw = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        """是否正在偵測"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """開始偵測"""
+        if self.running:
+            return
+        if self.grab is None:
+            from PIL import ImageGrab
+            self.grab = ImageGrab.grab
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='BuffDetector', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止偵測"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def process(self, image):
+        """偵測一幀（擷取結果或錄製的截圖）
+
+        Returns:
+            新出現的 skill_id 列表
+        """
+        from src.ui.frame_diff import changed_windows
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        detector = self.detector
+
+        raw = image.tobytes() if self.gate is not None else None
+        if raw is not None and raw == self._last_raw:
+            appeared = self.tracker.update(set(self._found))
+            self.stats.record(
+                'skipped', time.thread_time() - cpu_start, time.perf_counter() - wall_start, 0.0
+            )
+            return appeared
+        self._last_raw = raw
+
+        gray = detector.prepare_frame(image)
+        if self.gate is None:
+            kind, changed_ratio = 'full', 1.0
+            self._found = detector.detect(gray)
+        else:
+            changed = self.gate.update(gray)
+            changed_ratio = float(changed.mean())
+            if changed_ratio == 0.0:
+                kind = 'skipped'
+            elif changed_ratio == 1.0:
+                kind = 'full'
+                self._found = detector.detect(gray)
+            else:
+                kind = 'partial'
+                mask = changed_windows(detector.np, changed, self.gate.tile, gray.shape, detector.size)
+                self._found = detector.detect(gray, mask)
+
+        appeared = self.tracker.update(set(self._found))
+        self.stats.record(
+            kind, time.thread_time() - cpu_start, time.perf_counter() - wall_start, changed_ratio
+        )
+        return appeared
+
+    def _run(self):
+        """背景執行緒主體"""
+        x, y, width, height = self.region
+        bbox = (x, y, x + width, y + height)
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                image = self.grab(bbox=bbox)
+            except Exception as e:
+                print(f"⚠️ 螢幕擷取失敗，停止 buff 偵測: {e}")
+                return
+            for skill_id in self.process(image):
+                try:
+                    self.on_appear(skill_id)
+                except Exception as e:
+                    print(f"⚠️ buff 偵測回調錯誤: {e}")
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
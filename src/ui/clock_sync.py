@@ -0,0 +1,73 @@
+"""
+時鐘同步模組
+以 NTP 方式估計本機與房間主機的時鐘差與往返延遲，讓隊友的技能倒數對齊
+"""
+
+import time
+from collections import deque
+
+
+class ClockSync:
+    """本機時鐘與主機時鐘的差值估計
+
+    每次 ping 得到四個時間戳：
+        t0 本機送出、t1 主機收到、t2 主機回覆、t3 本機收到
+    offset = ((t1 - t0) + (t2 - t3)) / 2，rtt = (t3 - t0) - (t2 - t1)
+
+    往返延遲越短的樣本越準確（排隊延遲造成的不對稱最小），
+    因此在最近 window 個樣本中取延遲最短的一個，再以指數平滑更新估計值。
+    """
+
+    def __init__(self, window=8, smoothing=0.25, clock=time.monotonic):
+        """初始化時鐘同步
+
+        Args:
+            window: 保留的樣本數
+            smoothing: 指數平滑係數（0-1，越大越快跟上變化）
+            clock: 本機時鐘函數（秒）
+        """
+        self.clock = clock
+        self.smoothing = smoothing
+        self.samples = deque(maxlen=window)  # (rtt, offset)
+        self.offset = 0.0  # 主機時間 - 本機時間（秒）
+        self.rtt = None    # 往返延遲（秒）
+
+    @property
+    def synced(self):
+        """是否已有估計值"""
+        return self.rtt is not None
+
+    def add_sample(self, t0, t1, t2, t3):
+        """加入一次 ping 的結果
+
+        Args:
+            t0: 本機送出時間
+            t1: 主機收到時間
+            t2: 主機回覆時間
+            t3: 本機收到時間
+        """
+        rtt = max(0.0, (t3 - t0) - (t2 - t1))
+        offset = ((t1 - t0) + (t2 - t3)) / 2
+        self.samples.append((rtt, offset))
+
+        best_rtt, best_offset = min(self.samples)
+        if self.rtt is None:
+            self.offset = best_offset
+            self.rtt = best_rtt
+        else:
+            self.offset += self.smoothing * (best_offset - self.offset)
+            self.rtt += self.smoothing * (rtt - self.rtt)
+
+    def host_time(self, local_time=None):
+        """本機時間換算成主機時間
+
+        Args:
+            local_time: 本機時鐘時間，None 表示現在
+        """
+        if local_time is None:
+            local_time = self.clock()
+        return local_time + self.offset
+
+    def local_time(self, host_time):
+        """主機時間換算成本機時間"""
+        return host_time - self.offset
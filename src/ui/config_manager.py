@@ -6,13 +6,22 @@
 import json
 import os
 
+from src.ui.scheduler import Priority
+
 
 class ConfigManager:
     """配置管理器"""
     
-    def __init__(self, config_path):
+    def __init__(self, config_path, config=None):
+        """初始化配置管理器
+        
+        Args:
+            config_path: config.json 路徑
+            config: 已載入的配置字典（可選，來自啟動快照時不再讀取檔案）
+        """
         self.config_path = config_path
-        self.config = self._load_config()
+        self.config = config if config is not None else self._load_config()
+        self.scheduler = None  # 設定後 save() 改為合併延遲寫入
         
         # 分離出 skills 和 items（只讀，不會被保存）
         self.initial_skills = self.config.get('skills', [])
@@ -35,8 +44,32 @@ class ConfigManager:
         if not os.path.exists(self.profiles_dir):
             os.makedirs(self.profiles_dir)
     
+    def attach_scheduler(self, scheduler):
+        """設定任務排程器，之後的 save() 會合併成一次背景寫入
+        
+        Args:
+            scheduler: TaskScheduler 實例
+        """
+        self.scheduler = scheduler
+    
     def save(self):
-        """儲存配置文件（只保存 settings，不保存 skills 和 items）"""
+        """儲存配置文件（只保存 settings，不保存 skills 和 items）
+        
+        有排程器時只標記待寫入，同一時間內多次呼叫只會寫入一次。
+        """
+        if self.scheduler is None:
+            return self._write_config()
+        
+        self.scheduler.call_soon(self._write_config, priority=Priority.LOW, name='config_save')
+        return True
+    
+    def flush(self):
+        """立即寫入尚未完成的延遲保存"""
+        if self.scheduler is not None:
+            self.scheduler.flush('config_save')
+    
+    def _write_config(self):
+        """將配置寫入磁碟"""
         try:
             # 創建要保存的配置（不包含 skills 和 items 的當前狀態）
             save_config = {
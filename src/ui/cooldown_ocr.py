@@ -0,0 +1,407 @@
+"""
+冷卻數字辨識模組
+擷取遊戲技能欄，辨識每個欄位上的剩餘冷卻秒數，用來校正技能視窗的倒數
+（延遲或減少冷卻的裝備會讓實際冷卻與設定的秒數不同）。
+
+辨識方式為離線的範本比對：預先繪製 0-9 的字形（或使用從遊戲擷取的字形圖片），
+以亮度門檻切出每個數字後縮放到固定格子，所有數字一次以矩陣乘法與 10 個範本計算相關係數。
+
+需要 numpy（選用套件，未安裝時停用辨識）。
+"""
+
+import os
+import threading
+import time
+
+from src.ui.frame_diff import import_numpy
+
+GLYPH_GRID = (12, 10)  # 數字正規化後的格子大小（高, 寬）
+GLYPH_DIR = 'images/cooldown_digits'  # 從遊戲擷取的字形圖片（0.png ~ 9.png），不存在時以字型繪製
+
+
+def render_glyphs(height=12, font_path=None, bold=True):
+    """以字型繪製 0-9 的字形
+
+    Args:
+        height: 字型大小（像素）
+        font_path: TrueType 字型檔，None 表示使用 Pillow 內建字型
+        bold: 水平重複繪製一次加粗筆畫（遊戲的冷卻數字為粗體）
+
+    Returns:
+        {digit: PIL.Image（L 模式，黑底白字）}
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    if font_path:
+        font = ImageFont.truetype(font_path, height)
+    else:
+        font = ImageFont.load_default(size=height)
+
+    glyphs = {}
+    for digit in range(10):
+        image = Image.new('L', (height * 2, height * 2), 0)
+        draw = ImageDraw.Draw(image)
+        for dx in ((0, 1) if bold else (0,)):
+            draw.text((height // 2 + dx, height // 2), str(digit), fill=255, font=font)
+        glyphs[digit] = image
+    return glyphs
+
+
+def load_glyphs(directory):
+    """讀取從遊戲擷取的字形圖片（0.png ~ 9.png，亮色數字）
+
+    Returns:
+        {digit: PIL.Image}，缺少任何一個數字時返回 None
+    """
+    from PIL import Image
+
+    glyphs = {}
+    for digit in range(10):
+        path = os.path.join(directory, f"{digit}.png")
+        if not os.path.isfile(path):
+            return None
+        glyphs[digit] = Image.open(path).convert('L')
+    return glyphs
+
+
+class DigitRecognizer:
+    """以範本比對辨識亮色數字
+
+    亮度不低於 bright 的像素視為數字筆畫，依欄投影切成單一數字，
+    每個數字依高度等比例縮放並置中到 GLYPH_GRID，與範本比較正規化相關係數：
+        score = (x - μx)·(t - μt) / (|x - μx| · |t - μt|)
+    """
+
+    def __init__(self, glyphs, bright=140, min_score=0.7, min_height=5, max_height=24, max_aspect=1.0):
+        """初始化辨識器
+
+        Args:
+            glyphs: {digit: PIL.Image}（render_glyphs() 或 load_glyphs() 的結果）
+            bright: 數字筆畫的最低亮度（0-255）
+            min_score: 每個數字的最低相關係數，任一數字低於此值時整個欄位視為沒有數字
+            min_height: 低於此高度（像素）的亮點視為雜訊
+            max_height: 超過此高度的亮區（未冷卻的圖示）表示欄位沒有數字
+            max_aspect: 寬度超過高度的此倍數時視為相連的數字並切開
+        """
+        np = import_numpy('冷卻數字辨識')
+        if np is None:
+            raise ImportError("numpy")
+        self.np = np
+        self.bright = bright
+        self.min_score = min_score
+        self.min_height = min_height
+        self.max_height = max_height
+        self.max_aspect = max_aspect
+
+        templates = []
+        for digit in range(10):
+            mask = np.asarray(glyphs[digit].convert('L')) >= 128
+            rows, cols = np.flatnonzero(mask.any(axis=1)), np.flatnonzero(mask.any(axis=0))
+            if not rows.size:
+                raise ValueError(f"字形 {digit} 是空白的")
+            templates.append(self._sample(mask, rows[0], rows[-1] + 1, cols[0], cols[-1] + 1))
+        self._templates = self._normalize(np.array(templates)).T  # P×10
+
+    def _sample(self, mask, y0, y1, x0, x1):
+        """將數字範圍依高度等比例縮放（雙線性內插）並水平置中到 GLYPH_GRID，再以 3×3 平均模糊
+        （字型大小不同時筆畫會差一個像素，模糊後相關係數才不會因此大幅下降）
+
+        Returns:
+            長度 P 的 float32 陣列
+        """
+        np = self.np
+        grid_height, grid_width = GLYPH_GRID
+        factor = grid_height / (y1 - y0)
+        width = min(grid_width, max(1, int(round((x1 - x0) * factor))))
+
+        ys = np.clip(y0 + (np.arange(grid_height) + 0.5) / factor - 0.5, y0, y1 - 1)
+        xs = np.clip(x0 + (np.arange(width) + 0.5) / factor - 0.5, x0, x1 - 1)
+        top, left = ys.astype(np.intp), xs.astype(np.intp)
+        bottom, right = np.minimum(top + 1, y1 - 1), np.minimum(left + 1, x1 - 1)
+        wy, wx = (ys - top)[:, None], (xs - left)[None, :]
+        plane = mask.astype(np.float32)
+        resized = ((plane[np.ix_(top, left)] * (1 - wx) + plane[np.ix_(top, right)] * wx) * (1 - wy)
+                   + (plane[np.ix_(bottom, left)] * (1 - wx) + plane[np.ix_(bottom, right)] * wx) * wy)
+
+        cell = np.zeros((grid_height + 2, grid_width + 2), dtype=np.float32)
+        offset = (grid_width - width) // 2 + 1
+        cell[1:-1, offset:offset + width] = resized
+        blurred = sum(cell[dy:dy + grid_height, dx:dx + grid_width] for dy in range(3) for dx in range(3))
+        return blurred.ravel()
+
+    def _normalize(self, samples):
+        """每列減去平均並除以長度（全亮或全暗的列維持為 0）"""
+        np = self.np
+        centered = samples - samples.mean(axis=1, keepdims=True)
+        norms = np.sqrt((centered * centered).sum(axis=1, keepdims=True))
+        return centered / np.maximum(norms, 1e-6)
+
+    def _segments(self, mask):
+        """切出一個欄位中的數字（依欄投影切開，過寬的再從中間切開）
+
+        Args:
+            mask: 欄位的筆畫布林陣列 (H, W)
+
+        Returns:
+            由左到右的 (y0, y1, x0, x1) 列表；有過高的亮區時返回 None
+        """
+        np = self.np
+        projection = mask.sum(axis=0)
+        columns = np.concatenate(([False], projection > 0, [False]))
+        edges = np.flatnonzero(columns[1:] != columns[:-1])
+        pending = list(zip(edges[::2], edges[1::2]))
+        segments = []
+        while pending:
+            x0, x1 = pending.pop(0)
+            rows = np.flatnonzero(mask[:, x0:x1].any(axis=1))
+            y0, y1 = rows[0], rows[-1] + 1
+            if y1 - y0 > self.max_height:
+                return None
+            if y1 - y0 < self.min_height:
+                continue
+            if x1 - x0 > (y1 - y0) * self.max_aspect:
+                # 相連的數字：在中段筆畫最少的欄切開
+                low, high = x0 + (x1 - x0) // 3, x1 - (x1 - x0) // 3
+                split = low + int(projection[low:high].argmin())
+                pending[:0] = [(x0, split), (split, x1)]
+                continue
+            segments.append((y0, y1, x0, x1))
+        return segments
+
+    def read_cells(self, gray, cells, cell_size):
+        """辨識多個欄位
+
+        Args:
+            gray: 灰階陣列 (H, W)
+            cells: [(x, y), ...] 欄位左上角座標
+            cell_size: 欄位邊長（像素）
+
+        Returns:
+            與 cells 對應的秒數列表（沒有數字的欄位為 None）
+        """
+        np = self.np
+        strokes = gray >= self.bright
+
+        samples, owners, layouts = [], [], []
+        for index, (x, y) in enumerate(cells):
+            mask = strokes[y:y + cell_size, x:x + cell_size]
+            segments = self._segments(mask)
+            layouts.append(segments)
+            if not segments or len(segments) > 3:
+                continue
+            heights = [y1 - y0 for y0, y1, _, _ in segments]
+            if max(heights) > min(heights) * 1.3:
+                continue  # 高度不一致，不是同一組數字
+            for y0, y1, x0, x1 in segments:
+                samples.append(self._sample(mask, y0, y1, x0, x1))
+                owners.append(index)
+
+        values = [None] * len(cells)
+        if not samples:
+            return values
+
+        scores = self._normalize(np.array(samples)) @ self._templates  # 數字×10
+        digits = scores.argmax(axis=1)
+        confident = scores[np.arange(len(digits)), digits] >= self.min_score
+
+        text = {}
+        rejected = set()
+        for owner, digit, ok in zip(owners, digits, confident):
+            if ok:
+                text[owner] = text.get(owner, '') + str(int(digit))
+            else:
+                rejected.add(owner)
+        for owner, value in text.items():
+            if owner not in rejected and len(value) == len(layouts[owner]):
+                values[owner] = int(value)
+        return values
+
+    def read(self, image):
+        """辨識單一欄位的截圖（PIL.Image）
+
+        Returns:
+            秒數或 None
+        """
+        gray = self.np.asarray(image.convert('L'), dtype=self.np.float32)
+        height, width = gray.shape
+        size = min(height, width)
+        return self.read_cells(gray[:size, :size], [(0, 0)], size)[0]
+
+
+class CooldownSync:
+    """由連續的辨識結果推算精確的剩餘秒數
+
+    遊戲顯示的是向上取整的秒數（與技能視窗相同），只有在數字恰好減少 1 時，
+    才能確定剩餘時間在兩次擷取之間剛好等於新的數字；
+    以這個時間點推算，誤差不超過擷取間隔的一半。
+    不會倒數的亮區（未冷卻圖示的高光）因此不會被當成冷卻時間。
+    """
+
+    def __init__(self, max_gap=1.5):
+        """初始化
+
+        Args:
+            max_gap: 兩次擷取相隔超過此秒數時不推算（數字可能已跳過好幾秒）
+        """
+        self.max_gap = max_gap
+        self._values = {}  # {skill_id: 上一次辨識的秒數或 None}
+        self._last_time = None
+
+    def tick(self, now):
+        """記錄一幀沒有任何欄位變化"""
+        self._last_time = now
+
+    def update(self, readings, now):
+        """以一幀重新辨識的欄位更新
+
+        Args:
+            readings: {skill_id: 秒數或 None}（未列出的欄位視為與上一幀相同）
+            now: 擷取時間（秒，單調時鐘）
+
+        Returns:
+            [(skill_id, 擷取當下的剩餘秒數), ...]
+        """
+        events = []
+        previous_time, self._last_time = self._last_time, now
+        for skill_id, value in readings.items():
+            old = self._values.get(skill_id)
+            self._values[skill_id] = value
+            if value is None or old is None or previous_time is None:
+                continue
+            if old - value != 1 or now - previous_time > self.max_gap:
+                continue
+            changed_at = (previous_time + now) / 2
+            events.append((skill_id, value - (now - changed_at)))
+        return events
+
+
+class ScreenCooldownReader:
+    """背景執行緒定期擷取技能欄並辨識冷卻秒數
+
+    擷取區域依 slot_size 切成欄位（由左到右、由上到下），slots 依序對應技能。
+    與 buff 偵測相同，先比較整幀位元組，再以 FrameDiffGate 找出有變化的欄位，只辨識這些欄位。
+    """
+
+    def __init__(self, recognizer, region, slots, slot_size, on_reading,
+                 interval=0.25, grab=None, gate=True, clock=time.monotonic):
+        """初始化
+
+        Args:
+            recognizer: DigitRecognizer
+            region: 擷取區域 (x, y, width, height)
+            slots: 各欄位對應的 skill_id 列表（None 表示空欄位）
+            slot_size: 欄位邊長（像素）
+            on_reading: 推算出剩餘秒數時的回調 on_reading(skill_id, remaining, read_at)
+                        （在背景執行緒呼叫，read_at 為 clock() 的時間）
+            interval: 擷取間隔秒數
+            grab: 擷取函數 grab(bbox) → PIL.Image，None 表示使用 PIL.ImageGrab
+            gate: 是否啟用畫面變化偵測（False 時每幀辨識所有欄位）
+            clock: 時鐘函數（秒）
+        """
+        from src.ui.frame_diff import FrameDiffGate, FrameStats
+
+        self.recognizer = recognizer
+        self.region = region
+        self.slot_size = slot_size
+        self.on_reading = on_reading
+        self.interval = interval
+        self.grab = grab
+        self.clock = clock
+        self.sync = CooldownSync()
+        self.gate = FrameDiffGate(recognizer.np) if gate else None
+        self.stats = FrameStats()
+        self._last_raw = None
+        self._thread = None
+        self._stop = threading.Event()
+
+        _, _, width, height = region
+        columns = max(1, width // slot_size)
+        self.cells = []  # [(skill_id, (x, y)), ...]
+        for index, skill_id in enumerate(slots):
+            x, y = (index % columns) * slot_size, (index // columns) * slot_size
+            if skill_id is not None and x + slot_size <= width and y + slot_size <= height:
+                self.cells.append((skill_id, (x, y)))
+
+    @property
+    def running(self):
+        """是否正在辨識"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """開始辨識"""
+        if self.running:
+            return
+        if self.grab is None:
+            from PIL import ImageGrab
+            self.grab = ImageGrab.grab
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='CooldownReader', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止辨識"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def process(self, image, now=None):
+        """辨識一幀（擷取結果或錄製的截圖）
+
+        Args:
+            image: 技能欄截圖（PIL.Image）
+            now: 擷取時間，None 表示 clock()
+
+        Returns:
+            [(skill_id, 剩餘秒數), ...]
+        """
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        now = self.clock() if now is None else now
+        np = self.recognizer.np
+
+        raw = image.tobytes() if self.gate is not None else None
+        if raw is not None and raw == self._last_raw:
+            self.sync.tick(now)
+            self.stats.record('skipped', time.thread_time() - cpu_start, time.perf_counter() - wall_start, 0.0)
+            return []
+        self._last_raw = raw
+
+        gray = np.asarray(image.convert('L'), dtype=np.float32)
+        cells = self.cells
+        changed_ratio = 1.0
+        if self.gate is not None:
+            changed = self.gate.update(gray)
+            changed_ratio = float(changed.mean())
+            if changed_ratio < 1.0:
+                tile = self.gate.tile
+                cells = [
+                    (skill_id, (x, y)) for skill_id, (x, y) in cells
+                    if changed[y // tile:-(-(y + self.slot_size) // tile),
+                               x // tile:-(-(x + self.slot_size) // tile)].any()
+                ]
+
+        values = self.recognizer.read_cells(gray, [cell for _, cell in cells], self.slot_size) if cells else []
+        events = self.sync.update({skill_id: value for (skill_id, _), value in zip(cells, values)}, now)
+
+        kind = 'full' if changed_ratio == 1.0 else ('partial' if cells else 'skipped')
+        self.stats.record(kind, time.thread_time() - cpu_start, time.perf_counter() - wall_start, changed_ratio)
+        return events
+
+    def _run(self):
+        """背景執行緒主體"""
+        x, y, width, height = self.region
+        bbox = (x, y, x + width, y + height)
+        while not self._stop.is_set():
+            started = self.clock()
+            try:
+                image = self.grab(bbox=bbox)
+            except Exception as e:
+                print(f"⚠️ 螢幕擷取失敗，停止冷卻數字辨識: {e}")
+                return
+            for skill_id, remaining in self.process(image, started):
+                try:
+                    self.on_reading(skill_id, remaining, started)
+                except Exception as e:
+                    print(f"⚠️ 冷卻數字辨識回調錯誤: {e}")
+            self._stop.wait(max(0.0, self.interval - (self.clock() - started)))
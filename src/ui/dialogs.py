@@ -5,8 +5,9 @@
 
 import tkinter as tk
 from tkinter import simpledialog, messagebox
-from src.ui.components import RoundedButton, BorderedFrame
-from src.ui.styles import Colors, Fonts
+from src.ui.components import RoundedButton, BorderedFrame, ScrollableFrame
+from src.ui.styles import Colors, Fonts, Sizes
+from src.ui.scheduler import Priority
 
 
 class BaseDialog:
@@ -29,11 +30,13 @@ class BaseDialog:
         self.dialog.overrideredirect(True)
         self.dialog.configure(bg=Colors.BG_DARK)
         
-        # 計算置中位置
+        # 計算置中位置（沒有標題列無法拖回，尺寸不超過螢幕，保留工作列的空間）
         screen_width = parent.winfo_screenwidth()
         screen_height = parent.winfo_screenheight()
-        x = (screen_width - width) // 2
-        y = (screen_height - height) // 2
+        width = min(width, screen_width)
+        height = min(height, screen_height - 80)
+        x = max(0, (screen_width - width) // 2)
+        y = max(0, (screen_height - height) // 2)
         self.dialog.geometry(f"{width}x{height}+{x}+{y}")
         
         self.dialog.lift()
@@ -151,6 +154,7 @@ class ProfileManagerDialog(BaseDialog):
         self.current_settings = current_settings
         self.main_window = main_window
         self.current_profile = self.config_manager.get_current_profile()
+        self._refresh_task = None
         
         self._create_ui()
     
@@ -239,13 +243,35 @@ class ProfileManagerDialog(BaseDialog):
         ).pack(pady=10)
     
     def _refresh_list(self):
-        """刷新配置列表"""
+        """刷新配置列表（交由排程器分段插入）"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+        self._refresh_task = self.main_window.scheduler.submit(
+            self._refresh_list_job(), priority=Priority.NORMAL
+        )
+    
+    def _refresh_list_job(self, chunk_size=20):
+        """刷新配置列表（生成器任務，每批插入 chunk_size 筆）"""
         self.profile_listbox.delete(0, tk.END)
-        profiles = self.config_manager.list_profiles()
+        yield
         
-        for profile in profiles:
-            display_text = f"{'★ ' if profile == self.current_profile else '   '}{profile}"
-            self.profile_listbox.insert(tk.END, display_text)
+        profiles = self.config_manager.list_profiles()
+        for start in range(0, len(profiles), chunk_size):
+            if not self.profile_listbox.winfo_exists():
+                return
+            
+            display_texts = [
+                f"{'★ ' if profile == self.current_profile else '   '}{profile}"
+                for profile in profiles[start:start + chunk_size]
+            ]
+            self.profile_listbox.insert(tk.END, *display_texts)
+            yield
+    
+    def close(self):
+        """關閉對話框（取消尚未完成的列表刷新）"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+        super().close()
     
     def _get_selected_profile_name(self):
         """獲取選中的配置名稱"""
@@ -399,7 +425,7 @@ class SettingsDialog(BaseDialog):
             parent: 父視窗
             current_settings: 當前設定字典
         """
-        super().__init__(parent, "設定", 450, 700)  # 🆕 增加高度以容納視窗大小設定
+        super().__init__(parent, "設定", 470, 760)  # 🆕 選項放在可滾動區域，不再隨選項增加高度
         self.current_settings = current_settings
         
         self._create_ui()
@@ -412,17 +438,30 @@ class SettingsDialog(BaseDialog):
             bg=Colors.BG_MEDIUM, fg=Colors.ACCENT_YELLOW,
             font=Fonts.TITLE_MEDIUM
         )
-        title_label.pack(pady=(10, 20))
+        title_label.pack(pady=(10, 10))
+        
+        # 🆕 儲存按鈕固定在底部，選項放在可滾動區域（小螢幕也看得到全部選項與按鈕）
+        btn_frame = tk.Frame(self.content, bg=Colors.BG_MEDIUM)
+        btn_frame.pack(side=tk.BOTTOM, pady=15)
+        
+        RoundedButton(
+            btn_frame, "✓ 儲存設定", self._save, 
+            Colors.ACCENT_GREEN, width=150, height=38
+        ).pack()
+        
+        scroll = ScrollableFrame(self.content, bg=Colors.BG_MEDIUM)
+        scroll.pack(fill=tk.BOTH, expand=True, padx=(0, 5))
+        body = scroll.get_content()
         
         # 位置設定
         pos_label = tk.Label(
-            self.content, text="📍 技能視窗起始位置", 
+            body, text="📍 技能視窗起始位置", 
             bg=Colors.BG_MEDIUM, fg=Colors.ACCENT_YELLOW,
             font=Fonts.BODY_LARGE
         )
         pos_label.pack(anchor='w', padx=20, pady=(5, 5))
         
-        pos_frame = tk.Frame(self.content, bg=Colors.BG_MEDIUM)
+        pos_frame = tk.Frame(body, bg=Colors.BG_MEDIUM)
         pos_frame.pack(pady=10, padx=20, fill='x')
         
         tk.Label(
@@ -452,18 +491,18 @@ class SettingsDialog(BaseDialog):
         self.y_entry.grid(row=0, column=3, padx=8)
         
         # 分隔線
-        separator1 = tk.Frame(self.content, bg=Colors.TEXT_SECONDARY, height=1)
+        separator1 = tk.Frame(body, bg=Colors.TEXT_SECONDARY, height=1)
         separator1.pack(fill=tk.X, padx=20, pady=15)
         
         # 🆕 視窗大小設定（改用下拉選單）
         size_label = tk.Label(
-            self.content, text="📐 技能視窗大小", 
+            body, text="📐 技能視窗大小", 
             bg=Colors.BG_MEDIUM, fg=Colors.ACCENT_BLUE,
             font=Fonts.BODY_LARGE
         )
         size_label.pack(anchor='w', padx=20, pady=(5, 5))
         
-        size_frame = tk.Frame(self.content, bg=Colors.BG_MEDIUM)
+        size_frame = tk.Frame(body, bg=Colors.BG_MEDIUM)
         size_frame.pack(pady=10, padx=20, fill='x')
         
         tk.Label(
@@ -473,13 +512,7 @@ class SettingsDialog(BaseDialog):
         ).grid(row=0, column=0, padx=8)
         
         # 🆕 下拉選單選項
-        size_options = [
-            ("極小 (48px)", 48),
-            ("小 (64px) - 預設", 64),
-            ("中 (80px)", 80),
-            ("大 (96px)", 96),
-            ("極大 (128px)", 128)
-        ]
+        size_options = Sizes.SKILL_WINDOW_SIZE_OPTIONS
         
         current_size = self.current_settings.get('window_size', 64)
         
@@ -508,25 +541,25 @@ class SettingsDialog(BaseDialog):
         
         # 說明文字
         tk.Label(
-            self.content, 
+            body, 
             text="💡 推薦使用「小」或「中」大小", 
             bg=Colors.BG_MEDIUM, fg=Colors.TEXT_SECONDARY,
             font=Fonts.BODY_SMALL
         ).pack(anchor='w', padx=40, pady=(0, 10))
         
         # 分隔線
-        separator2 = tk.Frame(self.content, bg=Colors.TEXT_SECONDARY, height=1)
+        separator2 = tk.Frame(body, bg=Colors.TEXT_SECONDARY, height=1)
         separator2.pack(fill=tk.X, padx=20, pady=15)
         
         # 🆕 提前提示音設定
         alert_label = tk.Label(
-            self.content, text="🔔 提前提示音設定", 
+            body, text="🔔 提前提示音設定", 
             bg=Colors.BG_MEDIUM, fg=Colors.ACCENT_ORANGE,
             font=Fonts.BODY_LARGE
         )
         alert_label.pack(anchor='w', padx=20, pady=(5, 5))
         
-        alert_frame = tk.Frame(self.content, bg=Colors.BG_MEDIUM)
+        alert_frame = tk.Frame(body, bg=Colors.BG_MEDIUM)
         alert_frame.pack(pady=10, padx=20, fill='x')
         
         tk.Label(
@@ -550,19 +583,19 @@ class SettingsDialog(BaseDialog):
         
         # 說明文字
         tk.Label(
-            self.content, 
+            body, 
             text="💡 設為 0 表示結束時才提示", 
             bg=Colors.BG_MEDIUM, fg=Colors.TEXT_SECONDARY,
             font=Fonts.BODY_SMALL
         ).pack(anchor='w', padx=40, pady=(0, 10))
         
         # 分隔線
-        separator3 = tk.Frame(self.content, bg=Colors.TEXT_SECONDARY, height=1)
+        separator3 = tk.Frame(body, bg=Colors.TEXT_SECONDARY, height=1)
         separator3.pack(fill=tk.X, padx=20, pady=15)
         
         # 音效設定
         sound_label = tk.Label(
-            self.content, text="🔊 音效設定", 
+            body, text="🔊 音效設定", 
             bg=Colors.BG_MEDIUM, fg=Colors.ACCENT_YELLOW,
             font=Fonts.BODY_LARGE
         )
@@ -570,7 +603,7 @@ class SettingsDialog(BaseDialog):
         
         self.sound_var = tk.BooleanVar(value=self.current_settings.get('sound', True))
         sound_checkbox = tk.Checkbutton(
-            self.content, 
+            body, 
             text=" 啟用倒數完成音效提示", 
             variable=self.sound_var,
             bg=Colors.BG_MEDIUM, 
@@ -582,27 +615,216 @@ class SettingsDialog(BaseDialog):
         )
         sound_checkbox.pack(anchor='w', padx=40, pady=10)
         
+        # 分隔線
+        separator4 = tk.Frame(body, bg=Colors.TEXT_SECONDARY, height=1)
+        separator4.pack(fill=tk.X, padx=20, pady=15)
+        
+        # 🆕 效能設定
+        perf_label = tk.Label(
+            body, text="⚡ 效能設定", 
+            bg=Colors.BG_MEDIUM, fg=Colors.ACCENT_GREEN,
+            font=Fonts.BODY_LARGE
+        )
+        perf_label.pack(anchor='w', padx=20, pady=(5, 5))
+        
+        self.prewarm_var = tk.BooleanVar(value=self.current_settings.get('prewarm_windows', True))
+        prewarm_checkbox = tk.Checkbutton(
+            body, 
+            text=" 預先建立快捷鍵技能視窗（第一次觸發更快）", 
+            variable=self.prewarm_var,
+            bg=Colors.BG_MEDIUM, 
+            fg=Colors.TEXT_PRIMARY, 
+            font=Fonts.BODY_MEDIUM,
+            selectcolor=Colors.BG_DARK, 
+            activebackground=Colors.BG_MEDIUM,
+            activeforeground=Colors.TEXT_PRIMARY
+        )
+        prewarm_checkbox.pack(anchor='w', padx=40, pady=10)
+        
+        # 🆕 畫面 buff 偵測
+        self.buff_detector_var = tk.BooleanVar(value=self.current_settings.get('buff_detector_enabled', False))
+        tk.Checkbutton(
+            body, 
+            text=" 偵測遊戲 buff 列（buff 出現時自動觸發，需要 numpy）", 
+            variable=self.buff_detector_var,
+            bg=Colors.BG_MEDIUM, 
+            fg=Colors.TEXT_PRIMARY, 
+            font=Fonts.BODY_MEDIUM,
+            selectcolor=Colors.BG_DARK, 
+            activebackground=Colors.BG_MEDIUM,
+            activeforeground=Colors.TEXT_PRIMARY
+        ).pack(anchor='w', padx=40, pady=(0, 5))
+        
+        region_frame = tk.Frame(body, bg=Colors.BG_MEDIUM)
+        region_frame.pack(anchor='w', padx=60, pady=(0, 5))
+        tk.Label(
+            region_frame, text="擷取區域 (X, Y, 寬, 高):", 
+            bg=Colors.BG_MEDIUM, fg=Colors.TEXT_PRIMARY,
+            font=Fonts.BODY_MEDIUM
+        ).pack(side=tk.LEFT)
+        self.buff_region_entry = tk.Entry(
+            region_frame, font=('Arial', 11), width=18,
+            bg=Colors.BG_DARK, fg=Colors.TEXT_PRIMARY, relief=tk.FLAT
+        )
+        region = self.current_settings.get('buff_detector_region') or []
+        self.buff_region_entry.insert(0, ", ".join(str(value) for value in region))
+        self.buff_region_entry.pack(side=tk.LEFT, padx=8)
+        
+        # 🆕 冷卻數字辨識
+        self.cooldown_ocr_var = tk.BooleanVar(value=self.current_settings.get('cooldown_ocr_enabled', False))
+        tk.Checkbutton(
+            body, 
+            text=" 辨識技能欄冷卻秒數（與遊戲不同時自動校正，需要 numpy）", 
+            variable=self.cooldown_ocr_var,
+            bg=Colors.BG_MEDIUM, 
+            fg=Colors.TEXT_PRIMARY, 
+            font=Fonts.BODY_MEDIUM,
+            selectcolor=Colors.BG_DARK, 
+            activebackground=Colors.BG_MEDIUM,
+            activeforeground=Colors.TEXT_PRIMARY
+        ).pack(anchor='w', padx=40, pady=(0, 5))
+        
+        ocr_region_frame = tk.Frame(body, bg=Colors.BG_MEDIUM)
+        ocr_region_frame.pack(anchor='w', padx=60, pady=(0, 5))
+        tk.Label(
+            ocr_region_frame, text="技能欄區域 (X, Y, 寬, 高):", 
+            bg=Colors.BG_MEDIUM, fg=Colors.TEXT_PRIMARY,
+            font=Fonts.BODY_MEDIUM
+        ).pack(side=tk.LEFT)
+        self.ocr_region_entry = tk.Entry(
+            ocr_region_frame, font=('Arial', 11), width=18,
+            bg=Colors.BG_DARK, fg=Colors.TEXT_PRIMARY, relief=tk.FLAT
+        )
+        region = self.current_settings.get('cooldown_ocr_region') or []
+        self.ocr_region_entry.insert(0, ", ".join(str(value) for value in region))
+        self.ocr_region_entry.pack(side=tk.LEFT, padx=8)
+        
+        ocr_slots_frame = tk.Frame(body, bg=Colors.BG_MEDIUM)
+        ocr_slots_frame.pack(anchor='w', padx=60, pady=(0, 5))
+        tk.Label(
+            ocr_slots_frame, text="欄位技能:", 
+            bg=Colors.BG_MEDIUM, fg=Colors.TEXT_PRIMARY,
+            font=Fonts.BODY_MEDIUM
+        ).pack(side=tk.LEFT)
+        self.ocr_slots_entry = tk.Entry(
+            ocr_slots_frame, font=('Arial', 11), width=28,
+            bg=Colors.BG_DARK, fg=Colors.TEXT_PRIMARY, relief=tk.FLAT
+        )
+        self.ocr_slots_entry.insert(0, ", ".join(self.current_settings.get('cooldown_ocr_slots') or []))
+        self.ocr_slots_entry.pack(side=tk.LEFT, padx=8)
+        
+        tk.Label(
+            body, 
+            text="💡 欄位由左到右、由上到下，以逗號分隔技能名稱，空欄位留白", 
+            bg=Colors.BG_MEDIUM, fg=Colors.TEXT_SECONDARY,
+            font=Fonts.BODY_SMALL
+        ).pack(anchor='w', padx=60, pady=(0, 5))
+        
+        # 🆕 外部巨集 IPC
+        self.ipc_var = tk.BooleanVar(value=self.current_settings.get('ipc_enabled', False))
+        tk.Checkbutton(
+            body, 
+            text=" 允許本機巨集工具觸發技能（IPC，不必模擬按鍵）", 
+            variable=self.ipc_var,
+            bg=Colors.BG_MEDIUM, 
+            fg=Colors.TEXT_PRIMARY, 
+            font=Fonts.BODY_MEDIUM,
+            selectcolor=Colors.BG_DARK, 
+            activebackground=Colors.BG_MEDIUM,
+            activeforeground=Colors.TEXT_PRIMARY
+        ).pack(anchor='w', padx=40, pady=(0, 5))
+        
+        # 🆕 串流疊加層
+        self.overlay_var = tk.BooleanVar(value=self.current_settings.get('overlay_enabled', False))
+        tk.Checkbutton(
+            body, 
+            text=" 串流疊加層（OBS 瀏覽器來源顯示計時器）", 
+            variable=self.overlay_var,
+            bg=Colors.BG_MEDIUM, 
+            fg=Colors.TEXT_PRIMARY, 
+            font=Fonts.BODY_MEDIUM,
+            selectcolor=Colors.BG_DARK, 
+            activebackground=Colors.BG_MEDIUM,
+            activeforeground=Colors.TEXT_PRIMARY
+        ).pack(anchor='w', padx=40, pady=(0, 5))
+        
+        overlay_frame = tk.Frame(body, bg=Colors.BG_MEDIUM)
+        overlay_frame.pack(anchor='w', padx=60, pady=(0, 5))
+        tk.Label(
+            overlay_frame, text="網址 http://127.0.0.1:", 
+            bg=Colors.BG_MEDIUM, fg=Colors.TEXT_PRIMARY,
+            font=Fonts.BODY_MEDIUM
+        ).pack(side=tk.LEFT)
+        self.overlay_port_entry = tk.Entry(
+            overlay_frame, font=('Arial', 11), width=6,
+            bg=Colors.BG_DARK, fg=Colors.TEXT_PRIMARY, relief=tk.FLAT
+        )
+        self.overlay_port_entry.insert(0, str(self.current_settings.get('overlay_port', 8765)))
+        self.overlay_port_entry.pack(side=tk.LEFT, padx=(0, 2))
+        tk.Label(
+            overlay_frame, text="/", 
+            bg=Colors.BG_MEDIUM, fg=Colors.TEXT_PRIMARY,
+            font=Fonts.BODY_MEDIUM
+        ).pack(side=tk.LEFT)
+        
+        # 🆕 計時器共用記憶體
+        self.timer_shm_var = tk.BooleanVar(value=self.current_settings.get('timer_shm_enabled', False))
+        tk.Checkbutton(
+            body, 
+            text=" 以共用記憶體提供計時器給本機工具（Discord 機器人、儀表板）", 
+            variable=self.timer_shm_var,
+            bg=Colors.BG_MEDIUM, 
+            fg=Colors.TEXT_PRIMARY, 
+            font=Fonts.BODY_MEDIUM,
+            selectcolor=Colors.BG_DARK, 
+            activebackground=Colors.BG_MEDIUM,
+            activeforeground=Colors.TEXT_PRIMARY
+        ).pack(anchor='w', padx=40, pady=(0, 5))
+        
+        # 🆕 技能使用統計
+        self.analytics_var = tk.BooleanVar(value=self.current_settings.get('analytics_enabled', False))
+        tk.Checkbutton(
+            body, 
+            text=" 記錄技能使用統計（施放次數、覆蓋率、錯過補 buff，📈 查看）", 
+            variable=self.analytics_var,
+            bg=Colors.BG_MEDIUM, 
+            fg=Colors.TEXT_PRIMARY, 
+            font=Fonts.BODY_MEDIUM,
+            selectcolor=Colors.BG_DARK, 
+            activebackground=Colors.BG_MEDIUM,
+            activeforeground=Colors.TEXT_PRIMARY
+        ).pack(anchor='w', padx=40, pady=(0, 5))
+        
+        # 🆕 操作錄製
+        self.session_recording_var = tk.BooleanVar(value=self.current_settings.get('session_recording_enabled', False))
+        tk.Checkbutton(
+            body, 
+            text=" 錄製快捷鍵與設定操作（重現卡頓用，main.py --replay 重播）", 
+            variable=self.session_recording_var,
+            bg=Colors.BG_MEDIUM, 
+            fg=Colors.TEXT_PRIMARY, 
+            font=Fonts.BODY_MEDIUM,
+            selectcolor=Colors.BG_DARK, 
+            activebackground=Colors.BG_MEDIUM,
+            activeforeground=Colors.TEXT_PRIMARY
+        ).pack(anchor='w', padx=40, pady=(0, 5))
+        
         # 提示
         tk.Label(
-            self.content, text="💡 提示：視窗尺寸會自動適應技能圖片大小", 
+            body, text="💡 提示：視窗尺寸會自動適應技能圖片大小", 
             bg=Colors.BG_MEDIUM, fg=Colors.TEXT_SECONDARY,
             font=Fonts.BODY_SMALL
         ).pack(pady=(10, 5))
         
         tk.Label(
-            self.content, text="💡 提示視窗可在畫面上拖曳調整位置", 
+            body, text="💡 提示視窗可在畫面上拖曳調整位置", 
             bg=Colors.BG_MEDIUM, fg=Colors.TEXT_SECONDARY,
             font=Fonts.BODY_SMALL
         ).pack(pady=(0, 5))
         
-        # 儲存按鈕
-        btn_frame = tk.Frame(self.content, bg=Colors.BG_MEDIUM)
-        btn_frame.pack(pady=15)
-        
-        RoundedButton(
-            btn_frame, "✓ 儲存設定", self._save, 
-            Colors.ACCENT_GREEN, width=150, height=38
-        ).pack()
+        # 滾輪綁定到建立後的所有選項
+        for child in body.winfo_children():
+            scroll.bind_widget_to_scroll(child)
     
     def _save(self):
         """儲存設定"""
@@ -612,6 +834,38 @@ class SettingsDialog(BaseDialog):
             y_val = int(self.y_entry.get())
             alert_before = int(self.alert_before_entry.get())
             
+            # 🆕 擷取區域（啟用偵測時必填）
+            region_text = self.buff_region_entry.get().replace('，', ',').strip()
+            buff_region = [int(value) for value in region_text.split(',')] if region_text else None
+            if buff_region is not None and (
+                len(buff_region) != 4 or buff_region[2] <= 0 or buff_region[3] <= 0
+            ):
+                messagebox.showerror("錯誤", "擷取區域格式為 X, Y, 寬, 高！", parent=self.parent)
+                return
+            if self.buff_detector_var.get() and buff_region is None:
+                messagebox.showerror("錯誤", "啟用 buff 偵測需要設定擷取區域！", parent=self.parent)
+                return
+            
+            # 🆕 技能欄區域與欄位（啟用辨識時必填）
+            region_text = self.ocr_region_entry.get().replace('，', ',').strip()
+            ocr_region = [int(value) for value in region_text.split(',')] if region_text else None
+            if ocr_region is not None and (
+                len(ocr_region) != 4 or ocr_region[2] <= 0 or ocr_region[3] <= 0
+            ):
+                messagebox.showerror("錯誤", "技能欄區域格式為 X, Y, 寬, 高！", parent=self.parent)
+                return
+            slots_text = self.ocr_slots_entry.get().replace('，', ',').strip()
+            ocr_slots = [name.strip() for name in slots_text.split(',')] if slots_text else []
+            if self.cooldown_ocr_var.get() and (ocr_region is None or not any(ocr_slots)):
+                messagebox.showerror("錯誤", "啟用冷卻數字辨識需要設定技能欄區域與欄位技能！", parent=self.parent)
+                return
+            
+            # 🆕 疊加層埠
+            overlay_port = int(self.overlay_port_entry.get())
+            if not 1 <= overlay_port <= 65535:
+                messagebox.showerror("錯誤", "疊加層埠必須在 1-65535 之間！", parent=self.parent)
+                return
+            
             # 🆕 從下拉選單獲取視窗大小
             selected_label = self.size_var.get()
             window_size = self.size_options_map.get(selected_label, 64)
@@ -631,7 +885,19 @@ class SettingsDialog(BaseDialog):
                 'y': y_val,
                 'sound': self.sound_var.get(),
                 'alert_before_seconds': alert_before,
-                'window_size': window_size  # 🆕
+                'window_size': window_size,  # 🆕
+                'prewarm_windows': self.prewarm_var.get(),
+                'buff_detector_enabled': self.buff_detector_var.get(),
+                'buff_detector_region': buff_region,
+                'cooldown_ocr_enabled': self.cooldown_ocr_var.get(),
+                'cooldown_ocr_region': ocr_region,
+                'cooldown_ocr_slots': ocr_slots,
+                'ipc_enabled': self.ipc_var.get(),
+                'overlay_enabled': self.overlay_var.get(),
+                'overlay_port': overlay_port,
+                'timer_shm_enabled': self.timer_shm_var.get(),
+                'analytics_enabled': self.analytics_var.get(),
+                'session_recording_enabled': self.session_recording_var.get()
             }
             
             print(f"✅ 設定已保存：位置({x_val}, {y_val}), 音效={self.sound_var.get()}, 提前提示={alert_before}秒, 視窗大小={window_size}px")
@@ -640,4 +906,361 @@ class SettingsDialog(BaseDialog):
         except ValueError:
             messagebox.showerror("錯誤", "請輸入有效的數字！", parent=self.parent)
         except Exception as e:
-            messagebox.showerror("錯誤", f"設定格式錯誤：{e}", parent=self.parent)
\ No newline at end of file
+            messagebox.showerror("錯誤", f"設定格式錯誤：{e}", parent=self.parent)
+
+class RoomDialog(BaseDialog):
+    """🆕 組隊房間對話框"""
+    
+    def __init__(self, parent, current_settings):
+        """初始化組隊房間對話框
+        
+        Args:
+            parent: 父視窗
+            current_settings: 當前設定字典（host, port, player_name, room_code, members, browser）
+                browser 為 RoomBrowser，提供區網中探索到的房間
+        """
+        super().__init__(parent, "組隊房間", 420, 680)
+        self.current_settings = current_settings
+        self.browser = current_settings.get('browser')
+        self._discovered = []
+        self._refresh_id = None
+        
+        self._create_ui()
+    
+    def _create_ui(self):
+        """創建 UI"""
+        from src.ui.party_protocol import DEFAULT_PORT
+        
+        title_label = tk.Label(
+            self.content, text="🌐 組隊房間", 
+            bg=Colors.BG_MEDIUM, fg=Colors.ACCENT_YELLOW,
+            font=Fonts.TITLE_MEDIUM
+        )
+        title_label.pack(pady=(10, 15))
+        
+        room_code = self.current_settings.get('room_code')
+        if room_code:
+            # 已在房間中：顯示房間資訊與離開按鈕
+            members = self.current_settings.get('members', [])
+            tk.Label(
+                self.content, text=f"房間代碼: {room_code}", 
+                bg=Colors.BG_MEDIUM, fg=Colors.ACCENT_GREEN,
+                font=Fonts.BODY_LARGE_BOLD
+            ).pack(pady=(5, 10))
+            
+            tk.Label(
+                self.content, text=f"成員 ({len(members)}): " + "、".join(members[:20]), 
+                bg=Colors.BG_MEDIUM, fg=Colors.TEXT_PRIMARY,
+                font=Fonts.BODY_MEDIUM, wraplength=360, justify=tk.LEFT
+            ).pack(padx=20, pady=(0, 20))
+            
+            RoundedButton(
+                self.content, "🚪 離開房間", lambda: self._finish('leave'), 
+                Colors.ACCENT_RED, width=150, height=38
+            ).pack(pady=10)
+            return
+        
+        form = tk.Frame(self.content, bg=Colors.BG_MEDIUM)
+        form.pack(pady=10, padx=20, fill='x')
+        
+        fields = [
+            ('player_name', "玩家名稱:", self.current_settings.get('player_name', '')),
+            ('host', "伺服器位址:", self.current_settings.get('host') or '127.0.0.1'),
+            ('port', "埠號:", self.current_settings.get('port') or DEFAULT_PORT),
+            ('room_code', "房間代碼:", ''),
+        ]
+        self.entries = {}
+        for row, (key, label, value) in enumerate(fields):
+            tk.Label(
+                form, text=label, 
+                bg=Colors.BG_MEDIUM, fg=Colors.TEXT_PRIMARY,
+                font=Fonts.BODY_LARGE
+            ).grid(row=row, column=0, padx=8, pady=6, sticky='e')
+            
+            entry = tk.Entry(
+                form, font=('Arial', 11), width=20,
+                bg=Colors.BG_DARK, fg=Colors.TEXT_PRIMARY, relief=tk.FLAT
+            )
+            entry.insert(0, str(value))
+            entry.grid(row=row, column=1, padx=8, pady=6)
+            self.entries[key] = entry
+        
+        # 🆕 區網中探索到的房間（選取即填入代碼，雙擊直接加入）
+        tk.Label(
+            self.content, text="🔍 區網房間",
+            bg=Colors.BG_MEDIUM, fg=Colors.TEXT_PRIMARY,
+            font=Fonts.BODY_LARGE
+        ).pack(anchor='w', padx=28)
+        
+        list_frame = BorderedFrame(self.content, bg=Colors.BG_DARK)
+        list_frame.pack(fill=tk.X, padx=20, pady=(2, 5))
+        
+        self.room_listbox = tk.Listbox(
+            list_frame, bg=Colors.BG_DARK, fg=Colors.TEXT_PRIMARY,
+            font=Fonts.BODY_MEDIUM,
+            selectbackground=Colors.ACCENT_BLUE, height=5
+        )
+        self.room_listbox.pack(fill=tk.BOTH, expand=True)
+        self.room_listbox.bind('<<ListboxSelect>>', lambda e: self._on_room_selected())
+        self.room_listbox.bind('<Double-Button-1>', lambda e: self._finish('join'))
+        
+        self._refresh_rooms()
+        
+        tk.Label(
+            self.content, 
+            text="💡 建立房間會在本機啟動伺服器並在區網廣播，\n"
+                 "區網玩家直接選取房間加入；跨網路時以 IP、埠號與房間代碼加入", 
+            bg=Colors.BG_MEDIUM, fg=Colors.TEXT_SECONDARY,
+            font=Fonts.BODY_SMALL
+        ).pack(pady=(5, 15))
+        
+        btn_frame = tk.Frame(self.content, bg=Colors.BG_MEDIUM)
+        btn_frame.pack(pady=10)
+        
+        RoundedButton(
+            btn_frame, "🏠 建立房間", lambda: self._finish('create'), 
+            Colors.ACCENT_GREEN, width=130, height=38
+        ).pack(side=tk.LEFT, padx=5)
+        
+        RoundedButton(
+            btn_frame, "🚪 加入房間", lambda: self._finish('join'), 
+            Colors.ACCENT_BLUE, width=130, height=38
+        ).pack(side=tk.LEFT, padx=5)
+    
+    def _refresh_rooms(self):
+        """每秒更新區網房間列表（保留目前的選取）"""
+        self._refresh_id = None
+        if not self.browser:
+            self.room_listbox.insert(tk.END, "（無法收聽區網廣播）")
+            return
+        
+        rooms = self.browser.rooms()
+        codes = [room.code for room in rooms]
+        if codes != [room.code for room in self._discovered] or any(
+            old.members != new.members for old, new in zip(self._discovered, rooms)
+        ):
+            selected = self._selected_room()
+            self.room_listbox.delete(0, tk.END)
+            for room in rooms:
+                self.room_listbox.insert(tk.END, f"{room.code}  {room.name}（{room.members}人）")
+            if selected and selected.code in codes:
+                self.room_listbox.selection_set(codes.index(selected.code))
+            self._discovered = rooms
+        
+        self._refresh_id = self.dialog.after(1000, self._refresh_rooms)
+    
+    def _selected_room(self):
+        """目前選取的區網房間"""
+        selection = self.room_listbox.curselection()
+        if not selection or selection[0] >= len(self._discovered):
+            return None
+        return self._discovered[selection[0]]
+    
+    def _on_room_selected(self):
+        """選取區網房間時填入房間代碼"""
+        room = self._selected_room()
+        if room:
+            self.entries['room_code'].delete(0, tk.END)
+            self.entries['room_code'].insert(0, room.code)
+    
+    def close(self):
+        """關閉對話框（停止更新房間列表）"""
+        if self._refresh_id:
+            self.dialog.after_cancel(self._refresh_id)
+            self._refresh_id = None
+        super().close()
+    
+    def _finish(self, action):
+        """驗證輸入並關閉對話框"""
+        if action == 'leave':
+            self.result = {'action': 'leave'}
+            self.close()
+            return
+        
+        values = {key: entry.get().strip() for key, entry in self.entries.items()}
+        
+        if not values['player_name']:
+            messagebox.showerror("錯誤", "請輸入玩家名稱！", parent=self.dialog)
+            return
+        
+        try:
+            port = int(values['port'])
+            if not 0 < port < 65536:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("錯誤", "請輸入有效的埠號！", parent=self.dialog)
+            return
+        
+        if action == 'join' and not values['room_code']:
+            messagebox.showerror("錯誤", "請輸入房間代碼！", parent=self.dialog)
+            return
+        
+        self.result = {
+            'action': action,
+            'player_name': values['player_name'],
+            'host': values['host'] or '127.0.0.1',
+            'port': port,
+            'room_code': values['room_code'].upper(),
+        }
+        
+        # 🆕 區網中找得到的房間直接使用廣播的位址（不必輸入 IP）
+        address = self.browser.lookup(values['room_code']) if action == 'join' and self.browser else None
+        if address:
+            self.result['discovered_host'], self.result['discovered_port'] = address
+        self.close()
+
+
+class PerfStatsDialog(BaseDialog):
+    """🆕 效能面板（每秒更新背景偵測等元件的耗時統計）"""
+    
+    def __init__(self, parent, collect_stats):
+        """初始化效能面板
+        
+        Args:
+            parent: 父視窗
+            collect_stats: 取得統計的函數，返回 [(區段標題, [(名稱, 數值文字), ...]), ...]
+        """
+        super().__init__(parent, "📊 效能統計", 420, 420)
+        self.collect_stats = collect_stats
+        self._refresh_id = None
+        
+        self._create_ui()
+    
+    def _create_ui(self):
+        """創建 UI"""
+        self.stats_frame = tk.Frame(self.content, bg=Colors.BG_MEDIUM)
+        self.stats_frame.pack(fill=tk.BOTH, expand=True, padx=20)
+        
+        self._refresh()
+    
+    def _refresh(self):
+        """重新繪製統計（每秒一次）"""
+        self._refresh_id = None
+        for child in self.stats_frame.winfo_children():
+            child.destroy()
+        
+        for title, rows in self.collect_stats():
+            tk.Label(
+                self.stats_frame, text=title, 
+                bg=Colors.BG_MEDIUM, fg=Colors.ACCENT_GREEN,
+                font=Fonts.BODY_LARGE
+            ).pack(anchor='w', pady=(8, 2))
+            
+            table = tk.Frame(self.stats_frame, bg=Colors.BG_MEDIUM)
+            table.pack(fill=tk.X, padx=15)
+            for row, (name, value) in enumerate(rows):
+                tk.Label(
+                    table, text=name, 
+                    bg=Colors.BG_MEDIUM, fg=Colors.TEXT_SECONDARY,
+                    font=Fonts.BODY_MEDIUM
+                ).grid(row=row, column=0, sticky='w', pady=1)
+                tk.Label(
+                    table, text=value, 
+                    bg=Colors.BG_MEDIUM, fg=Colors.TEXT_PRIMARY,
+                    font=Fonts.BODY_MEDIUM
+                ).grid(row=row, column=1, sticky='e', padx=(20, 0), pady=1)
+        
+        self._refresh_id = self.dialog.after(1000, self._refresh)
+    
+    def close(self):
+        """關閉面板（停止更新）"""
+        if self._refresh_id:
+            self.dialog.after_cancel(self._refresh_id)
+            self._refresh_id = None
+        super().close()
+
+
+class SkillAnalyticsDialog(BaseDialog):
+    """🆕 技能使用統計（本場 / 最近 1 小時，每秒更新）"""
+    
+    COLUMNS = ("技能", "次數", "平均間隔/冷卻", "覆蓋率", "錯過")
+    
+    def __init__(self, parent, collect_rows):
+        """初始化統計面板
+        
+        Args:
+            parent: 父視窗
+            collect_rows: 取得表格列的函數，參數為 'session' 或 'hour'，
+                          返回 [(技能名稱, 次數, 平均間隔/冷卻, 覆蓋率, 錯過), ...]，未啟用時返回 None
+        """
+        super().__init__(parent, "📈 技能使用統計", 520, 480)
+        self.collect_rows = collect_rows
+        self.scope = 'session'
+        self._refresh_id = None
+        
+        self._create_ui()
+    
+    def _create_ui(self):
+        """創建 UI"""
+        scope_frame = tk.Frame(self.content, bg=Colors.BG_MEDIUM)
+        scope_frame.pack(fill=tk.X, padx=20, pady=(0, 5))
+        
+        self.scope_buttons = {}
+        for scope, text in (('session', "本場"), ('hour', "最近 1 小時")):
+            btn = RoundedButton(
+                scope_frame, text, lambda s=scope: self._set_scope(s),
+                Colors.BG_LIGHT, width=100, height=28
+            )
+            btn.pack(side=tk.LEFT, padx=3)
+            self.scope_buttons[scope] = btn
+        
+        self.table_frame = tk.Frame(self.content, bg=Colors.BG_MEDIUM)
+        self.table_frame.pack(fill=tk.BOTH, expand=True, padx=20)
+        
+        self._set_scope(self.scope)
+    
+    def _set_scope(self, scope):
+        """切換統計範圍"""
+        self.scope = scope
+        for key, btn in self.scope_buttons.items():
+            btn.update_color(Colors.ACCENT_BLUE if key == scope else Colors.BG_LIGHT, Colors.TEXT_PRIMARY)
+        if self._refresh_id:
+            self.dialog.after_cancel(self._refresh_id)
+        self._refresh()
+    
+    def _refresh(self):
+        """重新繪製表格（每秒一次）"""
+        self._refresh_id = None
+        for child in self.table_frame.winfo_children():
+            child.destroy()
+        
+        rows = self.collect_rows(self.scope)
+        if rows is None:
+            tk.Label(
+                self.table_frame, text="技能使用統計未啟用（設定中開啟）", 
+                bg=Colors.BG_MEDIUM, fg=Colors.TEXT_SECONDARY,
+                font=Fonts.BODY_MEDIUM
+            ).pack(pady=20)
+            return
+        
+        for column, title in enumerate(self.COLUMNS):
+            tk.Label(
+                self.table_frame, text=title, 
+                bg=Colors.BG_MEDIUM, fg=Colors.ACCENT_GREEN,
+                font=Fonts.BODY_MEDIUM_BOLD
+            ).grid(row=0, column=column, sticky='w' if column == 0 else 'e', padx=(0, 12), pady=(5, 3))
+        
+        if not rows:
+            tk.Label(
+                self.table_frame, text="尚未觸發任何技能", 
+                bg=Colors.BG_MEDIUM, fg=Colors.TEXT_SECONDARY,
+                font=Fonts.BODY_MEDIUM
+            ).grid(row=1, column=0, columnspan=len(self.COLUMNS), pady=10)
+        
+        for row, values in enumerate(rows, start=1):
+            for column, value in enumerate(values):
+                tk.Label(
+                    self.table_frame, text=value, 
+                    bg=Colors.BG_MEDIUM, 
+                    fg=Colors.TEXT_PRIMARY if column == 0 else Colors.TEXT_SECONDARY,
+                    font=Fonts.BODY_MEDIUM
+                ).grid(row=row, column=column, sticky='w' if column == 0 else 'e', padx=(0, 12), pady=1)
+        
+        self._refresh_id = self.dialog.after(1000, self._refresh)
+    
+    def close(self):
+        """關閉面板（停止更新）"""
+        if self._refresh_id:
+            self.dialog.after_cancel(self._refresh_id)
+            self._refresh_id = None
+        super().close()
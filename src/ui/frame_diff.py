@@ -0,0 +1,159 @@
+"""
+畫面變化偵測模組
+將擷取區域切成方塊，與上一幀逐塊比較平均絕對差，只讓有變化的方塊進入後續的比對；
+畫面沒有變化時（大多數的幀）只需一次向量化的差值計算。
+
+供畫面偵測（buff 列、冷卻數字）共用，需要 numpy；import_numpy() 供各個選用功能延遲導入 numpy。
+"""
+
+
+def import_numpy(feature=None):
+    """延遲導入 numpy（選用套件，未啟用相關功能時不載入）
+
+    Args:
+        feature: 需要 numpy 的功能名稱，未安裝時印出停用提示；None 表示不提示
+
+    Returns:
+        numpy 模組或 None
+    """
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        if feature:
+            print(f"⚠️ 未安裝 numpy 模組，{feature}已停用")
+            print("   若要啟用，請執行: pip install numpy")
+        return None
+
+
+class FrameDiffGate:
+    """逐塊比較前後兩幀的灰階影像"""
+
+    def __init__(self, np, tile=8, threshold=6.0):
+        """初始化
+
+        Args:
+            np: numpy 模組（由呼叫端延遲導入後傳入）
+            tile: 方塊邊長（像素，以傳入影像的解析度計）
+            threshold: 方塊平均絕對差超過此值視為有變化（0-255）
+        """
+        self.np = np
+        self.tile = tile
+        self.threshold = threshold
+        self._previous = None
+
+    def reset(self):
+        """忘記上一幀（下一幀視為全部變化）"""
+        self._previous = None
+
+    def update(self, gray):
+        """比較新的一幀
+
+        Args:
+            gray: 灰階 float32 陣列 (H, W)
+
+        Returns:
+            變化方塊的布林陣列 (ceil(H/tile), ceil(W/tile))；
+            第一幀或尺寸改變時全部為 True
+        """
+        np = self.np
+        tile = self.tile
+        height, width = gray.shape
+        rows, cols = -(-height // tile), -(-width // tile)
+
+        previous, self._previous = self._previous, gray
+        if previous is None or previous.shape != gray.shape:
+            return np.ones((rows, cols), dtype=bool)
+
+        diff = np.abs(gray - previous)
+        # 補齊到方塊的整數倍後一次求各塊平均
+        if height % tile or width % tile:
+            diff = np.pad(diff, ((0, rows * tile - height), (0, cols * tile - width)))
+        tile_means = diff.reshape(rows, tile, cols, tile).mean(axis=(1, 3))
+        changed = tile_means > self.threshold
+        if not changed.any():
+            self._previous = previous  # 累積的緩慢變化仍以舊的一幀為基準
+        return changed
+
+
+def changed_windows(np, changed_tiles, tile, shape, window):
+    """找出涵蓋到變化方塊的比對視窗
+
+    Args:
+        np: numpy 模組
+        changed_tiles: FrameDiffGate.update() 的結果
+        tile: 方塊邊長
+        shape: 影像大小 (H, W)
+        window: 比對視窗邊長
+
+    Returns:
+        布林陣列 (H - window + 1, W - window + 1)，True 表示該左上角的視窗需要重新比對
+    """
+    height, width = shape
+    pixels = np.repeat(np.repeat(changed_tiles, tile, axis=0), tile, axis=1)[:height, :width]
+
+    # 積分影像：任一視窗內的變化像素數 = 四個角的加減
+    integral = np.zeros((height + 1, width + 1), dtype=np.int32)
+    integral[1:, 1:] = pixels.cumsum(axis=0).cumsum(axis=1)
+    counts = (integral[window:, window:] - integral[:-window, window:]
+              - integral[window:, :-window] + integral[:-window, :-window])
+    return counts > 0
+
+
+class FrameStats:
+    """每幀耗時統計（依 skipped / partial / full 分類，供效能面板顯示）
+
+    skipped: 畫面沒有變化，略過比對
+    partial: 只重新比對有變化的方塊
+    full:    第一幀或尺寸改變，全部比對
+    """
+
+    KINDS = ('skipped', 'partial', 'full')
+
+    def __init__(self):
+        self.frames = {kind: 0 for kind in self.KINDS}
+        self.cpu_ms = {kind: 0.0 for kind in self.KINDS}   # 執行緒 CPU 時間累計
+        self.wall_ms = {kind: 0.0 for kind in self.KINDS}  # 實際經過時間累計
+        self.changed_ratio_total = 0.0
+        self.last_kind = None
+        self.last_cpu_ms = 0.0
+
+    def record(self, kind, cpu_seconds, wall_seconds, changed_ratio):
+        """記錄一幀
+
+        Args:
+            kind: 'skipped' / 'partial' / 'full'
+            cpu_seconds: 這一幀使用的 CPU 秒數（time.thread_time 差值）
+            wall_seconds: 這一幀的實際秒數
+            changed_ratio: 變化方塊比例（0-1）
+        """
+        self.frames[kind] += 1
+        self.cpu_ms[kind] += cpu_seconds * 1000
+        self.wall_ms[kind] += wall_seconds * 1000
+        self.changed_ratio_total += changed_ratio
+        self.last_kind = kind
+        self.last_cpu_ms = cpu_seconds * 1000
+
+    def summary(self):
+        """統計摘要
+
+        Returns:
+            {'frames', 'skipped_ratio', 'changed_ratio', 'cpu_ms_per_frame', 'last_cpu_ms',
+             'kinds': {kind: {'frames', 'cpu_ms', 'wall_ms'}}}（耗時為每幀平均）
+        """
+        total = sum(self.frames.values())
+        return {
+            'frames': total,
+            'skipped_ratio': self.frames['skipped'] / total if total else 0.0,
+            'changed_ratio': self.changed_ratio_total / total if total else 0.0,
+            'cpu_ms_per_frame': sum(self.cpu_ms.values()) / total if total else 0.0,
+            'last_cpu_ms': self.last_cpu_ms,
+            'kinds': {
+                kind: {
+                    'frames': self.frames[kind],
+                    'cpu_ms': self.cpu_ms[kind] / self.frames[kind] if self.frames[kind] else 0.0,
+                    'wall_ms': self.wall_ms[kind] / self.frames[kind] if self.frames[kind] else 0.0,
+                }
+                for kind in self.KINDS
+            },
+        }
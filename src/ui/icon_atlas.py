@@ -0,0 +1,159 @@
+"""
+圖示圖集模組
+打包時把所有內建圖示預先縮放成標準尺寸，存成單一檔案；
+執行時以記憶體映射讀取，直接切出 RGBA 資料，不需解碼
+"""
+
+import json
+import mmap
+import os
+import struct
+
+# 檔頭：魔術字串、版本、索引長度
+_HEADER = struct.Struct('<4sHI')
+_MAGIC = b'SATL'
+_VERSION = 2  # 2：修正 JPEG 圖示以最小尺寸解碼後放大的模糊問題
+_ALIGN = 8
+
+ATLAS_FILENAME = 'icon_atlas.bin'
+
+
+def _align(value):
+    """向上對齊到 _ALIGN 位元組"""
+    return (value + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def build_atlas(icon_paths, sizes, output_path, decoder):
+    """建立圖示圖集
+
+    Args:
+        icon_paths: {圖示檔名: 圖片路徑}
+        sizes: 要預先縮放的邊長列表
+        output_path: 輸出檔案路徑
+        decoder: decoder(icon_path, sizes) -> {size: PIL.Image}
+
+    Returns:
+        寫入的圖示數量
+    """
+    index = {}
+    chunks = []
+    offset = 0
+
+    for icon_name, icon_path in sorted(icon_paths.items()):
+        images = decoder(icon_path, sizes)
+        entry = {'source_bytes': os.path.getsize(icon_path), 'sizes': {}}
+        for size, image in sorted(images.items()):
+            data = image.convert('RGBA').tobytes()
+            entry['sizes'][str(size)] = [offset, image.width, image.height]
+            padded = _align(len(data))
+            chunks.append(data + b'\0' * (padded - len(data)))
+            offset += padded
+        index[icon_name] = entry
+
+    index_bytes = json.dumps(
+        {'sizes': sorted(sizes), 'icons': index}, ensure_ascii=False
+    ).encode('utf-8')
+    header = _HEADER.pack(_MAGIC, _VERSION, len(index_bytes)) + index_bytes
+    header += b'\0' * (_align(len(header)) - len(header))
+
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, output_path)
+    return len(index)
+
+
+class IconAtlas:
+    """唯讀的記憶體映射圖示圖集"""
+
+    def __init__(self, atlas_path):
+        """開啟圖集（格式不符時拋出 ValueError）
+
+        Args:
+            atlas_path: 圖集檔案路徑
+        """
+        self.atlas_path = atlas_path
+        self._file = open(atlas_path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        try:
+            magic, version, index_len = _HEADER.unpack_from(self._mmap)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"不支援的圖集格式: {atlas_path}")
+            start = _HEADER.size
+            index = json.loads(self._mmap[start:start + index_len].decode('utf-8'))
+        except Exception:
+            self.close()
+            raise
+
+        self.sizes = index['sizes']
+        self.icons = index['icons']
+        self._data_start = _align(_HEADER.size + index_len)
+        self._view = memoryview(self._mmap)
+
+    @classmethod
+    def open(cls, atlas_path):
+        """開啟圖集，不存在或損毀時返回 None
+
+        Args:
+            atlas_path: 圖集檔案路徑
+
+        Returns:
+            IconAtlas 實例或 None
+        """
+        if not os.path.exists(atlas_path):
+            return None
+        try:
+            return cls(atlas_path)
+        except Exception as e:
+            print(f"⚠️ 無法載入圖示圖集 {atlas_path}: {e}")
+            return None
+
+    def get(self, icon_name, size, source_path=None):
+        """從圖集切出圖示（不複製、不解碼）
+
+        Args:
+            icon_name: 圖示檔名
+            size: 邊長
+            source_path: 原始圖片路徑（可選），檔案大小與打包時不同時視為已被替換
+
+        Returns:
+            PIL.Image (RGBA) 或 None
+        """
+        entry = self.icons.get(icon_name)
+        if not entry:
+            return None
+        location = entry['sizes'].get(str(size))
+        if not location:
+            return None
+
+        if source_path is not None:
+            try:
+                if os.path.getsize(source_path) != entry['source_bytes']:
+                    return None
+            except OSError:
+                pass  # 原始檔案不存在時仍使用圖集
+
+        from PIL import Image
+
+        offset, width, height = location
+        start = self._data_start + offset
+        buffer = self._view[start:start + width * height * 4]
+        return Image.frombuffer('RGBA', (width, height), buffer, 'raw', 'RGBA', 0, 1)
+
+    def close(self):
+        """關閉圖集"""
+        try:
+            if getattr(self, '_view', None) is not None:
+                self._view.release()
+                self._view = None
+            self._mmap.close()
+        except (BufferError, ValueError):
+            pass  # 仍有圖片引用映射記憶體，交由程式結束時釋放
+        self._file.close()
@@ -0,0 +1,489 @@
+"""
+圖示感知雜湊索引
+為 images/ 的每張圖示計算感知雜湊（dHash，另有 numpy 時加上 pHash），結果快取到磁碟，
+用來找出幾乎相同的重複圖示，並在加入新圖片時建議目錄中已有的技能；
+另提供畫面偵測用的向量化雜湊預先篩選（HashPrefilter）。
+
+查詢使用多索引雜湊（multi-index hashing）：64 位元雜湊切成 8 段，
+距離 ≤ d 的雜湊至少有一段的距離 ≤ d // 8，只需探查這些段的桶，
+不必與所有圖示逐一比較，查詢成本不隨圖示數量線性成長。
+
+（可獨立執行列出重複圖示與新圖片的建議：python -m src.ui.icon_hash）
+"""
+
+import json
+import os
+import threading
+from itertools import combinations
+
+from src.ui.frame_diff import import_numpy
+
+HASH_BITS = 64
+DUPLICATE_DISTANCE = 6   # 視為重複圖示的最大漢明距離
+SUGGEST_DISTANCE = 14    # 建議相似技能的最大漢明距離
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp')
+CACHE_FILENAME = 'icon_hashes.json'
+_CACHE_VERSION = 1
+
+
+def _flatten(image):
+    """圖片 → 灰階（透明部分以中性灰填滿，避免透明像素的顏色影響雜湊）"""
+    from PIL import Image
+
+    image = image.convert('RGBA')
+    background = Image.new('RGBA', image.size, (128, 128, 128, 255))
+    background.alpha_composite(image)
+    return background.convert('L')
+
+
+def _to_int(bits):
+    """布林序列 → 整數（第一個元素為最高位元）"""
+    value = 0
+    for bit in bits:
+        value = (value << 1) | bool(bit)
+    return value
+
+
+def dhash(image):
+    """差異雜湊：縮成 9×8 灰階，比較每列相鄰像素的亮度
+
+    Args:
+        image: PIL.Image
+
+    Returns:
+        64 位元整數
+    """
+    from PIL import Image
+
+    pixels = _flatten(image).resize((9, 8), Image.Resampling.BOX).tobytes()
+    return _to_int(
+        pixels[row * 9 + col + 1] > pixels[row * 9 + col] for row in range(8) for col in range(8)
+    )
+
+
+def phash(image):
+    """DCT 感知雜湊：縮成 32×32 灰階後取左上 8×8 個低頻係數，與中位數比較
+
+    Args:
+        image: PIL.Image
+
+    Returns:
+        64 位元整數，未安裝 numpy 時返回 None
+    """
+    from PIL import Image
+
+    np = import_numpy()  # 只有 pHash 需要，未安裝時不提示
+    if np is None:
+        return None
+    pixels = np.asarray(_flatten(image).resize((32, 32), Image.Resampling.BOX), dtype=np.float64)
+    k = np.arange(32)
+    basis = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / 64)
+    coefficients = (basis @ pixels @ basis.T)[:8, :8].ravel()
+    return _to_int(coefficients > np.median(coefficients[1:]))  # 不含直流分量
+
+
+def hamming(a, b):
+    """兩個雜湊的漢明距離"""
+    return bin(a ^ b).count('1')
+
+
+class BandIndex:
+    """多索引雜湊：依雜湊的每一段分桶
+
+    距離 ≤ d 的兩個雜湊，在 bands 段中至少有一段的距離 ≤ d // bands（鴿籠原理），
+    查詢時對每段探查距離 ≤ d // bands 的所有桶，再以完整雜湊確認距離。
+    """
+
+    def __init__(self, bits=HASH_BITS, bands=8):
+        """初始化索引
+
+        Args:
+            bits: 雜湊位元數
+            bands: 分段數（bits 需能被整除）
+        """
+        self.bits = bits
+        self.bands = bands
+        self.band_bits = bits // bands
+        self._mask = (1 << self.band_bits) - 1
+        self._buckets = [{} for _ in range(bands)]  # 每段 {段值: [key, ...]}
+        self._hashes = {}  # {key: 雜湊}
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def _band_values(self, value):
+        return [(value >> (band * self.band_bits)) & self._mask for band in range(self.bands)]
+
+    def add(self, key, value):
+        """加入（或更新）一個雜湊"""
+        if key in self._hashes:
+            self.remove(key)
+        self._hashes[key] = value
+        for band, band_value in enumerate(self._band_values(value)):
+            self._buckets[band].setdefault(band_value, []).append(key)
+
+    def remove(self, key):
+        """移除一個雜湊"""
+        value = self._hashes.pop(key, None)
+        if value is None:
+            return
+        for band, band_value in enumerate(self._band_values(value)):
+            bucket = self._buckets[band][band_value]
+            bucket.remove(key)
+            if not bucket:
+                del self._buckets[band][band_value]
+
+    def query(self, value, max_distance):
+        """找出距離不超過 max_distance 的雜湊
+
+        Returns:
+            [(距離, key), ...]（依距離排序）
+        """
+        radius = max_distance // self.bands
+        flips = [0]
+        for count in range(1, radius + 1):
+            flips.extend(
+                sum(1 << bit for bit in bits) for bits in combinations(range(self.band_bits), count)
+            )
+
+        candidates = set()
+        for band, band_value in enumerate(self._band_values(value)):
+            buckets = self._buckets[band]
+            for flip in flips:
+                candidates.update(buckets.get(band_value ^ flip, ()))
+
+        results = []
+        for key in candidates:
+            distance = hamming(value, self._hashes[key])
+            if distance <= max_distance:
+                results.append((distance, key))
+        results.sort()
+        return results
+
+
+class HashPrefilter:
+    """畫面偵測用的感知雜湊預先篩選（numpy 向量化）
+
+    每個視窗與範本都縮成 8×8 區塊，比較每列相鄰區塊的亮度得到 56 位元雜湊，
+    切成 4 段 14 位元。每段探查段值本身與翻轉一個位元的 14 個桶（距離 ≤ 7 必定找到），
+    再以完整雜湊距離確認；隨機的範本落在探查桶內的機率約 4 × 15 / 16384，
+    因此候選數只與真正相似的範本有關，不隨範本數量線性成長。
+    """
+
+    BANDS = 4
+    BAND_BITS = 14
+
+    def __init__(self, np, template_blocks, max_distance=14):
+        """初始化
+
+        Args:
+            np: numpy 模組
+            template_blocks: 範本的 8×8 區塊平均 (K, 8, 8)
+            max_distance: 完整雜湊距離超過此值的組合不列為候選（0-56）
+        """
+        self.np = np
+        self.max_distance = max_distance
+        self._weights = (1 << np.arange(self.BAND_BITS)).astype(np.int32)
+        self._probes = np.array([0] + [1 << bit for bit in range(self.BAND_BITS)], dtype=np.int32)
+        self._popcount = np.array(
+            [bin(value).count('1') for value in range(1 << self.BAND_BITS)], dtype=np.uint8
+        )
+
+        self._template_bands = self.hash_bands(template_blocks)
+        self._buckets = []  # 每段：(依段值排序的範本索引, 各段值在排序中的起點)
+        for band_values in self._template_bands.T:
+            order = np.argsort(band_values, kind='stable')
+            counts = np.bincount(band_values, minlength=1 << self.BAND_BITS)
+            self._buckets.append((order, np.concatenate(([0], np.cumsum(counts)))))
+
+    def hash_bands(self, blocks):
+        """8×8 區塊平均 (n, 8, 8) → 雜湊的 4 段 (n, 4) int32"""
+        np = self.np
+        bits = (blocks[:, :, 1:] > blocks[:, :, :-1]).reshape(len(blocks), self.BANDS, self.BAND_BITS)
+        return bits.astype(np.int32) @ self._weights
+
+    @staticmethod
+    def window_blocks(np, gray, size):
+        """影像中每個 size×size 視窗的 8×8 區塊總和（不複製資料的視圖）
+
+        Args:
+            np: numpy 模組
+            gray: 灰階陣列 (H, W)
+            size: 視窗邊長（8 的倍數）
+
+        Returns:
+            (H - size + 1, W - size + 1, 8, 8) 陣列
+        """
+        block = size // 8
+        integral = np.zeros((gray.shape[0] + 1, gray.shape[1] + 1), dtype=np.float32)
+        integral[1:, 1:] = gray.cumsum(axis=0).cumsum(axis=1)
+        sums = (integral[block:, block:] - integral[:-block, block:]
+                - integral[block:, :-block] + integral[:-block, :-block])
+        span = size - block + 1
+        return np.lib.stride_tricks.sliding_window_view(sums, (span, span))[:, :, ::block, ::block]
+
+    def candidates(self, blocks):
+        """找出可能相符的（視窗, 範本）組合
+
+        Args:
+            blocks: 視窗的 8×8 區塊 (n, 8, 8)
+
+        Returns:
+            (視窗索引陣列, 範本索引陣列)
+        """
+        np = self.np
+        bands = self.hash_bands(blocks)
+        owners, templates = [], []
+        for band, (order, starts) in enumerate(self._buckets):
+            probes = (bands[:, band, None] ^ self._probes).ravel()
+            first = starts[probes]
+            counts = starts[probes + 1] - first
+            total = int(counts.sum())
+            if not total:
+                continue
+            owners.append(np.repeat(np.arange(len(probes)) // len(self._probes), counts))
+            templates.append(order[np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(total)])
+        if not owners:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+
+        # 同一組合可能在多段都相符，去除重複後以完整雜湊距離確認
+        count = len(self._template_bands)
+        pairs = np.unique(np.concatenate(owners) * count + np.concatenate(templates))
+        owner, template = pairs // count, pairs % count
+        distances = self._popcount[bands[owner] ^ self._template_bands[template]].sum(axis=1)
+        close = distances <= self.max_distance
+        return owner[close], template[close]
+
+
+class IconHashIndex:
+    """images/ 目錄的圖示雜湊索引
+
+    雜湊依（檔名、修改時間、大小）快取在 cache_path，圖片沒有變更時不需重新解碼。
+    """
+
+    def __init__(self, images_dir, cache_path=None):
+        """初始化索引
+
+        Args:
+            images_dir: 圖示目錄
+            cache_path: 雜湊快取檔路徑（None 表示不快取）
+        """
+        self.images_dir = images_dir
+        self.cache_path = cache_path
+        self.hashes = {}  # {檔名: (dhash, phash 或 None)}
+        self.index = BandIndex()
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """掃描目錄，計算新增或變更圖片的雜湊（其餘沿用快取）
+
+        Returns:
+            新計算的圖片數
+        """
+        from PIL import Image
+
+        cached = self._load_cache()
+        entries = {}
+        computed = 0
+        try:
+            names = sorted(
+                name for name in os.listdir(self.images_dir)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+        except OSError as e:
+            print(f"⚠️ 無法讀取圖示目錄 {self.images_dir}: {e}")
+            names = []
+
+        for name in names:
+            path = os.path.join(self.images_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = cached.get(name)
+            if not entry or entry.get('mtime') != st.st_mtime_ns or entry.get('size') != st.st_size:
+                try:
+                    with Image.open(path) as image:
+                        image.load()
+                        hashes = dhash(image), phash(image)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ 無法計算圖示雜湊 {name}: {e}")
+                    continue
+                entry = {
+                    'mtime': st.st_mtime_ns, 'size': st.st_size,
+                    'dhash': f"{hashes[0]:016x}",
+                    'phash': f"{hashes[1]:016x}" if hashes[1] is not None else None,
+                }
+                computed += 1
+            entries[name] = entry
+
+        with self._lock:
+            self.hashes = {
+                name: (int(entry['dhash'], 16), int(entry['phash'], 16) if entry.get('phash') else None)
+                for name, entry in entries.items()
+            }
+            self.index = BandIndex()
+            for name, (value, _) in self.hashes.items():
+                self.index.add(name, value)
+
+        if computed or set(entries) != set(cached):
+            self._save_cache(entries)
+        return computed
+
+    def _distance(self, a, b):
+        """兩張圖示的距離：dHash 距離，兩者都有 pHash 時取較大者（兩種雜湊都相近才算相似）"""
+        distance = hamming(a[0], b[0])
+        if a[1] is not None and b[1] is not None:
+            distance = max(distance, hamming(a[1], b[1]))
+        return distance
+
+    def similar(self, hashes, max_distance, exclude=None):
+        """找出與指定雜湊相似的圖示
+
+        Args:
+            hashes: (dhash, phash 或 None)
+            max_distance: 最大距離
+            exclude: 排除的檔名
+
+        Returns:
+            [(距離, 檔名), ...]（依距離排序）
+        """
+        with self._lock:
+            results = [
+                (self._distance(hashes, self.hashes[name]), name)
+                for _, name in self.index.query(hashes[0], max_distance)
+                if name != exclude
+            ]
+        return sorted(result for result in results if result[0] <= max_distance)
+
+    def duplicates(self, max_distance=DUPLICATE_DISTANCE):
+        """找出幾乎相同的圖示
+
+        Returns:
+            [[檔名, ...], ...]（每組至少兩個檔名）
+        """
+        parent = {}
+
+        def find(name):
+            while parent.get(name, name) != name:
+                name = parent[name]
+            return name
+
+        for name, hashes in list(self.hashes.items()):
+            for _, other in self.similar(hashes, max_distance, exclude=name):
+                root, other_root = find(name), find(other)
+                if root != other_root:
+                    parent[max(root, other_root)] = min(root, other_root)
+
+        groups = {}
+        for name in self.hashes:
+            groups.setdefault(find(name), []).append(name)
+        return sorted(sorted(group) for group in groups.values() if len(group) > 1)
+
+    def suggest(self, image, skills, max_distance=SUGGEST_DISTANCE, limit=3, exclude=None):
+        """為新圖片建議目錄中已有的技能
+
+        Args:
+            image: PIL.Image 或目錄中的檔名
+            skills: [{'id', 'name', 'icon'}, ...]（config.json 的技能與道具）
+            max_distance: 最大距離
+            limit: 最多建議幾個技能
+            exclude: 不建議的圖示檔名（通常是新圖片本身）
+
+        Returns:
+            [(距離, 技能資料), ...]
+        """
+        if isinstance(image, str):
+            exclude = exclude or image
+            hashes = self.hashes.get(image)
+            if hashes is None:
+                return []
+        else:
+            hashes = dhash(image), phash(image)
+
+        by_icon = {}
+        for skill in skills:
+            by_icon.setdefault(skill.get('icon'), []).append(skill)
+
+        suggestions = []
+        for distance, name in self.similar(hashes, max_distance, exclude=exclude):
+            for skill in by_icon.get(name, ()):
+                suggestions.append((distance, skill))
+        return suggestions[:limit]
+
+    def unreferenced(self, skills):
+        """目錄中沒有任何技能使用的圖片（通常是剛放入的新圖片）"""
+        used = {skill.get('icon') for skill in skills}
+        return [name for name in sorted(self.hashes) if name not in used]
+
+    def report(self, skills):
+        """列出重複圖示與新圖片的建議（啟動時於背景執行）
+
+        Args:
+            skills: config.json 的技能與道具
+
+        Returns:
+            印出的訊息列表
+        """
+        messages = []
+        for group in self.duplicates():
+            messages.append(f"💡 圖示幾乎相同：{'、'.join(group)}（可改用同一張圖片）")
+        for name in self.unreferenced(skills):
+            suggestions = self.suggest(name, skills)
+            if suggestions:
+                names = '、'.join(f"{skill['name']}（{skill['icon']}）" for _, skill in suggestions)
+                messages.append(f"💡 新圖片 {name} 與現有技能相似：{names}")
+        for message in messages:
+            print(message)
+        return messages
+
+    def _load_cache(self):
+        """讀取雜湊快取（格式錯誤或版本不符時視為沒有快取）"""
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != _CACHE_VERSION:
+            return {}
+        return data.get('icons', {})
+
+    def _save_cache(self, entries):
+        """寫入雜湊快取（失敗時靜默忽略，快取只是加速用）"""
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': _CACHE_VERSION, 'icons': entries}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"⚠️ 無法寫入圖示雜湊快取: {e}")
+
+
+def main():
+    """列出重複圖示與新圖片的建議"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="技能追蹤器 - 圖示雜湊索引")
+    parser.add_argument('--config', default='config.json', help="config.json 路徑")
+    parser.add_argument('--images', default='images', help="圖示目錄")
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    skills = config.get('skills', []) + config.get('items', [])
+
+    cache_path = os.path.join(os.path.dirname(os.path.abspath(args.config)), 'cache', CACHE_FILENAME)
+    index = IconHashIndex(args.images, cache_path)
+    computed = index.refresh()
+    print(f"🔎 {len(index.hashes)} 張圖示（新計算 {computed} 張）")
+    if not index.report(skills):
+        print("✅ 沒有重複圖示或待分類的新圖片")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,335 @@
+"""
+本機 IPC 觸發介面
+外部巨集工具直接連線觸發技能，不必模擬按鍵讓鍵盤監聽攔截（少一次系統鍵盤掛鉤，也不干擾遊戲輸入）。
+
+連線方式：
+    Unix domain socket（非 Windows，預設 DEFAULT_SOCKET_PATH，權限只限目前使用者）
+    127.0.0.1 TCP（Windows，或指定 port 時）
+
+通訊協定（UTF-8 文字，每行一個請求，回應依請求順序各一行 JSON）：
+    trigger <技能 ID 或名稱>   觸發技能（與快捷鍵相同）      → {"ok": true, "remaining": 秒數}
+    reset <技能 ID 或名稱>     結束倒數                       → {"ok": true}
+    query [技能 ID 或名稱]     剩餘秒數（省略時列出所有倒數）   → {"ok": true, "remaining": 秒數} / {"ok": true, "timers": {...}}
+    profile <配置名稱>         切換配置                       → {"ok": true, "profile": 名稱}
+    ping                       連線測試（不經過主執行緒）       → {"ok": true, "pong": 時間}
+    失敗時回應 {"ok": false, "error": 訊息}
+
+同一條連線可以一次送出多行（pipelining），不必等待前一行的回應；
+一次收到的多行只喚醒主執行緒一次，在同一次處理中依序執行。
+"""
+
+import asyncio
+import json
+import os
+import queue
+import socket
+import tempfile
+import threading
+import time
+
+DEFAULT_IPC_PORT = 9998
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), 'artale_skill_tracker.sock')
+MAX_LINE_SIZE = 4096
+READ_SIZE = 64 * 1024
+
+CMD_TRIGGER = 'trigger'
+CMD_RESET = 'reset'
+CMD_QUERY = 'query'
+CMD_PROFILE = 'profile'
+CMD_PING = 'ping'
+
+# 需要交給主執行緒處理的指令（ping 在 IPC 執行緒直接回應）
+DISPATCHED_COMMANDS = (CMD_TRIGGER, CMD_RESET, CMD_QUERY, CMD_PROFILE)
+
+
+def unix_sockets_supported():
+    """是否可使用 Unix domain socket（asyncio 在 Windows 不支援）"""
+    return hasattr(socket, 'AF_UNIX') and os.name != 'nt'
+
+
+class IpcServer:
+    """本機 IPC 伺服器
+
+    在背景執行緒執行 asyncio 事件迴圈，每條連線一個協程。
+    收到的指令放入執行緒安全的 commands 佇列，並呼叫 wakeup() 通知主執行緒
+    （同一批指令只通知一次；主執行緒取出前再收到的指令不會重複通知），
+    主執行緒以 process_pending(handler) 依序處理，結果交回事件迴圈寫回連線。
+    """
+
+    def __init__(self, path=None, host='127.0.0.1', port=DEFAULT_IPC_PORT, wakeup=None):
+        """初始化伺服器
+
+        Args:
+            path: Unix domain socket 路徑（None 表示使用 TCP）
+            host: TCP 監聽位址（只應為本機位址）
+            port: TCP 監聽埠（0 表示自動選擇）
+            wakeup: 有新指令時呼叫（可從 IPC 執行緒呼叫，例如 lambda: root.after(0, ...)）
+        """
+        self.path = path
+        self.host = host
+        self.port = port
+        self.wakeup = wakeup
+        self.commands = queue.Queue()  # ([(指令, 參數), ...], future)：同一次讀取的指令為一批
+        self._wake_pending = False
+        self._server = None
+        self._connections = {}  # {task: writer}
+        self._loop = None
+        self._thread = None
+
+    @property
+    def address(self):
+        """目前監聽的位址（顯示用）"""
+        return self.path if self.path else f"{self.host}:{self.port}"
+
+    # ==================== 啟動 / 停止 ====================
+
+    async def start(self):
+        """開始監聽（在目前的事件迴圈中）"""
+        self._loop = asyncio.get_running_loop()
+        if self.path:
+            if os.path.exists(self.path):
+                os.unlink(self.path)  # 上次未正常結束留下的 socket 檔案
+            old_umask = os.umask(0o177)
+            try:
+                self._server = await asyncio.start_unix_server(self._handle_client, self.path)
+            finally:
+                os.umask(old_umask)
+        else:
+            self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+            for sock in self._server.sockets:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    async def stop(self):
+        """停止監聽並關閉所有連線"""
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._connections.values()):
+            writer.transport.abort()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def start_in_thread(self, timeout=5):
+        """在背景執行緒中啟動事件迴圈
+
+        Args:
+            timeout: 等待監聽成功的秒數
+
+        Returns:
+            監聽的位址（顯示用）
+        """
+        ready = threading.Event()
+        result = {}
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self.start())
+            except Exception as e:
+                result['error'] = e
+                ready.set()
+                self._loop.close()
+                return
+            ready.set()
+            try:
+                self._loop.run_forever()
+            finally:
+                self._loop.run_until_complete(self.stop())
+                self._loop.close()
+
+        self._thread = threading.Thread(target=run, name='IpcServer', daemon=True)
+        self._thread.start()
+        if not ready.wait(timeout):
+            raise TimeoutError("IPC 伺服器啟動逾時")
+        if 'error' in result:
+            raise result['error']
+        return self.address
+
+    def stop_in_thread(self):
+        """停止背景執行緒中的伺服器"""
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    # ==================== 主執行緒 ====================
+
+    def process_pending(self, handler):
+        """處理佇列中的所有指令（主執行緒呼叫）
+
+        Args:
+            handler: handler(指令, 參數) → 回應字典（不含 ok）；
+                     拋出 LookupError / ValueError 時回應錯誤訊息
+
+        Returns:
+            處理的指令數
+        """
+        self._wake_pending = False
+        results = []
+        count = 0
+        while True:
+            try:
+                batch, future = self.commands.get_nowait()
+            except queue.Empty:
+                break
+            results.append((future, [_call(handler, command, argument) for command, argument in batch]))
+            count += len(batch)
+
+        if results:
+            try:
+                self._loop.call_soon_threadsafe(_resolve_all, results)
+            except RuntimeError:
+                pass  # 事件迴圈已關閉
+        return count
+
+    # ==================== 連線處理 ====================
+
+    async def _handle_client(self, reader, writer):
+        """處理一條連線：一次讀取所有已到達的行，依序回應"""
+        self._connections[asyncio.current_task()] = writer
+        pending = b''
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                *lines, pending = (pending + data).split(b'\n')
+                if len(pending) > MAX_LINE_SIZE:
+                    writer.write(_encode({'ok': False, 'error': "請求過長"}))
+                    break
+                if not lines:
+                    continue
+
+                # 需要主執行緒處理的指令先以 None 佔位，整批交給主執行緒
+                replies = [self._parse(line) for line in lines if line.strip()]
+                batch = [reply for reply in replies if isinstance(reply, tuple)]
+                if batch:
+                    future = self._loop.create_future()
+                    self.commands.put((batch, future))
+                    self._wake()
+                    results = iter(await future)
+                    replies = [next(results) if isinstance(reply, tuple) else reply for reply in replies]
+                writer.write(b''.join(_encode(reply) for reply in replies))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+    def _parse(self, line):
+        """解析一行請求
+
+        Returns:
+            回應字典，或需要主執行緒處理的 (指令, 參數)
+        """
+        try:
+            command, _, argument = line.decode('utf-8').strip().partition(' ')
+        except UnicodeDecodeError:
+            return {'ok': False, 'error': "請求不是 UTF-8 文字"}
+        command = command.lower()
+        if command == CMD_PING:
+            return {'ok': True, 'pong': time.time()}
+        if command not in DISPATCHED_COMMANDS:
+            return {'ok': False, 'error': f"未知的指令: {command}"}
+        return command, argument.strip()
+
+    def _wake(self):
+        """通知主執行緒有新指令（已通知而尚未處理時不重複通知）"""
+        if self.wakeup is None or self._wake_pending:
+            return
+        self._wake_pending = True
+        self.wakeup()
+
+
+def _call(handler, command, argument):
+    """執行一個指令 → 回應字典"""
+    try:
+        reply = {'ok': True}
+        reply.update(handler(command, argument) or {})
+        return reply
+    except (LookupError, ValueError) as e:
+        return {'ok': False, 'error': e.args[0] if e.args else str(e)}
+    except Exception as e:
+        print(f"⚠️ IPC 指令 {command} 失敗: {e}")
+        return {'ok': False, 'error': str(e)}
+
+
+def _resolve_all(results):
+    """設定各批指令的回應（事件迴圈執行緒）"""
+    for future, replies in results:
+        if not future.done():
+            future.set_result(replies)
+
+
+def _encode(reply):
+    """回應字典 → 一行 JSON"""
+    return json.dumps(reply, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def open_connection(path=None, host='127.0.0.1', port=DEFAULT_IPC_PORT, timeout=2):
+    """連線到 IPC 伺服器（同步 socket，供腳本與測試使用）
+
+    Args:
+        path: Unix domain socket 路徑（None 表示使用 TCP）
+
+    Returns:
+        socket.socket
+    """
+    if path:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(path)
+    else:
+        sock = socket.create_connection((host, port), timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def send_commands(sock, lines):
+    """送出多行請求（一次寫入）並依序讀取回應
+
+    Args:
+        sock: open_connection() 的連線
+        lines: 請求列表，例如 ['trigger 時間魔方', 'query']
+
+    Returns:
+        回應字典列表
+    """
+    sock.sendall(''.join(f"{line}\n" for line in lines).encode('utf-8'))
+    replies = []
+    buffer = b''
+    while len(replies) < len(lines):
+        chunk = sock.recv(READ_SIZE)
+        if not chunk:
+            raise ConnectionError("IPC 連線已中斷")
+        buffer += chunk
+        *complete, buffer = buffer.split(b'\n')
+        replies.extend(json.loads(line) for line in complete)
+    return replies
+
+
+def main():
+    """從命令列送出請求，例如：python -m src.ui.ipc_server "trigger 時間魔方" query"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="技能追蹤器 - 本機 IPC 用戶端")
+    parser.add_argument('requests', nargs='+', help="請求（每個參數一行）")
+    parser.add_argument('--path', help="Unix domain socket 路徑")
+    parser.add_argument('--port', type=int, default=DEFAULT_IPC_PORT, help="TCP 埠（未指定 --path 且不支援 Unix socket 時）")
+    args = parser.parse_args()
+
+    path = args.path or (DEFAULT_SOCKET_PATH if unix_sockets_supported() else None)
+    with open_connection(path, port=args.port) as sock:
+        for reply in send_commands(sock, args.requests):
+            print(json.dumps(reply, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
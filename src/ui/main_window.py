@@ -3,25 +3,37 @@
 技能追蹤與管理
 """
 
+import os
 import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk
-from pynput import keyboard
+import threading
 import time
 
 from src.ui.components import RoundedButton, SectionFrame, ScrollableFrame
-from src.ui.dialogs import ProfileManagerDialog, SettingsDialog
 from src.ui.skill_window import SkillWindow
 from src.ui.config_manager import ConfigManager
 from src.ui.skill_manager import SkillManager
+from src.ui.scheduler import TaskScheduler, Priority
 from src.ui.styles import Colors, Fonts, Sizes
 from src.ui.helpers import resource_path
+from src.ui.startup_profiler import StartupProfiler
+from src.ui.startup_snapshot import StartupSnapshot, SNAPSHOT_FILENAME
+from src.ui.timer_events import TimerEvents
+
+# 🆕 pynput、對話框、PIL、requests 皆延遲到第一次使用時才導入，讓主視窗先顯示
 
 
 class MainWindow:
     """主視窗類別"""
     
-    def __init__(self):
-        """初始化主視窗"""
+    def __init__(self, profiler=None):
+        """初始化主視窗
+        
+        Args:
+            profiler: 啟動分析器（可選，main.py --profile-startup）
+        """
+        self.profiler = profiler or StartupProfiler(enabled=False)
+        
         # 獲取版本號
         try:
             from version import get_version
@@ -37,40 +49,124 @@ class MainWindow:
         self.root.configure(bg=Colors.BG_DARK)
         self.root.geometry("1600x900+100+50")
         
+        # 🆕 協作式任務排程器（耗時工作分段在閒置時間執行）
+        self.scheduler = TaskScheduler(self.root)
+        
+        # 🆕 計時器事件（技能視窗狀態改變時通知訂閱者）
+        self.timer_events = TimerEvents()
+        
         # 初始化管理器
         try:
-            self.config_manager = ConfigManager(resource_path('config.json'))
-            self.skill_manager = SkillManager(self.config_manager)
+            with self.profiler.phase('config_load'):
+                # 🆕 啟動快照：檔案未變更時一次讀取已合併的狀態
+                config_path = resource_path('config.json')
+                config_dir = os.path.dirname(os.path.abspath(config_path))
+                self.startup_snapshot = StartupSnapshot(
+                    os.path.join(config_dir, 'cache', SNAPSHOT_FILENAME),
+                    config_path,
+                    os.path.join(os.path.dirname(config_path), 'profiles'),
+                    resource_path('images')
+                )
+                snapshot_state = self.startup_snapshot.load()
+                
+                self.config_manager = ConfigManager(
+                    config_path, snapshot_state['config'] if snapshot_state else None
+                )
+                self.config_manager.attach_scheduler(self.scheduler)
+                self.skill_manager = SkillManager(
+                    self.config_manager, self.scheduler, snapshot_state
+                )
+                
+                # 初始化變數
+                self._init_variables(snapshot_state)
         except Exception as e:
             messagebox.showerror("錯誤", f"初始化失敗: {e}")
             self.root.destroy()
             return
         
-        # 初始化變數
-        self._init_variables()
-        
-        # 創建 UI
+        # 創建 UI（欄位內容由排程器分段建立）
+        self.profiler.begin('ui_build')
         self._create_ui()
         
-        # 啟動鍵盤監聽
-        self._start_keyboard_listener()
+        # 🆕 計時器日誌：讀出上次結束時仍在倒數的計時器
+        if self.timer_journal_enabled:
+            self._start_timer_journal()
         
         # 初始化駐留技能
         self._initialize_permanent_skills()
         
+        # 🆕 冷啟動時於背景寫入快照（排在延遲保存之後）
+        if snapshot_state:
+            print("⚡ 使用啟動快照")
+        else:
+            self.scheduler.call_soon(
+                self._save_startup_snapshot, priority=Priority.LOW, name='startup_snapshot'
+            )
+        
+        # 🆕 以下工作等主視窗第一次繪製後才執行
+        self.root.after_idle(self._after_first_paint)
+        
         # 檢查更新（非阻塞）
         self.root.after(1000, self._check_for_updates)
-    
-    def _init_variables(self):
-        """初始化變數"""
-        # 確保預設配置存在
-        self.config_manager.ensure_default_profile()
         
-        # 獲取當前配置名稱
-        self.current_profile_name = self.config_manager.get_current_profile()
+        self.profiler.write_when_done(self.root)
+    
+    def _after_first_paint(self):
+        """主視窗顯示後：載入圖示、啟動鍵盤監聽"""
+        self.profiler.mark('first_paint')
+        
+        # 🆕 載入圖示（圖集直接覆蓋，其餘背景解碼；當前配置會用到的技能優先）
+        self.profiler.begin('image_load')
+        self.skill_manager.start_icon_loading(
+            self._get_priority_skill_ids(),
+            on_done=lambda: self.profiler.end('image_load')
+        )
         
-        # 載入當前配置
-        profile_data = self.config_manager.load_profile(self.current_profile_name)
+        # 啟動鍵盤監聽
+        with self.profiler.phase('listener_start'):
+            self._start_keyboard_listener()
+        
+        # 🆕 背景預建快捷鍵技能的隱藏視窗
+        self._prewarm_ready = True
+        self._schedule_prewarm()
+        
+        # 🆕 畫面 buff 偵測（建立範本較耗時，不影響第一次繪製）
+        if self.buff_detector_enabled:
+            self.scheduler.call_soon(self._start_buff_detector, priority=Priority.LOW, name='buff_detector')
+        if self.cooldown_ocr_enabled:
+            self.scheduler.call_soon(self._start_cooldown_reader, priority=Priority.LOW, name='cooldown_ocr')
+        if self.ipc_enabled:
+            self.scheduler.call_soon(self._start_ipc_server, priority=Priority.LOW, name='ipc_server')
+        if self.overlay_enabled:
+            self.scheduler.call_soon(self._start_overlay_server, priority=Priority.LOW, name='overlay_server')
+        if self.timer_shm_enabled:
+            self._start_timer_shm()
+        if self.analytics_enabled:
+            self._start_skill_analytics()
+        if self.session_recording_enabled:
+            self._start_session_recording()
+        
+        # 🆕 圖示雜湊索引（背景檢查重複圖示與待分類的新圖片）
+        self.scheduler.call_soon(self._start_icon_index, priority=Priority.LOW, name='icon_hash')
+    
+    def _init_variables(self, snapshot_state=None):
+        """初始化變數
+        
+        Args:
+            snapshot_state: 啟動快照狀態（可選），有效時不再讀取配置檔案
+        """
+        if snapshot_state:
+            self.current_profile_name = snapshot_state['profile_name']
+            profile_data = None
+        else:
+            # 確保預設配置存在
+            self.config_manager.ensure_default_profile()
+            
+            # 獲取當前配置名稱
+            self.current_profile_name = self.config_manager.get_current_profile()
+            
+            # 載入當前配置
+            profile_data = self.config_manager.load_profile(self.current_profile_name)
         
         settings = self.config_manager.config.get('settings', {})
         
@@ -91,12 +187,41 @@ class MainWindow:
         self.enable_sound = settings.get('enable_sound', True)
         self.window_alpha = 0.95  # 固定透明度
         self.window_size = settings.get('window_size', 64)  # 🆕 視窗大小設定
+        self.prewarm_windows = settings.get('prewarm_windows', True)  # 🆕 預建技能視窗
+        self.buff_detector_enabled = settings.get('buff_detector_enabled', False)  # 🆕 畫面 buff 偵測
+        self.buff_detector_region = settings.get('buff_detector_region')  # [x, y, 寬, 高]
+        self.buff_detector = None
+        self.cooldown_ocr_enabled = settings.get('cooldown_ocr_enabled', False)  # 🆕 冷卻數字辨識
+        self.cooldown_ocr_region = settings.get('cooldown_ocr_region')  # [x, y, 寬, 高]
+        self.cooldown_ocr_slots = settings.get('cooldown_ocr_slots', [])  # 各欄位的 skill_id（None 為空欄位）
+        self.cooldown_ocr_slot_size = settings.get('cooldown_ocr_slot_size', 34)  # 欄位邊長（像素）
+        self.cooldown_ocr_threshold = settings.get('cooldown_ocr_threshold', 1.0)  # 相差超過此秒數才校正
+        self.cooldown_reader = None
+        self.ipc_enabled = settings.get('ipc_enabled', False)  # 🆕 外部巨集 IPC
+        self.ipc_port = settings.get('ipc_port', 9998)  # 不支援 Unix socket 時的本機 TCP 埠
+        self.ipc_server = None
+        self.overlay_enabled = settings.get('overlay_enabled', False)  # 🆕 串流疊加層
+        self.overlay_port = settings.get('overlay_port', 8765)
+        self.overlay_server = None
+        self.timer_shm_enabled = settings.get('timer_shm_enabled', False)  # 🆕 計時器共用記憶體
+        self.timer_shm = None
+        self.timer_journal_enabled = settings.get('timer_journal_enabled', True)  # 🆕 計時器日誌（重新啟動後恢復倒數）
+        self.timer_journal = None
+        self._restored_timers = {}  # {skill_id: (旗標, 冷卻秒數, 結束時間)}
+        self.analytics_enabled = settings.get('analytics_enabled', False)  # 🆕 技能使用統計
+        self.skill_analytics = None
+        self.session_recording_enabled = settings.get('session_recording_enabled', False)  # 🆕 操作錄製
+        self.session_recorder = None
         
         # 🆕 提前提示音設定
         self.alert_before_seconds = settings.get('alert_before_seconds', 0)
         
-        # 技能設定 - 從配置檔案載入
-        if profile_data:
+        # 技能設定 - 從快照或配置檔案載入（快照中的快捷鍵與秒數已套用）
+        if snapshot_state:
+            self.skill_permanent = snapshot_state['skill_permanent']
+            self.skill_loop = snapshot_state['skill_loop']
+            self.skill_alert_enabled = snapshot_state['skill_alert_enabled']
+        elif profile_data:
             self.skill_permanent = profile_data.get('permanent', {})
             self.skill_loop = profile_data.get('loop', {})
             self.skill_alert_enabled = profile_data.get('alert_enabled', {})
@@ -144,6 +269,35 @@ class MainWindow:
         
         # 🔧 技能組拖曳數據
         self.group_drag_data = {'x': 0, 'y': 0, 'dragging': False, 'start_x': 0, 'start_y': 0}
+        
+        # 🆕 批次操作：待建立的技能視窗（分幀建立，避免 UI 卡頓）
+        self._bulk_depth = 0
+        self._pending_windows = {}  # {skill_id: 'permanent' | 'loop' | 'restore'}
+        
+        # 🆕 分段建立主 UI 的任務
+        self._ui_build_task = None
+        
+        # 🆕 預建的隱藏技能視窗（首次觸發只需顯示）
+        self._prewarmed = {}  # {skill_id: SkillWindow}
+        self._prewarm_task = None
+        self._prewarm_ready = False  # 主視窗顯示後才開始預建
+        
+        # 🆕 組隊房間（伺服器只在建立房間時啟動）
+        self.room_host = settings.get('room_host')
+        self.room_port = settings.get('room_port')
+        self.room_client = None
+        self.room_server = None
+        self.room_members = []
+        self._room_poll_id = None
+    
+    def _get_priority_skill_ids(self):
+        """獲取當前配置中會立即用到的技能（有快捷鍵、常駐或循環）"""
+        return [
+            skill_id for skill_id, skill in self.skill_manager.get_all_skills().items()
+            if skill.get('hotkey')
+            or self.skill_permanent.get(skill_id, False)
+            or self.skill_loop.get(skill_id, False)
+        ]
     
     # ==================== UI 創建 ====================
     
@@ -159,17 +313,26 @@ class MainWindow:
         # 第一欄：玩家技能
         col1 = tk.Frame(main_container, bg=Colors.BG_DARK)
         col1.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
-        self._create_player_skills_column(col1)
         
         # 第二欄：BOSS 技能
         col2 = tk.Frame(main_container, bg=Colors.BG_DARK)
         col2.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
-        self._create_boss_skills_column(col2)
         
         # 第三欄：道具
         col3 = tk.Frame(main_container, bg=Colors.BG_DARK)
         col3.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
-        self._create_items_column(col3)
+        
+        # 🆕 欄位內容分段建立，先讓視窗顯示
+        self._ui_build_task = self.scheduler.submit(
+            self._build_columns_job(col1, col2, col3), priority=Priority.NORMAL,
+            on_done=lambda _: self.profiler.end('ui_build')
+        )
+    
+    def _build_columns_job(self, col1, col2, col3):
+        """分段建立三個欄位（生成器任務）"""
+        yield from self._create_player_skills_column(col1)
+        yield from self._create_boss_skills_column(col2)
+        yield from self._create_items_column(col3)
     
     def _create_header(self):
         """創建頂部標題列"""
@@ -218,6 +381,15 @@ class MainWindow:
         )
         self.current_profile_label.pack(side=tk.LEFT, padx=5)
         
+        # 🆕 組隊房間狀態
+        self.room_status_label = tk.Label(
+            header, text="", 
+            bg=Colors.BG_MEDIUM, fg=Colors.ACCENT_GREEN,
+            font=Fonts.BODY_MEDIUM_BOLD
+        )
+        self.room_status_label.pack(side=tk.LEFT, padx=10)
+        self._update_room_status()
+        
         # 右側按鈕組
         right_buttons = tk.Frame(header, bg=Colors.BG_MEDIUM)
         right_buttons.pack(side=tk.RIGHT, padx=20, pady=15)
@@ -266,6 +438,24 @@ class MainWindow:
             Colors.ACCENT_ORANGE, width=65, height=25
         ).pack(side=tk.LEFT, padx=1)
         
+        # 🆕 組隊房間按鈕
+        RoundedButton(
+            right_buttons, "🌐 房間", self._show_room_dialog,
+            Colors.ACCENT_BLUE, width=80, height=30
+        ).pack(side=tk.LEFT, padx=3)
+        
+        # 🆕 效能面板按鈕
+        RoundedButton(
+            right_buttons, "📊", self._show_perf_panel,
+            Colors.BG_LIGHT, width=40, height=30
+        ).pack(side=tk.LEFT, padx=3)
+        
+        # 🆕 技能使用統計按鈕
+        RoundedButton(
+            right_buttons, "📈", self._show_analytics,
+            Colors.BG_LIGHT, width=40, height=30
+        ).pack(side=tk.LEFT, padx=3)
+        
         # 設定按鈕
         RoundedButton(
             right_buttons, "⚙️ 設定", self._show_settings,
@@ -291,7 +481,7 @@ class MainWindow:
         
         if 'player' in self.skill_manager.skill_categories:
             for subcategory, skill_ids in sorted(self.skill_manager.get_categories('player').items()):
-                group = self._create_skill_group(content, subcategory, skill_ids)
+                group = yield from self._create_skill_group(content, subcategory, skill_ids)
                 if group:
                     self.player_scroll_frame.bind_widget_to_scroll(group)
     
@@ -306,7 +496,7 @@ class MainWindow:
         
         if 'boss' in self.skill_manager.skill_categories:
             for subcategory, skill_ids in sorted(self.skill_manager.get_categories('boss').items()):
-                group = self._create_skill_group(content, subcategory, skill_ids)
+                group = yield from self._create_skill_group(content, subcategory, skill_ids)
                 if group:
                     self.boss_scroll_frame.bind_widget_to_scroll(group)
     
@@ -321,7 +511,7 @@ class MainWindow:
         
         if 'item' in self.skill_manager.skill_categories:
             for subcategory, item_ids in sorted(self.skill_manager.get_categories('item').items()):
-                group = self._create_skill_group(content, subcategory, item_ids)
+                group = yield from self._create_skill_group(content, subcategory, item_ids)
                 if group:
                     self.items_scroll_frame.bind_widget_to_scroll(group)
     
@@ -344,7 +534,7 @@ class MainWindow:
         ).pack(side=tk.LEFT, padx=15, pady=15)
     
     def _create_skill_group(self, parent, subcategory, skill_ids):
-        """創建技能分組"""
+        """創建技能分組（生成器，每個技能項目為一個工作單位）"""
         from src.ui.components import RoundedFrame
         
         group_wrapper = RoundedFrame(
@@ -370,6 +560,7 @@ class MainWindow:
             skill = self.skill_manager.get_skill(skill_id)
             if skill:
                 self._create_skill_item(group_frame, skill_id, skill)
+                yield
         
         return group_wrapper
     
@@ -575,14 +766,40 @@ class MainWindow:
     # ==================== 配置管理 ====================
     
     def _auto_save_current_profile(self):
-        """自動保存當前配置"""
+        """自動保存當前配置（合併到閒置時間寫入）"""
+        self.scheduler.call_soon(
+            self._write_current_profile, priority=Priority.LOW, name='auto_save_profile'
+        )
+    
+    def _write_current_profile(self):
+        """將當前設定寫入配置檔案"""
         current_settings = self._get_current_settings()
         self.config_manager.save_profile(self.current_profile_name, current_settings)
         print(f"💾 自動保存配置: {self.current_profile_name}")
     
+    def _flush_pending_saves(self):
+        """立即寫入所有延遲保存"""
+        self.scheduler.flush('auto_save_profile')
+        self.config_manager.flush()
+    
+    def _save_startup_snapshot(self):
+        """寫入啟動快照（記錄寫入當下的檔案戳記，之後檔案變更即失效）"""
+        self.startup_snapshot.save({
+            'config': self.config_manager.config,
+            'profile_name': self.current_profile_name,
+            'skills': self.skill_manager.get_all_skills(),
+            'skill_categories': self.skill_manager.get_categories(),
+            'skill_permanent': self.skill_permanent,
+            'skill_loop': self.skill_loop,
+            'skill_alert_enabled': self.skill_alert_enabled,
+        })
+    
     def _show_profile_manager(self):
         """顯示配置管理視窗"""
+        from src.ui.dialogs import ProfileManagerDialog
+        
         self.keyboard_enabled = False
+        self._flush_pending_saves()
         
         dialog = ProfileManagerDialog(
             self.root,
@@ -633,6 +850,8 @@ class MainWindow:
     def _apply_profile(self, profile_data):
         """套用配置"""
         self.current_profile_name = self.config_manager.get_current_profile()
+        if self.session_recorder:
+            self.session_recorder.profile(self.current_profile_name)
         
         for skill_id, skill in self.skill_manager.get_all_skills().items():
             original_cooldown = self._get_original_cooldown(skill_id)
@@ -666,6 +885,11 @@ class MainWindow:
     
     def _reload_main_ui(self):
         """重新載入主 UI"""
+        if self._ui_build_task:
+            self._ui_build_task.cancel()
+        
+        self._discard_prewarmed()
+        
         for widget in self.root.winfo_children():
             widget.destroy()
         
@@ -677,6 +901,7 @@ class MainWindow:
         
         self._create_ui()
         self._initialize_permanent_skills()
+        self._schedule_prewarm()
     
     # ==================== 快捷鍵操作 ====================
     
@@ -701,6 +926,7 @@ class MainWindow:
                     btn.update_color(Colors.BG_MEDIUM, Colors.TEXT_PRIMARY)
             
             self._auto_save_current_profile()
+            self._schedule_prewarm()
             messagebox.showinfo("完成", "已清空所有快捷鍵並恢復預設秒數!", parent=self.root)
     
     def _start_hotkey_capture(self, skill_id):
@@ -719,7 +945,7 @@ class MainWindow:
         )
     
     def _capture_hotkey(self, key):
-        """捕捉按鍵並設定"""
+        """捕捉按鍵並設定（在 Tk 主執行緒執行）"""
         if self.waiting_for_hotkey is None:
             return
         
@@ -744,6 +970,7 @@ class MainWindow:
                 btn.update_color(Colors.ACCENT_YELLOW, '#000000')
             
             self._auto_save_current_profile()
+            self._schedule_prewarm()
             
             self.hotkey_hint_label.config(
                 text=f"✓ '{self.waiting_skill_name}' 設定為 {key_str}",
@@ -774,61 +1001,142 @@ class MainWindow:
     
     def _toggle_all(self, setting_type):
         """切換所有技能的設定"""
+        if self.session_recorder:
+            self.session_recorder.toggle_all(setting_type)
+        all_skill_ids = list(self.skill_manager.get_all_skills().keys())
+        
         if setting_type == 'permanent':
-            all_checked = all(self.skill_permanent.get(sid, False) 
-                             for sid in self.skill_manager.get_all_skills().keys())
-            new_value = not all_checked
-            
-            # 🔧 如果要全選常駐，先取消所有循環
-            if new_value:
-                for skill_id in self.skill_manager.get_all_skills().keys():
-                    if self.skill_loop.get(skill_id, False):
-                        self._update_loop_skill(skill_id, False)
-                        self.skill_loop[skill_id] = False
-                        if skill_id in self.loop_vars:
-                            self.loop_vars[skill_id].set(False)
+            all_checked = all(self.skill_permanent.get(sid, False) for sid in all_skill_ids)
+            new_mode = None if all_checked else 'permanent'
             
-            for skill_id in self.skill_manager.get_all_skills().keys():
-                self._update_permanent_skill(skill_id, new_value)
-                self.skill_permanent[skill_id] = new_value
-                if skill_id in self.permanent_vars:
-                    self.permanent_vars[skill_id].set(new_value)
+            # 🔧 全選常駐時會一併取消循環；取消常駐時保留原本的循環設定
+            changes = {}
+            for skill_id in all_skill_ids:
+                if new_mode:
+                    changes[skill_id] = 'permanent'
+                elif self.skill_permanent.get(skill_id, False):
+                    changes[skill_id] = None
+            self._bulk_update_modes(changes)
+            return
         
         elif setting_type == 'loop':
-            all_checked = all(self.skill_loop.get(sid, False) 
-                             for sid in self.skill_manager.get_all_skills().keys())
-            new_value = not all_checked
-            
-            # 🔧 如果要全選循環，先取消所有常駐
-            if new_value:
-                for skill_id in self.skill_manager.get_all_skills().keys():
-                    if self.skill_permanent.get(skill_id, False):
-                        self._update_permanent_skill(skill_id, False)
-                        self.skill_permanent[skill_id] = False
-                        if skill_id in self.permanent_vars:
-                            self.permanent_vars[skill_id].set(False)
+            all_checked = all(self.skill_loop.get(sid, False) for sid in all_skill_ids)
+            new_mode = None if all_checked else 'loop'
             
-            for skill_id in self.skill_manager.get_all_skills().keys():
-                self._update_loop_skill(skill_id, new_value)
-                self.skill_loop[skill_id] = new_value
-                if skill_id in self.loop_vars:
-                    self.loop_vars[skill_id].set(new_value)
+            # 🔧 全選循環時會一併取消常駐；取消循環時保留原本的常駐設定
+            changes = {}
+            for skill_id in all_skill_ids:
+                if new_mode:
+                    changes[skill_id] = 'loop'
+                elif self.skill_loop.get(skill_id, False):
+                    changes[skill_id] = None
+            self._bulk_update_modes(changes)
+            return
         
         elif setting_type == 'alert':
-            all_checked = all(self.skill_alert_enabled.get(sid, False) 
-                             for sid in self.skill_manager.get_all_skills().keys())
+            all_checked = all(self.skill_alert_enabled.get(sid, False) for sid in all_skill_ids)
             new_value = not all_checked
             
-            for skill_id in self.skill_manager.get_all_skills().keys():
+            for skill_id in all_skill_ids:
                 self.skill_alert_enabled[skill_id] = new_value
                 if skill_id in self.alert_enabled_vars:
                     self.alert_enabled_vars[skill_id].set(new_value)
+                if skill_id in self.active_windows:
+                    self.active_windows[skill_id].alert_enabled = new_value
         
         self._save_config()
         self._auto_save_current_profile()
     
+    # ==================== 批次操作 ====================
+    
+    def _bulk_update_modes(self, changes):
+        """批次套用多個技能的模式變更（單一交易）
+        
+        所有狀態先在記憶體中更新，最後只保存一次、重新排列一次；
+        需要建立的技能視窗則排入佇列，分幀建立以保持 UI 流暢。
+        
+        Args:
+            changes: {skill_id: 'permanent' | 'loop' | None}，None 表示取消常駐與循環
+        """
+        self._bulk_depth += 1
+        try:
+            for skill_id, mode in changes.items():
+                if not self.skill_manager.get_skill(skill_id):
+                    continue
+                
+                was_permanent = self.skill_permanent.get(skill_id, False)
+                was_loop = self.skill_loop.get(skill_id, False)
+                is_permanent = mode == 'permanent'
+                is_loop = mode == 'loop'
+                
+                if was_permanent == is_permanent and was_loop == is_loop:
+                    continue
+                
+                self.skill_permanent[skill_id] = is_permanent
+                self.skill_loop[skill_id] = is_loop
+                if skill_id in self.permanent_vars:
+                    self.permanent_vars[skill_id].set(is_permanent)
+                if skill_id in self.loop_vars:
+                    self.loop_vars[skill_id].set(is_loop)
+                
+                # 舊模式的視窗（或尚未建立的排隊視窗）先移除
+                if was_permanent or was_loop:
+                    self._cancel_pending_window(skill_id)
+                    if skill_id in self.active_windows:
+                        self.active_windows[skill_id].close()
+                
+                if mode and skill_id not in self.active_windows:
+                    self._queue_window(skill_id, mode)
+        finally:
+            self._bulk_depth -= 1
+        
+        # 單次排版、單次保存
+        self._reposition_windows()
+        self._save_config()
+        self._auto_save_current_profile()
+        self._schedule_pending_windows()
+    
+    def _queue_window(self, skill_id, mode):
+        """將技能視窗排入待建立佇列（預先保留排列位置）"""
+        if skill_id not in self.window_order:
+            self.window_order.append(skill_id)
+        self._pending_windows[skill_id] = mode
+    
+    def _cancel_pending_window(self, skill_id):
+        """取消尚未建立的技能視窗"""
+        if self._pending_windows.pop(skill_id, None) is None:
+            return
+        if skill_id not in self.active_windows and skill_id in self.window_order:
+            self.window_order.remove(skill_id)
+    
+    def _schedule_pending_windows(self):
+        """排程建立佇列中的技能視窗"""
+        if self._pending_windows:
+            self.scheduler.submit(
+                self._pending_windows_job(), priority=Priority.NORMAL, name='pending_windows'
+            )
+    
+    def _pending_windows_job(self):
+        """逐一建立佇列中的技能視窗（生成器任務，由排程器控制每幀預算）"""
+        while self._pending_windows:
+            skill_id = next(iter(self._pending_windows))
+            mode = self._pending_windows.pop(skill_id)
+            
+            if skill_id not in self.active_windows:
+                if mode == 'permanent':
+                    self._create_permanent_window(skill_id)
+                elif mode == 'loop':
+                    self._create_loop_window(skill_id)
+            if skill_id in self._restored_timers:
+                self._restore_timer(skill_id)
+            if skill_id not in self.active_windows and skill_id in self.window_order:
+                self.window_order.remove(skill_id)  # 沒有建立視窗（技能不存在或恢復時已結束），釋放保留的位置
+            yield
+    
     def _update_skill_setting_exclusive(self, skill_id, setting_type, var):
         new_value = var.get()
+        if self.session_recorder:
+            self.session_recorder.setting(skill_id, setting_type, new_value)
     
         if new_value:
             if setting_type == 'permanent':
@@ -858,6 +1166,7 @@ class MainWindow:
                     self._create_loop_window(skill_id)
     
         else:
+            self._cancel_pending_window(skill_id)
             if skill_id in self.active_windows:
                 self.active_windows[skill_id].close()
     
@@ -874,6 +1183,8 @@ class MainWindow:
     def _update_alert_setting(self, skill_id, var):
         """更新提前提示設定"""
         new_value = var.get()
+        if self.session_recorder:
+            self.session_recorder.setting(skill_id, 'alert', new_value)
         self.skill_alert_enabled[skill_id] = new_value
         
         if skill_id in self.active_windows:
@@ -883,37 +1194,43 @@ class MainWindow:
         self._save_config()
         self._auto_save_current_profile()
     
-    def _update_permanent_skill(self, skill_id, is_permanent):
-        """更新駐留技能"""
-        was_permanent = self.skill_permanent.get(skill_id, False)
-        if is_permanent and not was_permanent:
-            if skill_id not in self.active_windows:
-                self._create_permanent_window(skill_id)
-        elif not is_permanent and was_permanent:
-            if skill_id in self.active_windows:
-                self.active_windows[skill_id].close()
-    
-    def _update_loop_skill(self, skill_id, is_loop):
-        """更新循環技能"""
-        was_loop = self.skill_loop.get(skill_id, False)
-        if is_loop and not was_loop:
-            if skill_id not in self.active_windows:
-                self._create_loop_window(skill_id)
-        elif not is_loop and was_loop:
-            if skill_id in self.active_windows:
-                self.active_windows[skill_id].close()
-    
     def _initialize_permanent_skills(self):
-        """初始化駐留技能和循環技能"""
+        """初始化駐留技能和循環技能（分幀建立）"""
         for skill_id, is_permanent in self.skill_permanent.items():
             if is_permanent and skill_id not in self.active_windows:
-                self._create_permanent_window(skill_id)
+                self._queue_window(skill_id, 'permanent')
         
         for skill_id, is_loop in self.skill_loop.items():
             if is_loop and skill_id not in self.active_windows:
-                self._create_loop_window(skill_id)
+                self._queue_window(skill_id, 'loop')
+        
+        # 🆕 計時器日誌中仍在倒數的一般技能（駐留/循環技能在視窗建立後校正）
+        now = time.time()
+        for skill_id, (_, _, end_time) in self._restored_timers.items():
+            if end_time > now and skill_id not in self._pending_windows and skill_id not in self.active_windows:
+                self._queue_window(skill_id, 'restore')
+        # 沒有排入佇列的紀錄（例如已不是循環技能的循環計時器）不再恢復
+        self._restored_timers = {
+            skill_id: timer for skill_id, timer in self._restored_timers.items()
+            if skill_id in self._pending_windows
+        }
         
-        # 🆕 初始化後更新預覽框大小
+        self._schedule_pending_windows()
+    
+    def _restore_timer(self, skill_id):
+        """🆕 依計時器日誌恢復倒數（扣除程式關閉期間經過的秒數）"""
+        _, total, end_time = self._restored_timers.pop(skill_id)
+        elapsed = max(0.0, time.time() - (end_time - total))
+        if self.skill_loop.get(skill_id, False) and total > 0:
+            elapsed %= total
+        elif elapsed >= total:
+            return  # 關閉期間已經結束
+        
+        window = self.active_windows.get(skill_id)
+        if window is not None:
+            window.restart_countdown(elapsed)
+        else:
+            self._trigger_skill(skill_id, elapsed=elapsed, record=False)
     
     def _create_permanent_window(self, skill_id):
         """創建駐留視窗"""
@@ -941,7 +1258,9 @@ class MainWindow:
             on_drag_motion=self._on_skill_drag_motion,
             on_drag_end=self._on_skill_drag_end,
             window_size=self.window_size,  # 🆕 傳遞視窗大小
-            skill_image_path=skill_image_path  # 🆕 傳遞圖片路徑
+            skill_image_path=skill_image_path,  # 🆕 傳遞圖片路徑
+            image_loader=self.skill_manager.load_icon_image,
+            on_event=self.timer_events.emit
         )
         self.active_windows[skill_id] = skill_window
     
@@ -971,26 +1290,47 @@ class MainWindow:
             on_drag_motion=self._on_skill_drag_motion,
             on_drag_end=self._on_skill_drag_end,
             window_size=self.window_size,  # 🆕 傳遞視窗大小
-            skill_image_path=skill_image_path  # 🆕 傳遞圖片路徑
+            skill_image_path=skill_image_path,  # 🆕 傳遞圖片路徑
+            image_loader=self.skill_manager.load_icon_image,
+            on_event=self.timer_events.emit
         )
         self.active_windows[skill_id] = skill_window
     
     # ==================== 其他功能 ====================
     
     def _check_for_updates(self):
-        """檢查更新（非阻塞）"""
-        from src.ui.updater import Updater
+        """檢查更新（背景執行緒執行網路請求，結果交回 Tk 執行緒）"""
+        result = {}
+        
+        def worker():
+            try:
+                from src.ui.updater import Updater
+                result['info'] = Updater().check_for_updates()
+            except Exception as e:
+                result['error'] = e
+        
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        self.root.after(200, self._poll_update_check, thread, result)
+    
+    def _poll_update_check(self, thread, result):
+        """等待更新檢查完成"""
+        if thread.is_alive():
+            self.root.after(200, self._poll_update_check, thread, result)
+            return
         
+        if 'error' in result:
+            print(f"⚠️ 檢查更新時發生錯誤: {result['error']}")
+            return
+        
+        update_info = result.get('info', {})
         try:
-            updater = Updater()
-            update_info = updater.check_for_updates()
-            
             if update_info.get('available'):
                 self.update_button.pack(side=tk.LEFT, padx=3)
                 self.update_info = update_info
                 print(f"🎉 發現新版本: {update_info['latest']} (當前: {update_info['current']})")
             else:
-                print(f"✅ 已是最新版本: {update_info['current']}")
+                print(f"✅ 已是最新版本: {update_info.get('current')}")
         except Exception as e:
             print(f"⚠️ 檢查更新時發生錯誤: {e}")
     
@@ -1098,11 +1438,14 @@ class MainWindow:
             btn.update_color(Colors.BG_MEDIUM, Colors.TEXT_SECONDARY)
         
         self._auto_save_current_profile()
+        self._schedule_prewarm()
         
         print(f"✅ 已清空 {skill['name']} 的快捷鍵")
     
     def _show_settings(self):
         """顯示設定對話框"""
+        from src.ui.dialogs import SettingsDialog
+        
         self.keyboard_enabled = False
         
         dialog = SettingsDialog(self.root, {
@@ -1110,7 +1453,19 @@ class MainWindow:
             'y': self.skill_start_y,
             'sound': self.enable_sound,
             'alert_before_seconds': self.alert_before_seconds,
-            'window_size': self.window_size  # 🆕 傳遞視窗大小
+            'window_size': self.window_size,  # 🆕 傳遞視窗大小
+            'prewarm_windows': self.prewarm_windows,
+            'buff_detector_enabled': self.buff_detector_enabled,
+            'buff_detector_region': self.buff_detector_region,
+            'cooldown_ocr_enabled': self.cooldown_ocr_enabled,
+            'cooldown_ocr_region': self.cooldown_ocr_region,
+            'cooldown_ocr_slots': self._slot_names(self.cooldown_ocr_slots),
+            'ipc_enabled': self.ipc_enabled,
+            'overlay_enabled': self.overlay_enabled,
+            'overlay_port': self.overlay_port,
+            'timer_shm_enabled': self.timer_shm_enabled,
+            'analytics_enabled': self.analytics_enabled,
+            'session_recording_enabled': self.session_recording_enabled
         })
         
         result = dialog.show()
@@ -1126,14 +1481,78 @@ class MainWindow:
             self.enable_sound = result['sound']
             self.alert_before_seconds = result['alert_before_seconds']
             self.window_size = result['window_size']  # 🆕
+            self.prewarm_windows = result['prewarm_windows']
+            old_detector = (self.buff_detector_enabled, self.buff_detector_region)
+            self.buff_detector_enabled = result['buff_detector_enabled']
+            self.buff_detector_region = result['buff_detector_region']
+            old_reader = (self.cooldown_ocr_enabled, self.cooldown_ocr_region, self.cooldown_ocr_slots)
+            self.cooldown_ocr_enabled = result['cooldown_ocr_enabled']
+            self.cooldown_ocr_region = result['cooldown_ocr_region']
+            self.cooldown_ocr_slots = self._slot_skill_ids(result['cooldown_ocr_slots'])
+            old_ipc = self.ipc_enabled
+            self.ipc_enabled = result['ipc_enabled']
+            old_overlay = (self.overlay_enabled, self.overlay_port)
+            self.overlay_enabled = result['overlay_enabled']
+            self.overlay_port = result['overlay_port']
+            old_shm = self.timer_shm_enabled
+            self.timer_shm_enabled = result['timer_shm_enabled']
+            old_analytics = self.analytics_enabled
+            self.analytics_enabled = result['analytics_enabled']
+            old_recording = self.session_recording_enabled
+            self.session_recording_enabled = result['session_recording_enabled']
             
             self.config_manager.set_settings('skill_start_x', self.skill_start_x)
             self.config_manager.set_settings('skill_start_y', self.skill_start_y)
             self.config_manager.set_settings('enable_sound', self.enable_sound)
             self.config_manager.set_settings('alert_before_seconds', self.alert_before_seconds)
             self.config_manager.set_settings('window_size', self.window_size)  # 🆕
+            self.config_manager.set_settings('prewarm_windows', self.prewarm_windows)
+            self.config_manager.set_settings('buff_detector_enabled', self.buff_detector_enabled)
+            self.config_manager.set_settings('buff_detector_region', self.buff_detector_region)
+            self.config_manager.set_settings('cooldown_ocr_enabled', self.cooldown_ocr_enabled)
+            self.config_manager.set_settings('cooldown_ocr_region', self.cooldown_ocr_region)
+            self.config_manager.set_settings('cooldown_ocr_slots', self.cooldown_ocr_slots)
+            self.config_manager.set_settings('ipc_enabled', self.ipc_enabled)
+            self.config_manager.set_settings('overlay_enabled', self.overlay_enabled)
+            self.config_manager.set_settings('overlay_port', self.overlay_port)
+            self.config_manager.set_settings('timer_shm_enabled', self.timer_shm_enabled)
+            self.config_manager.set_settings('analytics_enabled', self.analytics_enabled)
+            self.config_manager.set_settings('session_recording_enabled', self.session_recording_enabled)
             self.config_manager.save()
             
+            # 大小或開關變更時重建預建視窗
+            self._schedule_prewarm()
+            
+            # 🆕 偵測設定變更時重新啟動
+            if old_detector != (self.buff_detector_enabled, self.buff_detector_region):
+                self._stop_buff_detector()
+                if self.buff_detector_enabled:
+                    self._start_buff_detector()
+            if old_reader != (self.cooldown_ocr_enabled, self.cooldown_ocr_region, self.cooldown_ocr_slots):
+                self._stop_cooldown_reader()
+                if self.cooldown_ocr_enabled:
+                    self._start_cooldown_reader()
+            if old_ipc != self.ipc_enabled:
+                self._stop_ipc_server()
+                if self.ipc_enabled:
+                    self._start_ipc_server()
+            if old_overlay != (self.overlay_enabled, self.overlay_port):
+                self._stop_overlay_server()
+                if self.overlay_enabled:
+                    self._start_overlay_server()
+            if old_shm != self.timer_shm_enabled:
+                self._stop_timer_shm()
+                if self.timer_shm_enabled:
+                    self._start_timer_shm()
+            if old_analytics != self.analytics_enabled:
+                self._stop_skill_analytics()
+                if self.analytics_enabled:
+                    self._start_skill_analytics()
+            if old_recording != self.session_recording_enabled:
+                self._stop_session_recording()
+                if self.session_recording_enabled:
+                    self._start_session_recording()
+            
             for window in self.active_windows.values():
                 window.enable_sound = self.enable_sound
                 window.alert_before_seconds = self.alert_before_seconds
@@ -1154,8 +1573,15 @@ class MainWindow:
         
         self.keyboard_enabled = True
     
-    def _trigger_skill(self, skill_id, player_name=None):
-        """觸發技能"""
+    def _trigger_skill(self, skill_id, player_name=None, elapsed=0, record=True):
+        """觸發技能
+        
+        Args:
+            skill_id: 技能 ID
+            player_name: 觸發的玩家（隊友觸發時提供）
+            elapsed: 觸發後已經過的秒數（隊友觸發時扣除網路延遲）
+            record: 是否計入技能使用統計（依計時器日誌恢復時不計入）
+        """
         skill = self.skill_manager.get_skill(skill_id)
         if not skill:
             return
@@ -1166,9 +1592,13 @@ class MainWindow:
             is_permanent = self.skill_permanent.get(skill_id, False)
             is_loop = self.skill_loop.get(skill_id, False)
             if is_permanent or is_loop:
-                self.active_windows[skill_id].restart_countdown()
+                self.active_windows[skill_id].restart_countdown(elapsed)
+                if record and self.skill_analytics:
+                    self.skill_analytics.record_trigger(skill_id, skill['cooldown'], player_name)
+            elif player_name:
+                self.active_windows[skill_id].restart_countdown(elapsed)  # 隊友重新施放只校正時間，不關閉視窗
             else:
-                self.active_windows[skill_id].close()
+                self.active_windows[skill_id].close()  # 自己再按一次：關閉（切換）
             return
         
         if skill_id not in self.window_order:
@@ -1177,11 +1607,51 @@ class MainWindow:
         position = self._calculate_position(skill_id)
         is_permanent = self.skill_permanent.get(skill_id, False)
         is_loop = self.skill_loop.get(skill_id, False)
+        alert_enabled = self.skill_alert_enabled.get(skill_id, False)
+        
+        # 🆕 有預建視窗時只需顯示並開始倒數
+        skill_window = self._prewarmed.pop(skill_id, None)
+        if skill_window:
+            skill_window.activate(
+                position, player,
+                is_permanent=is_permanent,
+                is_loop=is_loop,
+                alert_enabled=alert_enabled,
+                alert_before_seconds=self.alert_before_seconds,
+                enable_sound=self.enable_sound,
+                elapsed=elapsed
+            )
+        else:
+            skill_window = self._build_skill_window(
+                skill_id, player, position, is_permanent, is_loop, alert_enabled,
+                elapsed=elapsed
+            )
+        self.active_windows[skill_id] = skill_window
+        if record and self.skill_analytics:
+            self.skill_analytics.record_trigger(skill_id, skill['cooldown'], player_name)
+    
+    def _build_skill_window(self, skill_id, player, position, is_permanent=False,
+                            is_loop=False, alert_enabled=False, prewarm=False, elapsed=0):
+        """建立觸發用的技能視窗
+        
+        Args:
+            skill_id: 技能 ID
+            player: 玩家名稱
+            position: 視窗位置 (x, y)
+            is_permanent: 是否常駐
+            is_loop: 是否循環
+            alert_enabled: 是否啟用提前提示
+            prewarm: 是否建立為隱藏的預建視窗
+            elapsed: 觸發後已經過的秒數
+        
+        Returns:
+            SkillWindow 實例
+        """
+        skill = self.skill_manager.get_skill(skill_id)
         skill_image = self.skill_manager.skill_images.get(skill_id)
         skill_image_path = self.skill_manager.skill_image_paths.get(skill_id)  # 🆕 獲取圖片路徑
-        alert_enabled = self.skill_alert_enabled.get(skill_id, False)
         
-        skill_window = SkillWindow(
+        return SkillWindow(
             skill, player, position, skill_image,
             lambda w: self._on_window_close(w, skill_id),
             self.enable_sound, skill_id, 
@@ -1194,9 +1664,241 @@ class MainWindow:
             on_drag_motion=self._on_skill_drag_motion,
             on_drag_end=self._on_skill_drag_end,
             window_size=self.window_size,  # 🆕 傳遞視窗大小
-            skill_image_path=skill_image_path  # 🆕 傳遞圖片路徑
+            skill_image_path=skill_image_path,  # 🆕 傳遞圖片路徑
+            image_loader=self.skill_manager.load_icon_image,
+            prewarm=prewarm,
+            elapsed=elapsed,
+            on_event=self.timer_events.emit
         )
-        self.active_windows[skill_id] = skill_window
+    
+    # ==================== 🆕 預建技能視窗 ====================
+    
+    def _schedule_prewarm(self):
+        """背景預建有快捷鍵技能的隱藏視窗（保留仍有效的，移除不再需要的）"""
+        if not self._prewarm_ready:
+            return
+        
+        if self._prewarm_task:
+            self._prewarm_task.cancel()
+            self._prewarm_task = None
+        
+        wanted = []
+        if self.prewarm_windows:
+            wanted = [
+                skill_id for skill_id, skill in self.skill_manager.get_all_skills().items()
+                if skill.get('hotkey')
+            ]
+        
+        wanted_set = set(wanted)
+        for skill_id, window in list(self._prewarmed.items()):
+            if skill_id not in wanted_set or window.window_size != self.window_size:
+                del self._prewarmed[skill_id]
+                window.discard()
+        
+        missing = [
+            skill_id for skill_id in wanted
+            if skill_id not in self._prewarmed and skill_id not in self.active_windows
+        ]
+        if missing:
+            self._prewarm_task = self.scheduler.submit(
+                self._prewarm_windows_job(missing), priority=Priority.LOW
+            )
+    
+    def _prewarm_windows_job(self, skill_ids):
+        """每個工作單位預建一個隱藏視窗"""
+        for skill_id in skill_ids:
+            yield
+            if skill_id in self._prewarmed or skill_id in self.active_windows:
+                continue
+            self._prewarmed[skill_id] = self._build_skill_window(
+                skill_id, self.player_name, (0, 0), prewarm=True
+            )
+        self._prewarm_task = None
+    
+    def _discard_prewarmed(self):
+        """銷毀所有預建視窗"""
+        if self._prewarm_task:
+            self._prewarm_task.cancel()
+            self._prewarm_task = None
+        for window in self._prewarmed.values():
+            window.discard()
+        self._prewarmed = {}
+    
+    # ==================== 🆕 組隊房間 ====================
+    
+    def _show_room_dialog(self):
+        """顯示組隊房間對話框"""
+        from src.ui.dialogs import RoomDialog
+        from src.ui.room_discovery import RoomBrowser
+        
+        self.keyboard_enabled = False
+        
+        # 🆕 對話框開啟期間收聽區網房間廣播
+        browser = None
+        if not (self.room_client and self.room_client.room_code):
+            browser = RoomBrowser()
+            try:
+                browser.start()
+            except OSError as e:
+                print(f"⚠️ 無法收聽區網房間廣播: {e}")
+                browser = None
+        
+        dialog = RoomDialog(self.root, {
+            'player_name': self.player_name,
+            'host': self.room_host,
+            'port': self.room_port,
+            'room_code': self.room_client.room_code if self.room_client else None,
+            'members': self.room_members,
+            'browser': browser
+        })
+        result = dialog.show()
+        
+        if browser:
+            browser.stop()
+        
+        if result:
+            if result['action'] == 'leave':
+                self._leave_room()
+            else:
+                self.player_name = result['player_name']
+                if self.skill_analytics:
+                    self.skill_analytics.local_player = self.player_name
+                self.room_host = result['host']
+                self.room_port = result['port']
+                self.config_manager.set_settings('player_name', self.player_name)
+                self.config_manager.set_settings('room_host', self.room_host)
+                self.config_manager.set_settings('room_port', self.room_port)
+                self.config_manager.save()
+                
+                if result['action'] == 'create':
+                    self._create_room()
+                else:
+                    self._join_room(
+                        result['room_code'],
+                        result.get('discovered_host'), result.get('discovered_port')
+                    )
+        
+        self.keyboard_enabled = True
+    
+    def _create_room(self):
+        """在本機啟動房間伺服器並建立房間"""
+        from src.ui.room_server import RoomServer
+        
+        self._leave_room()
+        
+        server = RoomServer(port=self.room_port, announce=True)
+        try:
+            port = server.start_in_thread()
+        except Exception as e:
+            messagebox.showerror("錯誤", f"無法啟動房間伺服器: {e}", parent=self.root)
+            return
+        
+        self.room_server = server
+        self._connect_room_client().create_room(
+            '127.0.0.1', port, self.player_name, self.skill_manager.get_all_skills().keys()
+        )
+    
+    def _join_room(self, room_code, host=None, port=None):
+        """加入其他玩家的房間
+        
+        Args:
+            room_code: 房間代碼
+            host: 伺服器位址（區網探索到的房間），None 表示使用設定中的位址
+            port: 伺服器埠
+        """
+        self._leave_room()
+        self._connect_room_client().join_room(
+            host or self.room_host, port or self.room_port, room_code, self.player_name,
+            self.skill_manager.get_all_skills().keys()
+        )
+    
+    def _connect_room_client(self):
+        """建立房間客戶端並開始輪詢事件"""
+        from src.ui.room_client import RoomClient
+        
+        self.room_client = RoomClient()
+        self._room_poll_id = self.root.after(30, self._poll_room_events)
+        return self.room_client
+    
+    def _leave_room(self):
+        """離開房間（建立者同時關閉伺服器）"""
+        if self._room_poll_id:
+            self.root.after_cancel(self._room_poll_id)
+            self._room_poll_id = None
+        
+        if self.room_client:
+            self.room_client.leave()
+            self.room_client = None
+        
+        if self.room_server:
+            self.room_server.stop_in_thread()
+            self.room_server = None
+        
+        self.room_members = []
+        self._update_room_status()
+    
+    def _poll_room_events(self):
+        """取出房間事件並在 Tk 主執行緒處理"""
+        self._room_poll_id = None
+        if not self.room_client:
+            return
+        
+        for event in self.room_client.poll_events():
+            self._handle_room_event(event)
+            if not self.room_client:
+                return  # 事件處理中已離開房間
+        
+        self._room_poll_id = self.root.after(30, self._poll_room_events)
+    
+    def _handle_room_event(self, event):
+        """處理單一房間事件"""
+        event_type = event.get('type')
+        
+        if event_type == 'trigger':
+            # 🆕 以時鐘同步換算的觸發時間對齊倒數
+            elapsed = max(0.0, time.monotonic() - event['triggered_at'])
+            # 成員表尚未收到時沒有名稱，仍須視為隊友觸發
+            self._trigger_skill(
+                event['skill_id'], player_name=event.get('player') or '隊友', elapsed=elapsed, record=False
+            )  # 隊友的施放不計入自己的使用統計
+        elif event_type == 'timer':
+            self._apply_room_timer(event)
+        elif event_type in ('created', 'joined', 'members'):
+            self.room_members = event.get('members', [])
+            self._update_room_status()
+            if event_type == 'created':
+                print(f"🌐 已建立房間: {event['room']}")
+            elif event_type == 'joined':
+                print(f"🌐 已加入房間: {event['room']}")
+        elif event_type == 'error':
+            messagebox.showerror("房間", event.get('message', '未知錯誤'), parent=self.root)
+        elif event_type == 'disconnected':
+            print("🌐 已離開房間")
+            self._leave_room()
+    
+    def _apply_room_timer(self, event):
+        """套用房間快照中的計時器（加入房間或重新同步時；已開啟的視窗只校正時間，不會被關閉）"""
+        skill_id = event['skill_id']
+        elapsed = max(0.0, time.monotonic() - event['triggered_at'])
+        if not self.skill_manager.get_skill(skill_id):
+            return
+        
+        window = self.active_windows.get(skill_id)
+        if window:
+            window.restart_countdown(elapsed)
+        elif elapsed < event.get('cooldown', 0) or event.get('loop'):
+            self._trigger_skill(skill_id, player_name=event.get('player') or '隊友', elapsed=elapsed, record=False)
+    
+    def _update_room_status(self):
+        """更新標題列的房間狀態"""
+        if not hasattr(self, 'room_status_label'):
+            return
+        room_code = self.room_client.room_code if self.room_client else None
+        text = f"🌐 {room_code} ({len(self.room_members)}人)" if room_code else ""
+        try:
+            self.room_status_label.config(text=text)
+        except tk.TclError:
+            pass  # 主 UI 重建中
     
     def _calculate_position(self, skill_id):
         """計算技能視窗位置（從右往左、從上往下）"""
@@ -1227,14 +1929,17 @@ class MainWindow:
         if skill_id in self.window_order:
             self.window_order.remove(skill_id)
     
-        self._reposition_windows()
+        # 批次操作中由 _bulk_update_modes 統一排版
+        if not self._bulk_depth:
+            self._reposition_windows()
         
-        # 🆕 更新預覽框大小
+        # 🆕 補回已使用的預建視窗
+        self.scheduler.call_soon(self._schedule_prewarm, priority=Priority.LOW, name='prewarm_refill')
     
     def _on_key_press(self, key):
         """按鍵處理"""
         if self.waiting_for_hotkey is not None:
-            self._capture_hotkey(key)
+            self.root.after(0, self._capture_hotkey, key)  # 鍵盤監聽執行緒 → Tk 執行緒
             return
         
         if not self.keyboard_enabled:
@@ -1244,12 +1949,371 @@ class MainWindow:
             key_name = key.name if hasattr(key, 'name') else str(key.char)
             skill_id = self.skill_manager.get_skill_by_hotkey(key_name)
             if skill_id:
+                if self.session_recorder:
+                    self.session_recorder.hotkey(key_name)
                 self.root.after(0, self._trigger_skill, skill_id)
+                self._send_room_trigger(skill_id)
         except:
             pass
     
+    def _send_room_trigger(self, skill_id):
+        """同步給房間成員（可從鍵盤監聽執行緒呼叫）"""
+        room_client = self.room_client
+        if room_client:
+            skill = self.skill_manager.get_skill(skill_id)
+            room_client.send_trigger(
+                skill_id, skill.get('cooldown', 0), loop=self.skill_loop.get(skill_id, False)
+            )
+    
+    # ==================== 🆕 畫面 buff 偵測 ====================
+    
+    def _start_buff_detector(self):
+        """以技能圖示建立偵測器並開始擷取設定的螢幕區域"""
+        from src.ui.buff_detector import BuffDetector, ScreenBuffDetector
+        from PIL import Image
+        
+        if self.buff_detector or not self.buff_detector_region:
+            return
+        
+        templates = {}
+        for skill_id, skill in self.skill_manager.get_all_skills().items():
+            if skill.get('category') == 'boss':
+                continue  # 王的技能不會出現在 buff 列
+            icon_path = self.skill_manager.skill_image_paths.get(skill_id)
+            try:
+                templates[skill_id] = Image.open(icon_path)
+            except (OSError, TypeError):
+                pass
+        
+        try:
+            detector = BuffDetector(templates, prefilter=True)
+        except ImportError:
+            self.buff_detector_enabled = False
+            return
+        if not detector.skill_ids:
+            print("⚠️ 沒有可比對的技能圖示（全部為王的技能或純色/透明圖示），buff 偵測未啟動")
+            return
+        
+        self.buff_detector = ScreenBuffDetector(
+            detector, tuple(self.buff_detector_region),
+            on_appear=lambda skill_id: self.root.after(0, self._on_buff_detected, skill_id)
+        )
+        self.buff_detector.start()
+        print(f"🔍 buff 偵測已啟動：{len(detector.skill_ids)} 個圖示，區域 {self.buff_detector_region}")
+    
+    def _stop_buff_detector(self):
+        """停止畫面 buff 偵測"""
+        if self.buff_detector:
+            self.buff_detector.stop()
+            self.buff_detector = None
+    
+    def _show_perf_panel(self):
+        """顯示效能面板（不停用快捷鍵，面板開啟時仍可觀察偵測耗時）"""
+        from src.ui.dialogs import PerfStatsDialog
+        
+        PerfStatsDialog(self.root, self._collect_perf_stats).show()
+    
+    def _collect_perf_stats(self):
+        """收集效能面板的統計
+        
+        Returns:
+            [(區段標題, [(名稱, 數值文字), ...]), ...]
+        """
+        return [
+            ("🔍 畫面 buff 偵測", self._frame_stats_rows(self.buff_detector)),
+            ("🔢 冷卻數字辨識", self._frame_stats_rows(self.cooldown_reader)),
+        ]
+    
+    def _frame_stats_rows(self, screen_reader):
+        """螢幕擷取元件（ScreenBuffDetector / ScreenCooldownReader）的每幀耗時統計列"""
+        if not screen_reader:
+            return [("狀態", "未啟用")]
+        
+        summary = screen_reader.stats.summary()
+        kinds = summary['kinds']
+        rows = [
+            ("已處理幀數", f"{summary['frames']}"),
+            ("每幀 CPU（平均）", f"{summary['cpu_ms_per_frame']:.3f} ms"),
+            ("每幀 CPU（最近）", f"{summary['last_cpu_ms']:.3f} ms"),
+            ("畫面未變化比例", f"{summary['skipped_ratio'] * 100:.1f}%"),
+            ("變化方塊比例", f"{summary['changed_ratio'] * 100:.1f}%"),
+        ]
+        labels = {'skipped': "略過", 'partial': "部分比對", 'full': "全部比對"}
+        for kind, label in labels.items():
+            if kinds[kind]['frames']:
+                rows.append((f"{label}（{kinds[kind]['frames']} 幀）", f"{kinds[kind]['cpu_ms']:.3f} ms/幀"))
+        return rows
+    
+    def _on_buff_detected(self, skill_id):
+        """buff 新出現：已由快捷鍵觸發時以實際施放時間重新倒數，否則觸發並同步給房間"""
+        if not self.keyboard_enabled:
+            return  # 對話框開啟中
+        
+        window = self.active_windows.get(skill_id)
+        if window:
+            window.restart_countdown()
+            return
+        
+        self._trigger_skill(skill_id)
+        self._send_room_trigger(skill_id)
+    
+    # ==================== 🆕 冷卻數字辨識 ====================
+    
+    def _slot_names(self, slots):
+        """欄位的 skill_id 列表 → 技能名稱列表（設定對話框顯示用，空欄位為空字串）"""
+        skills = self.skill_manager.get_all_skills()
+        return [skills[skill_id]['name'] if skill_id in skills else '' for skill_id in slots]
+    
+    def _slot_skill_ids(self, names):
+        """技能名稱（或 skill_id）列表 → 欄位的 skill_id 列表（找不到的技能視為空欄位）"""
+        skills = self.skill_manager.get_all_skills()
+        by_name = {skill['name']: skill_id for skill_id, skill in skills.items()}
+        slots = []
+        for name in names:
+            skill_id = by_name.get(name, name if name in skills else None)
+            if name and skill_id is None:
+                print(f"⚠️ 冷卻數字辨識：找不到技能「{name}」，視為空欄位")
+            slots.append(skill_id)
+        return slots
+    
+    def _start_icon_index(self):
+        """於背景執行緒更新圖示雜湊快取並列出重複圖示與新圖片的建議"""
+        from src.ui.icon_hash import IconHashIndex, CACHE_FILENAME
+        
+        config_dir = os.path.dirname(os.path.abspath(resource_path('config.json')))
+        index = IconHashIndex(resource_path('images'), os.path.join(config_dir, 'cache', CACHE_FILENAME))
+        skills = self.config_manager.initial_skills + self.config_manager.initial_items
+        
+        def worker():
+            try:
+                index.refresh()
+                index.report(skills)
+            except Exception as e:
+                print(f"⚠️ 圖示雜湊索引失敗: {e}")
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def _start_cooldown_reader(self):
+        """以字形範本建立辨識器並開始擷取技能欄"""
+        from src.ui.cooldown_ocr import (
+            DigitRecognizer, ScreenCooldownReader, GLYPH_DIR, load_glyphs, render_glyphs
+        )
+        
+        if self.cooldown_reader or not self.cooldown_ocr_region or not any(self.cooldown_ocr_slots):
+            return
+        
+        # 優先使用從遊戲擷取的字形，沒有時以內建字型繪製
+        glyphs = load_glyphs(resource_path(GLYPH_DIR)) or render_glyphs()
+        try:
+            recognizer = DigitRecognizer(glyphs)
+        except ImportError:
+            self.cooldown_ocr_enabled = False
+            return
+        
+        self.cooldown_reader = ScreenCooldownReader(
+            recognizer, tuple(self.cooldown_ocr_region), self.cooldown_ocr_slots, self.cooldown_ocr_slot_size,
+            on_reading=lambda skill_id, remaining, read_at: self.root.after(
+                0, self._on_cooldown_read, skill_id, remaining, read_at
+            )
+        )
+        self.cooldown_reader.start()
+        print(f"🔢 冷卻數字辨識已啟動：{len(self.cooldown_reader.cells)} 個欄位，區域 {self.cooldown_ocr_region}")
+    
+    def _stop_cooldown_reader(self):
+        """停止冷卻數字辨識"""
+        if self.cooldown_reader:
+            self.cooldown_reader.stop()
+            self.cooldown_reader = None
+    
+    def _on_cooldown_read(self, skill_id, remaining, read_at):
+        """遊戲顯示的冷卻與技能視窗相差超過門檻時，以遊戲為準校正倒數
+        
+        Args:
+            skill_id: 技能 ID
+            remaining: 擷取當下的剩餘秒數
+            read_at: 擷取時間（time.monotonic()）
+        """
+        window = self.active_windows.get(skill_id)
+        if not window:
+            return
+        
+        left = window.time_left()
+        if left is None:
+            return
+        
+        remaining -= time.monotonic() - read_at  # 扣除背景執行緒到主執行緒的延遲
+        if abs(left - remaining) <= self.cooldown_ocr_threshold:
+            return
+        
+        window.resync(remaining)
+        skill = self.skill_manager.get_skill(skill_id)
+        print(f"🔢 {skill['name'] if skill else skill_id} 依遊戲冷卻校正：{left:.1f} → {remaining:.1f} 秒")
+    
+    # ==================== 🆕 外部巨集 IPC ====================
+    
+    def _start_ipc_server(self):
+        """啟動本機 IPC 伺服器（Unix domain socket，Windows 使用本機 TCP）"""
+        from src.ui.ipc_server import IpcServer, DEFAULT_SOCKET_PATH, unix_sockets_supported
+        
+        if self.ipc_server:
+            return
+        
+        server = IpcServer(
+            path=DEFAULT_SOCKET_PATH if unix_sockets_supported() else None,
+            port=self.ipc_port,
+            wakeup=lambda: self.root.after(0, self._process_ipc_commands)
+        )
+        try:
+            address = server.start_in_thread()
+        except (OSError, TimeoutError) as e:
+            print(f"⚠️ IPC 伺服器啟動失敗: {e}")
+            return
+        self.ipc_server = server
+        print(f"🔌 IPC 伺服器已啟動: {address}")
+    
+    def _stop_ipc_server(self):
+        """停止本機 IPC 伺服器"""
+        if self.ipc_server:
+            self.ipc_server.stop_in_thread()
+            self.ipc_server = None
+    
+    def _process_ipc_commands(self):
+        """處理 IPC 指令（Tk 主執行緒）"""
+        if self.ipc_server:
+            self.ipc_server.process_pending(self._handle_ipc_command)
+    
+    def _handle_ipc_command(self, command, argument):
+        """執行一個 IPC 指令（與快捷鍵走相同的觸發流程）
+        
+        Args:
+            command: trigger / reset / query / profile
+            argument: 技能 ID 或名稱（profile 為配置名稱）
+        
+        Returns:
+            回應字典
+        """
+        if command == 'query':
+            if not argument:
+                timers = {}
+                for skill_id, window in self.active_windows.items():
+                    left = window.time_left()
+                    if left is not None:
+                        timers[skill_id] = round(left, 3)
+                return {'timers': timers}
+            return {'remaining': self._ipc_time_left(self._ipc_skill_id(argument))}
+        
+        if not self.keyboard_enabled:
+            raise ValueError("設定視窗開啟中，暫不接受指令")
+        
+        if command == 'trigger':
+            skill_id = self._ipc_skill_id(argument)
+            self._trigger_skill(skill_id)
+            self._send_room_trigger(skill_id)
+            return {'remaining': self._ipc_time_left(skill_id)}
+        
+        if command == 'reset':
+            window = self.active_windows.get(self._ipc_skill_id(argument))
+            if window:
+                window.close()
+            return {}
+        
+        if command == 'profile':
+            if argument != self.current_profile_name:
+                self._switch_profile(argument)
+                print(f"✅ 已切換到配置 '{argument}'（IPC）")
+            return {'profile': self.current_profile_name}
+        
+        raise ValueError(f"未知的指令: {command}")
+    
+    def _switch_profile(self, name):
+        """切換到已保存的配置（找不到時拋出 LookupError）"""
+        self._flush_pending_saves()
+        profile_data = self.config_manager.load_profile(name)
+        if not profile_data:
+            raise LookupError(f"找不到配置: {name}")
+        self.config_manager.set_current_profile(name)
+        self._apply_profile(profile_data)
+    
+    def _ipc_skill_id(self, name):
+        """技能 ID 或名稱 → 技能 ID（找不到時拋出 LookupError）"""
+        skills = self.skill_manager.get_all_skills()
+        if name in skills:
+            return name
+        for skill_id, skill in skills.items():
+            if skill['name'] == name:
+                return skill_id
+        raise LookupError(f"找不到技能: {name}")
+    
+    def _ipc_time_left(self, skill_id):
+        """技能視窗的剩餘秒數（未在倒數時為 0）"""
+        window = self.active_windows.get(skill_id)
+        left = window.time_left() if window else None
+        return round(left, 3) if left is not None else 0.0
+    
+    # ==================== 🆕 串流疊加層 ====================
+    
+    def _start_overlay_server(self):
+        """啟動串流疊加層 HTTP 伺服器並訂閱計時器事件"""
+        from src.ui.overlay_server import OverlayServer, OVERLAY_PAGE
+        from src.ui.timer_events import EVENT_START
+        
+        if self.overlay_server:
+            return
+        
+        server = OverlayServer(resource_path(OVERLAY_PAGE), resource_path('images'), port=self.overlay_port)
+        try:
+            server.start_in_thread()
+        except (OSError, TimeoutError) as e:
+            print(f"⚠️ 疊加層伺服器啟動失敗: {e}")
+            return
+        self.overlay_server = server
+        self.timer_events.subscribe(server.publish)
+        
+        # 已在倒數的計時器先送一次狀態
+        for window in self.active_windows.values():
+            if window.running:
+                self.timer_events.emit(EVENT_START, window)
+        print(f"📺 串流疊加層: {server.url}")
+    
+    def _stop_overlay_server(self):
+        """停止串流疊加層"""
+        if self.overlay_server:
+            self.timer_events.unsubscribe(self.overlay_server.publish)
+            self.overlay_server.stop_in_thread()
+            self.overlay_server = None
+    
+    # ==================== 🆕 計時器共用記憶體 ====================
+    
+    def _start_timer_shm(self):
+        """建立計時器共用記憶體區段並訂閱計時器事件"""
+        from src.ui.timer_shm import TimerStateExporter
+        from src.ui.timer_events import EVENT_START, describe
+        
+        if self.timer_shm:
+            return
+        
+        try:
+            self.timer_shm = TimerStateExporter()
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 計時器共用記憶體建立失敗: {e}")
+            return
+        self.timer_events.subscribe(self.timer_shm.on_event)
+        for window in self.active_windows.values():
+            if window.running:
+                self.timer_shm.on_event(describe(EVENT_START, window))
+        print(f"🧩 計時器共用記憶體: {self.timer_shm.name}")
+    
+    def _stop_timer_shm(self):
+        """刪除計時器共用記憶體區段"""
+        if self.timer_shm:
+            self.timer_events.unsubscribe(self.timer_shm.on_event)
+            self.timer_shm.close()
+            self.timer_shm = None
+    
     def _start_keyboard_listener(self):
         """啟動鍵盤監聽"""
+        from pynput import keyboard
+        
         listener = keyboard.Listener(on_press=self._on_key_press)
         listener.daemon = True
         listener.start()
@@ -1259,6 +2323,164 @@ class MainWindow:
         self.config_manager.set_settings('skill_permanent', self.skill_permanent)
         self.config_manager.save()
     
+    def _start_timer_journal(self):
+        """🆕 開啟計時器日誌並讀出上次結束時仍在倒數的計時器"""
+        from src.ui.timer_journal import TimerJournal, JOURNAL_FILENAME, skill_key
+        
+        config_dir = os.path.dirname(os.path.abspath(resource_path('config.json')))
+        journal = TimerJournal(os.path.join(config_dir, 'cache', JOURNAL_FILENAME))
+        try:
+            timers = journal.open()
+        except OSError as e:
+            print(f"⚠️ 計時器日誌無法開啟: {e}")
+            return
+        
+        skill_ids = {skill_key(skill_id): skill_id for skill_id in self.skill_manager.get_all_skills()}
+        self._restored_timers = {
+            skill_ids[key]: timer for key, timer in timers.items() if key in skill_ids
+        }
+        self.timer_journal = journal
+        self.timer_events.subscribe(journal.on_event)
+        if self._restored_timers:
+            print(f"📒 計時器日誌: 恢復 {len(self._restored_timers)} 個計時器")
+    
+    def _stop_timer_journal(self):
+        """🆕 寫入剩餘的日誌紀錄並關閉"""
+        if self.timer_journal:
+            self.timer_events.unsubscribe(self.timer_journal.on_event)
+            self.timer_journal.close()
+            self.timer_journal = None
+    
+    def _start_skill_analytics(self):
+        """🆕 開始記錄技能使用統計（資料庫由背景執行緒開啟與寫入）"""
+        from src.ui.skill_analytics import SkillAnalytics, DATABASE_FILENAME
+        
+        if self.skill_analytics:
+            return
+        config_dir = os.path.dirname(os.path.abspath(resource_path('config.json')))
+        self.skill_analytics = SkillAnalytics(
+            os.path.join(config_dir, 'cache', DATABASE_FILENAME), local_player=self.player_name
+        )
+        self.skill_analytics.start(self.current_profile_name)
+        self.timer_events.subscribe(self.skill_analytics.on_event)
+    
+    def _stop_skill_analytics(self):
+        """🆕 寫入剩餘的統計事件並停止"""
+        if self.skill_analytics:
+            self.timer_events.unsubscribe(self.skill_analytics.on_event)
+            self.skill_analytics.stop()
+            self.skill_analytics = None
+    
+    def _show_analytics(self):
+        """🆕 顯示技能使用統計"""
+        from src.ui.dialogs import SkillAnalyticsDialog
+        
+        SkillAnalyticsDialog(self.root, self._collect_analytics_rows).show()
+    
+    def _collect_analytics_rows(self, scope):
+        """技能使用統計的表格列
+        
+        Args:
+            scope: 'session'（本場）或 'hour'（最近 1 小時）
+            
+        Returns:
+            [(技能名稱, 次數, 平均間隔/冷卻, 覆蓋率, 錯過), ...]，未啟用時返回 None
+        """
+        if not self.skill_analytics:
+            return None
+        
+        rows = []
+        for row in self.skill_analytics.summary(scope):
+            skill = self.skill_manager.get_skill(row['skill_id'])
+            name = skill['name'] if skill else row['skill_id']
+            if row['avg_gap'] is None:
+                gap = "-"
+            else:
+                gap = f"{row['avg_gap']:.0f}/{row['cooldown']:.0f}秒"
+            rows.append((name, f"{row['casts']}", gap, f"{row['uptime'] * 100:.0f}%", f"{row['missed']}"))
+        return rows
+    
+    def _start_session_recording(self):
+        """🆕 開始錄製快捷鍵、設定切換與配置切換（cache/sessions）"""
+        from src.ui.session_recorder import SessionRecorder
+        
+        if self.session_recorder:
+            return
+        config_dir = os.path.dirname(os.path.abspath(resource_path('config.json')))
+        path = os.path.join(config_dir, 'cache', 'sessions', time.strftime('session_%Y%m%d_%H%M%S.rec'))
+        try:
+            self.session_recorder = SessionRecorder(path)
+        except OSError as e:
+            print(f"⚠️ 無法開始錄製: {e}")
+            return
+        print(f"📼 操作錄製: {path}")
+    
+    def _stop_session_recording(self):
+        """🆕 結束錄製"""
+        if self.session_recorder:
+            self.session_recorder.close()
+            print(f"📼 已錄製 {self.session_recorder.count} 個事件")
+            self.session_recorder = None
+    
+    def start_replay(self, path, speed=1.0):
+        """🆕 主視窗顯示後重播錄製檔（main.py --replay），完成時印出每個事件的延遲
+        
+        Args:
+            path: 錄製檔路徑
+            speed: 重播倍速，None 表示最快速度
+        """
+        from src.ui.session_recorder import SessionReplayer, read_session, format_report
+        
+        _, events = read_session(path)
+        self._stop_session_recording()  # 重播的操作不再錄製
+        replayer = SessionReplayer(events, self, speed)
+        self.root.after_idle(lambda: replayer.run_tk(
+            self.root, on_done=lambda report: print(format_report(report))
+        ))
+        print(f"🎬 重播 {path}：{len(events)} 個事件，{'最快速度' if speed is None else f'{speed:g} 倍速'}")
+    
+    def replay_event(self, event, now):
+        """🆕 重播一個錄下的事件（SessionReplayer 的目標，Tk 主執行緒）"""
+        from src.ui.session_recorder import KIND_HOTKEY, KIND_SETTING, KIND_TOGGLE_ALL, KIND_PROFILE
+        
+        if event.kind == KIND_HOTKEY:
+            skill_id = self.skill_manager.get_skill_by_hotkey(event.name)
+            if skill_id:
+                self._trigger_skill(skill_id)
+        elif event.kind == KIND_SETTING:
+            setting_type, value = event.value
+            variables = {
+                'permanent': self.permanent_vars, 'loop': self.loop_vars, 'alert': self.alert_enabled_vars
+            }[setting_type]
+            var = variables.get(event.name) or tk.BooleanVar(value=value)
+            var.set(value)
+            if setting_type == 'alert':
+                self._update_alert_setting(event.name, var)
+            else:
+                self._update_skill_setting_exclusive(event.name, setting_type, var)
+        elif event.kind == KIND_TOGGLE_ALL:
+            self._toggle_all(event.value)
+        elif event.kind == KIND_PROFILE:
+            if event.name != self.current_profile_name:
+                self._switch_profile(event.name)
+    
+    def _on_close(self):
+        """關閉主視窗（先寫入延遲保存）"""
+        self._flush_pending_saves()
+        self._save_startup_snapshot()
+        self._leave_room()
+        self._stop_buff_detector()
+        self._stop_cooldown_reader()
+        self._stop_ipc_server()
+        self._stop_overlay_server()
+        self._stop_timer_shm()
+        self._stop_timer_journal()
+        self._stop_skill_analytics()
+        self._stop_session_recording()
+        self.skill_manager.shutdown()
+        self.root.destroy()
+    
     def run(self):
         """運行應用程式"""
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
         self.root.mainloop()
\ No newline at end of file
@@ -0,0 +1,302 @@
+"""
+串流疊加層伺服器
+內嵌的 HTTP 伺服器（asyncio，只使用標準函式庫），給 OBS 瀏覽器來源顯示進行中的計時器：
+
+    GET /               疊加層頁面（overlay/index.html）
+    GET /events         計時器事件串流（Server-Sent Events）
+    GET /icons/<檔名>    技能圖示
+
+事件只在計時器狀態改變時推送（start、tick、alert、finish、close，見 timer_events），
+連線時先送出一個 snapshot 事件包含所有進行中的計時器。
+同一次推送的事件只編碼一次，相同的位元組寫給所有連線中的瀏覽器，
+因此觀看的瀏覽器數量幾乎不增加成本。
+"""
+
+import asyncio
+import json
+import mimetypes
+import os
+import threading
+import time
+from urllib.parse import unquote, urlsplit
+
+from src.ui.timer_events import EVENT_CLOSE
+
+DEFAULT_OVERLAY_PORT = 8765
+OVERLAY_PAGE = os.path.join('overlay', 'index.html')
+EVENT_SNAPSHOT = 'snapshot'
+
+# 沒有事件時定期送出註解行，避免瀏覽器或代理把閒置連線視為中斷
+KEEPALIVE_INTERVAL = 15
+
+_STATUS_TEXT = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed', 400: 'Bad Request'}
+
+
+def encode_events(events):
+    """事件列表 → Server-Sent Events 位元組（每個事件一個 event/data 區塊）"""
+    return b''.join(
+        f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n".encode('utf-8')
+        for event in events
+    )
+
+
+class OverlayServer:
+    """串流疊加層 HTTP 伺服器
+
+    publish() 可從任何執行緒呼叫（通常是 Tk 主執行緒的計時器事件）：
+    事件先累積在列表中，只在列表由空變為非空時喚醒事件迴圈一次，
+    事件迴圈一次編碼所有累積的事件並寫給每個連線。
+    傳送緩衝區超過 max_buffer 的慢速連線直接中斷（瀏覽器的 EventSource 會自動重連並收到快照）。
+    """
+
+    def __init__(self, page_path, images_dir, host='127.0.0.1', port=DEFAULT_OVERLAY_PORT,
+                 max_buffer=256 * 1024, keepalive=KEEPALIVE_INTERVAL):
+        """初始化伺服器
+
+        Args:
+            page_path: 疊加層頁面檔案路徑
+            images_dir: 技能圖示目錄
+            host: 監聽位址（預設只接受本機連線）
+            port: 監聽埠（0 表示自動選擇）
+            max_buffer: 單一連線傳送緩衝區上限（位元組）
+            keepalive: 註解行的間隔秒數
+        """
+        self.page_path = page_path
+        self.images_dir = images_dir
+        self.host = host
+        self.port = port
+        self.max_buffer = max_buffer
+        self.keepalive = keepalive
+        self.timers = {}  # {skill_id: 最後一個事件}（只在事件迴圈執行緒修改）
+        self.stats = {'payloads': 0, 'events': 0, 'bytes': 0, 'dropped_clients': 0}
+        self._clients = set()  # 事件串流的 writer
+        self._connections = {}  # {task: writer}
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._page = None
+        self._icons = {}  # {檔名: bytes}
+        self._server = None
+        self._keepalive_task = None
+        self._loop = None
+        self._thread = None
+
+    @property
+    def url(self):
+        """疊加層網址（填入 OBS 瀏覽器來源）"""
+        return f"http://{self.host}:{self.port}/"
+
+    @property
+    def client_count(self):
+        """連線中的事件串流數"""
+        return len(self._clients)
+
+    # ==================== 啟動 / 停止 ====================
+
+    async def start(self):
+        """開始監聽（在目前的事件迴圈中）
+
+        Returns:
+            實際監聽的埠號
+        """
+        self._loop = asyncio.get_running_loop()
+        try:
+            with open(self.page_path, 'rb') as f:
+                self._page = f.read()
+        except OSError as e:
+            print(f"⚠️ 找不到疊加層頁面: {e}")
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.keepalive:
+            self._keepalive_task = self._loop.create_task(self._keepalive_loop())
+        return self.port
+
+    async def stop(self):
+        """停止監聽並關閉所有連線"""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections.values()):
+                writer.transport.abort()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    def start_in_thread(self, timeout=5):
+        """在背景執行緒中啟動事件迴圈
+
+        Returns:
+            實際監聽的埠號
+        """
+        ready = threading.Event()
+        result = {}
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                result['port'] = self._loop.run_until_complete(self.start())
+            except Exception as e:
+                result['error'] = e
+                ready.set()
+                self._loop.close()
+                return
+            ready.set()
+            try:
+                self._loop.run_forever()
+            finally:
+                self._loop.run_until_complete(self.stop())
+                self._loop.close()
+
+        self._thread = threading.Thread(target=run, name='OverlayServer', daemon=True)
+        self._thread.start()
+        if not ready.wait(timeout):
+            raise TimeoutError("疊加層伺服器啟動逾時")
+        if 'error' in result:
+            raise result['error']
+        return result['port']
+
+    def stop_in_thread(self):
+        """停止背景執行緒中的伺服器"""
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    # ==================== 事件推送 ====================
+
+    def publish(self, event):
+        """推送計時器事件（任何執行緒；TimerEvents 的訂閱者）"""
+        loop = self._loop
+        if loop is None:
+            return
+        with self._pending_lock:
+            self._pending.append(event)
+            if len(self._pending) > 1:
+                return  # 已經排定推送
+        try:
+            loop.call_soon_threadsafe(self._flush)
+        except RuntimeError:
+            pass  # 事件迴圈已關閉
+
+    def _flush(self):
+        """編碼累積的事件並寫給所有連線（事件迴圈執行緒）"""
+        with self._pending_lock:
+            events, self._pending = self._pending, []
+        if not events:
+            return
+
+        for event in events:
+            if event['type'] == EVENT_CLOSE:
+                self.timers.pop(event['skill_id'], None)
+            else:
+                self.timers[event['skill_id']] = event
+
+        if not self._clients:
+            return
+        payload = encode_events(events)
+        self.stats['payloads'] += 1
+        self.stats['events'] += len(events)
+        self._broadcast(payload)
+
+    def _broadcast(self, payload):
+        """相同的位元組寫給所有事件串流"""
+        for writer in list(self._clients):
+            if writer.transport.get_write_buffer_size() > self.max_buffer:
+                self._clients.discard(writer)
+                self.stats['dropped_clients'] += 1
+                writer.transport.abort()
+                continue
+            writer.write(payload)
+            self.stats['bytes'] += len(payload)
+
+    async def _keepalive_loop(self):
+        """定期送出註解行"""
+        while True:
+            await asyncio.sleep(self.keepalive)
+            if self._clients:
+                self._broadcast(b': keepalive\n\n')
+
+    def snapshot(self):
+        """目前所有計時器的快照事件（新連線的第一個事件）"""
+        return {'type': EVENT_SNAPSHOT, 'timers': list(self.timers.values()), 'time': time.time()}
+
+    # ==================== HTTP ====================
+
+    async def _handle_client(self, reader, writer):
+        """處理一條 HTTP 連線"""
+        self._connections[asyncio.current_task()] = writer
+        try:
+            try:
+                header = await reader.readuntil(b'\r\n\r\n')
+                method, target, _ = header.split(b'\r\n', 1)[0].decode('latin-1').split(' ', 2)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+                writer.write(_response(400, b'bad request'))
+                return
+
+            if method != 'GET':
+                writer.write(_response(405, b'method not allowed'))
+                return
+
+            path = unquote(urlsplit(target).path)
+            if path == '/events':
+                await self._serve_events(reader, writer)
+            elif path in ('/', '/index.html') and self._page is not None:
+                writer.write(_response(200, self._page, 'text/html; charset=utf-8'))
+            elif path.startswith('/icons/'):
+                icon = self._load_icon(path[len('/icons/'):])
+                if icon is None:
+                    writer.write(_response(404, b'not found'))
+                else:
+                    writer.write(_response(200, icon, mimetypes.guess_type(path)[0] or 'application/octet-stream'))
+            else:
+                writer.write(_response(404, b'not found'))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(writer)
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def _serve_events(self, reader, writer):
+        """事件串流：送出標頭與快照後加入廣播對象，直到瀏覽器中斷連線"""
+        writer.write(
+            b'HTTP/1.1 200 OK\r\n'
+            b'Content-Type: text/event-stream; charset=utf-8\r\n'
+            b'Cache-Control: no-cache\r\n'
+            b'Access-Control-Allow-Origin: *\r\n'
+            b'Connection: keep-alive\r\n\r\n'
+            b'retry: 1000\n\n'
+            + encode_events([self.snapshot()])
+        )
+        self._clients.add(writer)
+        while await reader.read(1024):
+            pass  # 瀏覽器不會再送資料，讀到 EOF 表示中斷
+
+    def _load_icon(self, name):
+        """讀取技能圖示（只允許圖示目錄內的檔名）"""
+        if name in self._icons:
+            return self._icons[name]
+        if not name or os.path.basename(name) != name or name.startswith('.'):
+            return None
+        try:
+            with open(os.path.join(self.images_dir, name), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        self._icons[name] = data
+        return data
+
+
+def _response(status, body, content_type='text/plain; charset=utf-8'):
+    """一般 HTTP 回應（回應後關閉連線）"""
+    return (
+        f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Cache-Control: no-cache\r\n"
+        f"Connection: close\r\n\r\n"
+    ).encode('latin-1') + body
@@ -0,0 +1,208 @@
+"""
+組隊房間通訊協定
+每個封包為 4 位元組長度（big-endian）＋ 1 位元組封包類型 ＋ 內容，避免 TCP 串流黏包或拆包
+
+封包類型：
+    FRAME_JSON      控制訊息（建立/加入房間、成員與技能表更新），內容為 UTF-8 JSON
+    FRAME_TRIGGERS  技能觸發批次（增量），內容為序號 ＋ 固定長度的 TRIGGER_RECORD 陣列
+    FRAME_SNAPSHOT  房間計時器快照，內容為序號 ＋ 主機時間 ＋ TRIGGER_RECORD 陣列
+
+技能 ID 與成員名稱只在加入房間時以 JSON 交換一次，之後觸發紀錄只傳索引。
+伺服器廣播的每個增量封包序號加一；加入房間或發現序號跳號時，客戶端以一個快照
+取得目前所有進行中的計時器，不需要重播歷史觸發。
+"""
+
+import asyncio
+import json
+import struct
+
+DEFAULT_PORT = 9999
+MAX_MESSAGE_SIZE = 64 * 1024
+
+# 伺服器與客戶端累積觸發紀錄的間隔（毫秒），同一間隔內的觸發合併成一個封包
+BATCH_INTERVAL_MS = 20
+
+_LENGTH = struct.Struct('>I')
+
+FRAME_JSON = 0
+FRAME_TRIGGERS = 1
+FRAME_SNAPSHOT = 2
+
+# 觸發紀錄：成員 ID、技能索引、觸發時間、冷卻毫秒數
+# 觸發時間為主機時鐘（房間伺服器啟動後的毫秒數），0 表示寄件者尚未完成時鐘同步
+# 冷卻欄位最高位元為循環旗標（循環計時器到期後自動重新開始）
+TRIGGER_RECORD = struct.Struct('<HHII')
+TRIGGER_LOOP_FLAG = 0x80000000
+MAX_COOLDOWN_MS = TRIGGER_LOOP_FLAG - 1
+
+# 增量封包標頭：序號（客戶端上傳的觸發固定為 0）
+DELTA_HEADER = struct.Struct('<I')
+# 快照封包標頭：快照對應的最後序號、產生快照時的主機時間（毫秒）
+SNAPSHOT_HEADER = struct.Struct('<II')
+MAX_TRIGGERS_PER_FRAME = (MAX_MESSAGE_SIZE - 1 - SNAPSHOT_HEADER.size) // TRIGGER_RECORD.size
+
+# 控制訊息類型
+MSG_CREATE = 'create'      # 客戶端 → 伺服器：建立房間 {player, skills}
+MSG_CREATED = 'created'    # 伺服器 → 客戶端：{room, member_id, members, skills}
+MSG_JOIN = 'join'          # 客戶端 → 伺服器：加入房間 {room, player, skills}
+MSG_JOINED = 'joined'      # 伺服器 → 客戶端：{room, member_id, members, skills}
+MSG_LEAVE = 'leave'        # 客戶端 → 伺服器：離開房間
+MSG_MEMBERS = 'members'    # 伺服器 → 房間成員：成員表 {members: [[id, name], ...]}
+MSG_SKILLS = 'skills'      # 伺服器 → 房間成員：技能表新增 {start, ids}
+MSG_ERROR = 'error'        # 伺服器 → 客戶端：{message}
+MSG_PING = 'ping'          # 客戶端 → 伺服器：時鐘同步 {t0}
+MSG_PONG = 'pong'          # 伺服器 → 客戶端：{t0, t1, t2}（主機時鐘，秒）
+MSG_RESYNC = 'resync'      # 客戶端 → 伺服器：序號跳號，要求重新送出快照
+
+# 客戶端解碼觸發紀錄後放入事件佇列的類型
+MSG_TRIGGER = 'trigger'    # {skill_id, player, triggered_at（本機單調時鐘）, cooldown, loop}
+MSG_TIMER = 'timer'        # 快照中的進行中計時器，欄位同 trigger（重複套用不會切換視窗）
+
+
+class ProtocolError(Exception):
+    """通訊協定錯誤（訊息過大或格式不符）"""
+
+
+def _frame(kind, body):
+    """加上長度前綴與封包類型"""
+    if len(body) + 1 > MAX_MESSAGE_SIZE:
+        raise ProtocolError(f"訊息過大: {len(body) + 1} bytes")
+    return _LENGTH.pack(len(body) + 1) + bytes((kind,)) + body
+
+
+def encode_message(message):
+    """將控制訊息編碼為一個封包
+
+    Args:
+        message: 訊息字典（需包含 type）
+
+    Returns:
+        bytes
+    """
+    body = json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return _frame(FRAME_JSON, body)
+
+
+def pack_cooldown(cooldown_ms, loop=False):
+    """將冷卻毫秒數與循環旗標合併成紀錄的冷卻欄位"""
+    cooldown_ms = min(max(0, int(cooldown_ms)), MAX_COOLDOWN_MS)
+    return cooldown_ms | TRIGGER_LOOP_FLAG if loop else cooldown_ms
+
+
+def unpack_cooldown(value):
+    """拆開紀錄的冷卻欄位
+
+    Returns:
+        (冷卻毫秒數, 是否循環)
+    """
+    return value & MAX_COOLDOWN_MS, bool(value & TRIGGER_LOOP_FLAG)
+
+
+def _pack_records(records):
+    """將觸發紀錄串接成 bytes"""
+    pack = TRIGGER_RECORD.pack
+    return b''.join(
+        pack(member_id, skill_index, min(timestamp_ms, 0xFFFFFFFF), cooldown)
+        for member_id, skill_index, timestamp_ms, cooldown in records
+    )
+
+
+def encode_triggers(records, seq=0):
+    """將觸發紀錄編碼為一個增量封包
+
+    Args:
+        records: [(member_id, skill_index, timestamp_ms, cooldown), ...]
+                 cooldown 為 pack_cooldown() 的結果
+        seq: 封包序號（伺服器廣播時遞增，客戶端上傳為 0）
+
+    Returns:
+        bytes
+    """
+    return _frame(FRAME_TRIGGERS, DELTA_HEADER.pack(seq) + _pack_records(records))
+
+
+def encode_snapshot(seq, now_ms, records):
+    """將房間目前的計時器編碼為一個快照封包
+
+    Args:
+        seq: 快照包含到的最後增量序號
+        now_ms: 產生快照時的主機時間（毫秒）
+        records: 同 encode_triggers
+
+    Returns:
+        bytes
+    """
+    return _frame(FRAME_SNAPSHOT, SNAPSHOT_HEADER.pack(seq, now_ms) + _pack_records(records))
+
+
+def _unpack_records(body):
+    """將 bytes 拆成觸發紀錄列表"""
+    if len(body) % TRIGGER_RECORD.size:
+        raise ProtocolError("觸發紀錄長度不符")
+    return list(TRIGGER_RECORD.iter_unpack(body))
+
+
+def decode_frame(payload):
+    """解碼封包內容
+
+    Args:
+        payload: 不含長度前綴的 bytes
+
+    Returns:
+        (FRAME_JSON, 訊息字典)
+        (FRAME_TRIGGERS, (seq, 觸發紀錄列表))
+        (FRAME_SNAPSHOT, (seq, now_ms, 觸發紀錄列表))
+    """
+    if not payload:
+        raise ProtocolError("空的封包")
+
+    kind, body = payload[0], payload[1:]
+    if kind == FRAME_JSON:
+        try:
+            message = json.loads(body.decode('utf-8'))
+        except (UnicodeDecodeError, ValueError) as e:
+            raise ProtocolError(f"無效的訊息: {e}")
+        if not isinstance(message, dict) or 'type' not in message:
+            raise ProtocolError("訊息缺少 type")
+        return kind, message
+
+    if kind == FRAME_TRIGGERS:
+        if len(body) < DELTA_HEADER.size:
+            raise ProtocolError("增量封包過短")
+        (seq,) = DELTA_HEADER.unpack_from(body)
+        return kind, (seq, _unpack_records(body[DELTA_HEADER.size:]))
+
+    if kind == FRAME_SNAPSHOT:
+        if len(body) < SNAPSHOT_HEADER.size:
+            raise ProtocolError("快照封包過短")
+        seq, now_ms = SNAPSHOT_HEADER.unpack_from(body)
+        return kind, (seq, now_ms, _unpack_records(body[SNAPSHOT_HEADER.size:]))
+
+    raise ProtocolError(f"未知的封包類型: {kind}")
+
+
+async def read_frame(reader):
+    """從 asyncio StreamReader 讀取一個封包
+
+    Args:
+        reader: asyncio.StreamReader
+
+    Returns:
+        (封包類型, 內容)，連線正常關閉時返回 None
+    """
+    try:
+        header = await reader.readexactly(_LENGTH.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise ProtocolError("連線在封包中途關閉")
+        return None
+
+    (length,) = _LENGTH.unpack(header)
+    if length > MAX_MESSAGE_SIZE:
+        raise ProtocolError(f"訊息過大: {length} bytes")
+
+    try:
+        payload = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        raise ProtocolError("連線在封包中途關閉")
+    return decode_frame(payload)
@@ -0,0 +1,348 @@
+"""
+組隊房間客戶端
+在背景執行緒執行 asyncio 連線，收到的事件放入執行緒安全的佇列，
+由 Tk 主執行緒以 after() 輪詢取出
+"""
+
+import asyncio
+import queue
+import threading
+import time
+
+from src.ui.clock_sync import ClockSync
+from src.ui.party_protocol import (
+    BATCH_INTERVAL_MS, FRAME_SNAPSHOT, FRAME_TRIGGERS, MAX_TRIGGERS_PER_FRAME,
+    ProtocolError, encode_message, encode_triggers, pack_cooldown, read_frame, unpack_cooldown,
+    MSG_CREATE, MSG_CREATED, MSG_JOIN, MSG_JOINED, MSG_LEAVE, MSG_SKILLS,
+    MSG_TRIGGER, MSG_TIMER, MSG_ERROR, MSG_PING, MSG_PONG, MSG_RESYNC,
+)
+
+# 客戶端自行產生的事件類型
+EVENT_DISCONNECTED = 'disconnected'
+
+# 時鐘同步：加入房間後先快速取樣，之後定期更新
+SYNC_BURST_COUNT = 5
+SYNC_BURST_INTERVAL = 0.2
+SYNC_INTERVAL = 2.0
+
+
+class RoomClient:
+    """組隊房間客戶端
+
+    所有公開方法都可以從任何執行緒呼叫（Tk 主執行緒、鍵盤監聽執行緒）。
+    伺服器訊息與連線狀態以字典形式放入 events 佇列；
+    技能表與成員表只在背景執行緒修改，觸發紀錄在該執行緒解碼成技能 ID 與玩家名稱。
+    加入房間時先收到計時器快照（timer 事件），之後依序號接收增量（trigger 事件），
+    序號跳號時要求伺服器重新送出快照。
+    """
+
+    def __init__(self, connect_timeout=5, batch_interval_ms=BATCH_INTERVAL_MS,
+                 clock=time.monotonic):
+        """初始化客戶端
+
+        Args:
+            connect_timeout: 連線逾時秒數
+            batch_interval_ms: 觸發紀錄合併送出的間隔（毫秒）
+            clock: 本機單調時鐘（秒），事件的 triggered_at 以此時鐘表示
+        """
+        self.connect_timeout = connect_timeout
+        self.batch_interval = batch_interval_ms / 1000
+        self.clock = clock
+        self.clock_sync = ClockSync(clock=clock)
+        self.events = queue.Queue()
+        self.room_code = None
+        self.member_id = None
+        self._loop = None
+        self._thread = None
+        self._writer = None
+        self._task = None
+
+        # 加入房間時由伺服器提供
+        self._skill_ids = []    # 索引 → 技能 ID
+        self._skill_index = {}  # 技能 ID → 索引
+        self._members = {}      # 成員 ID → 名稱
+
+        # 待送出的觸發 (skill_id, 冷卻欄位, 觸發時間)
+        self._outgoing = []
+        self._flush_handle = None
+        self._sync_task = None
+
+        # 增量序號：None 表示等待快照中
+        self._seq = None
+
+    @property
+    def connected(self):
+        """是否仍在連線中"""
+        return self._thread is not None and self._thread.is_alive()
+
+    # ==================== 公開方法 ====================
+
+    def create_room(self, host, port, player_name, skill_ids=()):
+        """連線並建立房間（結果以 created / error 事件通知）
+
+        Args:
+            host: 伺服器位址
+            port: 伺服器埠
+            player_name: 玩家名稱
+            skill_ids: 本機的技能 ID 列表（加入房間時交換一次技能表）
+        """
+        self._start(host, port, {
+            'type': MSG_CREATE, 'player': player_name, 'skills': list(skill_ids)
+        })
+
+    def join_room(self, host, port, room_code, player_name, skill_ids=()):
+        """連線並加入房間（結果以 joined / error 事件通知）"""
+        self._start(host, port, {
+            'type': MSG_JOIN, 'room': room_code.strip().upper(),
+            'player': player_name, 'skills': list(skill_ids)
+        })
+
+    def send_trigger(self, skill_id, cooldown=0, loop=False):
+        """廣播技能觸發（合併到下一個批次送出）
+
+        Args:
+            skill_id: 技能 ID
+            cooldown: 冷卻秒數
+            loop: 是否為循環計時器
+        """
+        event_loop = self._loop
+        if event_loop is None or event_loop.is_closed():
+            return
+        try:
+            event_loop.call_soon_threadsafe(
+                self._queue_trigger, skill_id, pack_cooldown(cooldown * 1000, loop), self.clock()
+            )
+        except RuntimeError:
+            pass  # 事件迴圈已關閉
+
+    def leave(self):
+        """離開房間並中斷連線"""
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._shutdown)
+            except RuntimeError:
+                pass  # 事件迴圈已關閉
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self._thread = None
+        self._loop = None
+        self.room_code = None
+
+    def poll_events(self):
+        """取出所有待處理事件（Tk 主執行緒呼叫）
+
+        Returns:
+            事件字典列表
+        """
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    # ==================== 背景執行緒 ====================
+
+    def _start(self, host, port, first_message):
+        """啟動背景執行緒與連線"""
+        if self.connected:
+            self.leave()
+
+        self.clock_sync = ClockSync(clock=self.clock)
+        self._seq = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, args=(self._loop, host, port, first_message),
+            name='RoomClient', daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, loop, host, port, first_message):
+        """背景執行緒主體"""
+        asyncio.set_event_loop(loop)
+        self._task = loop.create_task(self._session(host, port, first_message))
+        try:
+            loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.close()
+
+    async def _session(self, host, port, first_message):
+        """連線、送出第一則訊息，然後持續接收"""
+        try:
+            reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port), self.connect_timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            self.events.put({'type': MSG_ERROR, 'message': f"無法連線到 {host}:{port}: {e}"})
+            self.events.put({'type': EVENT_DISCONNECTED})
+            return
+
+        try:
+            self._writer.write(encode_message(first_message))
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+                kind, data = frame
+                if kind == FRAME_TRIGGERS:
+                    self._on_triggers(*data)
+                elif kind == FRAME_SNAPSHOT:
+                    self._on_snapshot(*data)
+                else:
+                    self._on_message(data)
+        except (ProtocolError, ConnectionError) as e:
+            self.events.put({'type': MSG_ERROR, 'message': f"連線中斷: {e}"})
+        finally:
+            if self._sync_task is not None:
+                self._sync_task.cancel()
+                self._sync_task = None
+            self._close_writer()
+            self.events.put({'type': EVENT_DISCONNECTED})
+
+    def _on_message(self, message):
+        """處理控制訊息：更新技能表與成員表，再轉交 Tk 主執行緒"""
+        msg_type = message['type']
+
+        if msg_type == MSG_PONG:
+            t3 = self.clock()
+            try:
+                self.clock_sync.add_sample(message['t0'], message['t1'], message['t2'], t3)
+            except (KeyError, TypeError):
+                pass
+            return  # 內部使用，不轉交
+        elif msg_type in (MSG_CREATED, MSG_JOINED):
+            self.room_code = message['room']
+            self.member_id = message['member_id']
+            self._skill_ids = list(message.get('skills', []))
+            self._skill_index = {skill_id: i for i, skill_id in enumerate(self._skill_ids)}
+            if self._sync_task is None:
+                self._sync_task = asyncio.get_running_loop().create_task(self._sync_loop())
+        elif msg_type == MSG_SKILLS:
+            for skill_id in message.get('ids', []):
+                self._skill_index[skill_id] = len(self._skill_ids)
+                self._skill_ids.append(skill_id)
+            return  # 內部使用，不轉交
+
+        if 'members' in message:
+            self._members = {member_id: name for member_id, name in message['members']}
+            message = dict(message, members=list(self._members.values()))
+
+        self.events.put(message)
+
+    def _on_triggers(self, seq, records):
+        """處理增量封包：檢查序號後將觸發紀錄解碼成事件"""
+        if self._seq is None:
+            return  # 等待快照中，快照已包含這些觸發
+        if seq != self._seq + 1:
+            # 跳號（伺服器因緩衝區過滿略過了封包），改以快照補齊
+            self._seq = None
+            self._write(encode_message({'type': MSG_RESYNC}))
+            return
+        self._seq = seq
+
+        received_at = self.clock()
+        for record in records:
+            # 尚未同步時鐘時只能以收到的時間為準
+            self._put_timer_event(MSG_TRIGGER, record, received_at, 0.0)
+
+    def _on_snapshot(self, seq, now_ms, records):
+        """處理快照：每個進行中的計時器產生一個 timer 事件，並從快照序號繼續接收增量"""
+        self._seq = seq
+        received_at = self.clock()
+        for record in records:
+            # 尚未同步時鐘時，以快照產生時的主機時間推算已經過的時間
+            age = max(0.0, (now_ms - record[2]) / 1000)
+            self._put_timer_event(MSG_TIMER, record, received_at, age)
+
+    def _put_timer_event(self, event_type, record, received_at, fallback_age):
+        """將一筆觸發紀錄轉成事件（略過自己送出的紀錄）
+
+        Args:
+            event_type: MSG_TRIGGER 或 MSG_TIMER
+            record: (member_id, skill_index, timestamp_ms, cooldown)
+            received_at: 收到封包的本機時間
+            fallback_age: 未同步時鐘時，觸發到收到封包之間的秒數
+        """
+        member_id, skill_index, timestamp_ms, cooldown = record
+        if member_id == self.member_id or skill_index >= len(self._skill_ids):
+            return
+
+        # 換算成本機時鐘
+        if self.clock_sync.synced:
+            triggered_at = min(received_at, self.clock_sync.local_time(timestamp_ms / 1000))
+        else:
+            triggered_at = received_at - fallback_age
+
+        cooldown_ms, loop = unpack_cooldown(cooldown)
+        cooldown_seconds = cooldown_ms / 1000
+        if loop and cooldown_seconds > 0:
+            # 循環計時器只保留目前這一輪的相位
+            cycles = (received_at - triggered_at) // cooldown_seconds
+            triggered_at += cycles * cooldown_seconds
+
+        self.events.put({
+            'type': event_type,
+            'skill_id': self._skill_ids[skill_index],
+            'player': self._members.get(member_id),
+            'triggered_at': triggered_at,
+            'cooldown': cooldown_seconds,
+            'loop': loop,
+        })
+
+    async def _sync_loop(self):
+        """定期送出 ping 以更新時鐘差估計"""
+        for _ in range(SYNC_BURST_COUNT):
+            self._write(encode_message({'type': MSG_PING, 't0': self.clock()}))
+            await asyncio.sleep(SYNC_BURST_INTERVAL)
+        while True:
+            self._write(encode_message({'type': MSG_PING, 't0': self.clock()}))
+            await asyncio.sleep(SYNC_INTERVAL)
+
+    def _queue_trigger(self, skill_id, cooldown, triggered_at):
+        """加入待送出的觸發（背景執行緒）"""
+        self._outgoing.append((skill_id, cooldown, triggered_at))
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.batch_interval, self._flush_triggers
+            )
+
+    def _flush_triggers(self):
+        """送出累積的觸發紀錄（背景執行緒）"""
+        self._flush_handle = None
+        outgoing, self._outgoing = self._outgoing, []
+
+        sync = self.clock_sync
+        records = [
+            (0, self._skill_index[skill_id],
+             max(1, int(sync.host_time(triggered_at) * 1000)) if sync.synced else 0,
+             cooldown)
+            for skill_id, cooldown, triggered_at in outgoing
+            if skill_id in self._skill_index
+        ]
+        for start in range(0, len(records), MAX_TRIGGERS_PER_FRAME):
+            self._write(encode_triggers(records[start:start + MAX_TRIGGERS_PER_FRAME]))
+
+    def _write(self, frame):
+        """寫入連線（背景執行緒）"""
+        if self._writer is not None and not self._writer.is_closing():
+            self._writer.write(frame)
+
+    def _shutdown(self):
+        """結束連線（背景執行緒）：已連線時先送出剩餘觸發與離開訊息再關閉，連線中則直接取消"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_triggers()
+
+        if self._writer is not None:
+            self._write(encode_message({'type': MSG_LEAVE}))
+            self._close_writer()
+        elif self._task is not None:
+            self._task.cancel()
+
+    def _close_writer(self):
+        """關閉連線（背景執行緒）"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
@@ -0,0 +1,264 @@
+"""
+區域網路房間探索
+房間伺服器定期在 UDP 多播群組廣播目前的房間（代碼、房主名稱、人數與埠號），
+客戶端收聽同一群組並維護一份會自動過期的房間表，加入房間時只需以代碼查表，不必輸入 IP
+（可獨立執行列出區網中的房間：python -m src.ui.room_discovery）
+"""
+
+import json
+import socket
+import struct
+import threading
+import time
+
+DISCOVERY_GROUP = '239.255.77.88'
+DISCOVERY_PORT = 9998
+ANNOUNCE_INTERVAL = 1.0   # 廣播間隔（秒）
+ROOM_EXPIRY = 3.5         # 超過此秒數沒有收到廣播即視為房間已關閉
+
+_MAGIC = b'STRK'
+_VERSION = 1
+MAX_DATAGRAM_SIZE = 1400  # 避免 IP 分段
+MAX_ROOMS_PER_ANNOUNCEMENT = 20
+
+
+class DiscoveryError(Exception):
+    """探索封包格式錯誤"""
+
+
+def encode_announcement(port, rooms):
+    """編碼一則房間廣播
+
+    Args:
+        port: 房間伺服器的 TCP 埠
+        rooms: [(room_code, host_name, member_count), ...]（空列表表示伺服器已關閉）
+
+    Returns:
+        bytes
+    """
+    rooms = list(rooms)[:MAX_ROOMS_PER_ANNOUNCEMENT]
+    while True:
+        body = json.dumps(
+            {'v': _VERSION, 'port': port, 'rooms': [list(room) for room in rooms]},
+            ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')
+        if len(body) + len(_MAGIC) <= MAX_DATAGRAM_SIZE or not rooms:
+            return _MAGIC + body
+        rooms = rooms[:-1]  # 名稱過長時減少房間數
+
+
+def decode_announcement(data):
+    """解碼房間廣播
+
+    Args:
+        data: 收到的 UDP 資料
+
+    Returns:
+        (port, [(room_code, host_name, member_count), ...])
+    """
+    if not data.startswith(_MAGIC):
+        raise DiscoveryError("不是房間廣播")
+    try:
+        message = json.loads(data[len(_MAGIC):].decode('utf-8'))
+        if message.get('v') != _VERSION:
+            raise DiscoveryError(f"不支援的版本: {message.get('v')}")
+        port = int(message['port'])
+        rooms = [(str(code).upper(), str(name), int(count)) for code, name, count in message['rooms']]
+    except (UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        raise DiscoveryError(f"無效的房間廣播: {e}")
+    if not 0 < port < 65536:
+        raise DiscoveryError(f"無效的埠號: {port}")
+    return port, rooms
+
+
+class DiscoveredRoom:
+    """探索到的房間"""
+
+    __slots__ = ('code', 'name', 'members', 'host', 'port', 'last_seen')
+
+    def __init__(self, code, name, members, host, port, last_seen):
+        self.code = code
+        self.name = name
+        self.members = members
+        self.host = host
+        self.port = port
+        self.last_seen = last_seen
+
+    def __repr__(self):
+        return f"DiscoveredRoom({self.code}, {self.name}, {self.host}:{self.port}, {self.members}人)"
+
+
+class RoomAnnouncer:
+    """房間廣播端（由房間伺服器持有，在任何執行緒呼叫 announce 皆可）"""
+
+    def __init__(self, group=DISCOVERY_GROUP, port=DISCOVERY_PORT, interface='0.0.0.0', ttl=1):
+        """初始化廣播端
+
+        Args:
+            group: 多播群組位址
+            port: 探索用 UDP 埠
+            interface: 送出多播的網路介面位址（測試時可用 127.0.0.1）
+            ttl: 多播封包存活跳數（1 表示不離開區網）
+        """
+        self.address = (group, port)
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self._sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+        self._sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        self._sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(interface))
+        self._sock.setblocking(False)
+
+    def announce(self, server_port, rooms):
+        """送出一則廣播
+
+        Args:
+            server_port: 房間伺服器的 TCP 埠
+            rooms: [(room_code, host_name, member_count), ...]
+        """
+        try:
+            self._sock.sendto(encode_announcement(server_port, rooms), self.address)
+        except OSError as e:
+            print(f"⚠️ 房間廣播失敗: {e}")
+
+    def close(self):
+        """關閉 socket"""
+        self._sock.close()
+
+
+class RoomBrowser:
+    """房間探索端：背景執行緒收聽廣播並維護房間表
+
+    房間以 (房間代碼) 為鍵；同一伺服器的每則廣播都是完整列表，
+    因此伺服器關閉房間後，下一則廣播即可將其移除，不需等待過期。
+    """
+
+    def __init__(self, group=DISCOVERY_GROUP, port=DISCOVERY_PORT, interface='0.0.0.0',
+                 expiry=ROOM_EXPIRY, clock=time.monotonic):
+        """初始化探索端
+
+        Args:
+            group: 多播群組位址
+            port: 探索用 UDP 埠
+            interface: 加入多播群組的網路介面位址
+            expiry: 房間過期秒數
+            clock: 時鐘函數（秒）
+        """
+        self.group = group
+        self.port = port
+        self.interface = interface
+        self.expiry = expiry
+        self.clock = clock
+        self._rooms = {}  # {room_code: DiscoveredRoom}
+        self._lock = threading.Lock()
+        self._sock = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """開始收聽（可重複呼叫）"""
+        if self._thread is not None:
+            return
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, 'SO_REUSEPORT'):
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            except OSError:
+                pass
+        sock.bind(('', self.port))
+        membership = struct.pack('4s4s', socket.inet_aton(self.group), socket.inet_aton(self.interface))
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        sock.settimeout(0.5)  # 定期檢查停止旗標
+
+        self._sock = sock
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='RoomBrowser', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止收聽"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=2)
+        self._thread = None
+        self._sock.close()
+        self._sock = None
+
+    def rooms(self):
+        """目前仍有效的房間（依房間代碼排序）
+
+        Returns:
+            DiscoveredRoom 列表
+        """
+        now = self.clock()
+        with self._lock:
+            for code in [code for code, room in self._rooms.items() if now - room.last_seen > self.expiry]:
+                del self._rooms[code]
+            return sorted(self._rooms.values(), key=lambda room: room.code)
+
+    def lookup(self, room_code):
+        """以房間代碼查詢伺服器位址
+
+        Returns:
+            (host, port)，找不到或已過期時返回 None
+        """
+        room_code = room_code.strip().upper()
+        now = self.clock()
+        with self._lock:
+            room = self._rooms.get(room_code)
+            if room is None or now - room.last_seen > self.expiry:
+                return None
+            return room.host, room.port
+
+    def _run(self):
+        """背景執行緒主體"""
+        while not self._stop.is_set():
+            try:
+                data, (host, _) = self._sock.recvfrom(MAX_DATAGRAM_SIZE + 64)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            try:
+                port, rooms = decode_announcement(data)
+            except DiscoveryError:
+                continue
+            self._update(host, port, rooms)
+
+    def _update(self, host, port, rooms):
+        """以一則廣播更新房間表"""
+        now = self.clock()
+        codes = {code for code, _, _ in rooms}
+        with self._lock:
+            # 同一伺服器不再列出的房間已關閉
+            for code, room in list(self._rooms.items()):
+                if room.host == host and room.port == port and code not in codes:
+                    del self._rooms[code]
+            for code, name, members in rooms:
+                self._rooms[code] = DiscoveredRoom(code, name, members, host, port, now)
+
+
+def main():
+    """列出區網中的房間"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="技能追蹤器 - 區網房間探索")
+    parser.add_argument('--interface', default='0.0.0.0', help="加入多播群組的網路介面位址")
+    parser.add_argument('--seconds', type=float, default=3.0, help="收聽秒數")
+    args = parser.parse_args()
+
+    browser = RoomBrowser(interface=args.interface)
+    browser.start()
+    time.sleep(args.seconds)
+    rooms = browser.rooms()
+    browser.stop()
+
+    if not rooms:
+        print("🔍 沒有找到房間")
+    for room in rooms:
+        print(f"🌐 {room.code}  {room.name}（{room.members}人）  {room.host}:{room.port}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,482 @@
+"""
+組隊房間伺服器
+以 asyncio 在單一執行緒處理所有連線：房間代碼對應房間，技能觸發廣播給同房間成員
+（可在主程式內以背景執行緒啟動，也可獨立執行：python -m src.ui.room_server）
+"""
+
+import asyncio
+import secrets
+import threading
+import time
+
+from src.ui.party_protocol import (
+    DEFAULT_PORT, BATCH_INTERVAL_MS, FRAME_JSON, FRAME_TRIGGERS, MAX_TRIGGERS_PER_FRAME,
+    ProtocolError, encode_message, encode_snapshot, encode_triggers, read_frame,
+    unpack_cooldown,
+    MSG_CREATE, MSG_CREATED, MSG_JOIN, MSG_JOINED, MSG_LEAVE,
+    MSG_MEMBERS, MSG_SKILLS, MSG_ERROR, MSG_PING, MSG_PONG, MSG_RESYNC,
+)
+
+# 房間代碼字元（去除容易混淆的 0/O、1/I）
+_CODE_ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+ROOM_CODE_LENGTH = 6
+
+
+class Member:
+    """房間成員（一條連線）"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.member_id = None
+        self.name = None
+        self.room = None
+
+
+class Room:
+    """房間"""
+
+    def __init__(self, code):
+        self.code = code
+        self.members = []
+        self.members_dirty = False  # 成員列表變更待廣播（同一輪事件合併成一則）
+        self.skill_ids = []         # 技能表：索引 → 技能 ID（只增不減）
+        self.skill_index = {}       # 技能 ID → 索引
+        self.pending = []           # 待廣播的觸發紀錄 (member_id, skill_index, timestamp_ms, cooldown)
+        self.flush_handle = None
+        self.seq = 0                # 最後一個已廣播增量封包的序號
+        self.timers = {}            # 進行中的計時器：(技能索引, member_id) → (timestamp_ms, cooldown)
+        self._next_member_id = 1
+
+    def new_member_id(self):
+        """分配成員 ID（房間內不重複使用）"""
+        member_id = self._next_member_id
+        self._next_member_id += 1
+        return member_id
+
+    def intern_skills(self, skill_ids):
+        """將技能 ID 加入技能表
+
+        Returns:
+            新增的技能 ID 列表
+        """
+        added = []
+        for skill_id in skill_ids:
+            if isinstance(skill_id, str) and skill_id not in self.skill_index:
+                self.skill_index[skill_id] = len(self.skill_ids)
+                self.skill_ids.append(skill_id)
+                added.append(skill_id)
+        return added
+
+    def apply_triggers(self, records):
+        """以觸發紀錄更新計時器表（同一成員的同一技能以最後一次觸發為準，不同成員各自保留）"""
+        timers = self.timers
+        for member_id, skill_index, timestamp_ms, cooldown in records:
+            timers[skill_index, member_id] = (timestamp_ms, cooldown)
+
+    def active_timers(self, now_ms):
+        """目前進行中的計時器（順便移除已到期的非循環計時器）
+
+        Args:
+            now_ms: 主機時間（毫秒）
+
+        Returns:
+            觸發紀錄列表 [(member_id, skill_index, timestamp_ms, cooldown), ...]（依觸發時間排序，
+            客戶端依序套用時同一技能以最近一次觸發為準）
+        """
+        records = []
+        for key, (timestamp_ms, cooldown) in list(self.timers.items()):
+            cooldown_ms, loop = unpack_cooldown(cooldown)
+            if not loop and timestamp_ms + cooldown_ms <= now_ms:
+                del self.timers[key]
+                continue
+            skill_index, member_id = key
+            records.append((member_id, skill_index, timestamp_ms, cooldown))
+        records.sort(key=lambda record: record[2])
+        return records
+
+    def remove_member_timers(self, member_id):
+        """移除成員擁有的計時器"""
+        for key in [key for key in self.timers if key[1] == member_id]:
+            del self.timers[key]
+
+    def member_table(self):
+        """成員表 [[member_id, name], ...]（依加入順序）"""
+        return [[member.member_id, member.name] for member in self.members]
+
+
+class RoomServer:
+    """asyncio 組隊房間伺服器
+
+    每條連線一個協程，不為連線建立執行緒。
+    廣播時只寫入各連線的傳送緩衝區，不逐一等待；
+    緩衝區超過 max_buffer 時，觸發增量封包直接略過（客戶端發現序號跳號後以快照補齊），
+    控制訊息則中斷該慢速客戶端，不會拖慢其他成員。
+
+    每個房間保留進行中計時器的表，新成員加入時只收到一個快照（大小與進行中計時器數成正比）。
+    """
+
+    def __init__(self, host='0.0.0.0', port=DEFAULT_PORT, max_buffer=256 * 1024,
+                 batch_interval_ms=BATCH_INTERVAL_MS, announce=False, discovery_options=None):
+        """初始化伺服器
+
+        Args:
+            host: 監聽位址
+            port: 監聽埠（0 表示自動選擇）
+            max_buffer: 單一連線傳送緩衝區上限（位元組）
+            batch_interval_ms: 觸發紀錄合併廣播的間隔（毫秒）
+            announce: 是否在區網多播廣播房間列表
+            discovery_options: 傳給 RoomAnnouncer 的參數（group, port, interface）
+        """
+        self.host = host
+        self.port = port
+        self.max_buffer = max_buffer
+        self.batch_interval = batch_interval_ms / 1000
+        self.announce = announce
+        self.discovery_options = discovery_options or {}
+        self._announcer = None
+        self._announce_task = None
+        self._epoch = time.monotonic()  # 主機時鐘起點
+        self.rooms = {}  # {room_code: Room}
+        self._connections = {}  # {task: writer}
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    # ==================== 啟動 / 停止 ====================
+
+    async def start(self):
+        """開始監聽（在目前的事件迴圈中）
+
+        Returns:
+            實際監聽的埠號
+        """
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.announce:
+            self._start_announcer()
+        return self.port
+
+    async def serve_forever(self):
+        """開始監聽並持續執行"""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        """停止監聽並關閉所有連線"""
+        self._stop_announcer()
+        if self._server is not None:
+            self._server.close()
+            # 中斷連線讓各協程自行結束（取消協程會讓 asyncio 記錄多餘的錯誤）
+            for writer in list(self._connections.values()):
+                writer.transport.abort()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    def start_in_thread(self, timeout=5):
+        """在背景執行緒中啟動事件迴圈（主程式建立房間時使用）
+
+        Args:
+            timeout: 等待監聽成功的秒數
+
+        Returns:
+            實際監聽的埠號
+        """
+        ready = threading.Event()
+        result = {}
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                result['port'] = self._loop.run_until_complete(self.start())
+            except Exception as e:
+                result['error'] = e
+                ready.set()
+                self._loop.close()
+                return
+            ready.set()
+            try:
+                self._loop.run_forever()
+            finally:
+                self._loop.run_until_complete(self.stop())
+                self._loop.close()
+
+        self._thread = threading.Thread(target=run, name='RoomServer', daemon=True)
+        self._thread.start()
+        if not ready.wait(timeout):
+            raise TimeoutError("房間伺服器啟動逾時")
+        if 'error' in result:
+            raise result['error']
+        return result['port']
+
+    def stop_in_thread(self):
+        """停止背景執行緒中的伺服器"""
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    # ==================== 區網廣播 ====================
+
+    def _start_announcer(self):
+        """開始定期廣播房間列表"""
+        from src.ui.room_discovery import RoomAnnouncer
+
+        try:
+            self._announcer = RoomAnnouncer(**self.discovery_options)
+        except OSError as e:
+            print(f"⚠️ 無法啟動房間廣播: {e}")
+            return
+        self._announce_task = asyncio.get_running_loop().create_task(self._announce_loop())
+
+    def _stop_announcer(self):
+        """停止廣播（送出空列表讓探索端立即移除房間）"""
+        if self._announce_task is not None:
+            self._announce_task.cancel()
+            self._announce_task = None
+        if self._announcer is not None:
+            self._announcer.announce(self.port, [])
+            self._announcer.close()
+            self._announcer = None
+
+    async def _announce_loop(self):
+        """每隔 ANNOUNCE_INTERVAL 秒廣播一次（沒有房間時只在剛變空時送一次空列表）"""
+        from src.ui.room_discovery import ANNOUNCE_INTERVAL
+
+        announced = False
+        while True:
+            rooms = self.room_list()
+            if rooms or announced:
+                self._announcer.announce(self.port, rooms)
+            announced = bool(rooms)
+            await asyncio.sleep(ANNOUNCE_INTERVAL)
+
+    def room_list(self):
+        """房間列表 [(room_code, 房主名稱, 人數), ...]（建立最久的房間在前）"""
+        return [
+            (room.code, room.members[0].name, len(room.members))
+            for room in self.rooms.values() if room.members
+        ]
+
+    # ==================== 連線處理 ====================
+
+    async def _handle_client(self, reader, writer):
+        """處理一條客戶端連線"""
+        member = Member(writer)
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+                kind, data = frame
+                if kind == FRAME_TRIGGERS:
+                    self._queue_triggers(member, data[1])
+                elif kind != FRAME_JSON:
+                    raise ProtocolError(f"客戶端不應傳送的封包類型: {kind}")
+                elif not self._dispatch(member, data):
+                    break
+        except ProtocolError as e:
+            print(f"⚠️ 房間連線錯誤: {e}")
+        except ConnectionError:
+            pass  # 客戶端直接斷線
+        finally:
+            self._connections.pop(task, None)
+            self._leave(member)
+            writer.close()
+
+    def _dispatch(self, member, message):
+        """處理一則控制訊息（decode_frame 已確認為含 type 的字典）
+
+        Returns:
+            是否繼續保持連線（欄位格式不符時拋出 ProtocolError）
+        """
+        msg_type = message['type']
+
+        if msg_type == MSG_PING:
+            now = self.host_time()
+            self._send(member, {'type': MSG_PONG, 't0': message.get('t0'), 't1': now, 't2': now})
+        elif msg_type == MSG_RESYNC:
+            if member.room is not None:
+                self._send_snapshot(member)
+        elif msg_type == MSG_CREATE:
+            if member.room is None:
+                room = Room(self._new_room_code())
+                self.rooms[room.code] = room
+                self._join(member, room, message, MSG_CREATED)
+                if self._announcer is not None:
+                    self._announcer.announce(self.port, self.room_list())  # 新房間立即可被探索
+        elif msg_type == MSG_JOIN:
+            room = self.rooms.get(str(message.get('room', '')).upper())
+            if room is None:
+                self._send(member, {'type': MSG_ERROR, 'message': '找不到房間'})
+            elif member.room is None:
+                self._join(member, room, message, MSG_JOINED)
+        elif msg_type == MSG_LEAVE:
+            return False
+        return True
+
+    def _join(self, member, room, message, reply_type):
+        """加入房間：合併技能表、分配成員 ID，並通知所有成員"""
+        skill_ids = message.get('skills') or []
+        if not isinstance(skill_ids, list):
+            raise ProtocolError("skills 必須是列表")
+        added = room.intern_skills(skill_ids)
+        if added and room.members:
+            self._broadcast(room, {
+                'type': MSG_SKILLS, 'start': len(room.skill_ids) - len(added), 'ids': added
+            })
+
+        member.member_id = room.new_member_id()
+        member.name = str(message.get('player') or '玩家')[:32]
+        member.room = room
+        room.members.append(member)
+        self._send(member, {
+            'type': reply_type, 'room': room.code, 'member_id': member.member_id,
+            'members': room.member_table(), 'skills': room.skill_ids
+        })
+        self._send_snapshot(member)
+        self._schedule_members(room)
+
+    def _leave(self, member):
+        """離開房間（房間沒人時刪除）"""
+        room = member.room
+        if room is None:
+            return
+        member.room = None
+        if member in room.members:
+            room.members.remove(member)
+        room.remove_member_timers(member.member_id)
+        if room.members:
+            self._schedule_members(room)
+        else:
+            if room.flush_handle is not None:
+                room.flush_handle.cancel()
+            self.rooms.pop(room.code, None)
+
+    def _schedule_members(self, room):
+        """排程廣播成員列表（多人同時加入/離開時只廣播一次）"""
+        if not room.members_dirty:
+            room.members_dirty = True
+            asyncio.get_running_loop().call_soon(self._flush_members, room)
+
+    def _flush_members(self, room):
+        """廣播成員列表"""
+        room.members_dirty = False
+        if room.members:
+            self._broadcast(room, {'type': MSG_MEMBERS, 'members': room.member_table()})
+
+    # ==================== 觸發批次 ====================
+
+    def _queue_triggers(self, member, records):
+        """收集觸發紀錄，於下一個批次間隔一起廣播"""
+        room = member.room
+        if room is None:
+            return
+
+        received_ms = max(1, int(self.host_time() * 1000))
+        skill_count = len(room.skill_ids)
+        for _, skill_index, timestamp_ms, cooldown in records:
+            if skill_index < skill_count:
+                # 寄件者尚未同步時鐘時，以收到的時間代替
+                room.pending.append((
+                    member.member_id, skill_index, timestamp_ms or received_ms, cooldown
+                ))
+
+        if room.pending and room.flush_handle is None:
+            room.flush_handle = asyncio.get_running_loop().call_later(
+                self.batch_interval, self._flush_triggers, room
+            )
+
+    def _flush_triggers(self, room):
+        """廣播累積的觸發紀錄（封包只編碼一次，寄件者自行略過自己的紀錄）"""
+        room.flush_handle = None
+        pending, room.pending = room.pending, []
+        if not pending or not room.members:
+            return
+
+        room.apply_triggers(pending)
+        for start in range(0, len(pending), MAX_TRIGGERS_PER_FRAME):
+            room.seq += 1
+            frame = encode_triggers(pending[start:start + MAX_TRIGGERS_PER_FRAME], room.seq)
+            for member in list(room.members):
+                self._write(member, frame, droppable=True)
+
+    def _send_snapshot(self, member):
+        """傳送房間目前的計時器快照（計時器過多時只保留最近觸發的部分）"""
+        room = member.room
+        now_ms = max(1, int(self.host_time() * 1000))
+        records = room.active_timers(now_ms)
+        if len(records) > MAX_TRIGGERS_PER_FRAME:
+            records = records[-MAX_TRIGGERS_PER_FRAME:]  # 已依觸發時間排序
+        self._write(member, encode_snapshot(room.seq, now_ms, records))
+
+    def host_time(self):
+        """主機時鐘（伺服器啟動後的秒數）"""
+        return time.monotonic() - self._epoch
+
+    def _new_room_code(self):
+        """產生未使用的房間代碼"""
+        while True:
+            code = ''.join(secrets.choice(_CODE_ALPHABET) for _ in range(ROOM_CODE_LENGTH))
+            if code not in self.rooms:
+                return code
+
+    # ==================== 傳送 ====================
+
+    def _broadcast(self, room, message, exclude=None):
+        """廣播給房間成員（訊息只編碼一次）"""
+        frame = encode_message(message)
+        for member in list(room.members):
+            if member is not exclude:
+                self._write(member, frame)
+
+    def _send(self, member, message):
+        """傳送給單一成員"""
+        self._write(member, encode_message(message))
+
+    def _write(self, member, frame, droppable=False):
+        """寫入傳送緩衝區，緩衝區過大時略過可捨棄的封包或斷開慢速客戶端
+
+        Args:
+            member: 房間成員
+            frame: 已編碼的封包
+            droppable: 是否可捨棄（觸發增量封包，客戶端會以快照補齊）
+        """
+        transport = member.writer.transport
+        if transport.is_closing():
+            return
+        if transport.get_write_buffer_size() > self.max_buffer:
+            if droppable:
+                return
+            print(f"⚠️ 房間成員 {member.name} 傳送緩衝區已滿，中斷連線")
+            transport.abort()
+            return
+        member.writer.write(frame)
+
+
+def main():
+    """獨立執行房間伺服器"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="技能追蹤器 - 組隊房間伺服器")
+    parser.add_argument('--host', default='0.0.0.0', help="監聽位址")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="監聽埠")
+    parser.add_argument('--no-announce', action='store_true', help="不在區網廣播房間")
+    args = parser.parse_args()
+
+    server = RoomServer(args.host, args.port, announce=not args.no_announce)
+    print(f"🌐 房間伺服器啟動於 {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
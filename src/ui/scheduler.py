@@ -0,0 +1,170 @@
+"""
+協作式任務排程模組
+在 Tk 主執行緒的閒置時間，以小片段執行生成器任務，避免長時間阻塞 UI
+"""
+
+import heapq
+import itertools
+import time
+
+
+class Priority:
+    """任務優先級（數值越小越優先）"""
+    HIGH = 0      # 即時工作：不受時間預算限制，下一個片段內執行完畢
+    NORMAL = 10   # UI 建立、技能視窗建立
+    LOW = 20      # 背景工作：圖片解碼、檔案寫入
+
+
+class ScheduledTask:
+    """排程中的任務（由 TaskScheduler.submit 返回）"""
+
+    def __init__(self, job, priority, name=None, on_done=None):
+        self.job = job
+        self.priority = priority
+        self.name = name
+        self.on_done = on_done
+        self.finished = False
+        self.result = None
+
+    def cancel(self):
+        """取消任務（尚未執行的片段不會再執行）"""
+        if not self.finished:
+            self.finished = True
+            self.job.close()
+
+
+class TaskScheduler:
+    """協作式任務排程器
+
+    任務是生成器：每次 yield 代表一個可中斷的工作單位。
+    每一幀只執行 frame_budget_ms 內的工作，剩餘的留到下一幀，
+    讓技能倒數（Tk 計時器）與使用者輸入能在片段之間優先處理。
+    """
+
+    def __init__(self, root, frame_budget_ms=8, frame_interval_ms=16):
+        """初始化排程器
+
+        Args:
+            root: Tk 根視窗
+            frame_budget_ms: 每幀可使用的時間預算（毫秒）
+            frame_interval_ms: 兩個片段之間的間隔（毫秒）
+        """
+        self.root = root
+        self.frame_budget_ms = frame_budget_ms
+        self.frame_interval_ms = frame_interval_ms
+
+        self._queue = []  # (priority, seq, task) 的最小堆積
+        self._seq = itertools.count()
+        self._named = {}
+        self._after_id = None
+
+    def submit(self, job, priority=Priority.NORMAL, name=None, on_done=None):
+        """提交生成器任務
+
+        Args:
+            job: 生成器物件
+            priority: 優先級（Priority 常量）
+            name: 任務名稱；同名任務尚未完成時直接返回既有任務（合併重複請求）
+            on_done: 完成回調，參數為生成器的返回值
+
+        Returns:
+            ScheduledTask 實例
+        """
+        if name is not None:
+            existing = self._named.get(name)
+            if existing and not existing.finished:
+                job.close()
+                return existing
+
+        task = ScheduledTask(job, priority, name, on_done)
+        if name is not None:
+            self._named[name] = task
+        heapq.heappush(self._queue, (priority, next(self._seq), task))
+        self._wake()
+        return task
+
+    def call_soon(self, func, *args, priority=Priority.NORMAL, name=None):
+        """將一般函數包裝成單步任務
+
+        Args:
+            func: 要執行的函數
+            *args: 函數參數
+            priority: 優先級
+            name: 任務名稱（用於合併重複請求）
+
+        Returns:
+            ScheduledTask 實例
+        """
+        def job():
+            yield
+            return func(*args)
+
+        return self.submit(job(), priority, name)
+
+    def is_pending(self, name):
+        """檢查指定名稱的任務是否尚未完成"""
+        task = self._named.get(name)
+        return bool(task and not task.finished)
+
+    def flush(self, name=None):
+        """立即同步執行完任務（例如關閉程式前寫入檔案）
+
+        Args:
+            name: 任務名稱，None 則執行所有任務
+        """
+        if name is not None:
+            task = self._named.get(name)
+            tasks = [task] if task else []
+        else:
+            tasks = [task for _, _, task in sorted(self._queue, key=lambda e: e[:2])]
+
+        for task in tasks:
+            while not task.finished:
+                self._step(task)
+
+    def _wake(self):
+        """確保有片段已排程"""
+        if self._after_id is None:
+            self._after_id = self.root.after_idle(self._run_slice)
+
+    def _run_slice(self):
+        """在時間預算內執行任務片段"""
+        self._after_id = None
+        start = time.perf_counter()
+        deadline = start + self.frame_budget_ms / 1000
+
+        while self._queue:
+            priority, _, task = self._queue[0]
+            if task.finished:
+                heapq.heappop(self._queue)
+                continue
+
+            if priority > Priority.HIGH and time.perf_counter() >= deadline:
+                break
+
+            self._step(task)
+
+        if self._queue:
+            elapsed_ms = int((time.perf_counter() - start) * 1000)
+            delay = max(1, self.frame_interval_ms - elapsed_ms)
+            self._after_id = self.root.after(delay, self._run_slice)
+
+    def _step(self, task):
+        """執行任務的一個工作單位"""
+        try:
+            next(task.job)
+            return
+        except StopIteration as e:
+            task.result = e.value
+        except Exception as e:
+            print(f"⚠️ 背景任務失敗 {task.name or task.job}: {e}")
+
+        task.finished = True
+        if task.name is not None and self._named.get(task.name) is task:
+            del self._named[task.name]
+
+        if task.on_done:
+            try:
+                task.on_done(task.result)
+            except Exception as e:
+                print(f"⚠️ 任務完成回調失敗 {task.name or task.job}: {e}")
@@ -0,0 +1,506 @@
+"""
+操作錄製與重播
+錄下快捷鍵觸發、技能設定切換與配置切換（單調時鐘時間戳），存成精簡的二進位檔，
+之後以虛擬時鐘用 1 倍、N 倍或最快速度重播，回報每個事件的延遲，
+讓實際遊玩時遇到的卡頓變成可重複的效能測試。
+
+檔案格式（little-endian）：
+    標頭 HEADER：'ASR1'、版本、錄製開始的 time.time()
+    事件 RECORD（8 位元組）：與上一個事件相隔的微秒數（uint32）、類型、值、字串編號
+    字串（按鍵名稱、技能 ID、配置名稱）第一次出現時先寫一筆 KIND_STRING 紀錄
+    （字串編號欄位為位元組長度，後接 UTF-8 內容），之後的事件只寫編號。
+
+重播目標：
+    HeadlessEngine   不建立 Tk 物件，以虛擬時鐘模擬計時器（python -m src.ui.session_recorder replay）
+    MainWindow       實際的 Tk 介面（python main.py --replay 檔案）
+"""
+
+import math
+import os
+import struct
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from src.ui.skill_manager import SkillManager
+
+MAGIC = b'ASR1'
+VERSION = 1
+HEADER = struct.Struct('<4sHd')
+RECORD = struct.Struct('<IBBH')
+
+KIND_STRING = 0
+KIND_HOTKEY = 1
+KIND_SETTING = 2
+KIND_TOGGLE_ALL = 3
+KIND_PROFILE = 4
+KIND_WAIT = 5  # 相隔超過 uint32 微秒（約 71 分鐘）時補上的空事件
+
+KIND_NAMES = {
+    KIND_HOTKEY: 'hotkey', KIND_SETTING: 'setting', KIND_TOGGLE_ALL: 'toggle_all', KIND_PROFILE: 'profile',
+}
+
+SETTING_TYPES = ('permanent', 'loop', 'alert')
+
+_MAX_DELTA = 0xFFFFFFFF
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_FLUSH_EVERY = 256
+
+SessionEvent = namedtuple('SessionEvent', ['time', 'kind', 'name', 'value'])
+"""錄下的事件：time 為錄製開始後的秒數；value 為設定的 (類型, 開關)、全選的類型，其餘為 None"""
+
+
+class SessionRecorder:
+    """操作錄製器
+
+    可從任何執行緒呼叫（快捷鍵在鍵盤監聽執行緒、設定在 Tk 主執行緒），
+    每個事件只在鎖內編碼並寫入有緩衝的檔案；累積 flush_every 個事件或
+    第一個未寫出的事件經過 flush_interval 秒後交給作業系統，
+    程式當機或被強制結束時最多遺失最後 flush_interval 秒的事件。
+    """
+
+    def __init__(self, path, flush_interval=DEFAULT_FLUSH_INTERVAL, flush_every=DEFAULT_FLUSH_EVERY):
+        """開始錄製
+
+        Args:
+            path: 錄製檔路徑（已存在時覆寫）
+            flush_interval: 未寫出的事件最多保留在緩衝區的秒數
+            flush_every: 累積多少個事件時立即寫出
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_every = flush_every
+        self.count = 0
+        self._lock = threading.Lock()
+        self._strings = {}
+        self._unflushed = 0
+        self._timer = None  # 等待寫出緩衝區的 threading.Timer
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, time.time()))
+        self._file.flush()
+        self._last = time.perf_counter_ns()
+
+    def hotkey(self, key_name):
+        """快捷鍵觸發"""
+        self._record(KIND_HOTKEY, 0, key_name)
+
+    def setting(self, skill_id, setting_type, value):
+        """技能設定切換
+
+        Args:
+            skill_id: 技能 ID
+            setting_type: 'permanent'、'loop' 或 'alert'
+            value: 開或關
+        """
+        self._record(KIND_SETTING, SETTING_TYPES.index(setting_type) << 1 | bool(value), skill_id)
+
+    def toggle_all(self, setting_type):
+        """全選切換"""
+        self._record(KIND_TOGGLE_ALL, SETTING_TYPES.index(setting_type), '')
+
+    def profile(self, name):
+        """切換配置"""
+        self._record(KIND_PROFILE, 0, name)
+
+    def close(self):
+        """結束錄製"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _flush(self):
+        """計時器到期：寫出緩衝區（在 Timer 執行緒）"""
+        with self._lock:
+            self._timer = None
+            if self._file is not None and self._unflushed:
+                self._file.flush()
+                self._unflushed = 0
+
+    def _record(self, kind, value, string):
+        """編碼並寫入一個事件"""
+        now = time.perf_counter_ns()
+        with self._lock:
+            if self._file is None:
+                return
+            delta = (now - self._last) // 1000
+            self._last = now
+            while delta > _MAX_DELTA:
+                self._file.write(RECORD.pack(_MAX_DELTA, KIND_WAIT, 0, 0))
+                delta -= _MAX_DELTA
+
+            index = self._strings.get(string)
+            if index is None:
+                index = self._strings[string] = len(self._strings)
+                encoded = string.encode('utf-8')
+                self._file.write(RECORD.pack(0, KIND_STRING, 0, len(encoded)) + encoded)
+            self._file.write(RECORD.pack(delta, kind, value, index))
+            self.count += 1
+
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self._file.flush()
+                self._unflushed = 0
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+
+def read_session(path):
+    """讀取錄製檔（忽略寫到一半的尾端）
+
+    Returns:
+        (錄製開始的 time.time(), [SessionEvent, ...])
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"不是錄製檔: {path}")
+    magic, version, started = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"不是錄製檔或版本不符: {path}")
+
+    strings = []
+    events = []
+    elapsed_us = 0
+    offset = HEADER.size
+    while offset + RECORD.size <= len(data):
+        delta, kind, value, index = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if kind == KIND_STRING:
+            if offset + index > len(data):
+                break
+            strings.append(data[offset:offset + index].decode('utf-8'))
+            offset += index
+            continue
+        elapsed_us += delta
+        if kind == KIND_WAIT:
+            continue
+        if kind == KIND_SETTING:
+            value = (SETTING_TYPES[value >> 1], bool(value & 1))
+        elif kind == KIND_TOGGLE_ALL:
+            value = SETTING_TYPES[value]
+        else:
+            value = None
+        events.append(SessionEvent(elapsed_us / 1e6, kind, strings[index], value))
+    return started, events
+
+
+# ==================== 重播 ====================
+
+class VirtualClock:
+    """重播用的虛擬時鐘
+
+    speed 為 None 時每個事件直接跳到它的時間（最快速度）；
+    否則虛擬時間 = 實際經過時間 × speed。
+    """
+
+    def __init__(self, speed=1.0):
+        self.speed = speed
+        self._start = time.perf_counter()
+        self._virtual = 0.0
+
+    def now(self):
+        """目前的虛擬時間（秒）"""
+        if self.speed is None:
+            return self._virtual
+        return (time.perf_counter() - self._start) * self.speed
+
+    def advance(self, virtual_time):
+        """最快速度時跳到指定的虛擬時間"""
+        self._virtual = max(self._virtual, virtual_time)
+
+    def due(self, virtual_time):
+        """虛擬時間對應的實際時間（perf_counter）"""
+        if self.speed is None:
+            return time.perf_counter()
+        return self._start + virtual_time / self.speed
+
+
+class SessionReplayer:
+    """以虛擬時鐘重播錄下的事件
+
+    目標物件需提供 replay_event(event, now)，now 為事件的虛擬時間。
+    每個事件的延遲 = 處理完成的時間 − 應該開始處理的時間，
+    包含處理本身的耗時以及前一個事件（或 Tk 事件迴圈中其他工作）造成的延後。
+    """
+
+    def __init__(self, events, target, speed=1.0):
+        """初始化重播
+
+        Args:
+            events: SessionEvent 列表
+            target: 重播目標（HeadlessEngine 或 MainWindow）
+            speed: 重播倍速，None 表示最快速度
+        """
+        self.events = events
+        self.target = target
+        self.speed = speed
+        self.latencies = {}  # {類型名稱: [秒, ...]}
+        self.errors = 0
+        self.clock = None
+        self._index = 0
+
+    def run(self):
+        """在目前的執行緒重播全部事件（阻塞）
+
+        Returns:
+            report() 的結果
+        """
+        self.clock = VirtualClock(self.speed)
+        for event in self.events:
+            due = self.clock.due(event.time)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self._dispatch(event, due)
+        return self.report()
+
+    def run_tk(self, root, on_done=None):
+        """在 Tk 事件迴圈中重播（每個事件以 after() 排程，不阻塞介面）
+
+        Args:
+            root: Tk 根視窗
+            on_done: 全部重播完成時呼叫，參數為 report() 的結果
+        """
+        self.clock = VirtualClock(self.speed)
+        self._index = 0
+
+        def step():
+            while self._index < len(self.events):
+                event = self.events[self._index]
+                due = self.clock.due(event.time)
+                wait = due - time.perf_counter()
+                if wait > 0:
+                    root.after(max(1, math.ceil(wait * 1000)), step)
+                    return
+                self._index += 1
+                self._dispatch(event, due)
+                if self.speed is None:
+                    root.after(0, step)  # 最快速度時仍讓 Tk 處理事件之間累積的工作
+                    return
+            if on_done:
+                on_done(self.report())
+
+        root.after(0, step)
+
+    def _dispatch(self, event, due):
+        """處理一個事件並記錄延遲"""
+        self.clock.advance(event.time)
+        try:
+            self.target.replay_event(event, self.clock.now())
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ 重播事件失敗 {KIND_NAMES[event.kind]} {event.name}: {e}")
+        self.latencies.setdefault(KIND_NAMES[event.kind], []).append(time.perf_counter() - due)
+
+    def report(self):
+        """延遲統計
+
+        Returns:
+            {'events', 'errors', 'kinds': {類型名稱: {'count', 'p50_ms', 'p99_ms', 'max_ms'}}}
+        """
+        kinds = {}
+        for kind, values in self.latencies.items():
+            values = sorted(values)
+            kinds[kind] = {
+                'count': len(values),
+                'p50_ms': values[len(values) // 2] * 1000,
+                'p99_ms': values[min(len(values) - 1, int(len(values) * 0.99))] * 1000,
+                'max_ms': values[-1] * 1000,
+            }
+        return {'events': sum(len(v) for v in self.latencies.values()), 'errors': self.errors, 'kinds': kinds}
+
+
+def format_report(report):
+    """延遲統計 → 文字"""
+    lines = [f"🎬 重播 {report['events']} 個事件（失敗 {report['errors']}）"]
+    for kind, stats in sorted(report['kinds'].items()):
+        lines.append(
+            f"   {kind:<11} {stats['count']:>6} 次  p50 {stats['p50_ms']:8.3f} ms  "
+            f"p99 {stats['p99_ms']:8.3f} ms  max {stats['max_ms']:8.3f} ms"
+        )
+    return '\n'.join(lines)
+
+
+# ==================== 無介面的重播目標 ====================
+
+class HeadlessEngine:
+    """不建立 Tk 物件的重播目標
+
+    技能表、快捷鍵查找與配置讀取使用實際的 ConfigManager / SkillManager，
+    計時器以虛擬時間模擬 MainWindow 的規則：
+    一般技能倒數中再按一次會關閉，常駐 / 循環技能重新倒數，循環技能結束後自動重新開始。
+    """
+
+    def __init__(self, config_path):
+        """初始化引擎
+
+        Args:
+            config_path: config.json 路徑
+        """
+        from src.ui.config_manager import ConfigManager
+
+        self.config_manager = ConfigManager(config_path)
+        self.skill_manager = HeadlessSkillManager(self.config_manager)
+        self._original_cooldowns = {
+            data['id']: data.get('cooldown')
+            for data in self.config_manager.initial_skills + self.config_manager.initial_items
+        }
+        self.skill_permanent = {}
+        self.skill_loop = {}
+        self.skill_alert_enabled = {}
+        self.timers = {}  # {skill_id: 結束的虛擬時間}
+        self.triggers = 0
+        profile_data = self.config_manager.load_profile(self.config_manager.get_current_profile())
+        self._apply_profile(profile_data or {})
+
+    def replay_event(self, event, now):
+        """處理一個重播事件"""
+        if event.kind == KIND_HOTKEY:
+            skill_id = self.skill_manager.get_skill_by_hotkey(event.name)
+            if skill_id:
+                self._trigger(skill_id, now)
+        elif event.kind == KIND_SETTING:
+            self._set_mode(event.name, *event.value, now=now)
+        elif event.kind == KIND_TOGGLE_ALL:
+            self._toggle_all(event.value, now)
+        elif event.kind == KIND_PROFILE:
+            profile_data = self.config_manager.load_profile(event.name)
+            if not profile_data:
+                raise LookupError(f"找不到配置: {event.name}")
+            self._apply_profile(profile_data)
+            self.timers = {}
+
+    def active_timers(self, now):
+        """虛擬時間 now 仍在倒數的計時器 {skill_id: 剩餘秒數}"""
+        active = {}
+        for skill_id, end_time in self.timers.items():
+            cooldown = self.skill_manager.get_skill(skill_id)['cooldown']
+            if self.skill_loop.get(skill_id) and cooldown:
+                remaining = (end_time - now) % cooldown
+            else:
+                remaining = end_time - now
+            if remaining > 0:
+                active[skill_id] = remaining
+        return active
+
+    def _trigger(self, skill_id, now):
+        """對應 MainWindow._trigger_skill"""
+        self.triggers += 1
+        skill = self.skill_manager.get_skill(skill_id)
+        if skill_id in self.timers:
+            if self.skill_permanent.get(skill_id) or self.skill_loop.get(skill_id):
+                self.timers[skill_id] = now + skill['cooldown']
+            elif now < self.timers[skill_id] + 2:  # 結束後視窗保留 2 秒
+                del self.timers[skill_id]
+                return
+        self.timers[skill_id] = now + skill['cooldown']
+
+    def _set_mode(self, skill_id, setting_type, value, now):
+        """對應 MainWindow._update_skill_setting_exclusive / _update_alert_setting"""
+        if setting_type == 'alert':
+            self.skill_alert_enabled[skill_id] = value
+            return
+        other = self.skill_loop if setting_type == 'permanent' else self.skill_permanent
+        modes = self.skill_permanent if setting_type == 'permanent' else self.skill_loop
+        if value and other.get(skill_id):
+            other[skill_id] = False
+            self.timers.pop(skill_id, None)
+        modes[skill_id] = value
+        if not value:
+            self.timers.pop(skill_id, None)
+        elif skill_id not in self.timers:
+            skill = self.skill_manager.get_skill(skill_id)
+            self.timers[skill_id] = now + (skill['cooldown'] if setting_type == 'loop' else 0)
+
+    def _toggle_all(self, setting_type, now):
+        """對應 MainWindow._toggle_all"""
+        settings = {'permanent': self.skill_permanent, 'loop': self.skill_loop, 'alert': self.skill_alert_enabled}
+        value = not all(settings[setting_type].get(sid, False) for sid in self.skill_manager.get_all_skills())
+        for skill_id in self.skill_manager.get_all_skills():
+            if value or settings[setting_type].get(skill_id, False):
+                self._set_mode(skill_id, setting_type, value, now)
+
+    def _apply_profile(self, profile_data):
+        """對應 MainWindow._apply_profile（只套用快捷鍵、秒數與模式）"""
+        for skill_id, skill in self.skill_manager.get_all_skills().items():
+            original_cooldown = self._original_cooldowns.get(skill_id)
+            if original_cooldown:
+                skill['cooldown'] = original_cooldown
+            skill['hotkey'] = ''
+        for skill_id, hotkey in profile_data.get('hotkeys', {}).items():
+            skill = self.skill_manager.get_skill(skill_id)
+            if skill:
+                skill['hotkey'] = hotkey
+        for skill_id, cooldown in profile_data.get('cooldown_overrides', {}).items():
+            skill = self.skill_manager.get_skill(skill_id)
+            if skill:
+                skill['cooldown'] = cooldown
+        self.skill_permanent = profile_data.get('permanent', {}).copy()
+        self.skill_loop = profile_data.get('loop', {}).copy()
+        self.skill_alert_enabled = profile_data.get('alert_enabled', {}).copy()
+
+
+class HeadlessSkillManager(SkillManager):
+    """只載入技能表的 SkillManager（不載入圖示、不建立 Tk 物件）"""
+
+    def __init__(self, config_manager):
+        self.config_manager = config_manager
+        self.skills = {}
+        self.skill_categories = {}
+        self._pending_icons = []
+        self._load_skills()
+
+
+# ==================== 命令列 ====================
+
+def parse_speed(text):
+    """'max' → None，其餘為倍速"""
+    if text.lower() in ('max', '0'):
+        return None
+    speed = float(text)
+    if speed <= 0:
+        raise ValueError("倍速必須大於 0")
+    return speed
+
+
+def main(argv=None):
+    """命令列：查看錄製檔或以無介面引擎重播"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="操作錄製檔工具")
+    sub = parser.add_subparsers(dest='command', required=True)
+    show = sub.add_parser('show', help="列出錄下的事件")
+    show.add_argument('path')
+    replay = sub.add_parser('replay', help="以無介面引擎重播並回報延遲")
+    replay.add_argument('path')
+    replay.add_argument('--speed', default='max', help="倍速（1、4…）或 max（預設）")
+    replay.add_argument('--config', default='config.json', help="config.json 路徑")
+    replay.add_argument('--json', action='store_true', help="以 JSON 輸出延遲統計")
+    args = parser.parse_args(argv)
+
+    started, events = read_session(args.path)
+    if args.command == 'show':
+        print(f"📼 {args.path}：{len(events)} 個事件，錄製於 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started))}")
+        for event in events:
+            value = '' if event.value is None else f" {event.value}"
+            print(f"   {event.time:10.3f}s  {KIND_NAMES[event.kind]:<11} {event.name}{value}")
+        return 0
+
+    replayer = SessionReplayer(events, HeadlessEngine(args.config), parse_speed(args.speed))
+    report = replayer.run()
+    print(json.dumps(report, ensure_ascii=False, indent=2) if args.json else format_report(report))
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""
+技能使用統計
+記錄每個技能的施放次數、施放間隔與冷卻的比較、buff 覆蓋率，以及錯過的補 buff
+（計時器結束後 missed_grace 秒內沒有再次觸發），寫入 SQLite 資料庫。
+
+熱路徑（_trigger_skill、計時器事件）只把原始事件放入佇列；
+背景執行緒計算間隔與覆蓋時間，更新記憶體中的本場與最近 1 小時統計，
+並每 flush_interval 秒以一個交易批次寫入資料庫。
+"""
+
+import collections
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from src.ui.timer_events import EVENT_FINISH
+
+DATABASE_FILENAME = 'skill_analytics.db'
+
+KIND_CAST = 1
+KIND_FINISH = 2
+KIND_MISSED = 3
+
+SCOPE_SESSION = 'session'
+SCOPE_HOUR = 'hour'
+
+DEFAULT_WINDOW = 3600
+DEFAULT_MISSED_GRACE = 3.0
+DEFAULT_RETENTION_DAYS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    profile TEXT
+);
+CREATE TABLE IF NOT EXISTS events (
+    session INTEGER NOT NULL,
+    time REAL NOT NULL,
+    kind INTEGER NOT NULL,
+    skill_id TEXT NOT NULL,
+    player TEXT,
+    cooldown REAL,
+    gap REAL,
+    covered REAL
+);
+CREATE INDEX IF NOT EXISTS events_time ON events (time);
+"""
+
+
+class _Aggregate:
+    """單一技能的累計值（可加可減，最近 1 小時的統計移出舊事件時扣回）"""
+
+    __slots__ = ('casts', 'gap_sum', 'gaps', 'covered', 'missed', 'cooldown')
+
+    def __init__(self):
+        self.casts = 0
+        self.gap_sum = 0.0
+        self.gaps = 0
+        self.covered = 0.0
+        self.missed = 0
+        self.cooldown = 0.0
+
+    def add(self, row, sign=1):
+        """加入（sign=1）或移除（sign=-1）一筆事件"""
+        _, kind, _, _, cooldown, gap, covered = row
+        if kind == KIND_CAST:
+            self.casts += sign
+            if sign > 0:
+                self.cooldown = cooldown
+            if gap is not None:
+                self.gap_sum += sign * gap
+                self.gaps += sign
+                self.covered += sign * covered
+        elif kind == KIND_MISSED:
+            self.missed += sign
+
+
+class SkillAnalytics:
+    """技能使用統計
+
+    record_trigger() 與 on_event() 可在 Tk 主執行緒呼叫（只放入佇列），
+    summary() 讀取記憶體中的統計（與背景執行緒以鎖同步，不查詢資料庫）。
+    """
+
+    def __init__(self, db_path, window=DEFAULT_WINDOW, missed_grace=DEFAULT_MISSED_GRACE,
+                 flush_interval=1.0, batch_size=512, local_player=None,
+                 retention_days=DEFAULT_RETENTION_DAYS):
+        """初始化統計
+
+        Args:
+            db_path: SQLite 資料庫路徑
+            window: 滾動統計的秒數（預設 1 小時）
+            missed_grace: 計時器結束後多少秒內再次觸發不算錯過
+            flush_interval: 批次寫入資料庫的間隔秒數
+            batch_size: 累積超過此筆數時提前寫入
+            local_player: 本機玩家名稱（隊友的計時器結束不計入錯過的補 buff）
+            retention_days: 開啟時刪除超過此天數的事件與場次（None 表示全部保留）
+        """
+        self.db_path = db_path
+        self.local_player = local_player
+        self.retention_days = retention_days
+        self.window = window
+        self.missed_grace = missed_grace
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.stats = {'events': 0, 'batches': 0}
+        self.session_id = None
+        self.session_start = None
+        self._history_start = None  # 滾動統計最早的事件時間（含先前場次）
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._session = collections.defaultdict(_Aggregate)
+        self._hour = collections.defaultdict(_Aggregate)
+        self._recent = collections.deque()  # 最近 window 秒的事件列（時間排序）
+        self._last_cast = {}  # {skill_id: (時間, 冷卻秒數)}
+        self._finished = {}  # {skill_id: (結束時間, 冷卻秒數, 玩家)}，等待再次觸發
+        self._thread = None
+
+    # ==================== 開始 / 停止 ====================
+
+    def start(self, profile=None):
+        """開始新的一場統計（背景執行緒開啟資料庫）
+
+        Args:
+            profile: 目前的配置名稱（記錄在 sessions 表）
+        """
+        if self._thread is not None:
+            return
+        self.session_start = self._history_start = time.time()
+        self._thread = threading.Thread(
+            target=self._run, args=(profile,), name='SkillAnalytics', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """寫入剩餘事件並停止背景執行緒"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    # ==================== 熱路徑 ====================
+
+    def record_trigger(self, skill_id, cooldown, player=None):
+        """記錄一次技能觸發（只放入佇列）"""
+        self._queue.put((KIND_CAST, time.time(), skill_id, player, cooldown))
+
+    def on_event(self, event):
+        """TimerEvents 訂閱者：記錄自己的非循環計時器的結束（只放入佇列）"""
+        if event['type'] == EVENT_FINISH and not event.get('loop') and (
+            event.get('player') in (None, self.local_player)
+        ):
+            self._queue.put((KIND_FINISH, time.time(), event['skill_id'], event.get('player'),
+                             event.get('total')))
+
+    # ==================== 統計 ====================
+
+    def summary(self, scope=SCOPE_SESSION, now=None):
+        """各技能的統計（依施放次數排序）
+
+        Args:
+            scope: SCOPE_SESSION（本場）或 SCOPE_HOUR（最近 window 秒）
+            now: 目前時間（測試用）
+
+        Returns:
+            [{'skill_id', 'casts', 'avg_gap', 'cooldown', 'gap_ratio', 'uptime', 'missed'}, ...]
+        """
+        now = time.time() if now is None else now
+        if self.session_start is None:
+            return []
+        span = now - self.session_start
+        with self._lock:
+            if scope == SCOPE_HOUR:
+                self._expire(now)
+                aggregates = self._hour
+                span = min(self.window, now - self._history_start)
+            else:
+                aggregates = self._session
+            rows = []
+            for skill_id, aggregate in aggregates.items():
+                if not aggregate.casts and not aggregate.missed:
+                    continue
+                covered = aggregate.covered
+                last = self._last_cast.get(skill_id)
+                if last is not None:
+                    covered += min(now - last[0], last[1])  # 最後一次施放目前為止的覆蓋時間
+                avg_gap = aggregate.gap_sum / aggregate.gaps if aggregate.gaps else None
+                cooldown = aggregate.cooldown
+                rows.append({
+                    'skill_id': skill_id,
+                    'casts': aggregate.casts,
+                    'avg_gap': avg_gap,
+                    'cooldown': cooldown,
+                    'gap_ratio': avg_gap / cooldown if avg_gap is not None and cooldown else None,
+                    'uptime': min(1.0, covered / span) if span > 0 else 0.0,
+                    'missed': aggregate.missed,
+                })
+        rows.sort(key=lambda row: (-row['casts'], row['skill_id']))
+        return rows
+
+    # ==================== 背景執行緒 ====================
+
+    def _run(self, profile):
+        """背景執行緒：處理佇列並批次寫入資料庫"""
+        connection = None
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            connection = sqlite3.connect(self.db_path)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(_SCHEMA)
+            self._prune(connection)
+            with connection:
+                self.session_id = connection.execute(
+                    'INSERT INTO sessions (started, profile) VALUES (?, ?)', (self.session_start, profile)
+                ).lastrowid
+            self._load_recent(connection)
+        except sqlite3.Error as e:
+            print(f"⚠️ 技能統計資料庫無法開啟，只保留記憶體統計: {e}")
+            if connection is not None:
+                connection.close()
+            connection = None
+
+        rows = []
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, next_flush - time.monotonic()))
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            if item:
+                rows.extend(self._process(item))
+            if time.monotonic() >= next_flush or len(rows) >= self.batch_size:
+                rows.extend(self._check_missed(time.time()))
+                self._write(connection, rows)
+                rows = []
+                next_flush = time.monotonic() + self.flush_interval
+
+        rows.extend(self._check_missed(time.time()))
+        self._write(connection, rows)
+        if connection is not None:
+            connection.close()
+
+    def _process(self, item):
+        """原始事件 → 資料庫事件列（同時更新記憶體統計）"""
+        kind, timestamp, skill_id, player, cooldown = item
+        rows = []
+        if kind == KIND_FINISH:
+            if not cooldown:
+                return rows
+            self._finished[skill_id] = (timestamp, cooldown, player)
+        else:
+            finished = self._finished.pop(skill_id, None)
+            if finished is not None and timestamp - finished[0] > self.missed_grace:
+                rows.append((finished[0] + self.missed_grace, KIND_MISSED, skill_id, finished[2],
+                             finished[1], None, None))
+            last = self._last_cast.get(skill_id)
+            gap = covered = None
+            if last is not None:
+                gap = timestamp - last[0]
+                covered = min(gap, last[1])
+            self._last_cast[skill_id] = (timestamp, cooldown)
+        rows.append((timestamp, kind, skill_id, player, cooldown, gap if kind == KIND_CAST else None,
+                     covered if kind == KIND_CAST else None))
+        self._apply(rows, session=True)
+        return rows
+
+    def _check_missed(self, now):
+        """結束後超過 missed_grace 秒仍未再次觸發的計時器記為錯過"""
+        rows = []
+        for skill_id, (finished, cooldown, player) in list(self._finished.items()):
+            if now - finished > self.missed_grace:
+                del self._finished[skill_id]
+                rows.append((finished + self.missed_grace, KIND_MISSED, skill_id, player, cooldown, None, None))
+        self._apply(rows, session=True)
+        return rows
+
+    def _apply(self, rows, session):
+        """事件列加入本場與滾動統計"""
+        if not rows:
+            return
+        with self._lock:
+            for row in rows:
+                skill_id = row[2]
+                if session:
+                    self._session[skill_id].add(row)
+                self._hour[skill_id].add(row)
+                self._recent.append(row)
+
+    def _expire(self, now):
+        """移出超過 window 秒的事件（呼叫端持有鎖）"""
+        cutoff = now - self.window
+        recent = self._recent
+        while recent and recent[0][0] < cutoff:
+            row = recent.popleft()
+            self._hour[row[2]].add(row, sign=-1)
+
+    def _prune(self, connection):
+        """刪除超過保留天數的事件與場次（資料庫不會無限成長）"""
+        if not self.retention_days:
+            return
+        cutoff = time.time() - self.retention_days * 86400
+        with connection:
+            deleted = connection.execute('DELETE FROM events WHERE time < ?', (cutoff,)).rowcount
+            connection.execute(
+                'DELETE FROM sessions WHERE started < ? AND id NOT IN (SELECT DISTINCT session FROM events)',
+                (cutoff,)
+            )
+        if deleted:
+            print(f"🧹 技能統計: 刪除 {deleted} 筆超過 {self.retention_days} 天的事件")
+
+    def _load_recent(self, connection):
+        """讀入資料庫中最近 window 秒的事件（跨場次的滾動統計）"""
+        rows = connection.execute(
+            'SELECT time, kind, skill_id, player, cooldown, gap, covered FROM events '
+            'WHERE time >= ? ORDER BY time', (time.time() - self.window,)
+        ).fetchall()
+        if rows:
+            self._history_start = min(self._history_start, rows[0][0])
+        self._apply(rows, session=False)
+
+    def _write(self, connection, rows):
+        """一個交易寫入一批事件"""
+        if connection is None or not rows:
+            return
+        try:
+            with connection:
+                connection.executemany(
+                    'INSERT INTO events (session, time, kind, skill_id, player, cooldown, gap, covered) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    [(self.session_id,) + row for row in rows]
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️ 技能統計寫入失敗: {e}")
+            return
+        self.stats['events'] += len(rows)
+        self.stats['batches'] += 1
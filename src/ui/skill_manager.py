@@ -3,18 +3,60 @@
 處理技能的載入、分類、圖片載入等核心邏輯
 """
 
-from PIL import Image, ImageTk
+import os
+import queue
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
 from src.ui.helpers import resource_path
+from src.ui.styles import Colors
+from src.ui.thumbnail_cache import ThumbnailCache
+from src.ui.icon_atlas import IconAtlas, ATLAS_FILENAME
+
+# 主視窗使用的圖示尺寸
+ICON_SIZE_LARGE = 50
+ICON_SIZE_SMALL = 28
+
+
+def decode_icon(icon_path, sizes):
+    """解碼並縮放圖示（可在背景執行緒執行，不建立任何 Tk 物件）
+    
+    大圖（例如整張截圖）先用 draft/reduce 粗略縮小，再做 LANCZOS 縮放。
+    
+    Args:
+        icon_path: 圖片路徑
+        sizes: 需要的邊長列表
+    
+    Returns:
+        {size: PIL.Image (RGBA)}
+    """
+    from PIL import Image
+    
+    img = Image.open(icon_path)
+    target = max(sizes)  # 以最大尺寸解碼，較小的尺寸由下方 reduce + LANCZOS 產生，避免放大造成模糊
+    img.draft('RGB', (target, target))  # 僅 JPEG 有效，其他格式無作用
+    img = img.convert('RGBA')
+    
+    results = {}
+    for size in sorted(sizes, reverse=True):
+        # 比目標大兩倍以上時先整數倍縮小，減少 LANCZOS 的運算量
+        factor = min(img.width, img.height) // (size * 2)
+        source = img.reduce(factor) if factor > 1 else img
+        results[size] = source.resize((size, size), Image.Resampling.LANCZOS)
+    return results
 
 
 class SkillManager:
     """技能管理器"""
     
-    def __init__(self, config_manager):
+    def __init__(self, config_manager, scheduler=None, snapshot_state=None):
         """初始化技能管理器
         
         Args:
             config_manager: 配置管理器實例
+            scheduler: 任務排程器（可選），提供時先顯示預留圖示（不需載入 PIL），
+                       再由 start_icon_loading() 從圖集讀取或於背景執行緒解碼
+            snapshot_state: 啟動快照狀態（可選），直接使用已合併的技能表與分類
         """
         self.config_manager = config_manager
         self.skills = {}
@@ -22,8 +64,35 @@ class SkillManager:
         self.skill_images = {}
         self.skill_images_small = {}
         self.skill_image_paths = {}  # 新增：保存圖片路徑
+        self._pending_icons = []  # (skill_id, icon_filename)
+        
+        # 🆕 背景解碼
+        self.scheduler = scheduler
+        self._icon_executor = None
+        self._decoded_icons = queue.Queue()
+        self._icons_in_flight = 0
+        self._on_icons_loaded = None
+        
+        # 🆕 磁碟縮圖快取（與 config.json 同目錄下的 cache/thumbnails）
+        cache_dir = os.path.join(
+            os.path.dirname(os.path.abspath(config_manager.config_path)), 'cache', 'thumbnails'
+        )
+        self.thumbnail_cache = ThumbnailCache(cache_dir)
         
-        self._load_skills()
+        # 🆕 打包時產生的圖示圖集（不存在時為 None，全部使用散裝圖片）
+        self.icon_atlas = IconAtlas.open(resource_path(ATLAS_FILENAME))
+        
+        if snapshot_state:
+            self._load_skills_from_snapshot(snapshot_state)
+        else:
+            self._load_skills()
+        
+        if scheduler:
+            self._create_placeholders()
+        else:
+            for skill_id, icon_filename in self._pending_icons:
+                self._load_skill_image(skill_id, icon_filename)
+            self._pending_icons = []
     
     def _load_skills(self):
         """載入所有技能和道具"""
@@ -43,8 +112,8 @@ class SkillManager:
                 self.skill_categories[category][subcategory] = []
             self.skill_categories[category][subcategory].append(skill_id)
             
-            # 載入圖片
-            self._load_skill_image(skill_id, skill_data['icon'])
+            # 圖片稍後載入
+            self._pending_icons.append((skill_id, skill_data['icon']))
         
         # 載入道具（使用原始值）
         for item_data in self.config_manager.initial_items:
@@ -62,8 +131,142 @@ class SkillManager:
                 self.skill_categories[category][subcategory] = []
             self.skill_categories[category][subcategory].append(item_id)
             
-            # 載入圖片
-            self._load_skill_image(item_id, item_data['icon'])
+            # 圖片稍後載入
+            self._pending_icons.append((item_id, item_data['icon']))
+    
+    def _load_skills_from_snapshot(self, snapshot_state):
+        """從啟動快照載入技能表與分類（已套用配置的快捷鍵與秒數）"""
+        self.skills = snapshot_state['skills']
+        self.skill_categories = snapshot_state['skill_categories']
+        self._pending_icons = [
+            (skill_id, skill['icon']) for skill_id, skill in self.skills.items()
+        ]
+    
+    def load_icon_images(self, icon_path, sizes):
+        """讀取圖示的多個尺寸：圖集 → 磁碟快取 → 解碼（可在背景執行緒呼叫）
+        
+        Args:
+            icon_path: 圖片路徑
+            sizes: 邊長列表
+        
+        Returns:
+            {size: PIL.Image}
+        """
+        results = {}
+        missing = list(sizes)
+        if self.icon_atlas is not None:
+            icon_name = os.path.basename(icon_path)
+            for size in sizes:
+                image = self.icon_atlas.get(icon_name, size, icon_path)
+                if image is not None:
+                    results[size] = image
+                    missing.remove(size)
+        
+        if missing:
+            results.update(self.thumbnail_cache.load(icon_path, missing, decode_icon))
+        return results
+    
+    def load_icon_image(self, icon_path, size):
+        """讀取單一尺寸的圖示（供技能視窗使用）"""
+        return self.load_icon_images(icon_path, (size,))[size]
+    
+    def _create_placeholders(self):
+        """為所有技能建立預留圖示（之後直接覆蓋內容，不需重建 UI）"""
+        for skill_id, icon_filename in self._pending_icons:
+            self.skill_image_paths[skill_id] = resource_path(f"images/{icon_filename}")
+            self.skill_images[skill_id] = self._new_placeholder(ICON_SIZE_LARGE)
+            self.skill_images_small[skill_id] = self._new_placeholder(ICON_SIZE_SMALL)
+    
+    def _new_placeholder(self, size):
+        """建立純色預留圖示（只用 Tk，不載入 PIL）"""
+        photo = tk.PhotoImage(width=size, height=size)
+        photo.put(Colors.BG_LIGHT, to=(0, 0, size, size))
+        return photo
+    
+    def _show_icon(self, placeholder, image):
+        """（Tk 執行緒）把 PIL 圖片覆蓋到預留圖示上，所有使用中的 Label 同步更新"""
+        from PIL import ImageTk
+        
+        photo = ImageTk.PhotoImage(image)
+        placeholder.tk.call(placeholder.name, 'copy', str(photo), '-compositingrule', 'set')
+    
+    def start_icon_loading(self, priority_ids=(), on_done=None):
+        """載入圖示：圖集中的直接覆蓋，其餘於背景執行緒池解碼後交回 Tk 執行緒
+        
+        Args:
+            priority_ids: 優先解碼的技能 ID（例如有快捷鍵或常駐/循環的技能）
+            on_done: 全部圖示載入完成時的回調（可選）
+        """
+        priority_ids = set(priority_ids)
+        pending = sorted(self._pending_icons, key=lambda entry: entry[0] not in priority_ids)
+        self._pending_icons = []
+        
+        # 圖集：不需解碼，直接在 Tk 執行緒覆蓋
+        if self.icon_atlas is not None:
+            remaining = []
+            for skill_id, icon_filename in pending:
+                icon_path = self.skill_image_paths[skill_id]
+                large = self.icon_atlas.get(icon_filename, ICON_SIZE_LARGE, icon_path)
+                small = self.icon_atlas.get(icon_filename, ICON_SIZE_SMALL, icon_path)
+                if large is None or small is None:
+                    remaining.append((skill_id, icon_filename))
+                    continue
+                self._show_icon(self.skill_images[skill_id], large)
+                self._show_icon(self.skill_images_small[skill_id], small)
+            pending = remaining
+        
+        if not pending:
+            if on_done:
+                on_done()
+            return
+        
+        if self._icon_executor is None:
+            workers = min(4, os.cpu_count() or 1)
+            self._icon_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='icon')
+        
+        for skill_id, _ in pending:
+            future = self._icon_executor.submit(
+                self.load_icon_images, self.skill_image_paths[skill_id],
+                (ICON_SIZE_LARGE, ICON_SIZE_SMALL)
+            )
+            future.add_done_callback(
+                lambda f, sid=skill_id: self._decoded_icons.put((sid, f))
+            )
+            self._icons_in_flight += 1
+        
+        self._on_icons_loaded = on_done
+        self.scheduler.root.after(15, self._drain_decoded_icons)
+    
+    def _drain_decoded_icons(self):
+        """（Tk 執行緒）將解碼完成的圖示覆蓋到預留圖示上"""
+        while True:
+            try:
+                skill_id, future = self._decoded_icons.get_nowait()
+            except queue.Empty:
+                break
+            
+            self._icons_in_flight -= 1
+            if future.cancelled():
+                continue
+            
+            try:
+                images = future.result()
+                self._show_icon(self.skill_images[skill_id], images[ICON_SIZE_LARGE])
+                self._show_icon(self.skill_images_small[skill_id], images[ICON_SIZE_SMALL])
+            except Exception as e:
+                print(f"⚠️ 無法載入圖片 {self.skill_image_paths.get(skill_id)}: {e}")
+        
+        if self._icons_in_flight > 0:
+            self.scheduler.root.after(15, self._drain_decoded_icons)
+        elif self._on_icons_loaded:
+            callback, self._on_icons_loaded = self._on_icons_loaded, None
+            callback()
+    
+    def shutdown(self):
+        """停止背景解碼"""
+        if self._icon_executor is not None:
+            self._icon_executor.shutdown(wait=False, cancel_futures=True)
+            self._icon_executor = None
     
     def _load_skill_image(self, skill_id, icon_filename):
         """載入技能圖片
@@ -72,14 +275,14 @@ class SkillManager:
             skill_id: 技能 ID
             icon_filename: 圖片檔名
         """
+        from PIL import ImageTk
+        
         icon_path = resource_path(f"images/{icon_filename}")
         self.skill_image_paths[skill_id] = icon_path  # 保存路徑
         try:
-            img = Image.open(icon_path)
-            img_large = img.resize((50, 50), Image.Resampling.LANCZOS)
-            img_small = img.resize((28, 28), Image.Resampling.LANCZOS)
-            self.skill_images[skill_id] = ImageTk.PhotoImage(img_large)
-            self.skill_images_small[skill_id] = ImageTk.PhotoImage(img_small)
+            images = self.load_icon_images(icon_path, (ICON_SIZE_LARGE, ICON_SIZE_SMALL))
+            self.skill_images[skill_id] = ImageTk.PhotoImage(images[ICON_SIZE_LARGE])
+            self.skill_images_small[skill_id] = ImageTk.PhotoImage(images[ICON_SIZE_SMALL])
         except:
             self.skill_images[skill_id] = None
             self.skill_images_small[skill_id] = None
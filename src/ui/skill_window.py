@@ -4,8 +4,12 @@
 """
 
 import tkinter as tk
-import winsound
+try:
+    import winsound
+except ImportError:  # 非 Windows（例如在 Linux 上執行效能測試）沒有提示音
+    winsound = None
 from src.ui.styles import Colors
+from src.ui.timer_events import EVENT_START, EVENT_TICK, EVENT_ALERT, EVENT_FINISH, EVENT_CLOSE
 
 
 class SkillWindow:
@@ -18,7 +22,11 @@ class SkillWindow:
         alert_enabled=False, alert_before_seconds=0, on_alert=None,  # 🆕 提前提示參數
         on_drag_start=None, on_drag_motion=None, on_drag_end=None,  # 🔧 拖曳回調參數
         window_size=64,  # 🆕 視窗大小參數
-        skill_image_path=None  # 🆕 圖片路徑參數
+        skill_image_path=None,  # 🆕 圖片路徑參數
+        image_loader=None,  # 🆕 圖示讀取函數 image_loader(path, size)（圖集/快取）
+        prewarm=False,  # 🆕 預先建立隱藏視窗，呼叫 activate() 才顯示並開始倒數
+        elapsed=0,  # 🆕 觸發後已經過的秒數（隊友觸發時扣除網路延遲）
+        on_event=None  # 🆕 計時器事件回調 on_event(事件類型, 視窗)
     ):
         self.skill = skill
         self.player = player
@@ -29,6 +37,7 @@ class SkillWindow:
         self.is_loop = is_loop
         self.skill_image = skill_image
         self._skill_image_path = skill_image_path  # 🆕 保存圖片路徑
+        self.image_loader = image_loader
 
         self.window_alpha = window_alpha if window_alpha is not None else 0.95
         self.window_size = window_size  # 🆕 保存視窗大小
@@ -38,6 +47,7 @@ class SkillWindow:
         self.alert_before_seconds = alert_before_seconds
         self.on_alert = on_alert  # 回調函數
         self.alert_triggered = False  # 是否已觸發提示
+        self.on_event = on_event
         
         # 🔧 拖曳回調函數
         self.on_drag_start = on_drag_start
@@ -54,22 +64,26 @@ class SkillWindow:
         self.start_time = None
         self.end_time = None
 
-        self._create_window(position)
+        self._create_window(position, hidden=prewarm)
 
-        if not start_at_zero:
-            self.start_countdown()
+        if prewarm:
+            pass  # 等 activate()
+        elif not start_at_zero:
+            self.start_countdown(elapsed)
         else:
             self._update_display()
 
     # --------------------------------------------------
     # UI
     # --------------------------------------------------
-    def _create_window(self, position):
+    def _create_window(self, position, hidden=False):
         from PIL import Image, ImageTk
 
         window_size = self.window_size  # 🆕 使用實例變數
 
         self.window = tk.Toplevel()
+        if hidden:
+            self.window.withdraw()  # 🆕 預建視窗：建立完成前就隱藏，不會閃爍
         self.window.attributes("-topmost", True)
         self.window.attributes("-alpha", self.window_alpha)
         self.window.overrideredirect(True)
@@ -102,8 +116,12 @@ class SkillWindow:
         if self._skill_image_path:
             try:
                 from PIL import Image, ImageTk
-                img = Image.open(self._skill_image_path)
-                img = img.resize((window_size, window_size), Image.Resampling.LANCZOS)
+                if self.image_loader is not None:
+                    # 🆕 優先使用圖集與磁碟快取，沒有才解碼
+                    img = self.image_loader(self._skill_image_path, window_size)
+                else:
+                    img = Image.open(self._skill_image_path)
+                    img = img.resize((window_size, window_size), Image.Resampling.LANCZOS)
                 self.bg_image = ImageTk.PhotoImage(img)
                 print(f"✅ 已載入並縮放技能圖片: {self.skill_id}, 大小: {window_size}x{window_size}")
             except Exception as e:
@@ -243,21 +261,53 @@ class SkillWindow:
         if self.on_drag_end:
             self.on_drag_end(event)
 
+    # --------------------------------------------------
+    # 🆕 預建視窗
+    # --------------------------------------------------
+    def activate(self, position, player, is_permanent, is_loop,
+                 alert_enabled, alert_before_seconds, enable_sound, elapsed=0):
+        """顯示預先建立的視窗並開始倒數（只更新設定，不重建任何元件）"""
+        self.player = player
+        self.is_permanent = is_permanent
+        self.is_loop = is_loop
+        self.alert_enabled = alert_enabled
+        self.alert_before_seconds = alert_before_seconds
+        self.enable_sound = enable_sound
+        self.total = self.skill["cooldown"]  # 秒數可能在預建後被修改
+        self.remaining = self.total
+
+        self.window.geometry(f"+{position[0]}+{position[1]}")
+        self.window.deiconify()
+        self.window.attributes("-topmost", True)
+        self.start_countdown(elapsed)
+
+    def discard(self):
+        """銷毀視窗但不觸發 on_close（用於未使用的預建視窗）"""
+        self.stop_countdown()
+        try:
+            self.window.destroy()
+        except:
+            pass
+
     # --------------------------------------------------
     # Countdown Logic
     # --------------------------------------------------
-    def start_countdown(self):
+    def start_countdown(self, elapsed=0):
         import time
+        import math
         self.stop_countdown()
         self.running = True
         self.alert_triggered = False
         
-        # 🔧 記錄開始和結束時間戳
-        self.start_time = time.time()
+        # 🔧 記錄開始和結束時間戳（🆕 扣除觸發後已經過的秒數）
+        self.start_time = time.time() - elapsed
         self.end_time = self.start_time + self.total
+        if elapsed > 0:
+            self.remaining = max(0, math.ceil(self.total - elapsed))
         
         self._update_display()
         self.after_id = self.window.after(100, self._tick)  # 🔧 100ms 更新一次（更流暢）
+        self._emit(EVENT_START)
 
     def stop_countdown(self):
         self.running = False
@@ -265,14 +315,36 @@ class SkillWindow:
             self.window.after_cancel(self.after_id)
             self.after_id = None
 
-    def reset_countdown(self):
+    def reset_countdown(self, elapsed=0):
         self.remaining = self.total
         self.alert_triggered = False
         self._update_display()
-        self.start_countdown()
+        self.start_countdown(elapsed)
+
+    def restart_countdown(self, elapsed=0):
+        self.reset_countdown(elapsed)
 
-    def restart_countdown(self):
-        self.reset_countdown()
+    def time_left(self):
+        """🆕 精確的剩餘秒數（未在倒數時返回 None）"""
+        import time
+        if not self.running or self.end_time is None:
+            return None
+        return max(0.0, self.end_time - time.time())
+
+    def resync(self, remaining):
+        """🆕 以遊戲畫面讀到的剩餘秒數校正倒數（不改變冷卻總秒數與循環設定）"""
+        import time
+        import math
+        if not self.running:
+            return
+        now = time.time()
+        self.start_time = now - (self.total - remaining)
+        self.end_time = now + remaining
+        self.remaining = max(0, math.ceil(remaining))
+        if self.remaining > self.alert_before_seconds:
+            self.alert_triggered = False
+        self._update_display()
+        self._emit(EVENT_TICK)
 
     def _tick(self):
         import time
@@ -293,6 +365,7 @@ class SkillWindow:
         if new_remaining != self.remaining:
             self.remaining = new_remaining
             self._update_display()
+            self._emit(EVENT_TICK)
             
             # 檢查是否需要觸發提前提示
             if (self.alert_enabled and 
@@ -313,6 +386,8 @@ class SkillWindow:
         if self.alert_enabled and not self.alert_triggered and self.alert_before_seconds == 0:
             self._trigger_alert()
         
+        self._emit(EVENT_FINISH)
+        
         if self.enable_sound:
             self._play_sound()
 
@@ -350,12 +425,14 @@ class SkillWindow:
         
         # 🔧 然後才開始倒數（立即開始，不要延遲）
         self.running = True
+        self._emit(EVENT_START)
         self._tick()  # 🔧 直接調用而不是 after，這樣時間戳更精確
 
     # 🆕 觸發提前提示
     def _trigger_alert(self):
         """觸發提前提示音和視窗"""
         self.alert_triggered = True
+        self._emit(EVENT_ALERT)
         
         # 播放提示音
         if self.enable_sound:
@@ -382,6 +459,11 @@ class SkillWindow:
         # 🆕 更新主文字（白色）
         self.canvas.itemconfig(self.timer_text, text=text, fill="white")
 
+    def _emit(self, kind):
+        """🆕 發出計時器事件"""
+        if self.on_event:
+            self.on_event(kind, self)
+
     def _play_sound(self):
         try:
             winsound.Beep(800, 300)
@@ -396,6 +478,7 @@ class SkillWindow:
 
     def close(self):
         self.stop_countdown()
+        self._emit(EVENT_CLOSE)
         try:
             self.window.destroy()
         except:
@@ -0,0 +1,178 @@
+"""
+啟動效能分析模組
+記錄各模組導入時間與啟動階段耗時（main.py --profile-startup）
+"""
+
+import builtins
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ImportTimer:
+    """攔截 __import__，記錄每個模組第一次導入的耗時"""
+
+    def __init__(self):
+        self.records = []  # {'module', 'inclusive_ms', 'self_ms', 'depth'}
+        self._stack = []
+        self._original_import = None
+        self._thread_id = threading.get_ident()  # 只記錄主執行緒的導入
+
+    def install(self):
+        """開始記錄"""
+        if self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self):
+        """停止記錄"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """計時版 __import__（只記錄主執行緒尚未載入的絕對導入）"""
+        if (level != 0 or name in sys.modules
+                or threading.get_ident() != self._thread_id):
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            inclusive = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += inclusive
+            self.records.append({
+                'module': name,
+                'inclusive_ms': round(inclusive * 1000, 3),
+                'self_ms': round((inclusive - children) * 1000, 3),
+                'depth': len(self._stack),
+            })
+
+
+class StartupProfiler:
+    """啟動階段計時器（停用時所有方法都不做事）"""
+
+    def __init__(self, enabled=True, output_path='startup_profile.json'):
+        """初始化啟動計時器
+
+        Args:
+            enabled: 是否啟用
+            output_path: 結果輸出路徑（JSON）
+        """
+        self.enabled = enabled
+        self.output_path = output_path
+        self.import_timer = ImportTimer()
+        self._t0 = time.perf_counter()
+        self._phases = {}  # name -> [start, end]
+        self._marks = {}
+        self._written = False
+
+    def _now_ms(self):
+        return round((time.perf_counter() - self._t0) * 1000, 3)
+
+    def start_import_timing(self):
+        """開始記錄模組導入時間"""
+        if self.enabled:
+            self.import_timer.install()
+
+    def stop_import_timing(self):
+        """停止記錄模組導入時間"""
+        self.import_timer.uninstall()
+
+    def begin(self, name):
+        """開始一個階段"""
+        if self.enabled:
+            self._phases[name] = [self._now_ms(), None]
+
+    def end(self, name):
+        """結束一個階段"""
+        if self.enabled and name in self._phases:
+            self._phases[name][1] = self._now_ms()
+
+    @contextmanager
+    def phase(self, name):
+        """以 with 區塊計時一個階段"""
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def mark(self, name):
+        """記錄時間點（例如主視窗第一次繪製）"""
+        if self.enabled and name not in self._marks:
+            self._marks[name] = self._now_ms()
+
+    def pending_phases(self):
+        """尚未結束的階段"""
+        return [name for name, (_, end) in self._phases.items() if end is None]
+
+    def write_when_done(self, root, timeout_ms=30000, poll_ms=100):
+        """等所有階段結束後寫入結果（非同步階段如圖示解碼、UI 建立）
+
+        Args:
+            root: Tk 根視窗（用來輪詢）
+            timeout_ms: 最長等待時間
+            poll_ms: 輪詢間隔
+        """
+        if not self.enabled:
+            return
+
+        def poll(waited=0):
+            if self.pending_phases() and waited < timeout_ms:
+                root.after(poll_ms, poll, waited + poll_ms)
+            else:
+                self.write()
+
+        root.after(poll_ms, poll)
+
+    def report(self):
+        """產生結果字典"""
+        imports = sorted(
+            self.import_timer.records, key=lambda r: r['inclusive_ms'], reverse=True
+        )
+        return {
+            'total_ms': self._now_ms(),
+            'phases': {
+                name: {
+                    'start_ms': start,
+                    'end_ms': end,
+                    'duration_ms': round(end - start, 3) if end is not None else None,
+                }
+                for name, (start, end) in self._phases.items()
+            },
+            'marks': dict(self._marks),
+            'imports': imports,
+        }
+
+    def write(self, path=None):
+        """寫入結果並輸出摘要"""
+        if not self.enabled or self._written:
+            return
+        self._written = True
+        self.stop_import_timing()
+
+        path = path or self.output_path
+        report = self.report()
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"⚠️ 無法寫入啟動分析結果: {e}")
+            return
+
+        print(f"⏱️ 啟動分析已寫入 {path}")
+        for name, info in report['phases'].items():
+            print(f"   {name:<16} {info['duration_ms']} ms")
+        for name, value in report['marks'].items():
+            print(f"   {name:<16} @ {value} ms")
+        top_imports = [r for r in report['imports'] if r['depth'] == 0][:5]
+        for record in top_imports:
+            print(f"   import {record['module']:<24} {record['inclusive_ms']} ms")
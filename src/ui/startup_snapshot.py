@@ -0,0 +1,111 @@
+"""
+啟動快照模組
+把已合併的技能表、分類順序與當前配置套用後的狀態存成單一二進位檔，
+下次啟動一次讀取即可，不需重新解析 config.json 與配置檔案
+"""
+
+import os
+import pickle
+import struct
+
+# 檔頭：魔術字串、格式版本
+_HEADER = struct.Struct('<4sH')
+_MAGIC = b'SSNP'
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_FILENAME = 'startup_snapshot.bin'
+
+
+class StartupSnapshot:
+    """啟動快照
+
+    以 config.json、profiles 目錄、當前配置檔案與 images 目錄的
+    修改時間（與大小）作為驗證戳記，任何一個改變時快照即失效。
+    """
+
+    def __init__(self, snapshot_path, config_path, profiles_dir, images_dir):
+        """初始化啟動快照
+
+        Args:
+            snapshot_path: 快照檔案路徑
+            config_path: config.json 路徑
+            profiles_dir: 配置檔案目錄
+            images_dir: 圖片目錄
+        """
+        self.snapshot_path = snapshot_path
+        self.config_path = config_path
+        self.profiles_dir = profiles_dir
+        self.images_dir = images_dir
+
+    def _stamps(self, profile_name):
+        """取得驗證戳記（檔案不存在時記為 None）"""
+        paths = [
+            self.config_path,
+            self.profiles_dir,
+            os.path.join(self.profiles_dir, f"{profile_name}.json"),
+            self.images_dir,
+        ]
+        stamps = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamps.append(None)
+        return stamps
+
+    def load(self):
+        """讀取快照
+
+        Returns:
+            狀態字典，沒有快照、格式不符或已失效時返回 None
+        """
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        try:
+            magic, version = _HEADER.unpack_from(data)
+            if magic != _MAGIC or version != SNAPSHOT_VERSION:
+                return None
+            payload = pickle.loads(data[_HEADER.size:])
+            if payload['stamps'] != self._stamps(payload['state']['profile_name']):
+                return None
+            return payload['state']
+        except Exception as e:
+            print(f"⚠️ 無法讀取啟動快照: {e}")
+            return None
+
+    def save(self, state):
+        """寫入快照（失敗時靜默忽略，快照只是加速用）
+
+        Args:
+            state: 狀態字典，需包含 profile_name
+
+        Returns:
+            成功返回 True，失敗返回 False
+        """
+        try:
+            payload = {'stamps': self._stamps(state['profile_name']), 'state': state}
+            data = _HEADER.pack(_MAGIC, SNAPSHOT_VERSION) + pickle.dumps(
+                payload, protocol=pickle.HIGHEST_PROTOCOL
+            )
+
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            tmp_path = self.snapshot_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.snapshot_path)
+            return True
+        except Exception as e:
+            print(f"⚠️ 無法寫入啟動快照: {e}")
+            return False
+
+    def invalidate(self):
+        """刪除快照"""
+        try:
+            os.remove(self.snapshot_path)
+        except OSError:
+            pass
@@ -34,6 +34,15 @@ class Sizes:
     SKILL_WINDOW_WIDTH = 100
     SKILL_WINDOW_HEIGHT = 125
     
+    # 技能視窗大小選項（設定對話框與打包圖示圖集共用）
+    SKILL_WINDOW_SIZE_OPTIONS = [
+        ("極小 (48px)", 48),
+        ("小 (64px) - 預設", 64),
+        ("中 (80px)", 80),
+        ("大 (96px)", 96),
+        ("極大 (128px)", 128)
+    ]
+    
     # 按鈕尺寸
     BTN_LARGE = (120, 35)
     BTN_MEDIUM = (100, 30)
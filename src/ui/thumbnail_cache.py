@@ -0,0 +1,205 @@
+"""
+縮圖快取模組
+將縮放後的圖示以 RGBA 原始資料存到磁碟，下次啟動直接讀取，不需重新解碼
+"""
+
+import hashlib
+import os
+import struct
+import threading
+
+# 檔頭：魔術字串、寬、高
+_HEADER = struct.Struct('<4sHH')
+_MAGIC = b'STC1'
+_SUFFIX = '.rgba'
+
+
+class ThumbnailCache:
+    """磁碟縮圖快取
+
+    檔名由（圖片路徑、尺寸、來源檔案 mtime 與大小）的雜湊組成：
+    來源圖片變更後雜湊不同，舊快取會在寫入新快取時一併刪除。
+    總大小超過上限時，刪除最久未使用的檔案。
+    """
+
+    def __init__(self, cache_dir, max_bytes=32 * 1024 * 1024):
+        """初始化縮圖快取
+
+        Args:
+            cache_dir: 快取目錄
+            max_bytes: 快取大小上限（位元組）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None  # 第一次寫入時才掃描目錄
+
+    # ==================== 讀寫 ====================
+
+    def get(self, icon_path, size):
+        """讀取快取的縮圖
+
+        Args:
+            icon_path: 原始圖片路徑
+            size: 邊長
+
+        Returns:
+            PIL.Image (RGBA) 或 None（沒有快取或來源已變更）
+        """
+        try:
+            cache_path = self._cache_path(icon_path, size)
+            with open(cache_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        try:
+            magic, width, height = _HEADER.unpack_from(data)
+            if magic != _MAGIC or len(data) != _HEADER.size + width * height * 4:
+                return None
+            os.utime(cache_path)  # 更新使用時間（LRU）
+        except (struct.error, OSError):
+            return None
+
+        from PIL import Image
+
+        return Image.frombuffer(
+            'RGBA', (width, height), data[_HEADER.size:], 'raw', 'RGBA', 0, 1
+        )
+
+    def put(self, icon_path, size, image):
+        """寫入縮圖快取（失敗時靜默忽略，快取只是加速用）
+
+        Args:
+            icon_path: 原始圖片路徑
+            size: 邊長
+            image: 縮放後的 PIL.Image
+        """
+        try:
+            cache_path = self._cache_path(icon_path, size)
+            image = image.convert('RGBA')
+            data = _HEADER.pack(_MAGIC, image.width, image.height) + image.tobytes()
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"⚠️ 無法寫入縮圖快取 {icon_path}: {e}")
+            return
+
+        with self._lock:
+            freed = self._remove_stale(cache_path)
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total_bytes()
+            else:
+                self._total_bytes += len(data) - freed
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def load(self, icon_path, sizes, decoder):
+        """讀取多個尺寸的縮圖，缺少的尺寸用 decoder 產生並寫入快取
+
+        Args:
+            icon_path: 原始圖片路徑
+            sizes: 邊長列表
+            decoder: decoder(icon_path, sizes) -> {size: PIL.Image}
+
+        Returns:
+            {size: PIL.Image}
+        """
+        results = {}
+        missing = []
+        for size in sizes:
+            image = self.get(icon_path, size)
+            if image is None:
+                missing.append(size)
+            else:
+                results[size] = image
+
+        if missing:
+            decoded = decoder(icon_path, missing)
+            for size, image in decoded.items():
+                self.put(icon_path, size, image)
+            results.update(decoded)
+
+        return results
+
+    def clear(self):
+        """清空快取"""
+        with self._lock:
+            for entry in self._entries():
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+            self._total_bytes = 0
+
+    # ==================== 內部工具 ====================
+
+    def _cache_path(self, icon_path, size):
+        """計算快取檔案路徑（來源不存在時拋出 OSError）"""
+        icon_path = os.path.abspath(icon_path)
+        st = os.stat(icon_path)
+        source_key = hashlib.sha1(icon_path.encode('utf-8')).hexdigest()[:16]
+        version_key = hashlib.sha1(
+            f"{st.st_mtime_ns}|{st.st_size}".encode('utf-8')
+        ).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f"{source_key}_{size}_{version_key}{_SUFFIX}")
+
+    def _entries(self):
+        """列出快取檔案"""
+        try:
+            return [
+                entry for entry in os.scandir(self.cache_dir)
+                if entry.is_file() and entry.name.endswith(_SUFFIX)
+            ]
+        except OSError:
+            return []
+
+    def _remove_stale(self, cache_path):
+        """刪除同一圖片、同一尺寸的舊版本快取，返回釋放的位元組數"""
+        name = os.path.basename(cache_path)
+        prefix = name[:name.rindex('_') + 1]
+        freed = 0
+        for entry in self._entries():
+            if entry.name.startswith(prefix) and entry.name != name:
+                try:
+                    freed += entry.stat().st_size
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+        return freed
+
+    def _scan_total_bytes(self):
+        """計算快取目錄總大小"""
+        total = 0
+        for entry in self._entries():
+            try:
+                total += entry.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _evict(self):
+        """依最後使用時間刪除最舊的快取，直到低於上限"""
+        entries = []
+        for entry in self._entries():
+            try:
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+            except OSError:
+                pass
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
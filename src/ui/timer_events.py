@@ -0,0 +1,74 @@
+"""
+計時器事件
+技能視窗在狀態改變時發出事件（開始、秒數變化、提前提示、倒數結束、關閉），
+由主視窗的 TimerEvents 分派給訂閱者（串流疊加層等），訂閱者不必輪詢視窗狀態。
+"""
+
+EVENT_START = 'start'    # 開始或重新開始倒數（含循環重新開始）
+EVENT_TICK = 'tick'      # 顯示的秒數改變（含校正）
+EVENT_ALERT = 'alert'    # 提前提示
+EVENT_FINISH = 'finish'  # 倒數結束
+EVENT_CLOSE = 'close'    # 視窗關閉
+
+TIMER_EVENTS = (EVENT_START, EVENT_TICK, EVENT_ALERT, EVENT_FINISH, EVENT_CLOSE)
+
+
+def describe(kind, window):
+    """技能視窗 → 事件字典
+
+    Args:
+        kind: 事件類型
+        window: SkillWindow
+
+    Returns:
+        {type, skill_id, name, icon, player, remaining, total, end_time, loop, permanent}
+        end_time 為 time.time() 時間（未在倒數時為 None）
+    """
+    return {
+        'type': kind,
+        'skill_id': window.skill_id,
+        'name': window.skill.get('name', window.skill_id),
+        'icon': window.skill.get('icon', ''),
+        'player': window.player,
+        'remaining': window.remaining,
+        'total': window.total,
+        'end_time': window.end_time if window.running else None,
+        'loop': window.is_loop,
+        'permanent': window.is_permanent,
+    }
+
+
+class TimerEvents:
+    """計時器事件分派（Tk 主執行緒）
+
+    沒有訂閱者時 emit() 不建立事件字典；
+    每個事件只建立一次字典，所有訂閱者共用（訂閱者不應修改）。
+    """
+
+    def __init__(self):
+        self._listeners = []
+
+    def subscribe(self, listener):
+        """訂閱事件
+
+        Args:
+            listener: listener(event)，event 為 describe() 的字典
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """取消訂閱"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def emit(self, kind, window):
+        """發出事件（SkillWindow 的 on_event 回調）"""
+        if not self._listeners:
+            return
+        event = describe(kind, window)
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"⚠️ 計時器事件處理失敗 ({kind}): {e}")
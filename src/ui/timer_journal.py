@@ -0,0 +1,246 @@
+"""
+計時器日誌
+以只附加的固定長度紀錄保存計時器的開始、重新開始、模式變更與關閉，
+主程式當機或重新啟動後，依日誌把仍在倒數的計時器恢復到正確的剩餘秒數。
+
+紀錄格式 RECORD（32 位元組，little-endian）：
+    類型、旗標（FLAG_LOOP / FLAG_PERMANENT）、保留、冷卻秒數（float32）、
+    技能鍵（skill_id 的 8 位元組雜湊）、結束時間（time.time()）、CRC32（前 24 位元組）
+
+寫入由背景執行緒批次進行（每批一次 write ＋ 一次 fsync），熱路徑只把紀錄加入緩衝區。
+紀錄數超過門檻時改寫為只含進行中計時器的新檔（寫入暫存檔後 os.replace）。
+讀取時遇到 CRC 不符或不完整的尾端紀錄（寫到一半當機）就停止，並截斷到最後一筆完整紀錄。
+"""
+
+import hashlib
+import os
+import struct
+import threading
+import time
+import zlib
+
+from src.ui.timer_events import EVENT_ALERT, EVENT_CLOSE, EVENT_FINISH, EVENT_START, EVENT_TICK
+
+JOURNAL_FILENAME = 'timers.journal'
+
+RECORD = struct.Struct('<BBHfQdI4x')
+_CHECKED = struct.Struct('<BBHfQd')  # CRC 涵蓋的欄位
+
+KIND_START = 1
+KIND_RESTART = 2
+KIND_MODE = 3
+KIND_CLOSE = 4
+
+FLAG_LOOP = 0x01
+FLAG_PERMANENT = 0x02
+
+# 結束時間變動超過此秒數才記錄（一般的秒數變化不寫入，校正才寫入）
+RESYNC_TOLERANCE = 0.5
+
+DEFAULT_SYNC_INTERVAL = 0.5
+DEFAULT_COMPACT_AFTER = 4096
+
+
+def skill_key(skill_id):
+    """skill_id → 8 位元組雜湊（紀錄不必保存可變長度的技能 ID）"""
+    return int.from_bytes(hashlib.blake2b(skill_id.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def encode_record(kind, flags, total, key, end_time):
+    """一筆紀錄 → 32 位元組"""
+    body = _CHECKED.pack(kind, flags, 0, total, key, end_time)
+    return RECORD.pack(kind, flags, 0, total, key, end_time, zlib.crc32(body))
+
+
+def replay(data):
+    """重播日誌內容
+
+    Args:
+        data: 日誌檔案內容
+
+    Returns:
+        ({技能鍵: (旗標, 冷卻秒數, 結束時間)}, 完整紀錄的位元組數)
+    """
+    timers = {}
+    valid = 0
+    for offset in range(0, len(data) - RECORD.size + 1, RECORD.size):
+        kind, flags, _, total, key, end_time, crc = RECORD.unpack_from(data, offset)
+        if zlib.crc32(data[offset:offset + _CHECKED.size]) != crc:
+            break
+        if kind == KIND_CLOSE:
+            timers.pop(key, None)
+        elif kind in (KIND_START, KIND_RESTART, KIND_MODE):
+            timers[key] = (flags, total, end_time)
+        else:
+            break
+        valid = offset + RECORD.size
+    return timers, valid
+
+
+class TimerJournal:
+    """計時器日誌（TimerEvents 的訂閱者）
+
+    on_event() 在 Tk 主執行緒執行，只編碼紀錄並加入緩衝區；
+    背景執行緒每 sync_interval 秒最多寫入並 fsync 一次。
+    """
+
+    def __init__(self, path, sync_interval=DEFAULT_SYNC_INTERVAL, compact_after=DEFAULT_COMPACT_AFTER):
+        """初始化日誌
+
+        Args:
+            path: 日誌檔案路徑
+            sync_interval: 批次寫入的最短間隔秒數
+            compact_after: 檔案紀錄數超過此值時改寫
+        """
+        self.path = path
+        self.sync_interval = sync_interval
+        self.compact_after = compact_after
+        self.stats = {'records': 0, 'syncs': 0, 'bytes': 0, 'compactions': 0}
+        self._active = {}       # 技能鍵 → (旗標, 結束時間)（Tk 主執行緒）
+        self._pending = []
+        self._condition = threading.Condition()
+        self._live = {}         # 技能鍵 → 紀錄位元組（寫入執行緒，改寫時使用）
+        self._file_records = 0
+        self._fd = None
+        self._thread = None
+        self._closing = False
+
+    # ==================== 開啟 / 關閉 ====================
+
+    def open(self):
+        """讀取日誌並開始寫入
+
+        Returns:
+            {技能鍵: (旗標, 冷卻秒數, 結束時間)}：仍在倒數的計時器（已結束的非循環計時器不返回）
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            data = b''
+        timers, valid = replay(data)
+        if valid < len(data):
+            print(f"⚠️ 計時器日誌尾端有 {len(data) - valid} 位元組不完整，已略過")
+
+        # 以進行中的計時器重新開始一個檔案（同時去除不完整的尾端）
+        now = time.time()
+        live = {}
+        for key, (flags, total, end_time) in timers.items():
+            if end_time > now or flags & FLAG_LOOP:
+                live[key] = (flags, total, end_time)
+                self._live[key] = encode_record(KIND_START, flags, total, key, end_time)
+                self._active[key] = (flags, end_time)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._rewrite()
+
+        self._thread = threading.Thread(target=self._run, name='TimerJournal', daemon=True)
+        self._thread.start()
+        return live
+
+    def close(self):
+        """寫入剩餘紀錄並停止背景執行緒"""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._closing = True
+            self._condition.notify()
+        self._thread.join(timeout=5)
+        self._thread = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    # ==================== 事件 ====================
+
+    def on_event(self, event):
+        """TimerEvents 訂閱者（Tk 主執行緒）"""
+        kind = event['type']
+        key = skill_key(event['skill_id'])
+        active = self._active.get(key)
+
+        if kind == EVENT_CLOSE:
+            if active is not None:
+                del self._active[key]
+                self._append(encode_record(KIND_CLOSE, 0, 0.0, key, 0.0))
+            return
+
+        end_time = event.get('end_time')
+        if end_time is None:
+            return
+        flags = (FLAG_LOOP if event.get('loop') else 0) | (FLAG_PERMANENT if event.get('permanent') else 0)
+
+        if kind == EVENT_START:
+            record_kind = KIND_RESTART if active is not None else KIND_START
+        elif active is None:
+            return  # 日誌開啟前就在倒數的計時器，等下一次開始再記錄
+        elif kind == EVENT_TICK and abs(end_time - active[1]) > RESYNC_TOLERANCE:
+            record_kind = KIND_RESTART  # 校正
+        elif kind in (EVENT_TICK, EVENT_ALERT, EVENT_FINISH) and flags != active[0]:
+            record_kind = KIND_MODE
+        else:
+            return
+
+        self._active[key] = (flags, end_time)
+        self._append(encode_record(record_kind, flags, float(event.get('total') or 0), key, end_time))
+
+    def _append(self, record):
+        """加入寫入緩衝區"""
+        with self._condition:
+            self._pending.append(record)
+            if len(self._pending) == 1:
+                self._condition.notify()
+
+    # ==================== 寫入執行緒 ====================
+
+    def _run(self):
+        """批次寫入：收到紀錄後寫入並 fsync，之後至少間隔 sync_interval 秒"""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closing:
+                    self._condition.wait()
+                records, self._pending = self._pending, []
+                closing = self._closing
+            if records:
+                try:
+                    self._write(records)
+                except OSError as e:
+                    print(f"⚠️ 計時器日誌寫入失敗: {e}")
+            if closing:
+                return
+            time.sleep(self.sync_interval)
+
+    def _write(self, records):
+        """寫入一批紀錄（必要時改寫檔案）"""
+        for record in records:
+            key = RECORD.unpack_from(record)[4]
+            if record[0] == KIND_CLOSE:
+                self._live.pop(key, None)
+            else:
+                self._live[key] = record
+
+        if self._file_records + len(records) > self.compact_after:
+            self._rewrite()
+            self.stats['compactions'] += 1
+        else:
+            data = b''.join(records)
+            os.write(self._fd, data)
+            os.fsync(self._fd)
+            self._file_records += len(records)
+            self.stats['bytes'] += len(data)
+        self.stats['records'] += len(records)
+        self.stats['syncs'] += 1
+
+    def _rewrite(self):
+        """以進行中的計時器改寫日誌（暫存檔 fsync 後取代，當機時舊檔仍完整）"""
+        data = b''.join(self._live.values())
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if self._fd is not None:
+            os.close(self._fd)
+        os.replace(temp_path, self.path)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | getattr(os, 'O_BINARY', 0))
+        self._file_records = len(self._live)
+        self.stats['bytes'] += len(data)
@@ -0,0 +1,343 @@
+"""
+計時器狀態共用記憶體
+主程式把進行中的計時器寫入固定格式的共用記憶體區段，本機的其他工具（Discord 機器人、
+第二螢幕儀表板等）直接讀取記憶體，不需要 IPC 來回，也不需要系統呼叫。
+
+區段格式（little-endian）：
+    0   標頭 HEADER（64 位元組）
+            magic 'SKTM'、版本、紀錄大小、序號（seqlock）、紀錄容量、紀錄數、
+            名稱區容量、名稱區長度、更新時間（time.time()）、名稱表版本
+    64  紀錄 RECORD × 容量
+            技能索引、模式（MODE_*）、旗標（FLAG_*）、冷卻秒數、結束時間（time.time()）
+    ... 名稱表：UTF-8 JSON [[skill_id, 名稱], ...]，技能索引即為列表索引
+
+寫入時序號先加一（奇數表示寫入中），寫完再加一；
+讀取端在序號為偶數且讀取前後相同時才採用（seqlock），否則重試。
+
+讀取端用法：
+
+    from src.ui.timer_shm import TimerStateReader
+    reader = TimerStateReader()
+    for timer in reader.snapshot():
+        print(timer.name, timer.remaining())
+"""
+
+import json
+import os
+import struct
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+from src.ui.timer_events import EVENT_ALERT, EVENT_CLOSE, EVENT_FINISH, EVENT_START
+
+DEFAULT_SEGMENT_NAME = 'artale_skill_tracker_timers'
+SEGMENT_VERSION = 1
+MAGIC = b'SKTM'
+
+HEADER = struct.Struct('<4sHHQIIIIdI')
+HEADER_SIZE = 64
+SEQUENCE = struct.Struct('<Q')
+SEQUENCE_OFFSET = 8
+RECORD = struct.Struct('<HBBfd')
+
+DEFAULT_CAPACITY = 256
+DEFAULT_NAMES_CAPACITY = 64 * 1024
+
+MODE_NORMAL = 0
+MODE_LOOP = 1
+MODE_PERMANENT = 2
+
+FLAG_RUNNING = 0x01
+FLAG_ALERTED = 0x02
+FLAG_FINISHED = 0x04
+
+# 讀取時序號持續變動時最多重試的秒數（寫入端每次只寫幾微秒，正常第一次就成功）
+MAX_READ_WAIT = 0.1
+
+
+class TimerState(namedtuple('TimerState', 'skill_id name end_time total mode flags')):
+    """共用記憶體中的一個計時器"""
+
+    __slots__ = ()
+
+    @property
+    def running(self):
+        return bool(self.flags & FLAG_RUNNING)
+
+    def remaining(self, now=None):
+        """剩餘秒數（未在倒數時為 0）"""
+        if not self.running:
+            return 0.0
+        return max(0.0, self.end_time - (time.time() if now is None else now))
+
+
+def segment_size(capacity=DEFAULT_CAPACITY, names_capacity=DEFAULT_NAMES_CAPACITY):
+    """區段大小（位元組）"""
+    return HEADER_SIZE + capacity * RECORD.size + names_capacity
+
+
+# 本行程建立的區段名稱（同一行程內讀取時不取消 resource_tracker 的登記）
+_created = set()
+
+
+def _attach(name):
+    """連接已存在的區段（讀取端不登記到 resource_tracker，結束時才不會刪除寫入端的區段）"""
+    segment = shared_memory.SharedMemory(name=name)
+    if os.name != 'nt' and name not in _created:
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(segment._name, 'shared_memory')
+        except Exception:
+            pass
+    return segment
+
+
+class TimerStateExporter:
+    """把計時器事件寫入共用記憶體（Tk 主執行緒，TimerEvents 的訂閱者）
+
+    只在影響紀錄內容的事件（開始、提前提示、結束、關閉、校正）時寫入；
+    一般的秒數變化不改變結束時間，不會寫入。每次寫入整個紀錄陣列（只有進行中的計時器）。
+    """
+
+    def __init__(self, name=DEFAULT_SEGMENT_NAME, capacity=DEFAULT_CAPACITY,
+                 names_capacity=DEFAULT_NAMES_CAPACITY):
+        """建立區段
+
+        Args:
+            name: 共用記憶體名稱
+            capacity: 紀錄容量（同時進行的計時器上限）
+            names_capacity: 名稱表容量（位元組）
+        """
+        self.name = name
+        self.capacity = capacity
+        self.names_capacity = names_capacity
+        size = segment_size(capacity, names_capacity)
+        try:
+            self.segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # 上次未正常結束留下的區段
+            stale = _attach(name)
+            stale.close()
+            stale.unlink()
+            self.segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _created.add(name)
+        self.buffer = self.segment.buf
+
+        self._sequence = 0
+        self._names = []        # [[skill_id, 名稱], ...]
+        self._index = {}        # skill_id → 技能索引
+        self._names_generation = 0
+        self._names_length = 0
+        self._records = {}      # skill_id → RECORD 欄位
+        self._names_blob = None  # 待寫入的名稱表
+        self._write_header()
+
+    # ==================== 事件 ====================
+
+    def on_event(self, event):
+        """TimerEvents 訂閱者"""
+        skill_id = event['skill_id']
+        kind = event['type']
+        if kind == EVENT_CLOSE:
+            if self._records.pop(skill_id, None) is not None:
+                self.publish()
+            return
+
+        if skill_id not in self._index:
+            self._add_name(skill_id, event.get('name', skill_id))
+
+        mode = MODE_LOOP if event.get('loop') else MODE_PERMANENT if event.get('permanent') else MODE_NORMAL
+        old = self._records.get(skill_id)
+        flags = old[2] if old and kind != EVENT_START else 0
+        if event.get('end_time') is not None:
+            flags |= FLAG_RUNNING
+        else:
+            flags &= ~FLAG_RUNNING
+        if kind == EVENT_ALERT:
+            flags |= FLAG_ALERTED
+        elif kind == EVENT_FINISH:
+            flags |= FLAG_FINISHED
+        record = (self._index[skill_id], mode, flags, float(event.get('total') or 0),
+                  float(event.get('end_time') or 0.0))
+        if record != old:
+            self._records[skill_id] = record
+            self.publish()
+
+    def publish(self):
+        """以 seqlock 寫入所有紀錄（名稱表有變更時一併寫入）"""
+        records = list(self._records.values())[:self.capacity]
+        self._begin_write()
+        if self._names_blob is not None:
+            start = HEADER_SIZE + self.capacity * RECORD.size
+            self.buffer[start:start + len(self._names_blob)] = self._names_blob
+            self._names_length = len(self._names_blob)
+            self._names_generation += 1
+            self._names_blob = None
+        offset = HEADER_SIZE
+        for record in records:
+            RECORD.pack_into(self.buffer, offset, *record)
+            offset += RECORD.size
+        self._write_header(count=len(records))
+        self._end_write()
+
+    def close(self):
+        """刪除區段（主程式結束時呼叫）"""
+        self._records.clear()
+        try:
+            self.publish()
+        except (TypeError, ValueError):
+            pass
+        self.buffer = None
+        self.segment.close()
+        try:
+            self.segment.unlink()
+        except FileNotFoundError:
+            pass
+        _created.discard(self.name)
+
+    # ==================== 內部 ====================
+
+    def _add_name(self, skill_id, name):
+        """加入名稱表（下次 publish() 寫入；滿了就只保留目前有紀錄的技能並重新編號）"""
+        self._names.append([skill_id, name])
+        self._index[skill_id] = len(self._names) - 1
+        blob = json.dumps(self._names, ensure_ascii=False).encode('utf-8')
+        if len(blob) > self.names_capacity:
+            keep = {entry[0]: entry for entry in self._names if entry[0] in self._records or entry[0] == skill_id}
+            self._names = list(keep.values())
+            self._index = {entry[0]: i for i, entry in enumerate(self._names)}
+            self._records = {
+                sid: (self._index[sid],) + record[1:] for sid, record in self._records.items()
+            }
+            blob = json.dumps(self._names, ensure_ascii=False).encode('utf-8')[:self.names_capacity]
+        self._names_blob = blob
+
+    def _write_header(self, count=0):
+        HEADER.pack_into(
+            self.buffer, 0, MAGIC, SEGMENT_VERSION, RECORD.size, self._sequence,
+            self.capacity, count, self.names_capacity, self._names_length,
+            time.time(), self._names_generation
+        )
+
+    def _begin_write(self):
+        self._sequence += 1
+        SEQUENCE.pack_into(self.buffer, SEQUENCE_OFFSET, self._sequence)
+
+    def _end_write(self):
+        self._sequence += 1
+        SEQUENCE.pack_into(self.buffer, SEQUENCE_OFFSET, self._sequence)
+
+
+class TimerStateReader:
+    """讀取計時器共用記憶體（其他程式使用）
+
+    連接後直接讀取記憶體：序號未改變時 changed() 只讀 8 位元組，
+    snapshot() 在序號穩定時解碼紀錄，名稱表只在版本改變時重新解碼。
+    """
+
+    def __init__(self, name=DEFAULT_SEGMENT_NAME):
+        """連接區段（主程式未啟動時拋出 FileNotFoundError）"""
+        self.segment = _attach(name)
+        self.buffer = self.segment.buf
+        magic, version, record_size = struct.unpack_from('<4sHH', self.buffer, 0)
+        if magic != MAGIC or version != SEGMENT_VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"不支援的計時器區段格式: {magic!r} v{version}")
+        self.updated_at = 0.0
+        self.retries = 0
+        self._sequence = None
+        self._names = []
+        self._names_generation = None
+
+    def sequence(self):
+        """目前的序號（奇數表示寫入中）"""
+        return SEQUENCE.unpack_from(self.buffer, SEQUENCE_OFFSET)[0]
+
+    def changed(self):
+        """上次 snapshot() 之後是否有新的寫入"""
+        return self.sequence() != self._sequence
+
+    def snapshot(self):
+        """讀取一致的計時器快照
+
+        Returns:
+            TimerState 列表
+        """
+        buffer = self.buffer
+        deadline = None
+        attempt = 0
+        while True:
+            if attempt:
+                # 重試：偶爾讓出 CPU 給寫入端，超過時限放棄
+                self.retries += 1
+                if attempt % 16 == 0:
+                    time.sleep(0)
+                    if deadline is None:
+                        deadline = time.monotonic() + MAX_READ_WAIT
+                    elif time.monotonic() > deadline:
+                        raise TimeoutError("計時器區段持續寫入中，無法取得一致的快照")
+            attempt += 1
+
+            before = SEQUENCE.unpack_from(buffer, SEQUENCE_OFFSET)[0]
+            if before & 1:
+                continue
+            (_, _, _, _, capacity, count, _, names_length,
+             updated_at, generation) = HEADER.unpack_from(buffer, 0)
+            end = HEADER_SIZE + min(count, capacity) * RECORD.size
+            records = list(RECORD.iter_unpack(buffer[HEADER_SIZE:end]))
+            if generation != self._names_generation:
+                start = HEADER_SIZE + capacity * RECORD.size
+                blob = bytes(buffer[start:start + names_length])
+            else:
+                blob = None
+            if SEQUENCE.unpack_from(buffer, SEQUENCE_OFFSET)[0] != before:
+                continue
+
+            if blob is not None:
+                self._names = [tuple(entry) for entry in json.loads(blob.decode('utf-8'))] if blob else []
+                self._names_generation = generation
+            self._sequence = before
+            self.updated_at = updated_at
+            # 名稱表與紀錄在同一次寫入中更新，索引必定有效；直接建立 tuple 省去 namedtuple 的參數處理
+            names = self._names
+            new = tuple.__new__
+            return [
+                new(TimerState, names[index] + (end_time, total, mode, flags))
+                for index, mode, flags, total, end_time in records
+            ]
+
+    def close(self):
+        """中斷連接（不刪除區段）"""
+        self.buffer = None
+        self.segment.close()
+
+
+def main():
+    """持續顯示共用記憶體中的計時器：python -m src.ui.timer_shm"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="技能追蹤器 - 計時器共用記憶體讀取")
+    parser.add_argument('--name', default=DEFAULT_SEGMENT_NAME, help="共用記憶體名稱")
+    parser.add_argument('--interval', type=float, default=0.5, help="更新間隔秒數")
+    args = parser.parse_args()
+
+    try:
+        reader = TimerStateReader(args.name)
+    except FileNotFoundError:
+        print("❌ 找不到計時器共用記憶體（主程式未啟動或未啟用匯出）")
+        return
+    try:
+        while True:
+            timers = reader.snapshot()
+            line = '  '.join(f"{timer.name} {timer.remaining():.1f}s" for timer in timers if timer.running)
+            print(f"\r⏱️ {line or '（沒有進行中的計時器）'}\033[K", end='', flush=True)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print()
+    finally:
+        reader.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -16,21 +16,33 @@ except ImportError:
 # GitHub Release API
 GITHUB_API_URL = "https://api.github.com/repos/asd23353934/skill_tracker/releases/latest"
 
-# 嘗試導入 requests
-try:
-    import requests
-    HAS_REQUESTS = True
-except ImportError:
-    HAS_REQUESTS = False
-    print("⚠️ 未安裝 requests 模組，自動更新功能已停用")
-    print("   若要啟用自動更新，請執行: pip install requests")
 
-# 嘗試導入 packaging
-try:
-    from packaging import version as pkg_version
-    HAS_PACKAGING = True
-except ImportError:
-    HAS_PACKAGING = False
+def _import_requests():
+    """延遲導入 requests（啟動時不載入，第一次檢查更新時才導入）
+    
+    Returns:
+        requests 模組或 None
+    """
+    try:
+        import requests
+        return requests
+    except ImportError:
+        print("⚠️ 未安裝 requests 模組，自動更新功能已停用")
+        print("   若要啟用自動更新，請執行: pip install requests")
+        return None
+
+
+def _import_packaging_version():
+    """延遲導入 packaging.version
+    
+    Returns:
+        packaging.version 模組或 None
+    """
+    try:
+        from packaging import version as pkg_version
+        return pkg_version
+    except ImportError:
+        return None
 
 
 class Updater:
@@ -55,7 +67,8 @@ class Updater:
             }
         """
         # 檢查依賴
-        if not HAS_REQUESTS:
+        requests = _import_requests()
+        if requests is None:
             return {
                 'available': False,
                 'current': self.current_version,
@@ -115,7 +128,8 @@ class Updater:
         Returns:
             bool: 如果最新版本更高返回 True
         """
-        if HAS_PACKAGING:
+        pkg_version = _import_packaging_version()
+        if pkg_version is not None:
             try:
                 return pkg_version.parse(latest) > pkg_version.parse(current)
             except: